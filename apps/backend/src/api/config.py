@@ -12,6 +12,7 @@ from src.core.config import (
     DeletePolicy,
     SyncIntervalUnit,
     SyncMode,
+    UploadDispatchMode,
 )
 
 
@@ -24,13 +25,19 @@ class ConfigResponse(BaseModel):
     auth_scopes: list[str] = Field(default_factory=list)
     sync_mode: SyncMode = SyncMode.bidirectional
     ignore_hidden_cache_paths: bool = True
+    local_event_burst_threshold: int = 200
     token_store: str = "keyring"
     upload_interval_value: float = 60.0
     upload_interval_unit: SyncIntervalUnit = SyncIntervalUnit.seconds
     upload_daily_time: str = "01:00"
+    upload_dispatch_mode: UploadDispatchMode = UploadDispatchMode.event
+    sync_max_concurrent_jobs: int = 3
+    sync_task_weights: dict[str, float] = Field(default_factory=dict)
     download_interval_value: float = 1.0
     download_interval_unit: SyncIntervalUnit = SyncIntervalUnit.days
     download_daily_time: str = "01:00"
+    schedule_spread_minutes: int = 30
+    schedule_chain_tasks: bool = False
     sync_log_retention_days: int = 0
     sync_log_warn_size_mb: int = 200
     system_log_retention_days: int = 1
@@ -39,6 +46,8 @@ class ConfigResponse(BaseModel):
     last_update_check: float = 0.0
     allow_dev_to_stable: bool = False
     upload_md_to_cloud: bool = False
+    export_sub_sheets_separately: bool = False
+    sheet_direct_export_max_cells: int = 200000
     device_display_name: str = "当前设备"
     delete_policy: DeletePolicy = DeletePolicy.safe
     delete_grace_minutes: int = 30
@@ -54,13 +63,19 @@ class ConfigResponse(BaseModel):
             auth_scopes=list(config.auth_scopes or []),
             sync_mode=config.sync_mode,
             ignore_hidden_cache_paths=config.ignore_hidden_cache_paths,
+            local_event_burst_threshold=config.local_event_burst_threshold,
             token_store=config.token_store,
             upload_interval_value=config.upload_interval_value,
             upload_interval_unit=config.upload_interval_unit,
             upload_daily_time=config.upload_daily_time,
+            upload_dispatch_mode=config.upload_dispatch_mode,
+            sync_max_concurrent_jobs=config.sync_max_concurrent_jobs,
+            sync_task_weights=dict(config.sync_task_weights or {}),
             download_interval_value=config.download_interval_value,
             download_interval_unit=config.download_interval_unit,
             download_daily_time=config.download_daily_time,
+            schedule_spread_minutes=config.schedule_spread_minutes,
+            schedule_chain_tasks=config.schedule_chain_tasks,
             sync_log_retention_days=config.sync_log_retention_days,
             sync_log_warn_size_mb=config.sync_log_warn_size_mb,
             system_log_retention_days=config.system_log_retention_days,
@@ -69,6 +84,8 @@ class ConfigResponse(BaseModel):
             last_update_check=config.last_update_check,
             allow_dev_to_stable=config.allow_dev_to_stable,
             upload_md_to_cloud=config.upload_md_to_cloud,
+            export_sub_sheets_separately=config.export_sub_sheets_separately,
+            sheet_direct_export_max_cells=config.sheet_direct_export_max_cells,
             device_display_name=config.device_display_name,
             delete_policy=config.delete_policy,
             delete_grace_minutes=config.delete_grace_minutes,
@@ -84,13 +101,19 @@ class ConfigUpdateRequest(BaseModel):
     auth_scopes: list[str] | None = None
     sync_mode: SyncMode | None = None
     ignore_hidden_cache_paths: bool | None = None
+    local_event_burst_threshold: int | None = None
     token_store: str | None = None
     upload_interval_value: float | None = None
     upload_interval_unit: SyncIntervalUnit | None = None
     upload_daily_time: str | None = None
+    upload_dispatch_mode: UploadDispatchMode | None = None
+    sync_max_concurrent_jobs: int | None = None
+    sync_task_weights: dict[str, float] | None = None
     download_interval_value: float | None = None
     download_interval_unit: SyncIntervalUnit | None = None
     download_daily_time: str | None = None
+    schedule_spread_minutes: int | None = None
+    schedule_chain_tasks: bool | None = None
     sync_log_retention_days: int | None = None
     sync_log_warn_size_mb: int | None = None
     system_log_retention_days: int | None = None
@@ -98,6 +121,8 @@ class ConfigUpdateRequest(BaseModel):
     update_check_interval_hours: int | None = None
     allow_dev_to_stable: bool | None = None
     upload_md_to_cloud: bool | None = None
+    export_sub_sheets_separately: bool | None = None
+    sheet_direct_export_max_cells: int | None = None
     device_display_name: str | None = None
     delete_policy: DeletePolicy | None = None
     delete_grace_minutes: int | None = None
@@ -133,6 +158,11 @@ async def update_config(payload: ConfigUpdateRequest) -> ConfigResponse:
 
     if payload.ignore_hidden_cache_paths is not None:
         data["ignore_hidden_cache_paths"] = bool(payload.ignore_hidden_cache_paths)
+    if (
+        payload.local_event_burst_threshold is not None
+        and payload.local_event_burst_threshold >= 0
+    ):
+        data["local_event_burst_threshold"] = int(payload.local_event_burst_threshold)
 
     if payload.token_store is not None and payload.token_store.strip():
         data["token_store"] = payload.token_store.strip()
@@ -148,6 +178,19 @@ async def update_config(payload: ConfigUpdateRequest) -> ConfigResponse:
         if cleaned and _is_time_value(cleaned):
             data["upload_daily_time"] = cleaned
 
+    if payload.upload_dispatch_mode is not None:
+        data["upload_dispatch_mode"] = payload.upload_dispatch_mode.value
+
+    if payload.sync_max_concurrent_jobs is not None and payload.sync_max_concurrent_jobs > 0:
+        data["sync_max_concurrent_jobs"] = int(payload.sync_max_concurrent_jobs)
+
+    if payload.sync_task_weights is not None:
+        data["sync_task_weights"] = {
+            task_id: float(weight)
+            for task_id, weight in payload.sync_task_weights.items()
+            if task_id and weight > 0
+        }
+
     if payload.download_interval_value is not None and payload.download_interval_value > 0:
         data["download_interval_value"] = payload.download_interval_value
 
@@ -160,6 +203,12 @@ async def update_config(payload: ConfigUpdateRequest) -> ConfigResponse:
             if _is_time_value(cleaned):
                 data["download_daily_time"] = cleaned
 
+    if payload.schedule_spread_minutes is not None and payload.schedule_spread_minutes >= 0:
+        data["schedule_spread_minutes"] = int(payload.schedule_spread_minutes)
+
+    if payload.schedule_chain_tasks is not None:
+        data["schedule_chain_tasks"] = bool(payload.schedule_chain_tasks)
+
     if payload.sync_log_retention_days is not None and payload.sync_log_retention_days >= 0:
         data["sync_log_retention_days"] = payload.sync_log_retention_days
 
@@ -181,6 +230,15 @@ async def update_config(payload: ConfigUpdateRequest) -> ConfigResponse:
     if payload.upload_md_to_cloud is not None:
         data["upload_md_to_cloud"] = bool(payload.upload_md_to_cloud)
 
+    if payload.export_sub_sheets_separately is not None:
+        data["export_sub_sheets_separately"] = bool(payload.export_sub_sheets_separately)
+
+    if (
+        payload.sheet_direct_export_max_cells is not None
+        and payload.sheet_direct_export_max_cells >= 0
+    ):
+        data["sheet_direct_export_max_cells"] = int(payload.sheet_direct_export_max_cells)
+
     _apply_str(data, "device_display_name", payload.device_display_name)
 
     if payload.delete_policy is not None:
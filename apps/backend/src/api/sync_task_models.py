@@ -5,6 +5,7 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 from src.core.config import DeletePolicy, SyncMode
+from src.services.sync_job_scheduler import JobQueueStats
 from src.services.sync_runner import SyncFileEvent, SyncTaskStatus
 from src.services.sync_task_service import SyncTaskItem
 
@@ -143,6 +144,30 @@ class SyncTaskStatusResponse(BaseModel):
         )
 
 
+class SyncTaskQueueResponse(BaseModel):
+    task_id: str
+    queued: int
+    running: int
+    completed: int
+    oldest_wait_seconds: float
+    last_wait_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+
+    @classmethod
+    def from_stats(cls, stats: JobQueueStats) -> "SyncTaskQueueResponse":
+        return cls(
+            task_id=stats.task_id,
+            queued=stats.queued,
+            running=stats.running,
+            completed=stats.completed,
+            oldest_wait_seconds=stats.oldest_wait_seconds,
+            last_wait_seconds=stats.last_wait_seconds,
+            avg_wait_seconds=stats.avg_wait_seconds,
+            max_wait_seconds=stats.max_wait_seconds,
+        )
+
+
 class SyncTaskDiagnosticCounts(BaseModel):
     total: int = 0
     processed: int = 0
@@ -12,6 +12,7 @@ from src.api.sync_task_models import (
     SyncTaskCreateRequest,
     SyncTaskDiagnosticsResponse,
     SyncTaskOverviewResponse,
+    SyncTaskQueueResponse,
     SyncTaskResponse,
     SyncTaskStatusResponse,
     SyncTaskUpdateRequest,
@@ -20,12 +21,14 @@ from src.core.config import ConfigManager
 from src.core.logging import get_log_file
 from src.services.docx_service import DocxService, DocxServiceError
 from src.services.log_reader import prune_log_file, read_log_entries
+from src.services.media_token_cache_service import MediaTokenCacheService
 from src.services.sync_event_store import SyncEventStore
 from src.services.sync_task_diagnostics_service import (
     build_sync_log_response,
     build_task_diagnostics_response,
     list_task_overviews,
 )
+from src.services.sync_export_part_service import SyncExportPartService
 from src.services.sync_link_service import SyncLinkService
 from src.services.sync_run_event_service import SyncRunEventService
 from src.services.sync_run_service import SyncRunItem, SyncRunService
@@ -74,6 +77,12 @@ async def list_task_status() -> list[SyncTaskStatusResponse]:
     return [SyncTaskStatusResponse.from_status(status) for status in statuses.values()]
 
 
+@router.get("/tasks/queue", response_model=list[SyncTaskQueueResponse])
+async def list_task_queue() -> list[SyncTaskQueueResponse]:
+    stats = runner.list_queue_stats()
+    return [SyncTaskQueueResponse.from_stats(item) for item in stats.values()]
+
+
 @router.get("/tasks/overview", response_model=list[SyncTaskOverviewResponse])
 async def list_task_overview() -> list[SyncTaskOverviewResponse]:
     items = await service.list_tasks()
@@ -177,6 +186,7 @@ async def delete_task(task_id: str) -> dict:
     tombstone_service = SyncTombstoneService()
     await link_service.delete_by_task(task_id)
     await tombstone_service.delete_by_task(task_id)
+    await SyncExportPartService().delete_by_task(task_id)
     return {"status": "deleted"}
 
 
@@ -193,6 +203,7 @@ async def reset_task_links(task_id: str) -> dict:
     tombstone_service = SyncTombstoneService()
     count = await link_service.delete_by_task(task_id)
     await tombstone_service.delete_by_task(task_id)
+    await SyncExportPartService().delete_by_task(task_id)
     # 同时清除初始扫描标记，确保下次上传调度重新扫描
     runner._initial_upload_scanned.discard(task_id)
     runner._cloud_folder_cache = {
@@ -231,7 +242,7 @@ async def replace_markdown(payload: MarkdownReplaceRequest) -> dict:
         base_path = path.parent.as_posix()
 
     markdown = path.read_text(encoding="utf-8")
-    docx_service = DocxService()
+    docx_service = DocxService(media_token_cache=MediaTokenCacheService())
     try:
         await docx_service.replace_document_content(
             payload.document_id,
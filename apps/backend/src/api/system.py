@@ -12,6 +12,7 @@ from loguru import logger
 
 from src.api.watcher import watcher_manager
 from src.db.session import dispose_engines
+from src.services.event_loop_monitor import EventLoopLagMonitor, loop_lag_monitor
 from src.services.update_install_service import queue_install_request
 from src.services.update_service import (
     UpdateService,
@@ -20,6 +21,7 @@ from src.services.update_service import (
     is_newer_version,
 )
 from src.services.update_scheduler import UpdateScheduler
+from src.services.watcher import SharedObserver, get_shared_observer
 from src.core.version import get_version
 
 router = APIRouter(prefix="/system", tags=["system"])
@@ -49,6 +51,29 @@ class UpdateOpenFolderPayload(BaseModel):
     download_path: str | None = None
 
 
+class WatcherHealthResponse(BaseModel):
+    observer_alive: bool
+    watched_roots: int
+    observer_restarts: int
+    emitter_restarts: int
+    overflows: int
+    watch_limit_errors: int
+    resyncs: int
+    last_issue: str | None = None
+    last_issue_at: float | None = None
+    max_user_watches: int | None = None
+    max_user_instances: int | None = None
+
+
+class LoopLagResponse(BaseModel):
+    samples: int
+    last_ms: float
+    avg_ms: float
+    p95_ms: float
+    max_ms: float
+    slow_count: int
+
+
 def _select_folder() -> str | None:
     try:
         import tkinter as tk
@@ -110,6 +135,51 @@ async def select_folder() -> FolderResponse:
     return FolderResponse(path=path)
 
 
+@router.get("/loop-lag", response_model=LoopLagResponse)
+async def loop_lag(request: Request) -> LoopLagResponse:
+    monitor: EventLoopLagMonitor = getattr(
+        request.app.state, "loop_lag_monitor", loop_lag_monitor
+    )
+    snapshot = monitor.snapshot()
+    return LoopLagResponse(
+        samples=snapshot.samples,
+        last_ms=round(snapshot.last_ms, 2),
+        avg_ms=round(snapshot.avg_ms, 2),
+        p95_ms=round(snapshot.p95_ms, 2),
+        max_ms=round(snapshot.max_ms, 2),
+        slow_count=snapshot.slow_count,
+    )
+
+
+def _read_inotify_limit(name: str) -> int | None:
+    try:
+        return int(Path("/proc/sys/fs/inotify", name).read_text(encoding="utf-8").strip())
+    except (OSError, ValueError):
+        return None
+
+
+@router.get("/watcher-health", response_model=WatcherHealthResponse)
+async def watcher_health(request: Request) -> WatcherHealthResponse:
+    observer: SharedObserver = getattr(
+        request.app.state, "shared_observer", None
+    ) or get_shared_observer()
+    health = observer.health()
+    return WatcherHealthResponse(
+        observer_alive=health.observer_alive,
+        watched_roots=health.watched_roots,
+        observer_restarts=health.observer_restarts,
+        emitter_restarts=health.emitter_restarts,
+        overflows=health.overflows,
+        watch_limit_errors=health.watch_limit_errors,
+        resyncs=health.resyncs,
+        last_issue=health.last_issue,
+        last_issue_at=health.last_issue_at,
+        # 仅 Linux 可读；watch_limit_errors 增长时据此判断是否需要调大上限
+        max_user_watches=_read_inotify_limit("max_user_watches"),
+        max_user_instances=_read_inotify_limit("max_user_instances"),
+    )
+
+
 def _get_update_service(request: Request) -> UpdateService:
     scheduler: UpdateScheduler | None = getattr(request.app.state, "update_scheduler", None)
     if scheduler is not None:
@@ -22,6 +22,7 @@ class WatcherStartRequest(BaseModel):
 class WatcherSilenceRequest(BaseModel):
     path: str
     ttl_seconds: float | None = None
+    recursive: bool = False
 
 
 @watcher_router.post("/start")
@@ -49,7 +50,11 @@ async def watcher_status() -> dict:
 @watcher_router.post("/silence")
 async def silence_path(payload: WatcherSilenceRequest) -> dict:
     path = Path(payload.path).expanduser()
-    watcher_manager.silence(path, ttl_seconds=payload.ttl_seconds)
+    watcher_manager.silence(
+        path,
+        ttl_seconds=payload.ttl_seconds,
+        recursive=payload.recursive,
+    )
     return {"status": "ok"}
 
 
@@ -24,6 +24,11 @@ class SyncIntervalUnit(str, Enum):
     days = "days"
 
 
+class UploadDispatchMode(str, Enum):
+    event = "event"
+    interval = "interval"
+
+
 class DeletePolicy(str, Enum):
     off = "off"
     safe = "safe"
@@ -90,12 +95,18 @@ class AppConfig(BaseModel):
     database_url: str = Field(default_factory=_default_database_url)
     sync_mode: SyncMode = SyncMode.bidirectional
     ignore_hidden_cache_paths: bool = True
+    local_event_burst_threshold: int = 200
     upload_interval_value: float = 60.0
     upload_interval_unit: SyncIntervalUnit = SyncIntervalUnit.seconds
     upload_daily_time: str = "01:00"
+    upload_dispatch_mode: UploadDispatchMode = UploadDispatchMode.event
+    sync_max_concurrent_jobs: int = 3
+    sync_task_weights: dict[str, float] = Field(default_factory=dict)
     download_interval_value: float = 1.0
     download_interval_unit: SyncIntervalUnit = SyncIntervalUnit.days
     download_daily_time: str = "01:00"
+    schedule_spread_minutes: int = 30
+    schedule_chain_tasks: bool = False
     sync_log_retention_days: int = 0
     sync_log_warn_size_mb: int = 200
     system_log_retention_days: int = 1
@@ -104,6 +115,8 @@ class AppConfig(BaseModel):
     last_update_check: float = 0.0
     allow_dev_to_stable: bool = False
     upload_md_to_cloud: bool = False
+    export_sub_sheets_separately: bool = False
+    sheet_direct_export_max_cells: int = 200000
     device_display_name: str = Field(default_factory=current_device_name)
     delete_policy: DeletePolicy = DeletePolicy.safe
     delete_grace_minutes: int = 30
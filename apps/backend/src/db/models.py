@@ -34,6 +34,39 @@ class SyncLink(Base):
     resource_sync_revision: Mapped[str | None] = mapped_column(
         String, nullable=True, default=None
     )
+    export_sub_id: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    export_sub_id_revision: Mapped[str | None] = mapped_column(
+        String, nullable=True, default=None
+    )
+
+
+class SyncExportPart(Base):
+    __tablename__ = "sync_export_parts"
+
+    local_path: Mapped[str] = mapped_column(String, primary_key=True)
+    task_id: Mapped[str] = mapped_column(String, index=True)
+    cloud_token: Mapped[str] = mapped_column(String, index=True)
+    cloud_type: Mapped[str] = mapped_column(String, nullable=False)
+    sub_id: Mapped[str] = mapped_column(String, nullable=False)
+    sub_revision: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    cloud_revision: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    local_hash: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    records_synced_at: Mapped[float | None] = mapped_column(Float, nullable=True, default=None)
+    updated_at: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class MediaTokenCache(Base):
+    __tablename__ = "media_token_cache"
+
+    cache_key: Mapped[str] = mapped_column(String, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String, index=True)
+    document_id: Mapped[str] = mapped_column(String, index=True)
+    parent_type: Mapped[str] = mapped_column(String, nullable=False)
+    file_token: Mapped[str] = mapped_column(String, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[float] = mapped_column(Float, nullable=False)
+    verified_at: Mapped[float] = mapped_column(Float, nullable=False)
+    use_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class SyncTombstone(Base):
@@ -52,6 +85,15 @@ class SyncTombstone(Base):
     executed_at: Mapped[float | None] = mapped_column(Float, nullable=True, default=None)
 
 
+class SyncPendingUpload(Base):
+    __tablename__ = "sync_pending_uploads"
+
+    task_id: Mapped[str] = mapped_column(String, primary_key=True)
+    local_path: Mapped[str] = mapped_column(String, primary_key=True)
+    changed_at: Mapped[float] = mapped_column(Float, nullable=False)
+    queued_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class ConflictRecord(Base):
     __tablename__ = "conflicts"
 
@@ -30,7 +30,7 @@ class SchemaMigration:
     upgrade: MigrationFn
 
 
-CURRENT_SCHEMA_VERSION = 1
+CURRENT_SCHEMA_VERSION = 2
 
 
 def create_engine(database_url: Optional[str] = None) -> AsyncEngine:
@@ -288,12 +288,34 @@ async def _apply_schema_v1(conn) -> None:
     )
 
 
+async def _apply_schema_v2(conn) -> None:
+    await _ensure_column(
+        conn,
+        table="sync_links",
+        column="export_sub_id",
+        column_type="TEXT",
+        default_value=None,
+    )
+    await _ensure_column(
+        conn,
+        table="sync_links",
+        column="export_sub_id_revision",
+        column_type="TEXT",
+        default_value=None,
+    )
+
+
 _SCHEMA_MIGRATIONS = [
     SchemaMigration(
         version=1,
         description="补齐 sync_tasks/sync_links 历史列，并创建 sync_runs/sync_run_events 复合索引",
         upgrade=_apply_schema_v1,
     ),
+    SchemaMigration(
+        version=2,
+        description="sync_links 新增导出子表 sub_id 缓存列",
+        upgrade=_apply_schema_v2,
+    ),
 ]
 
 
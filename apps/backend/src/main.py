@@ -34,7 +34,9 @@ from src.api.watcher import watcher_manager
 from src.core.logging import init_logging
 from src.core.paths import bundle_root
 from src.db.session import init_db
+from src.services.async_fs import get_async_fs
 from src.services.conflict_service import ConflictService
+from src.services.event_loop_monitor import EventLoopLagMonitor, loop_lag_monitor
 from src.services.sync_log_maintenance_service import SyncLogMaintenanceService
 from src.services.sync_scheduler import SyncScheduler
 from src.services.update_scheduler import UpdateScheduler
@@ -95,11 +97,13 @@ def _build_lifespan(
     watcher_manager_instance,
     init_db_fn: InitDbFn,
     init_logging_fn: InitLoggingFn,
+    loop_lag_monitor_instance: EventLoopLagMonitor,
 ):
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         init_logging_fn()
         watcher_manager_instance.set_loop(asyncio.get_running_loop())
+        await loop_lag_monitor_instance.start()
         await init_db_fn()
         await log_maintenance_service_instance.start()
         await sync_scheduler_instance.start()
@@ -114,6 +118,8 @@ def _build_lifespan(
             close_runner = getattr(app.state.sync_runner, "close", None)
             if callable(close_runner):
                 await close_runner()
+            await loop_lag_monitor_instance.stop()
+            get_async_fs().shutdown()
 
     return lifespan
 
@@ -167,6 +173,7 @@ def create_app(
     watcher_manager_instance=watcher_manager,
     init_db_fn: InitDbFn = init_db,
     init_logging_fn: InitLoggingFn = init_logging,
+    loop_lag_monitor_instance: EventLoopLagMonitor = loop_lag_monitor,
 ) -> FastAPI:
     app = FastAPI(
         title="LarkSync API",
@@ -177,6 +184,7 @@ def create_app(
             watcher_manager_instance=watcher_manager_instance,
             init_db_fn=init_db_fn,
             init_logging_fn=init_logging_fn,
+            loop_lag_monitor_instance=loop_lag_monitor_instance,
         ),
     )
 
@@ -231,6 +239,7 @@ def create_app(
     app.state.sync_runner = sync_runner_service
     app.state.log_maintenance_service = log_maintenance_service_instance
     app.state.update_scheduler = update_scheduler_instance
+    app.state.loop_lag_monitor = loop_lag_monitor_instance
 
     app.add_middleware(
         CORSMiddleware,
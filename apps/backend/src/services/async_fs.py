@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from src.services.file_hash import calculate_file_hash
+
+T = TypeVar("T")
+
+_DEFAULT_MAX_WORKERS = 4
+
+
+class AsyncFileSystem:
+    """把阻塞的文件系统调用放到有界线程池执行，避免慢盘/杀毒扫描卡住事件循环。
+
+    线程数固定上限：磁盘本身是串行资源，过多线程只会放大排队而不会更快。
+    """
+
+    def __init__(self, max_workers: int = _DEFAULT_MAX_WORKERS) -> None:
+        self._max_workers = max(1, int(max_workers))
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs) if kwargs else functools.partial(fn, *args)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    async def hash_file(self, path: str | Path) -> str:
+        return await self.run(calculate_file_hash, path)
+
+    async def read_text(self, path: Path, encoding: str = "utf-8") -> str:
+        return await self.run(path.read_text, encoding=encoding)
+
+    async def read_bytes(self, path: Path) -> bytes:
+        return await self.run(path.read_bytes)
+
+    async def stat(self, path: Path) -> os.stat_result:
+        return await self.run(path.stat)
+
+    async def exists(self, path: Path) -> bool:
+        return await self.run(path.exists)
+
+    async def mkdir(self, path: Path) -> None:
+        await self.run(path.mkdir, parents=True, exist_ok=True)
+
+    async def list_files(
+        self,
+        root: Path,
+        predicate: Callable[[Path], bool] | None = None,
+    ) -> list[Path]:
+        """在线程中完成整棵目录遍历，返回满足条件的文件列表。"""
+        return await self.run(_list_files, root, predicate)
+
+    async def list_file_stats(
+        self,
+        root: Path,
+        predicate: Callable[[Path], bool] | None = None,
+    ) -> list[tuple[Path, os.stat_result]]:
+        """同 list_files，并在同一线程中取回 stat，用于只比对大小/修改时间的快速扫描。"""
+        return await self.run(_list_file_stats, root, predicate)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        executor = self._executor
+        if executor is not None:
+            return executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="larksync-fs",
+                )
+            return self._executor
+
+
+def _list_files(root: Path, predicate: Callable[[Path], bool] | None) -> list[Path]:
+    if not root.exists():
+        return []
+    files: Iterable[Path] = (path for path in root.rglob("*") if path.is_file())
+    if predicate is None:
+        return list(files)
+    return [path for path in files if predicate(path)]
+
+
+def _list_file_stats(
+    root: Path, predicate: Callable[[Path], bool] | None
+) -> list[tuple[Path, os.stat_result]]:
+    stats: list[tuple[Path, os.stat_result]] = []
+    for path in _list_files(root, predicate):
+        try:
+            stats.append((path, path.stat()))
+        except OSError:
+            continue
+    return stats
+
+
+_async_fs: AsyncFileSystem | None = None
+
+
+def get_async_fs() -> AsyncFileSystem:
+    global _async_fs
+    if _async_fs is None:
+        _async_fs = AsyncFileSystem()
+    return _async_fs
+
+
+__all__ = ["AsyncFileSystem", "get_async_fs"]
@@ -1,9 +1,41 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from typing import Any
 
 from src.services.feishu_client import FeishuClient
 
+# 多维表格字段类型：最后更新时间（系统字段），可用于按修改时间过滤记录
+FIELD_TYPE_MODIFIED_TIME = 1002
+_RECORD_PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class BitableTable:
+    table_id: str
+    name: str
+    revision: str | None = None
+
+
+@dataclass(frozen=True)
+class BitableField:
+    field_id: str
+    name: str
+    type: int
+
+
+@dataclass(frozen=True)
+class BitableRecord:
+    record_id: str
+    fields: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class BitableRecordPage:
+    records: list[BitableRecord]
+    total: int | None = None
+
 
 class BitableService:
     def __init__(
@@ -15,11 +47,15 @@ class BitableService:
         self._base_url = base_url.rstrip("/")
 
     async def list_table_ids(self, app_token: str) -> list[str]:
+        tables = await self.list_tables(app_token)
+        return [table.table_id for table in tables]
+
+    async def list_tables(self, app_token: str) -> list[BitableTable]:
         if not app_token:
             return []
         url = f"{self._base_url}/open-apis/bitable/v1/apps/{app_token}/tables"
         page_token: str | None = None
-        table_ids: list[str] = []
+        tables: list[BitableTable] = []
         while True:
             params: dict[str, Any] = {"page_size": 100}
             if page_token:
@@ -34,18 +70,133 @@ class BitableService:
                 if not isinstance(item, dict):
                     continue
                 table_id = item.get("table_id") or item.get("id")
-                if table_id:
-                    table_ids.append(str(table_id))
+                if not table_id:
+                    continue
+                revision = item.get("revision")
+                tables.append(
+                    BitableTable(
+                        table_id=str(table_id),
+                        name=str(item.get("name") or table_id),
+                        revision=str(revision) if revision is not None else None,
+                    )
+                )
             has_more = bool(data.get("has_more"))
             if not has_more:
                 break
             page_token = data.get("page_token") or data.get("next_page_token")
             if not page_token:
                 break
-        return table_ids
+        return tables
+
+    async def list_fields(self, app_token: str, table_id: str) -> list[BitableField]:
+        if not app_token or not table_id:
+            return []
+        url = (
+            f"{self._base_url}/open-apis/bitable/v1/apps/{app_token}"
+            f"/tables/{table_id}/fields"
+        )
+        page_token: str | None = None
+        fields: list[BitableField] = []
+        while True:
+            params: dict[str, Any] = {"page_size": 100}
+            if page_token:
+                params["page_token"] = page_token
+            response = await self._client.request_with_retry("GET", url, params=params)
+            payload = response.json()
+            if payload.get("code") != 0:
+                raise RuntimeError(f"获取多维表格字段失败: {payload.get('msg')}")
+            data = payload.get("data") or {}
+            for item in data.get("items") or []:
+                if not isinstance(item, dict):
+                    continue
+                field_id = item.get("field_id")
+                name = item.get("field_name")
+                if not field_id or not name:
+                    continue
+                try:
+                    field_type = int(item.get("type") or 0)
+                except (TypeError, ValueError):
+                    field_type = 0
+                fields.append(BitableField(field_id=str(field_id), name=str(name), type=field_type))
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                break
+        return fields
+
+    async def iter_record_pages(
+        self,
+        app_token: str,
+        table_id: str,
+        *,
+        field_names: list[str] | None = None,
+        modified_field: str | None = None,
+        modified_after: float | None = None,
+        page_size: int = _RECORD_PAGE_SIZE,
+    ) -> AsyncIterator[BitableRecordPage]:
+        """按页读取记录；指定 modified_field/modified_after 时只返回该时间之后修改过的记录。"""
+        url = (
+            f"{self._base_url}/open-apis/bitable/v1/apps/{app_token}"
+            f"/tables/{table_id}/records/search"
+        )
+        body: dict[str, Any] = {"automatic_fields": False}
+        if field_names is not None:
+            body["field_names"] = field_names
+        if modified_field and modified_after is not None:
+            body["filter"] = {
+                "conjunction": "and",
+                "conditions": [
+                    {
+                        "field_name": modified_field,
+                        "operator": "isGreater",
+                        "value": ["ExactDate", str(int(modified_after * 1000))],
+                    }
+                ],
+            }
+        page_token: str | None = None
+        while True:
+            params: dict[str, Any] = {"page_size": max(1, min(page_size, _RECORD_PAGE_SIZE))}
+            if page_token:
+                params["page_token"] = page_token
+            response = await self._client.request_with_retry(
+                "POST", url, params=params, json=body
+            )
+            payload = response.json()
+            if payload.get("code") != 0:
+                raise RuntimeError(f"读取多维表格记录失败: {payload.get('msg')}")
+            data = payload.get("data") or {}
+            records = [
+                BitableRecord(
+                    record_id=str(item["record_id"]),
+                    fields=item.get("fields") or {},
+                )
+                for item in data.get("items") or []
+                if isinstance(item, dict) and item.get("record_id")
+            ]
+            total = data.get("total")
+            yield BitableRecordPage(
+                records=records,
+                total=total if isinstance(total, int) else None,
+            )
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                break
+
+    async def list_record_ids(self, app_token: str, table_id: str) -> set[str]:
+        """只读取 record_id（不带任何字段），用于比对记录集合的增删。"""
+        record_ids: set[str] = set()
+        async for page in self.iter_record_pages(app_token, table_id, field_names=[]):
+            record_ids.update(record.record_id for record in page.records)
+        return record_ids
 
     async def close(self) -> None:
         await self._client.close()
 
 
-__all__ = ["BitableService"]
+__all__ = [
+    "FIELD_TYPE_MODIFIED_TIME",
+    "BitableField",
+    "BitableRecord",
+    "BitableRecordPage",
+    "BitableService",
+    "BitableTable",
+]
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Hashable, Sequence
+
+Opcode = tuple[str, int, int, int, int]
+
+# 无锚点区间退回 Myers 时允许的最大编辑距离；超出后整段按 replace 处理，避免长文档上退化
+_MYERS_MAX_COST = 1000
+# 没有唯一签名时，按出现次数相同且不超过该值的签名依次配对作为锚点
+_DUPLICATE_ANCHOR_MAX_COUNT = 8
+
+
+def diff_opcodes(
+    a: Sequence[Hashable],
+    b: Sequence[Hashable],
+    *,
+    max_cost: int = _MYERS_MAX_COST,
+) -> list[Opcode]:
+    """比较两组块签名，返回与 difflib.SequenceMatcher.get_opcodes 同格式的操作序列。
+
+    先剥离公共前后缀，再用两侧各只出现一次的签名做 patience 锚点（最长递增子序列）
+    递归切分；没有唯一签名时按出现次数相同的重复签名依次配对，仍无锚点的小区间
+    交给 Myers O(ND) 求解。整体对常见的“少量编辑”场景接近线性。
+    """
+    return _matches_to_opcodes(match_pairs(a, b, max_cost=max_cost), len(a), len(b))
+
+
+def match_pairs(
+    a: Sequence[Hashable],
+    b: Sequence[Hashable],
+    *,
+    max_cost: int = _MYERS_MAX_COST,
+) -> list[tuple[int, int]]:
+    matches: list[tuple[int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            matches.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            matches.append((a_hi, b_hi))
+        if a_lo >= a_hi or b_lo >= b_hi:
+            continue
+        anchors = _anchor_pairs(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            matches.extend(_myers_pairs(a, b, a_lo, a_hi, b_lo, b_hi, max_cost))
+            continue
+        prev_a, prev_b = a_lo, b_lo
+        for anchor_a, anchor_b in anchors:
+            matches.append((anchor_a, anchor_b))
+            if anchor_a > prev_a or anchor_b > prev_b:
+                stack.append((prev_a, anchor_a, prev_b, anchor_b))
+            prev_a, prev_b = anchor_a + 1, anchor_b + 1
+        if a_hi > prev_a or b_hi > prev_b:
+            stack.append((prev_a, a_hi, prev_b, b_hi))
+    matches.sort()
+    return matches
+
+
+def _anchor_pairs(
+    a: Sequence[Hashable],
+    b: Sequence[Hashable],
+    a_lo: int,
+    a_hi: int,
+    b_lo: int,
+    b_hi: int,
+) -> list[tuple[int, int]]:
+    a_positions: dict[Hashable, list[int]] = defaultdict(list)
+    for index in range(a_lo, a_hi):
+        a_positions[a[index]].append(index)
+    b_positions: dict[Hashable, list[int]] = defaultdict(list)
+    for index in range(b_lo, b_hi):
+        item = b[index]
+        if item in a_positions:
+            b_positions[item].append(index)
+    if not b_positions:
+        return []
+
+    candidates = [
+        (a_positions[item][0], positions[0])
+        for item, positions in b_positions.items()
+        if len(positions) == 1 and len(a_positions[item]) == 1
+    ]
+    if not candidates:
+        # 重复签名：只取两侧出现次数一致的低频签名，按出现顺序一一配对
+        counts = Counter(
+            len(positions)
+            for item, positions in b_positions.items()
+            if len(positions) == len(a_positions[item])
+        )
+        if not counts:
+            return []
+        lowest = min(counts)
+        if lowest > _DUPLICATE_ANCHOR_MAX_COUNT:
+            return []
+        for item, positions in b_positions.items():
+            if len(positions) == lowest and len(a_positions[item]) == lowest:
+                candidates.extend(zip(a_positions[item], positions))
+    candidates.sort()
+    return _longest_increasing_by_b(candidates)
+
+
+def _longest_increasing_by_b(pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    tails: list[int] = []
+    tail_indexes: list[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, b_index) in enumerate(pairs):
+        slot = bisect_left(tails, b_index)
+        if slot == len(tails):
+            tails.append(b_index)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = b_index
+            tail_indexes[slot] = index
+        previous[index] = tail_indexes[slot - 1] if slot > 0 else -1
+    result: list[tuple[int, int]] = []
+    cursor = tail_indexes[-1] if tail_indexes else -1
+    while cursor >= 0:
+        result.append(pairs[cursor])
+        cursor = previous[cursor]
+    result.reverse()
+    return result
+
+
+def _myers_pairs(
+    a: Sequence[Hashable],
+    b: Sequence[Hashable],
+    a_lo: int,
+    a_hi: int,
+    b_lo: int,
+    b_hi: int,
+    max_cost: int,
+) -> list[tuple[int, int]]:
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    limit = min(n + m, max_cost)
+    frontier: dict[int, int] = {1: 0}
+    trace: list[dict[int, int]] = []
+    for cost in range(limit + 1):
+        trace.append(dict(frontier))
+        for k in range(-cost, cost + 1, 2):
+            if k == -cost or (k != cost and frontier[k - 1] < frontier[k + 1]):
+                x = frontier[k + 1]
+            else:
+                x = frontier[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            frontier[k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, a_lo, b_lo)
+    return []
+
+
+def _myers_backtrack(
+    trace: list[dict[int, int]],
+    n: int,
+    m: int,
+    a_lo: int,
+    b_lo: int,
+) -> list[tuple[int, int]]:
+    pairs: list[tuple[int, int]] = []
+    x, y = n, m
+    for cost in range(len(trace) - 1, -1, -1):
+        frontier = trace[cost]
+        k = x - y
+        if cost == 0:
+            while x > 0 and y > 0:
+                x -= 1
+                y -= 1
+                pairs.append((a_lo + x, b_lo + y))
+            break
+        if k == -cost or (k != cost and frontier[k - 1] < frontier[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = frontier[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((a_lo + x, b_lo + y))
+        x, y = prev_x, prev_y
+    pairs.reverse()
+    return pairs
+
+
+def _matches_to_opcodes(
+    matches: list[tuple[int, int]], a_len: int, b_len: int
+) -> list[Opcode]:
+    opcodes: list[Opcode] = []
+    i = j = 0
+
+    def add(tag: str, i1: int, i2: int, j1: int, j2: int) -> None:
+        if opcodes and opcodes[-1][0] == tag and tag == "equal":
+            last = opcodes[-1]
+            opcodes[-1] = (tag, last[1], i2, last[3], j2)
+            return
+        opcodes.append((tag, i1, i2, j1, j2))
+
+    for match_a, match_b in [*matches, (a_len, b_len)]:
+        if match_a > i and match_b > j:
+            add("replace", i, match_a, j, match_b)
+        elif match_a > i:
+            add("delete", i, match_a, j, j)
+        elif match_b > j:
+            add("insert", i, i, j, match_b)
+        if match_a < a_len and match_b < b_len:
+            add("equal", match_a, match_a + 1, match_b, match_b + 1)
+        i, j = match_a + 1, match_b + 1
+    return opcodes
+
+
+__all__ = ["Opcode", "diff_opcodes", "match_pairs"]
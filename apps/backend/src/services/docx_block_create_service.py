@@ -8,6 +8,7 @@ from typing import Any, Awaitable, Callable, Iterable
 from loguru import logger
 
 from src.services.file_uploader import FileUploadError
+from src.services.media_token_cache_service import MediaTokenCacheService
 from src.services.media_uploader import MediaUploadError
 from src.services.transcoder import BLOCK_TYPE_FILE, BLOCK_TYPE_TABLE
 
@@ -20,6 +21,10 @@ FallbackTableBlockFn = Callable[..., Awaitable[bool]]
 SummarizeBlockTypesFn = Callable[[Iterable[dict[str, Any]]], dict[int | None, int]]
 TruncatePayloadFn = Callable[[dict[str, Any], int], str]
 
+_MEDIA_UPLOAD_CONCURRENCY = 4
+# descendant 接口单次请求最多携带的块数量
+DESCENDANT_CREATE_MAX_BLOCKS = 1000
+
 
 def _chunked(values: list[str], size: int) -> Iterable[list[str]]:
     for index in range(0, len(values), size):
@@ -34,15 +39,26 @@ def build_create_chunks(
     file_paths: dict[str, Path] | None,
     batch_size: int = 50,
 ) -> list[list[str]]:
+    # 连续的图片/附件块合并为一批创建，创建后即可并发上传素材
     chunks: list[list[str]] = []
     buffered: list[str] = []
+    asset_run: list[str] = []
     for child_id in child_ids:
         has_nested = bool(children_map.get(child_id))
         has_asset = bool(
             (image_paths and child_id in image_paths)
             or (file_paths and child_id in file_paths)
         )
-        if has_nested or has_asset:
+        if has_asset and not has_nested:
+            if buffered:
+                chunks.extend(list(_chunked(buffered, batch_size)))
+                buffered = []
+            asset_run.append(child_id)
+            continue
+        if asset_run:
+            chunks.extend(list(_chunked(asset_run, batch_size)))
+            asset_run = []
+        if has_nested:
             if buffered:
                 chunks.extend(list(_chunked(buffered, batch_size)))
                 buffered = []
@@ -50,11 +66,23 @@ def build_create_chunks(
             continue
         buffered.append(child_id)
 
+    if asset_run:
+        chunks.extend(list(_chunked(asset_run, batch_size)))
     if buffered:
         chunks.extend(list(_chunked(buffered, batch_size)))
     return chunks
 
 
+def _collect_subtree(root_id: str, children_map: dict[str, list[str]]) -> list[str]:
+    ordered: list[str] = []
+    stack = [root_id]
+    while stack:
+        block_id = stack.pop()
+        ordered.append(block_id)
+        stack.extend(reversed(children_map.get(block_id) or []))
+    return ordered
+
+
 def extract_file_block_id(created_block: dict[str, Any]) -> str | None:
     block_id = created_block.get("block_id")
     if created_block.get("block_type") == BLOCK_TYPE_FILE and isinstance(block_id, str):
@@ -85,6 +113,9 @@ class DocxBlockCreateService:
         image_parent_type: str,
         file_parent_type: str,
         service_error_cls: type[Exception],
+        media_token_cache: MediaTokenCacheService | None = None,
+        sanitize_descendant_block: SanitizeBlockFn | None = None,
+        descendant_max_blocks: int = DESCENDANT_CREATE_MAX_BLOCKS,
     ) -> None:
         self._request_json = request_json
         self._sanitize_block = sanitize_block
@@ -100,6 +131,9 @@ class DocxBlockCreateService:
         self._image_parent_type = image_parent_type
         self._file_parent_type = file_parent_type
         self._service_error_cls = service_error_cls
+        self._media_token_cache = media_token_cache
+        self._sanitize_descendant_block = sanitize_descendant_block
+        self._descendant_max_blocks = max(1, descendant_max_blocks)
 
     async def create_children_recursive(
         self,
@@ -122,112 +156,387 @@ class DocxBlockCreateService:
             image_paths=image_paths,
             file_paths=file_paths,
         )
+        # 连续的带子块节点（表格、嵌套列表、引用容器等）攒成一批，整棵子树走 descendant 接口创建
+        nested_run: list[str] = []
         for chunk in create_chunks:
-            logger.info(
-                "创建子块: document_id={} parent={} size={} types={}",
-                document_id,
-                parent_block_id,
-                len(chunk),
-                self._summarize_block_types([block_map[child_id] for child_id in chunk]),
-            )
-            payload = {
-                "children": [self._sanitize_block(block_map[child_id]) for child_id in chunk],
-            }
-            if next_index >= 0:
-                payload["index"] = next_index
-            image_uploads: list[tuple[int, Path]] = []
-            file_uploads: list[tuple[int, Path]] = []
-            if image_paths:
-                for idx, child_id in enumerate(chunk):
-                    image_path = image_paths.get(child_id)
-                    if image_path:
-                        image_uploads.append((idx, image_path))
-            if file_paths:
-                for idx, child_id in enumerate(chunk):
-                    file_path = file_paths.get(child_id)
-                    if file_path:
-                        file_uploads.append((idx, file_path))
-            if next_index >= 0:
-                next_index += len(chunk)
-            try:
-                response = await self._request_json(
-                    "POST",
-                    f"{self._base_url}/open-apis/docx/v1/documents/{document_id}/blocks/{parent_block_id}/children",
-                    params={
-                        "client_token": str(uuid.uuid4()),
-                        "document_revision_id": -1,
-                        "user_id_type": user_id_type,
-                    },
-                    json=payload,
-                )
-            except Exception as exc:
-                await self.handle_create_children_error(
-                    exc,
+            if self._sanitize_descendant_block is not None and len(chunk) == 1 and children_map.get(
+                chunk[0]
+            ):
+                nested_run.append(chunk[0])
+                continue
+            if nested_run:
+                next_index = await self._create_subtrees(
                     document_id=document_id,
                     parent_block_id=parent_block_id,
-                    chunk=chunk,
+                    root_ids=nested_run,
                     block_map=block_map,
                     children_map=children_map,
                     user_id_type=user_id_type,
+                    insert_index=next_index,
                     image_paths=image_paths,
                     file_paths=file_paths,
-                    insert_index=insert_index,
                     error_flag=error_flag,
                 )
-                continue
-            data = response.get("data") or {}
-            created = data.get("children", [])
-            if not isinstance(created, list):
-                raise self._service_error_cls("创建块响应缺少 children")
-
-            if image_uploads:
-                await self._upload_created_images(
-                    created=created,
-                    image_uploads=image_uploads,
-                    document_id=document_id,
-                    user_id_type=user_id_type,
-                )
+                nested_run = []
+            await self._create_chunk(
+                document_id=document_id,
+                parent_block_id=parent_block_id,
+                chunk=chunk,
+                block_map=block_map,
+                children_map=children_map,
+                user_id_type=user_id_type,
+                insert_index=next_index,
+                image_paths=image_paths,
+                file_paths=file_paths,
+                error_flag=error_flag,
+            )
+            if next_index >= 0:
+                next_index += len(chunk)
+        if nested_run:
+            await self._create_subtrees(
+                document_id=document_id,
+                parent_block_id=parent_block_id,
+                root_ids=nested_run,
+                block_map=block_map,
+                children_map=children_map,
+                user_id_type=user_id_type,
+                insert_index=next_index,
+                image_paths=image_paths,
+                file_paths=file_paths,
+                error_flag=error_flag,
+            )
 
-            if file_uploads:
-                await self._upload_created_files(
-                    created=created,
-                    file_uploads=file_uploads,
+    async def _create_subtrees(
+        self,
+        *,
+        document_id: str,
+        parent_block_id: str,
+        root_ids: list[str],
+        block_map: dict[str, dict[str, Any]],
+        children_map: dict[str, list[str]],
+        user_id_type: str,
+        insert_index: int,
+        image_paths: dict[str, Path] | None,
+        file_paths: dict[str, Path] | None,
+        error_flag: dict[str, bool] | None,
+    ) -> int:
+        """按 API 上限把多棵子树打包成 descendant 请求；单批失败时退回逐层创建。"""
+        next_index = insert_index
+        for batch, subtree_ids in self._plan_descendant_batches(root_ids, children_map):
+            created = False
+            if subtree_ids:
+                created = await self._create_descendant_batch(
                     document_id=document_id,
+                    parent_block_id=parent_block_id,
+                    root_ids=batch,
+                    subtree_ids=subtree_ids,
+                    block_map=block_map,
+                    children_map=children_map,
                     user_id_type=user_id_type,
+                    insert_index=next_index,
+                    image_paths=image_paths,
+                    file_paths=file_paths,
                 )
-
-            for old_id, new_block in zip(chunk, created):
-                new_id = new_block.get("block_id")
-                if not new_id:
-                    raise self._service_error_cls("创建块响应缺少 block_id")
-                old_block = block_map.get(old_id, {})
-                if old_block.get("block_type") == BLOCK_TYPE_TABLE:
-                    await self._populate_table_cells(
+            if not created:
+                fallback_index = next_index
+                for root_id in batch:
+                    await self._create_chunk(
                         document_id=document_id,
-                        table_block=new_block,
-                        source_table_block=old_block,
+                        parent_block_id=parent_block_id,
+                        chunk=[root_id],
                         block_map=block_map,
                         children_map=children_map,
                         user_id_type=user_id_type,
+                        insert_index=fallback_index,
                         image_paths=image_paths,
                         file_paths=file_paths,
                         error_flag=error_flag,
                     )
-                    continue
-                old_children = children_map.get(old_id, [])
-                if old_children:
-                    await self.create_children_recursive(
-                        document_id=document_id,
-                        parent_block_id=new_id,
-                        child_ids=old_children,
-                        block_map=block_map,
-                        children_map=children_map,
-                        user_id_type=user_id_type,
-                        insert_index=-1,
-                        image_paths=image_paths,
-                        file_paths=file_paths,
-                        error_flag=error_flag,
-                    )
+                    if fallback_index >= 0:
+                        fallback_index += 1
+            if next_index >= 0:
+                next_index += len(batch)
+        return next_index
+
+    def _plan_descendant_batches(
+        self,
+        root_ids: list[str],
+        children_map: dict[str, list[str]],
+    ) -> list[tuple[list[str], list[str]]]:
+        """返回 (根节点, 子树全部节点) 批次；超出单批上限的子树单独成批且节点列表为空，表示直接回退。"""
+        batches: list[tuple[list[str], list[str]]] = []
+        roots: list[str] = []
+        members: list[str] = []
+        for root_id in root_ids:
+            subtree = _collect_subtree(root_id, children_map)
+            if len(subtree) > self._descendant_max_blocks:
+                if roots:
+                    batches.append((roots, members))
+                    roots, members = [], []
+                batches.append(([root_id], []))
+                continue
+            if roots and len(members) + len(subtree) > self._descendant_max_blocks:
+                batches.append((roots, members))
+                roots, members = [], []
+            roots.append(root_id)
+            members.extend(subtree)
+        if roots:
+            batches.append((roots, members))
+        return batches
+
+    async def _create_descendant_batch(
+        self,
+        *,
+        document_id: str,
+        parent_block_id: str,
+        root_ids: list[str],
+        subtree_ids: list[str],
+        block_map: dict[str, dict[str, Any]],
+        children_map: dict[str, list[str]],
+        user_id_type: str,
+        insert_index: int,
+        image_paths: dict[str, Path] | None,
+        file_paths: dict[str, Path] | None,
+    ) -> bool:
+        sanitize = self._sanitize_descendant_block
+        if sanitize is None:
+            return False
+        descendants: list[dict[str, Any]] = []
+        for block_id in subtree_ids:
+            block = sanitize(block_map[block_id])
+            block["block_id"] = block_id
+            children = children_map.get(block_id) or []
+            if children:
+                block["children"] = list(children)
+            descendants.append(block)
+        payload: dict[str, Any] = {"children_id": list(root_ids), "descendants": descendants}
+        if insert_index >= 0:
+            payload["index"] = insert_index
+        logger.info(
+            "批量创建子树: document_id={} parent={} roots={} blocks={} types={}",
+            document_id,
+            parent_block_id,
+            len(root_ids),
+            len(subtree_ids),
+            self._summarize_block_types([block_map[block_id] for block_id in root_ids]),
+        )
+        try:
+            response = await self._request_json(
+                "POST",
+                f"{self._base_url}/open-apis/docx/v1/documents/{document_id}/blocks/{parent_block_id}/descendant",
+                params={
+                    "client_token": str(uuid.uuid4()),
+                    "document_revision_id": -1,
+                    "user_id_type": user_id_type,
+                },
+                json=payload,
+            )
+        except Exception as exc:
+            logger.warning(
+                "批量创建子树失败，回退逐层创建: document_id={} parent={} roots={} error={}",
+                document_id,
+                parent_block_id,
+                len(root_ids),
+                exc,
+            )
+            return False
+
+        data = response.get("data") or {}
+        relations: dict[str, str] = {}
+        for item in data.get("block_id_relations") or []:
+            if not isinstance(item, dict):
+                continue
+            temporary_id = item.get("temporary_block_id")
+            real_id = item.get("block_id")
+            if isinstance(temporary_id, str) and isinstance(real_id, str):
+                relations[temporary_id] = real_id
+        await self._upload_descendant_assets(
+            document_id=document_id,
+            subtree_ids=subtree_ids,
+            block_map=block_map,
+            children_map=children_map,
+            relations=relations,
+            user_id_type=user_id_type,
+            image_paths=image_paths,
+            file_paths=file_paths,
+        )
+        return True
+
+    async def _upload_descendant_assets(
+        self,
+        *,
+        document_id: str,
+        subtree_ids: list[str],
+        block_map: dict[str, dict[str, Any]],
+        children_map: dict[str, list[str]],
+        relations: dict[str, str],
+        user_id_type: str,
+        image_paths: dict[str, Path] | None,
+        file_paths: dict[str, Path] | None,
+    ) -> None:
+        created: list[dict[str, Any]] = []
+        image_uploads: list[tuple[int, Path]] = []
+        file_uploads: list[tuple[int, Path]] = []
+        for block_id in subtree_ids:
+            image_path = image_paths.get(block_id) if image_paths else None
+            file_path = file_paths.get(block_id) if file_paths else None
+            if not image_path and not file_path:
+                continue
+            real_id = relations.get(block_id)
+            if not real_id:
+                logger.error(
+                    "子树创建响应缺少块映射，素材未回填: document_id={} block_id={}",
+                    document_id,
+                    block_id,
+                )
+                continue
+            created.append(
+                {
+                    "block_id": real_id,
+                    "block_type": block_map[block_id].get("block_type"),
+                    "children": [
+                        relations[child_id]
+                        for child_id in children_map.get(block_id) or []
+                        if child_id in relations
+                    ],
+                }
+            )
+            if image_path:
+                image_uploads.append((len(created) - 1, image_path))
+            if file_path:
+                file_uploads.append((len(created) - 1, file_path))
+        if image_uploads:
+            await self._upload_created_images(
+                created=created,
+                image_uploads=image_uploads,
+                document_id=document_id,
+                user_id_type=user_id_type,
+            )
+        if file_uploads:
+            await self._upload_created_files(
+                created=created,
+                file_uploads=file_uploads,
+                document_id=document_id,
+                user_id_type=user_id_type,
+            )
+
+    async def _create_chunk(
+        self,
+        *,
+        document_id: str,
+        parent_block_id: str,
+        chunk: list[str],
+        block_map: dict[str, dict[str, Any]],
+        children_map: dict[str, list[str]],
+        user_id_type: str,
+        insert_index: int,
+        image_paths: dict[str, Path] | None,
+        file_paths: dict[str, Path] | None,
+        error_flag: dict[str, bool] | None,
+    ) -> None:
+        logger.info(
+            "创建子块: document_id={} parent={} size={} types={}",
+            document_id,
+            parent_block_id,
+            len(chunk),
+            self._summarize_block_types([block_map[child_id] for child_id in chunk]),
+        )
+        payload = {
+            "children": [self._sanitize_block(block_map[child_id]) for child_id in chunk],
+        }
+        if insert_index >= 0:
+            payload["index"] = insert_index
+        image_uploads: list[tuple[int, Path]] = []
+        file_uploads: list[tuple[int, Path]] = []
+        if image_paths:
+            for idx, child_id in enumerate(chunk):
+                image_path = image_paths.get(child_id)
+                if image_path:
+                    image_uploads.append((idx, image_path))
+        if file_paths:
+            for idx, child_id in enumerate(chunk):
+                file_path = file_paths.get(child_id)
+                if file_path:
+                    file_uploads.append((idx, file_path))
+        try:
+            response = await self._request_json(
+                "POST",
+                f"{self._base_url}/open-apis/docx/v1/documents/{document_id}/blocks/{parent_block_id}/children",
+                params={
+                    "client_token": str(uuid.uuid4()),
+                    "document_revision_id": -1,
+                    "user_id_type": user_id_type,
+                },
+                json=payload,
+            )
+        except Exception as exc:
+            await self.handle_create_children_error(
+                exc,
+                document_id=document_id,
+                parent_block_id=parent_block_id,
+                chunk=chunk,
+                block_map=block_map,
+                children_map=children_map,
+                user_id_type=user_id_type,
+                image_paths=image_paths,
+                file_paths=file_paths,
+                insert_index=insert_index,
+                error_flag=error_flag,
+            )
+            return
+        data = response.get("data") or {}
+        created = data.get("children", [])
+        if not isinstance(created, list):
+            raise self._service_error_cls("创建块响应缺少 children")
+
+        if image_uploads:
+            await self._upload_created_images(
+                created=created,
+                image_uploads=image_uploads,
+                document_id=document_id,
+                user_id_type=user_id_type,
+            )
+
+        if file_uploads:
+            await self._upload_created_files(
+                created=created,
+                file_uploads=file_uploads,
+                document_id=document_id,
+                user_id_type=user_id_type,
+            )
+
+        for old_id, new_block in zip(chunk, created):
+            new_id = new_block.get("block_id")
+            if not new_id:
+                raise self._service_error_cls("创建块响应缺少 block_id")
+            old_block = block_map.get(old_id, {})
+            if old_block.get("block_type") == BLOCK_TYPE_TABLE:
+                await self._populate_table_cells(
+                    document_id=document_id,
+                    table_block=new_block,
+                    source_table_block=old_block,
+                    block_map=block_map,
+                    children_map=children_map,
+                    user_id_type=user_id_type,
+                    image_paths=image_paths,
+                    file_paths=file_paths,
+                    error_flag=error_flag,
+                )
+                continue
+            old_children = children_map.get(old_id, [])
+            if old_children:
+                await self.create_children_recursive(
+                    document_id=document_id,
+                    parent_block_id=new_id,
+                    child_ids=old_children,
+                    block_map=block_map,
+                    children_map=children_map,
+                    user_id_type=user_id_type,
+                    insert_index=-1,
+                    image_paths=image_paths,
+                    file_paths=file_paths,
+                    error_flag=error_flag,
+                )
 
     async def handle_create_children_error(
         self,
@@ -360,24 +669,32 @@ class DocxBlockCreateService:
         document_id: str,
         user_id_type: str,
     ) -> None:
+        targets: list[tuple[str, Path]] = []
         for idx, image_path in image_uploads:
             if idx >= len(created):
                 continue
             new_id = created[idx].get("block_id")
-            if not new_id:
-                continue
+            if new_id:
+                targets.append((new_id, image_path))
+
+        async def _upload_image(new_id: str, image_path: Path) -> None:
             try:
-                token = await self._media_uploader.upload_image(
-                    image_path,
-                    parent_node=new_id,
-                    parent_type=self._image_parent_type,
-                )
-                await self._replace_image_block(
+                await self._attach_media(
                     document_id=document_id,
-                    block_id=new_id,
-                    token=token,
-                    image_path=image_path,
-                    user_id_type=user_id_type,
+                    path=image_path,
+                    parent_type=self._image_parent_type,
+                    upload=lambda: self._media_uploader.upload_image(
+                        image_path,
+                        parent_node=new_id,
+                        parent_type=self._image_parent_type,
+                    ),
+                    attach=lambda token: self._replace_image_block(
+                        document_id=document_id,
+                        block_id=new_id,
+                        token=token,
+                        image_path=image_path,
+                        user_id_type=user_id_type,
+                    ),
                 )
             except MediaUploadError as exc:
                 logger.error(
@@ -396,6 +713,8 @@ class DocxBlockCreateService:
                     exc,
                 )
 
+        await self._run_media_uploads(targets, _upload_image)
+
     async def _upload_created_files(
         self,
         *,
@@ -404,6 +723,7 @@ class DocxBlockCreateService:
         document_id: str,
         user_id_type: str,
     ) -> None:
+        targets: list[tuple[str, Path]] = []
         for idx, file_path in file_uploads:
             if idx >= len(created):
                 continue
@@ -417,18 +737,30 @@ class DocxBlockCreateService:
                     self._truncate_payload(new_block),
                 )
                 continue
-            try:
+            targets.append((target_file_block_id, file_path))
+
+        async def _upload_file(target_file_block_id: str, file_path: Path) -> None:
+            async def _upload() -> str:
                 upload = await self._file_uploader.upload_file(
                     file_path=file_path,
                     parent_node=target_file_block_id,
                     parent_type=self._file_parent_type,
                     record_db=False,
                 )
-                await self._replace_file_block(
+                return upload.file_token
+
+            try:
+                await self._attach_media(
                     document_id=document_id,
-                    block_id=target_file_block_id,
-                    token=upload.file_token,
-                    user_id_type=user_id_type,
+                    path=file_path,
+                    parent_type=self._file_parent_type,
+                    upload=_upload,
+                    attach=lambda token: self._replace_file_block(
+                        document_id=document_id,
+                        block_id=target_file_block_id,
+                        token=token,
+                        user_id_type=user_id_type,
+                    ),
                 )
             except FileUploadError as exc:
                 logger.error(
@@ -447,8 +779,86 @@ class DocxBlockCreateService:
                     exc,
                 )
 
+        await self._run_media_uploads(targets, _upload_file)
+
+    @staticmethod
+    async def _run_media_uploads(
+        targets: list[tuple[str, Path]],
+        upload_one: Callable[[str, Path], Awaitable[None]],
+    ) -> None:
+        """不同文件并发上传；同一路径的多个块串行处理，后者可直接命中前者写入的缓存。"""
+        groups: dict[str, list[tuple[str, Path]]] = {}
+        for block_id, path in targets:
+            groups.setdefault(str(path), []).append((block_id, path))
+        semaphore = asyncio.Semaphore(_MEDIA_UPLOAD_CONCURRENCY)
+
+        async def _run_group(items: list[tuple[str, Path]]) -> None:
+            for block_id, path in items:
+                async with semaphore:
+                    await upload_one(block_id, path)
+
+        await asyncio.gather(*(_run_group(items) for items in groups.values()))
+
+    async def _attach_media(
+        self,
+        *,
+        document_id: str,
+        path: Path,
+        parent_type: str,
+        upload: Callable[[], Awaitable[str]],
+        attach: Callable[[str], Awaitable[None]],
+    ) -> None:
+        cache = self._media_token_cache
+        key = None
+        if cache is not None:
+            try:
+                key = await cache.content_key(path)
+            except OSError:
+                key = None
+        if key is not None:
+            cached_token = await cache.get_token(
+                key, document_id=document_id, parent_type=parent_type
+            )
+            if cached_token:
+                try:
+                    await attach(cached_token)
+                except Exception as exc:
+                    logger.info(
+                        "缓存素材 token 复用失败，改为重新上传: document_id={} path={} error={}",
+                        document_id,
+                        path,
+                        exc,
+                    )
+                    await cache.invalidate(
+                        key, document_id=document_id, parent_type=parent_type
+                    )
+                else:
+                    logger.info(
+                        "复用已上传素材: document_id={} path={} token={}",
+                        document_id,
+                        path,
+                        cached_token,
+                    )
+                    await cache.remember(
+                        key,
+                        document_id=document_id,
+                        parent_type=parent_type,
+                        file_token=cached_token,
+                    )
+                    return
+        token = await upload()
+        await attach(token)
+        if key is not None:
+            await cache.remember(
+                key,
+                document_id=document_id,
+                parent_type=parent_type,
+                file_token=token,
+            )
+
 
 __all__ = [
+    "DESCENDANT_CREATE_MAX_BLOCKS",
     "DocxBlockCreateService",
     "build_create_chunks",
     "extract_file_block_id",
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+# 解析与转码不读取的字段：评论、修订信息等，压缩时直接丢弃
+_DROPPED_KEYS = frozenset({"comment_ids", "revision_id", "creator_id", "modifier_id"})
+_META_KEYS = frozenset({"block_id", "parent_id", "block_type", "children"})
+_MAX_KEY_SHAPES = 4096
+_key_shapes: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+class FrozenRecord(Mapping[str, Any]):
+    """只读的紧凑字典：同一组键的记录共享键元组，自身只保存值元组。"""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: tuple[str, ...], values: tuple[Any, ...]) -> None:
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class CompactBlock(Mapping[str, Any]):
+    """只读的精简块：元数据放在槽位里，正文负载转换为 FrozenRecord 并去除默认样式。
+
+    实现 Mapping 接口，DocxParser/DocxTranscoder 仍按 block.get(...) 访问；
+    只用于解析与转码，写入路径仍使用原始字典。
+    """
+
+    __slots__ = (
+        "_block_id",
+        "_parent_id",
+        "_block_type",
+        "_children",
+        "_payload_key",
+        "_payload",
+        "_extra",
+    )
+
+    def __init__(
+        self,
+        *,
+        block_id: str | None,
+        parent_id: str | None,
+        block_type: int | None,
+        children: list[str] | None,
+        payload_key: str | None,
+        payload: Any,
+        extra: FrozenRecord | None,
+    ) -> None:
+        self._block_id = block_id
+        self._parent_id = parent_id
+        self._block_type = block_type
+        self._children = children
+        self._payload_key = payload_key
+        self._payload = payload
+        self._extra = extra
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "block_id" and self._block_id is not None:
+            return self._block_id
+        if key == "parent_id" and self._parent_id is not None:
+            return self._parent_id
+        if key == "block_type" and self._block_type is not None:
+            return self._block_type
+        if key == "children" and self._children is not None:
+            return self._children
+        if key == self._payload_key:
+            return self._payload
+        if self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._block_id is not None:
+            yield "block_id"
+        if self._parent_id is not None:
+            yield "parent_id"
+        if self._block_type is not None:
+            yield "block_type"
+        if self._children is not None:
+            yield "children"
+        if self._payload_key is not None:
+            yield self._payload_key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CompactBlock({dict(self)!r})"
+
+
+def compact_block(raw: Mapping[str, Any]) -> CompactBlock:
+    """把接口返回的原始块转换为 CompactBlock；逐页调用即可随分页增量构建。"""
+    payload_keys = [key for key in raw if key not in _META_KEYS and key not in _DROPPED_KEYS]
+    payload_key = payload_keys[0] if payload_keys else None
+    extra = None
+    if len(payload_keys) > 1:
+        extra = _freeze({key: raw[key] for key in payload_keys[1:]})
+    children = raw.get("children")
+    return CompactBlock(
+        block_id=raw.get("block_id"),
+        parent_id=raw.get("parent_id") or None,
+        block_type=raw.get("block_type"),
+        # 空 children 与缺省等价（读取方均按 get("children") or [] 处理），不单独占用列表
+        children=list(children) if isinstance(children, list) and children else None,
+        payload_key=sys.intern(payload_key) if payload_key else None,
+        payload=_slim_value(raw[payload_key]) if payload_key else None,
+        extra=extra,
+    )
+
+
+def _slim_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return _freeze(value)
+    if isinstance(value, list):
+        return [_slim_value(item) for item in value]
+    if isinstance(value, str) and len(value) <= 32:
+        # 样式名、语言、颜色等短字符串大量重复，共享同一对象
+        return sys.intern(value)
+    return value
+
+
+def _freeze(value: Mapping[str, Any]) -> FrozenRecord:
+    keys: list[str] = []
+    values: list[Any] = []
+    for key, item in value.items():
+        if key in _DROPPED_KEYS:
+            continue
+        if key == "text_element_style" and isinstance(item, Mapping):
+            # 文本样式中 False/空值与缺省等价，只保留真正生效的样式
+            item = {name: style for name, style in item.items() if style}
+            if not item:
+                continue
+        keys.append(key)
+        values.append(_slim_value(item))
+    return FrozenRecord(_shared_keys(tuple(keys)), tuple(values))
+
+
+def _shared_keys(keys: tuple[str, ...]) -> tuple[str, ...]:
+    shared = _key_shapes.get(keys)
+    if shared is not None:
+        return shared
+    if len(_key_shapes) >= _MAX_KEY_SHAPES:
+        return keys
+    shared = tuple(sys.intern(key) for key in keys)
+    _key_shapes[shared] = shared
+    return shared
+
+
+__all__ = ["CompactBlock", "FrozenRecord", "compact_block"]
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import time
 import uuid
+from contextlib import contextmanager, suppress
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Iterable
+from typing import Any, Awaitable, Callable, Iterable, Iterator
 
 from loguru import logger
 
+from src.services.markdown_blocks import split_markdown_blocks
+
 ListBlocksFn = Callable[..., Awaitable[list[dict[str, Any]]]]
 FindRootBlockFn = Callable[[Iterable[dict[str, Any]]], dict[str, Any] | None]
 ConvertMarkdownWithImagesFn = Callable[..., Awaitable[Any]]
@@ -19,6 +25,9 @@ ExtractChildrenIdsFn = Callable[[dict[str, Any]], list[str]]
 MAX_CHILDREN_PER_BLOCK = 20000
 ROOT_WRAPPER_CHILD_BATCH_SIZE = MAX_CHILDREN_PER_BLOCK
 ROOT_WRAPPER_TEXT = "\u200b"
+# 全量覆盖时单个转换分段的字符上限；更长的文档分段转换，与前一段的写入重叠进行
+PIPELINE_SEGMENT_CHARS = 60000
+_REFERENCE_DEFINITION_RE = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*\S", re.MULTILINE)
 
 
 def _build_wrapper_text_elements() -> list[dict[str, Any]]:
@@ -76,7 +85,9 @@ class DocxContentWriteService:
         logger.info(
             "替换文档内容: document_id={} length={}", document_id, len(markdown)
         )
-        items = await self._list_blocks(document_id, user_id_type=user_id_type)
+        timings = _PhaseTimings()
+        with timings.measure("list"):
+            items = await self._list_blocks(document_id, user_id_type=user_id_type)
         root_block = self._find_root_block(items)
         if not root_block:
             raise self._service_error_cls("未找到文档根 Block")
@@ -86,14 +97,40 @@ class DocxContentWriteService:
             root_block.get("block_id"),
             len(children),
         )
+        if update_mode not in {"auto", "partial", "full"}:
+            update_mode = "auto"
 
-        convert = await self._convert_markdown_with_images(
-            markdown,
-            document_id=document_id,
-            user_id_type=user_id_type,
-            base_path=base_path,
-        )
-        convert = self._normalize_convert(convert)
+        # 局部更新需要整篇转换结果做比较；只做全量覆盖时可以边转换后续分段边写入前面的分段
+        segments: list[str] = []
+        if (update_mode == "full" or not children) and len(children) < MAX_CHILDREN_PER_BLOCK // 2:
+            segments = _split_markdown_for_pipeline(markdown, PIPELINE_SEGMENT_CHARS)
+        if len(segments) > 1:
+            await self._replace_pipelined(
+                document_id=document_id,
+                root_block_id=root_block["block_id"],
+                segments=segments,
+                old_children_count=len(children),
+                user_id_type=user_id_type,
+                base_path=base_path,
+                timings=timings,
+            )
+            await self._delete_old_children(
+                document_id=document_id,
+                root_block_id=root_block["block_id"],
+                count=len(children),
+                timings=timings,
+            )
+            timings.log(document_id, segments=len(segments))
+            return
+
+        with timings.measure("convert"):
+            convert = await self._convert_markdown_with_images(
+                markdown,
+                document_id=document_id,
+                user_id_type=user_id_type,
+                base_path=base_path,
+            )
+            convert = self._normalize_convert(convert)
         logger.info(
             "转换结果: document_id={} blocks={} first_level={} types={}",
             document_id,
@@ -101,20 +138,19 @@ class DocxContentWriteService:
             len(convert.first_level_block_ids),
             self._summarize_block_types(convert.blocks),
         )
-        if update_mode not in {"auto", "partial", "full"}:
-            update_mode = "auto"
 
         partial_applied = False
         if update_mode in {"auto", "partial"} and children:
-            partial_applied = await self._apply_partial_update(
-                document_id=document_id,
-                root_block_id=root_block["block_id"],
-                current_children=children,
-                current_blocks=items,
-                convert=convert,
-                user_id_type=user_id_type,
-                force=update_mode == "partial",
-            )
+            with timings.measure("partial"):
+                partial_applied = await self._apply_partial_update(
+                    document_id=document_id,
+                    root_block_id=root_block["block_id"],
+                    current_children=children,
+                    current_blocks=items,
+                    convert=convert,
+                    user_id_type=user_id_type,
+                    force=update_mode == "partial",
+                )
 
         if not partial_applied:
             remaining_old_children = len(children)
@@ -132,21 +168,23 @@ class DocxContentWriteService:
                     len(convert.first_level_block_ids),
                     overflow,
                 )
-                await self._delete_children(
-                    document_id=document_id,
-                    block_id=root_block["block_id"],
-                    start_index=delete_start,
-                    end_index=remaining_old_children,
-                )
+                with timings.measure("delete"):
+                    await self._delete_children(
+                        document_id=document_id,
+                        block_id=root_block["block_id"],
+                        start_index=delete_start,
+                        end_index=remaining_old_children,
+                    )
                 remaining_old_children = delete_start
 
-            ok = await self.create_from_convert(
-                document_id=document_id,
-                root_block_id=root_block["block_id"],
-                convert=convert,
-                user_id_type=user_id_type,
-                current_root_children_count=remaining_old_children,
-            )
+            with timings.measure("create"):
+                ok = await self.create_from_convert(
+                    document_id=document_id,
+                    root_block_id=root_block["block_id"],
+                    convert=convert,
+                    user_id_type=user_id_type,
+                    current_root_children_count=remaining_old_children,
+                )
             if not ok:
                 raise self._service_error_cls("创建块失败，已中止替换")
             logger.info(
@@ -154,23 +192,126 @@ class DocxContentWriteService:
                 document_id,
                 len(convert.blocks),
             )
+            await self._delete_old_children(
+                document_id=document_id,
+                root_block_id=root_block["block_id"],
+                count=remaining_old_children,
+                timings=timings,
+            )
+        logger.info(
+            "替换完成: document_id={} blocks={}",
+            document_id,
+            len(convert.blocks),
+        )
+        timings.log(document_id, segments=1)
 
-            if remaining_old_children > 0:
-                await self._delete_children(
-                    document_id=document_id,
-                    block_id=root_block["block_id"],
-                    start_index=0,
-                    end_index=remaining_old_children,
-                )
-                logger.info(
-                    "旧内容已删除: document_id={} count={}",
+    async def _replace_pipelined(
+        self,
+        *,
+        document_id: str,
+        root_block_id: str,
+        segments: list[str],
+        old_children_count: int,
+        user_id_type: str,
+        base_path: str | Path | None,
+        timings: _PhaseTimings,
+    ) -> None:
+        logger.info(
+            "分段流水线覆盖: document_id={} segments={}",
+            document_id,
+            len(segments),
+        )
+        created_count = 0
+        block_count = 0
+        pending = asyncio.create_task(
+            self._convert_segment(segments[0], document_id, user_id_type, base_path)
+        )
+        try:
+            for index in range(len(segments)):
+                with timings.measure("convert"):
+                    convert = await pending
+                pending = None
+                if index + 1 < len(segments):
+                    # 下一段的转换与本段的写入并行，写入仍按顺序追加在旧内容之后
+                    pending = asyncio.create_task(
+                        self._convert_segment(
+                            segments[index + 1], document_id, user_id_type, base_path
+                        )
+                    )
+                with timings.measure("create"):
+                    ok = await self.create_from_convert(
+                        document_id=document_id,
+                        root_block_id=root_block_id,
+                        convert=convert,
+                        user_id_type=user_id_type,
+                        current_root_children_count=old_children_count + created_count,
+                    )
+                if not ok:
+                    raise self._service_error_cls("创建块失败，已中止替换")
+                created_count += len(convert.first_level_block_ids)
+                block_count += len(convert.blocks)
+        except BaseException:
+            if pending is not None:
+                pending.cancel()
+                with suppress(BaseException):
+                    await pending
+            if created_count > 0:
+                logger.warning(
+                    "分段覆盖中途失败，删除已写入的新内容: document_id={} created={}",
                     document_id,
-                    remaining_old_children,
+                    created_count,
                 )
+                with suppress(Exception):
+                    await self._delete_children(
+                        document_id=document_id,
+                        block_id=root_block_id,
+                        start_index=old_children_count,
+                        end_index=old_children_count + created_count,
+                    )
+            raise
         logger.info(
-            "替换完成: document_id={} blocks={}",
+            "新内容已创建: document_id={} blocks={} segments={}",
             document_id,
-            len(convert.blocks),
+            block_count,
+            len(segments),
+        )
+
+    async def _convert_segment(
+        self,
+        markdown: str,
+        document_id: str,
+        user_id_type: str,
+        base_path: str | Path | None,
+    ) -> Any:
+        convert = await self._convert_markdown_with_images(
+            markdown,
+            document_id=document_id,
+            user_id_type=user_id_type,
+            base_path=base_path,
+        )
+        return self._normalize_convert(convert)
+
+    async def _delete_old_children(
+        self,
+        *,
+        document_id: str,
+        root_block_id: str,
+        count: int,
+        timings: _PhaseTimings,
+    ) -> None:
+        if count <= 0:
+            return
+        with timings.measure("delete"):
+            await self._delete_children(
+                document_id=document_id,
+                block_id=root_block_id,
+                start_index=0,
+                end_index=count,
+            )
+        logger.info(
+            "旧内容已删除: document_id={} count={}",
+            document_id,
+            count,
         )
 
     async def create_from_convert(
@@ -231,20 +372,24 @@ class DocxContentWriteService:
         base_path: str | Path | None,
         user_id_type: str = "open_id",
         insert_index: int = -1,
+        current_root_children_count: int | None = None,
+        convert: Any | None = None,
     ) -> int:
-        convert = await self._convert_markdown_with_images(
-            markdown,
-            document_id=document_id,
-            user_id_type=user_id_type,
-            base_path=base_path,
-        )
-        convert = self._normalize_convert(convert)
+        if convert is None:
+            convert = await self._convert_markdown_with_images(
+                markdown,
+                document_id=document_id,
+                user_id_type=user_id_type,
+                base_path=base_path,
+            )
+            convert = self._normalize_convert(convert)
         ok = await self.create_from_convert(
             document_id=document_id,
             root_block_id=root_block_id,
             convert=convert,
             user_id_type=user_id_type,
             insert_index=insert_index,
+            current_root_children_count=current_root_children_count,
         )
         if not ok:
             raise self._service_error_cls("创建块失败，已中止插入")
@@ -369,4 +514,43 @@ class DocxContentWriteService:
             )
 
 
-__all__ = ["DocxContentWriteService"]
+class _PhaseTimings:
+    def __init__(self) -> None:
+        self._elapsed: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._elapsed[phase] = self._elapsed.get(phase, 0.0) + time.perf_counter() - started
+
+    def log(self, document_id: str, *, segments: int) -> None:
+        logger.info(
+            "替换阶段耗时: document_id={} segments={} {}",
+            document_id,
+            segments,
+            " ".join(f"{phase}={seconds:.2f}s" for phase, seconds in self._elapsed.items()),
+        )
+
+
+def _split_markdown_for_pipeline(markdown: str, segment_chars: int) -> list[str]:
+    """按 Markdown 块边界切成不超过 segment_chars 的分段；含引用式链接定义时不切分。"""
+    if len(markdown) <= segment_chars or _REFERENCE_DEFINITION_RE.search(markdown):
+        return [markdown]
+    segments: list[str] = []
+    buffer: list[str] = []
+    size = 0
+    for block in split_markdown_blocks(markdown):
+        if buffer and size + len(block) > segment_chars:
+            segments.append("\n\n".join(buffer))
+            buffer, size = [], 0
+        buffer.append(block)
+        size += len(block) + 2
+    if buffer:
+        segments.append("\n\n".join(buffer))
+    return segments
+
+
+__all__ = ["DocxContentWriteService", "PIPELINE_SEGMENT_CHARS"]
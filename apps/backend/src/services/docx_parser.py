@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping
 from datetime import datetime
 from typing import Callable
 from urllib.parse import unquote
@@ -29,6 +30,9 @@ LIST_BLOCK_TYPES = {BLOCK_TYPE_BULLET, BLOCK_TYPE_ORDERED, BLOCK_TYPE_TODO}
 SHEET_PREVIEW_MAX_ROWS = 30
 SHEET_PREVIEW_MAX_COLS = 12
 
+_VISITING = 1
+_VISITED = 2
+
 _TEXT_BLOCK_FIELDS = {
     BLOCK_TYPE_TEXT: "text",
     BLOCK_TYPE_BULLET: "bullet",
@@ -78,6 +82,13 @@ def _resolve_ordered_index(current: int | None, sequence: object) -> int:
 
 
 class DocxParser:
+    """块树解析器。
+
+    初始化时以迭代方式一次性建立索引：过滤后的子块列表（去掉成环引用）、父块、
+    深度与先序顺序。collect_text/text_from_block 的结果按块缓存，
+    表格单元格等重复读取不会重新拼接文本。
+    """
+
     def __init__(
         self,
         blocks: list[dict],
@@ -90,14 +101,69 @@ class DocxParser:
             for block in blocks
             if (block_id := block.get("block_id"))
         }
-        self._children_map = {
-            block_id: [
+        self._children_map: dict[str, list[str]] = {}
+        self._parent_map: dict[str, str] = {}
+        self._depth_map: dict[str, int] = {}
+        self._order: list[str] = []
+        self._text_cache: dict[tuple[str, bool], str] = {}
+        self._collect_cache: dict[tuple[str, int | None], str] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        raw_children: dict[str, list[str]] = {}
+        referenced: set[str] = set()
+        for block_id, block in self._block_map.items():
+            children = [
                 child
                 for child in (block.get("children") or [])
                 if child in self._block_map
             ]
-            for block_id, block in self._block_map.items()
-        }
+            raw_children[block_id] = children
+            referenced.update(children)
+
+        starts: list[str] = []
+        root = self._find_root()
+        if root and root.get("block_id") in self._block_map:
+            starts.append(root["block_id"])
+        starts.extend(block_id for block_id in self._block_map if block_id not in referenced)
+        # 整体成环的块不会出现在任何根下，最后按原始顺序补齐
+        starts.extend(self._block_map)
+
+        state: dict[str, int] = {}
+        finished: list[str] = []
+        for start in starts:
+            if start in state:
+                continue
+            state[start] = _VISITING
+            self._order.append(start)
+            self._children_map[start] = []
+            stack = [(start, iter(raw_children[start]))]
+            while stack:
+                current, pending = stack[-1]
+                for child in pending:
+                    mark = state.get(child)
+                    if mark == _VISITING:
+                        # 指向祖先的引用会形成环，直接丢弃
+                        continue
+                    self._children_map[current].append(child)
+                    if mark is None:
+                        state[child] = _VISITING
+                        self._parent_map[child] = current
+                        self._order.append(child)
+                        self._children_map[child] = []
+                        stack.append((child, iter(raw_children[child])))
+                        break
+                else:
+                    state[current] = _VISITED
+                    finished.append(current)
+                    stack.pop()
+
+        # 同一块可能被多个父块引用，深度取最长路径，保证沿任意路径渲染都不会超过该值
+        for block_id in reversed(finished):
+            depth = self._depth_map.setdefault(block_id, 0) + 1
+            for child in self._children_map[block_id]:
+                if self._depth_map.get(child, 0) < depth:
+                    self._depth_map[child] = depth
 
     def resolve_order(self) -> list[str]:
         root = self._find_root()
@@ -127,32 +193,69 @@ class DocxParser:
     def children_ids(self, block_id: str) -> list[str]:
         return self._children_map.get(block_id, [])
 
+    def parent_id(self, block_id: str) -> str | None:
+        """首次遍历到该块时所在的父块。"""
+        return self._parent_map.get(block_id)
+
+    def depth(self, block_id: str) -> int:
+        """块距根块的最长路径深度，根块为 0；未知块返回 0。"""
+        return self._depth_map.get(block_id, 0)
+
+    def document_order(self) -> list[str]:
+        """全部块的先序顺序（根块在前，其后是孤立块与成环块）。"""
+        return list(self._order)
+
+    def iter_subtree(self, block_id: str, max_depth: int | None = None) -> Iterator[str]:
+        """先序遍历以 block_id 为根的子树，max_depth 为相对深度上限（None 表示不限）。"""
+        if block_id not in self._block_map or (max_depth is not None and max_depth < 0):
+            return
+        stack = [(block_id, 0)]
+        while stack:
+            current, level = stack.pop()
+            yield current
+            if max_depth is not None and level >= max_depth:
+                continue
+            children = self._children_map.get(current, [])
+            stack.extend((child, level + 1) for child in reversed(children))
+
     def text_from_block(self, block: dict, *, strip: bool = True) -> str:
+        block_id = block.get("block_id")
+        cacheable = bool(block_id) and self._block_map.get(block_id) is block
+        if cacheable:
+            cached = self._text_cache.get((block_id, strip))
+            if cached is not None:
+                return cached
         text_block = self._resolve_text_block(block)
         if not text_block:
-            return ""
-        elements = text_block.get("elements") or []
-        parts: list[str] = []
-        for element in elements:
-            formatted = self._format_element(element)
-            if formatted:
-                parts.append(formatted)
-        text = "".join(parts)
-        return text.strip() if strip else text
-
-    def collect_text(self, block_id: str, max_depth: int = 6) -> str:
-        block = self.get_block(block_id)
-        if not block or max_depth < 0:
-            return ""
+            text = ""
+        else:
+            elements = text_block.get("elements") or []
+            parts: list[str] = []
+            for element in elements:
+                formatted = self._format_element(element)
+                if formatted:
+                    parts.append(formatted)
+            text = "".join(parts)
+            if strip:
+                text = text.strip()
+        if cacheable:
+            self._text_cache[(block_id, strip)] = text
+        return text
+
+    def collect_text(self, block_id: str, max_depth: int | None = 6) -> str:
+        key = (block_id, max_depth)
+        cached = self._collect_cache.get(key)
+        if cached is not None:
+            return cached
         parts: list[str] = []
-        text = self.text_from_block(block)
-        if text:
-            parts.append(text)
-        for child_id in self.children_ids(block_id):
-            child_text = self.collect_text(child_id, max_depth=max_depth - 1)
-            if child_text:
-                parts.append(child_text)
-        return " ".join(parts).strip()
+        for current in self.iter_subtree(block_id, max_depth):
+            text = self.text_from_block(self._block_map[current])
+            if text:
+                parts.append(text)
+        # 各段均已去除首尾空白，直接拼接即与逐层递归拼接的结果一致
+        result = " ".join(parts)
+        self._collect_cache[key] = result
+        return result
 
     def _resolve_text_block(self, block: dict) -> dict | None:
         block_type = block.get("block_type")
@@ -181,7 +284,7 @@ class DocxParser:
     def _find_text_container(cls, value: object, max_depth: int) -> dict | None:
         if max_depth < 0:
             return None
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             direct = cls._extract_text_container(value)
             if direct:
                 return direct
@@ -199,13 +302,13 @@ class DocxParser:
 
     @staticmethod
     def _extract_text_container(value: object) -> dict | None:
-        if not isinstance(value, dict):
+        if not isinstance(value, Mapping):
             return None
         if isinstance(value.get("elements"), list):
             return value
         for key in ("text", "content", "title"):
             nested = value.get(key)
-            if isinstance(nested, dict) and isinstance(nested.get("elements"), list):
+            if isinstance(nested, Mapping) and isinstance(nested.get("elements"), list):
                 return nested
         return None
 
@@ -250,7 +353,7 @@ class DocxParser:
             return self._apply_text_style(text, style)
         equation = element.get("equation")
         if equation:
-            if not isinstance(equation, dict):
+            if not isinstance(equation, Mapping):
                 return ""
             content = str(equation.get("content") or "").strip()
             if not content:
@@ -290,7 +393,7 @@ class DocxParser:
         if isinstance(value, list):
             parts = [cls._fallback_element_text(item, depth - 1) for item in value]
             return "".join(part for part in parts if part)
-        if not isinstance(value, dict):
+        if not isinstance(value, Mapping):
             return ""
 
         text = value.get("text")
@@ -1,22 +1,75 @@
 from __future__ import annotations
 
-import difflib
 import hashlib
 from collections import Counter
+from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable
 
 from loguru import logger
 
+from src.services.block_diff import diff_opcodes
 from src.services.transcoder import (
+    BLOCK_TYPE_BULLET,
+    BLOCK_TYPE_CALLOUT,
+    BLOCK_TYPE_CODE,
     BLOCK_TYPE_FILE,
+    BLOCK_TYPE_HEADING_MAX,
+    BLOCK_TYPE_HEADING_MIN,
     BLOCK_TYPE_IMAGE,
+    BLOCK_TYPE_ORDERED,
+    BLOCK_TYPE_QUOTE,
+    BLOCK_TYPE_QUOTE_CONTAINER,
     BLOCK_TYPE_TABLE,
+    BLOCK_TYPE_TABLE_CELL,
+    BLOCK_TYPE_TEXT,
+    BLOCK_TYPE_TODO,
     DocxParser,
 )
 
 DeleteChildren = Callable[..., Awaitable[None]]
 CreateChildrenRecursive = Callable[..., Awaitable[None]]
 ExtractChildrenIds = Callable[[dict[str, Any]], list[str]]
+BatchUpdateBlocks = Callable[..., Awaitable[None]]
+
+_TEXT_FIELDS = {
+    BLOCK_TYPE_TEXT: "text",
+    BLOCK_TYPE_BULLET: "bullet",
+    BLOCK_TYPE_ORDERED: "ordered",
+    BLOCK_TYPE_CODE: "code",
+    BLOCK_TYPE_QUOTE: "quote",
+    BLOCK_TYPE_TODO: "todo",
+}
+# 自身没有文本、只承载子块的容器：样式一致时直接下钻比较子块
+_CONTAINER_FIELDS = {
+    BLOCK_TYPE_TABLE_CELL: "table_cell",
+    BLOCK_TYPE_QUOTE_CONTAINER: "quote_container",
+    BLOCK_TYPE_CALLOUT: "callout",
+}
+_BATCH_UPDATE_CHUNK = 200
+
+
+@dataclass
+class _LevelOp:
+    kind: str
+    parent_block_id: str
+    start: int
+    end: int = 0
+    desired_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _UpdatePlan:
+    ops: list[_LevelOp] = field(default_factory=list)
+    text_updates: list[dict[str, Any]] = field(default_factory=list)
+    root_kept: int = 0
+    root_modified: int = 0
+    root_deleted: int = 0
+    root_inserted: int = 0
+
+    @property
+    def write_calls(self) -> int:
+        update_calls = -(-len(self.text_updates) // _BATCH_UPDATE_CHUNK)
+        return len(self.ops) + update_calls
 
 
 class DocxPartialUpdateService:
@@ -26,10 +79,12 @@ class DocxPartialUpdateService:
         delete_children: DeleteChildren,
         create_children_recursive: CreateChildrenRecursive,
         extract_children_ids: ExtractChildrenIds,
+        batch_update_blocks: BatchUpdateBlocks | None = None,
     ) -> None:
         self._delete_children = delete_children
         self._create_children_recursive = create_children_recursive
         self._extract_children_ids = extract_children_ids
+        self._batch_update_blocks = batch_update_blocks
 
     async def apply_partial_update(
         self,
@@ -50,9 +105,6 @@ class DocxPartialUpdateService:
         desired_ids = convert.first_level_block_ids
         if not desired_ids:
             return False
-        if not force and any(block.get("block_type") == BLOCK_TYPE_TABLE for block in convert.blocks):
-            logger.info("局部更新跳过: 检测到表格块，退回全量覆盖")
-            return False
 
         current_parser = DocxParser(current_blocks)
         desired_parser = DocxParser(convert.blocks)
@@ -66,11 +118,14 @@ class DocxPartialUpdateService:
             _block_signature(block_id, desired_map, desired_parser)
             for block_id in desired_ids
         ]
-        if not force and (_has_duplicate_signatures(current_sigs) or _has_duplicate_signatures(desired_sigs)):
-            logger.info("局部更新跳过: 检测到重复块签名，退回全量覆盖")
-            return False
         if not force:
             anchors = _unique_anchor_pairs(current_sigs, desired_sigs)
+            # 重复签名由 diff_opcodes 按出现顺序配对处理；只有完全没有唯一锚点时才无法可靠对齐
+            if not anchors and (
+                _has_duplicate_signatures(current_sigs) or _has_duplicate_signatures(desired_sigs)
+            ):
+                logger.info("局部更新跳过: 检测到重复块签名且无唯一锚点，退回全量覆盖")
+                return False
             min_len = min(len(current_sigs), len(desired_sigs))
             anchor_ratio = len(anchors) / max(min_len, 1)
             if min_len >= 8 and len(anchors) < 2:
@@ -89,61 +144,389 @@ class DocxPartialUpdateService:
                     logger.info("局部更新跳过: 锚点顺序不一致，退回全量覆盖")
                     return False
 
-        matcher = difflib.SequenceMatcher(a=current_sigs, b=desired_sigs)
-        opcodes = matcher.get_opcodes()
-        changed = sum((i2 - i1) for tag, i1, i2, _, _ in opcodes if tag != "equal")
-        change_ratio = changed / max(len(current_sigs), 1)
+        children_map = {
+            block.get("block_id"): self._extract_children_ids(block)
+            for block in convert.blocks
+        }
+        planner = _HierarchicalPlanner(
+            current_map=current_map,
+            current_parser=current_parser,
+            desired_map=desired_map,
+            desired_parser=desired_parser,
+            extract_children_ids=self._extract_children_ids,
+            allow_text_update=self._batch_update_blocks is not None,
+        )
+        plan = _UpdatePlan()
+        planner.plan_level(
+            plan,
+            parent_block_id=root_block_id,
+            current_ids=current_ids,
+            desired_ids=list(desired_ids),
+            current_sigs=current_sigs,
+            desired_sigs=desired_sigs,
+            is_root=True,
+        )
+        change_ratio = plan.root_deleted / max(len(current_ids), 1)
+        similarity = 2 * (plan.root_kept + plan.root_modified) / max(
+            len(current_ids) + len(desired_ids), 1
+        )
         logger.info(
-            "局部更新评估: document_id={} current={} desired={} ops={} change_ratio={:.2f}",
+            "局部更新评估: document_id={} current={} desired={} ops={} text_updates={} change_ratio={:.2f} similarity={:.2f}",
             document_id,
-            len(current_sigs),
-            len(desired_sigs),
-            len(opcodes),
+            len(current_ids),
+            len(desired_ids),
+            len(plan.ops),
+            len(plan.text_updates),
             change_ratio,
+            similarity,
         )
+        if not plan.ops and not plan.text_updates:
+            logger.info("局部更新完成: document_id={} 无差异", document_id)
+            return True
 
-        if not force and (change_ratio > 0.6 or len(opcodes) > 50):
-            logger.info("局部更新跳过: change_ratio 太高或 ops 过多，退回全量覆盖")
-            return False
-        if not force and matcher.ratio() < 0.55:
-            logger.info("局部更新跳过: 相似度过低 (ratio={:.2f})", matcher.ratio())
-            return False
+        if not force:
+            if change_ratio > 0.6 or plan.write_calls > 50:
+                logger.info("局部更新跳过: change_ratio 太高或 ops 过多，退回全量覆盖")
+                return False
+            if similarity < 0.55:
+                logger.info("局部更新跳过: 相似度过低 (ratio={:.2f})", similarity)
+                return False
+            if _creates_table(plan.ops, desired_map, children_map):
+                logger.info("局部更新跳过: 需要新建表格块，退回全量覆盖")
+                return False
 
-        block_map = {block.get("block_id"): block for block in convert.blocks}
-        children_map = {
-            block.get("block_id"): self._extract_children_ids(block)
-            for block in convert.blocks
-        }
+        for op in plan.ops:
+            if op.kind == "delete":
+                await self._delete_children(
+                    document_id=document_id,
+                    block_id=op.parent_block_id,
+                    start_index=op.start,
+                    end_index=op.end,
+                )
+                continue
+            await self._create_children_recursive(
+                document_id=document_id,
+                parent_block_id=op.parent_block_id,
+                child_ids=op.desired_ids,
+                block_map=desired_map,
+                children_map=children_map,
+                user_id_type=user_id_type,
+                insert_index=op.start,
+                image_paths=convert.image_paths,
+                file_paths=convert.file_paths,
+            )
+        if plan.text_updates and self._batch_update_blocks is not None:
+            await self._batch_update_blocks(
+                document_id=document_id,
+                requests=plan.text_updates,
+                user_id_type=user_id_type,
+            )
+        logger.info(
+            "局部更新完成: document_id={} ops={} text_updates={}",
+            document_id,
+            len(plan.ops),
+            len(plan.text_updates),
+        )
+        return True
+
+    def build_text_update_requests(
+        self,
+        *,
+        current_ids: list[str],
+        current_blocks: list[dict[str, Any]],
+        convert: Any,
+    ) -> list[dict[str, Any]] | None:
+        """把现有块与转换结果的一级块逐个配对，生成原位更新文本的请求。
+
+        只有两侧数量一致、且每一对都是无子块的同形态文本块时才返回请求列表
+        （文本未变化的块不产生请求）；否则返回 None，由调用方走删除重建。
+        """
+        desired_ids = list(convert.first_level_block_ids)
+        if not current_ids or len(current_ids) != len(desired_ids):
+            return None
+        current_map = {block.get("block_id"): block for block in current_blocks}
+        desired_map = {block.get("block_id"): block for block in convert.blocks}
+        planner = _HierarchicalPlanner(
+            current_map=current_map,
+            current_parser=DocxParser(current_blocks),
+            desired_map=desired_map,
+            desired_parser=DocxParser(convert.blocks),
+            extract_children_ids=self._extract_children_ids,
+            allow_text_update=True,
+        )
+        requests: list[dict[str, Any]] = []
+        for current_id, desired_id in zip(current_ids, desired_ids):
+            if not planner.is_inplace_text_pair(current_id, desired_id):
+                return None
+            request = planner.text_update_request(current_id, desired_id)
+            if request is not None:
+                requests.append(request)
+        return requests
+
+
+class _HierarchicalPlanner:
+    """按层比较子块：签名一致的保留，同形态的块原位更新文本或下钻比较子块，其余删除/新建。"""
 
-        offset = 0
-        for tag, i1, i2, j1, j2 in opcodes:
+    def __init__(
+        self,
+        *,
+        current_map: dict[str, dict[str, Any]],
+        current_parser: DocxParser,
+        desired_map: dict[str, dict[str, Any]],
+        desired_parser: DocxParser,
+        extract_children_ids: ExtractChildrenIds,
+        allow_text_update: bool,
+    ) -> None:
+        self._current_map = current_map
+        self._current_parser = current_parser
+        self._desired_map = desired_map
+        self._desired_parser = desired_parser
+        self._extract_children_ids = extract_children_ids
+        self._allow_text_update = allow_text_update
+
+    def plan_level(
+        self,
+        plan: _UpdatePlan,
+        *,
+        parent_block_id: str,
+        current_ids: list[str],
+        desired_ids: list[str],
+        current_sigs: list[str] | None = None,
+        desired_sigs: list[str] | None = None,
+        is_root: bool = False,
+    ) -> None:
+        if current_sigs is None:
+            current_sigs = [
+                _block_signature(block_id, self._current_map, self._current_parser)
+                for block_id in current_ids
+            ]
+        if desired_sigs is None:
+            desired_sigs = [
+                _block_signature(block_id, self._desired_map, self._desired_parser)
+                for block_id in desired_ids
+            ]
+        script: list[tuple[str, str | None, str | None]] = []
+        for tag, i1, i2, j1, j2 in diff_opcodes(current_sigs, desired_sigs):
             if tag == "equal":
+                script.extend(
+                    ("keep", current_ids[i], desired_ids[j1 + i - i1]) for i in range(i1, i2)
+                )
                 continue
-            start = i1 + offset
-            end = i2 + offset
-            if tag in {"delete", "replace"} and end > start:
-                await self._delete_children(
-                    document_id=document_id,
-                    block_id=root_block_id,
-                    start_index=start,
-                    end_index=end,
+            script.extend(self._align_changed(current_ids[i1:i2], desired_ids[j1:j2]))
+
+        index = 0
+        pending_delete = 0
+        pending_insert: list[str] = []
+
+        def flush() -> None:
+            nonlocal index, pending_delete, pending_insert
+            if pending_delete:
+                plan.ops.append(
+                    _LevelOp("delete", parent_block_id, index, index + pending_delete)
                 )
-                offset -= (i2 - i1)
-            if tag in {"insert", "replace"} and j2 > j1:
-                await self._create_children_recursive(
-                    document_id=document_id,
-                    parent_block_id=root_block_id,
-                    child_ids=desired_ids[j1:j2],
-                    block_map=block_map,
-                    children_map=children_map,
-                    user_id_type=user_id_type,
-                    insert_index=start,
-                    image_paths=convert.image_paths,
-                    file_paths=convert.file_paths,
+                pending_delete = 0
+            if pending_insert:
+                plan.ops.append(
+                    _LevelOp("create", parent_block_id, index, desired_ids=pending_insert)
                 )
-                offset += (j2 - j1)
-        logger.info("局部更新完成: document_id={}", document_id)
-        return True
+                index += len(pending_insert)
+                pending_insert = []
+
+        for action, current_id, desired_id in script:
+            if action == "delete":
+                if pending_insert:
+                    flush()
+                pending_delete += 1
+                if is_root:
+                    plan.root_deleted += 1
+                continue
+            if action == "insert":
+                pending_insert.append(desired_id)
+                if is_root:
+                    plan.root_inserted += 1
+                continue
+            if action == "modify" and not self._can_modify(current_id, desired_id):
+                if pending_insert:
+                    flush()
+                pending_delete += 1
+                pending_insert.append(desired_id)
+                if is_root:
+                    plan.root_deleted += 1
+                    plan.root_inserted += 1
+                continue
+            flush()
+            if action == "modify":
+                self._plan_modify(plan, current_id, desired_id)
+                if is_root:
+                    plan.root_modified += 1
+            elif is_root:
+                plan.root_kept += 1
+            index += 1
+        flush()
+
+    def _align_changed(
+        self, current_ids: list[str], desired_ids: list[str]
+    ) -> list[tuple[str, str | None, str | None]]:
+        current_shapes = [self._shape(self._current_map[block_id]) for block_id in current_ids]
+        desired_shapes = [self._shape(self._desired_map[block_id]) for block_id in desired_ids]
+        script: list[tuple[str, str | None, str | None]] = []
+        for tag, i1, i2, j1, j2 in diff_opcodes(current_shapes, desired_shapes):
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    current_id = current_ids[i1 + offset]
+                    desired_id = desired_ids[j1 + offset]
+                    if current_shapes[i1 + offset] is not None:
+                        script.append(("modify", current_id, desired_id))
+                    else:
+                        script.append(("delete", current_id, None))
+                        script.append(("insert", None, desired_id))
+                continue
+            script.extend(("delete", block_id, None) for block_id in current_ids[i1:i2])
+            script.extend(("insert", None, block_id) for block_id in desired_ids[j1:j2])
+        return script
+
+    def _shape(self, block: dict[str, Any]) -> tuple[Any, ...] | None:
+        """可原位修改的块形态；None 表示只能删除重建（图片、附件等）。"""
+        block_type = block.get("block_type")
+        if block_type == BLOCK_TYPE_TABLE:
+            prop = (block.get("table") or {}).get("property") or {}
+            return (
+                block_type,
+                prop.get("row_size"),
+                prop.get("column_size"),
+                _merge_signature(prop.get("merge_info")),
+            )
+        if block_type in _CONTAINER_FIELDS:
+            return (block_type, _style_signature(block.get(_CONTAINER_FIELDS[block_type])))
+        text_field = _text_field(block_type)
+        if text_field is None:
+            return None
+        payload = block.get(text_field) or {}
+        return (block_type, _style_signature(payload.get("style")))
+
+    def _plan_modify(self, plan: _UpdatePlan, current_id: str, desired_id: str) -> None:
+        current_block = self._current_map[current_id]
+        desired_block = self._desired_map[desired_id]
+        current_children = self._existing_children(current_block, self._current_map)
+        desired_children = self._existing_children(desired_block, self._desired_map)
+        if current_block.get("block_type") == BLOCK_TYPE_TABLE:
+            # 同行列数的表格单元格一一对应，不能增删单元格，只比较单元格内容
+            for current_cell, desired_cell in zip(current_children, desired_children):
+                self.plan_level(
+                    plan,
+                    parent_block_id=current_cell,
+                    current_ids=self._existing_children(
+                        self._current_map[current_cell], self._current_map
+                    ),
+                    desired_ids=self._existing_children(
+                        self._desired_map[desired_cell], self._desired_map
+                    ),
+                )
+            return
+        request = self.text_update_request(current_id, desired_id)
+        if request is not None:
+            plan.text_updates.append(request)
+        if current_children or desired_children:
+            self.plan_level(
+                plan,
+                parent_block_id=current_id,
+                current_ids=current_children,
+                desired_ids=desired_children,
+            )
+
+    def text_update_request(self, current_id: str, desired_id: str) -> dict[str, Any] | None:
+        current_block = self._current_map[current_id]
+        desired_block = self._desired_map[desired_id]
+        text_field = _text_field(current_block.get("block_type"))
+        if text_field is None:
+            return None
+        current_text = self._current_parser.text_from_block(current_block, strip=False)
+        desired_text = self._desired_parser.text_from_block(desired_block, strip=False)
+        if current_text == desired_text:
+            return None
+        elements = (desired_block.get(text_field) or {}).get("elements") or []
+        return {"block_id": current_id, "update_text_elements": {"elements": elements}}
+
+    def is_inplace_text_pair(self, current_id: str, desired_id: str) -> bool:
+        """两侧都是无子块的同形态文本块，只需替换文本元素即可对齐。"""
+        current_block = self._current_map.get(current_id)
+        desired_block = self._desired_map.get(desired_id)
+        if not current_block or not desired_block:
+            return False
+        if _text_field(current_block.get("block_type")) is None:
+            return False
+        if self._shape(current_block) != self._shape(desired_block):
+            return False
+        # 云端块只给了一级块，子块不一定在 current_map 里：按原始 children 判断，避免带子块的列表项被当成叶子
+        return not (
+            self._extract_children_ids(current_block)
+            or self._existing_children(desired_block, self._desired_map)
+        )
+
+    def _can_modify(self, current_id: str, desired_id: str) -> bool:
+        if self._allow_text_update:
+            return True
+        current_block = self._current_map[current_id]
+        if _text_field(current_block.get("block_type")) is None:
+            return True
+        return self._current_parser.text_from_block(
+            current_block, strip=False
+        ) == self._desired_parser.text_from_block(self._desired_map[desired_id], strip=False)
+
+    def _existing_children(
+        self, block: dict[str, Any], block_map: dict[str, dict[str, Any]]
+    ) -> list[str]:
+        return [
+            child_id
+            for child_id in self._extract_children_ids(block)
+            if child_id in block_map
+        ]
+
+
+def _text_field(block_type: Any) -> str | None:
+    if isinstance(block_type, int) and BLOCK_TYPE_HEADING_MIN <= block_type <= BLOCK_TYPE_HEADING_MAX:
+        return f"heading{block_type - 2}"
+    return _TEXT_FIELDS.get(block_type)
+
+
+def _style_signature(value: Any) -> str:
+    if not isinstance(value, dict):
+        return ""
+    # 云端返回的样式会补齐默认值（align=1、folded=false 等），转换结果通常省略，比较前剔除
+    cleaned = {
+        key: item
+        for key, item in value.items()
+        if key != "elements" and item not in (None, False, "", 0, [], {}) and not (key == "align" and item == 1)
+    }
+    return repr(sorted(cleaned.items()))
+
+
+def _merge_signature(value: Any) -> str:
+    if not isinstance(value, list):
+        return ""
+    spans = [
+        (item.get("row_span", 1), item.get("col_span", 1))
+        for item in value
+        if isinstance(item, dict)
+    ]
+    if all(span == (1, 1) for span in spans):
+        return ""
+    return repr(spans)
+
+
+def _creates_table(
+    ops: list[_LevelOp],
+    block_map: dict[str, dict[str, Any]],
+    children_map: dict[str, list[str]],
+) -> bool:
+    stack = [block_id for op in ops if op.kind == "create" for block_id in op.desired_ids]
+    while stack:
+        block_id = stack.pop()
+        block = block_map.get(block_id) or {}
+        if block.get("block_type") == BLOCK_TYPE_TABLE:
+            return True
+        stack.extend(children_map.get(block_id) or [])
+    return False
 
 
 def _block_signature(
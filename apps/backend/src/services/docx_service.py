@@ -18,6 +18,7 @@ from src.services.docx_block_create_service import (
     DocxBlockCreateService,
     build_create_chunks as _build_create_chunks,
 )
+from src.services.docx_block_model import compact_block
 from src.services.docx_content_write_service import DocxContentWriteService
 from src.services.docx_markdown_convert_helper import (
     compile_placeholder_pattern as _compile_placeholder_pattern,
@@ -34,6 +35,7 @@ from src.services.docx_partial_update_service import DocxPartialUpdateService
 from src.services.docx_table_runtime_service import DocxTableRuntimeService
 from src.services.feishu_client import FeishuClient
 from src.services.file_uploader import FileUploader
+from src.services.media_token_cache_service import MediaTokenCacheService
 from src.services.media_uploader import MediaUploader
 from src.services.transcoder import (
     DocxParser,
@@ -121,6 +123,7 @@ class DocxService:
         file_uploader: FileUploader | None = None,
         image_parent_type: str = "docx_image",
         file_parent_type: str = "docx_file",
+        media_token_cache: MediaTokenCacheService | None = None,
     ) -> None:
         self._client = client or FeishuClient()
         self._base_url = base_url.rstrip("/")
@@ -168,6 +171,7 @@ class DocxService:
             delete_children=self.delete_children,
             create_children_recursive=self._create_children_recursive,
             extract_children_ids=_extract_children_ids,
+            batch_update_blocks=self.batch_update_blocks,
         )
         self._block_create_service = DocxBlockCreateService(
             request_json=self._request_json,
@@ -184,6 +188,8 @@ class DocxService:
             image_parent_type=self._image_parent_type,
             file_parent_type=self._file_parent_type,
             service_error_cls=DocxServiceError,
+            media_token_cache=media_token_cache,
+            sanitize_descendant_block=self._sanitize_descendant_block,
         )
         self._content_write_service = DocxContentWriteService(
             list_blocks=self.list_blocks,
@@ -236,6 +242,22 @@ class DocxService:
             blocks=blocks,
         )
 
+    async def convert_markdown_block(
+        self,
+        markdown: str,
+        document_id: str,
+        user_id_type: str = "open_id",
+        base_path: str | Path | None = None,
+    ) -> ConvertResult:
+        """转换单个 Markdown 段落并展开顶层页面块，结果可在原位更新与插入之间复用。"""
+        convert = await self.convert_markdown_with_images(
+            markdown,
+            document_id=document_id,
+            user_id_type=user_id_type,
+            base_path=base_path,
+        )
+        return self._normalize_convert(convert)
+
     async def convert_markdown_with_images(
         self,
         markdown: str,
@@ -273,9 +295,14 @@ class DocxService:
         return _patch_table_properties(convert, processed_markdown)
 
     async def list_blocks(
-        self, document_id: str, user_id_type: str = "open_id"
+        self,
+        document_id: str,
+        user_id_type: str = "open_id",
+        *,
+        compact: bool = False,
     ) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
+        """分页列出全部块；compact=True 时逐页转换为只读的 CompactBlock，仅供解析/转码使用。"""
+        items: list[Any] = []
         page_token: str | None = None
         while True:
             params = {"page_size": 200, "user_id_type": user_id_type}
@@ -291,7 +318,10 @@ class DocxService:
                 raise DocxServiceError("获取块列表响应缺少 data")
             page_items = data.get("items", [])
             if isinstance(page_items, list):
-                items.extend(page_items)
+                if compact:
+                    items.extend(compact_block(item) for item in page_items if isinstance(item, dict))
+                else:
+                    items.extend(page_items)
             if not data.get("has_more"):
                 break
             page_token = data.get("page_token")
@@ -317,6 +347,47 @@ class DocxService:
             )
             current_end = current_start
 
+    async def batch_update_blocks(
+        self,
+        document_id: str,
+        requests: list[dict[str, Any]],
+        user_id_type: str = "open_id",
+    ) -> None:
+        """原位批量更新块（如 update_text_elements），不改变块 ID。"""
+        chunk_size = 200
+        for start in range(0, len(requests), chunk_size):
+            chunk = requests[start : start + chunk_size]
+            await self._request_json(
+                "PATCH",
+                f"{self._base_url}/open-apis/docx/v1/documents/{document_id}/blocks/batch_update",
+                params={
+                    "client_token": str(uuid.uuid4()),
+                    "document_revision_id": -1,
+                    "user_id_type": user_id_type,
+                },
+                json={"requests": chunk},
+            )
+
+    async def rename_document(
+        self,
+        document_id: str,
+        title: str,
+        user_id_type: str = "open_id",
+    ) -> None:
+        """修改文档标题：标题即根 page 块的文本，原位更新不影响正文。"""
+        await self.batch_update_blocks(
+            document_id,
+            [
+                {
+                    "block_id": document_id,
+                    "update_text_elements": {
+                        "elements": [{"text_run": {"content": title}}],
+                    },
+                }
+            ],
+            user_id_type=user_id_type,
+        )
+
     async def _try_delete_children(
         self,
         document_id: str,
@@ -392,6 +463,8 @@ class DocxService:
         base_path: str | Path | None,
         user_id_type: str = "open_id",
         insert_index: int = -1,
+        current_root_children_count: int | None = None,
+        convert: ConvertResult | None = None,
     ) -> int:
         return await self._content_write_service.insert_markdown_block(
             document_id=document_id,
@@ -400,6 +473,38 @@ class DocxService:
             base_path=base_path,
             user_id_type=user_id_type,
             insert_index=insert_index,
+            current_root_children_count=current_root_children_count,
+            convert=convert,
+        )
+
+    async def plan_text_updates(
+        self,
+        document_id: str,
+        markdown: str,
+        *,
+        current_ids: list[str],
+        current_blocks: list[dict[str, Any]],
+        base_path: str | Path | None,
+        user_id_type: str = "open_id",
+        convert: ConvertResult | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """Markdown 段落只改了文字时，返回对 current_ids 原位更新的 batch_update 请求；否则 None。
+
+        传入 convert 时直接复用，调用方回退到删除重建时可把同一份转换结果交给 insert_markdown_block。
+        """
+        if convert is None:
+            convert = await self.convert_markdown_block(
+                markdown,
+                document_id=document_id,
+                user_id_type=user_id_type,
+                base_path=base_path,
+            )
+        if convert.image_paths or convert.file_paths:
+            return None
+        return self._partial_update_service.build_text_update_requests(
+            current_ids=current_ids,
+            current_blocks=current_blocks,
+            convert=convert,
         )
 
     async def _create_children_recursive(
@@ -583,6 +688,19 @@ class DocxService:
                 cleaned["table"] = table
         return cleaned
 
+    @staticmethod
+    def _sanitize_descendant_block(block: dict[str, Any]) -> dict[str, Any]:
+        # descendant 接口连同单元格一起创建表格，行数需与单元格一致，不能沿用逐层创建时的行数上限
+        cleaned = DocxService._sanitize_block(block)
+        if cleaned.get("block_type") == BLOCK_TYPE_TABLE:
+            source_prop = (block.get("table") or {}).get("property")
+            table = cleaned.get("table")
+            if isinstance(source_prop, dict) and isinstance(table, dict):
+                prop = table.get("property")
+                if isinstance(prop, dict) and "row_size" in source_prop:
+                    prop["row_size"] = source_prop["row_size"]
+        return cleaned
+
     @staticmethod
     def _find_root_block(items: Iterable[dict[str, Any]]) -> dict[str, Any] | None:
         for item in items:
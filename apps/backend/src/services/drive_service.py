@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 from pydantic import BaseModel, ConfigDict, Field
 
 from src.services.feishu_client import FeishuClient
@@ -159,6 +161,48 @@ class DriveService:
                 f"删除文件失败: {payload.get('msg')} token={file_token} type={file_type or '-'}"
             )
 
+    async def move_file(
+        self,
+        file_token: str,
+        file_type: str,
+        folder_token: str,
+    ) -> str | None:
+        """把文件或文件夹移动到目标文件夹；移动文件夹时返回异步任务 ID。"""
+        url = f"{self._base_url}/open-apis/drive/v1/files/{file_token}/move"
+        body = {"type": file_type, "folder_token": folder_token}
+        response = await self._client.request("POST", url, json=body)
+        payload = response.json()
+        if payload.get("code") != 0:
+            raise RuntimeError(
+                f"移动文件失败: {payload.get('msg')} token={file_token} type={file_type}"
+            )
+        data = payload.get("data") or {}
+        task_id = data.get("task_id")
+        return str(task_id) if task_id else None
+
+    async def wait_task(
+        self,
+        task_id: str,
+        *,
+        attempts: int = 30,
+        interval: float = 1.0,
+    ) -> None:
+        """轮询文件夹移动/删除等异步任务，直到成功；失败或超时抛出异常。"""
+        url = f"{self._base_url}/open-apis/drive/v1/files/task_check"
+        for attempt in range(max(1, attempts)):
+            response = await self._client.request("GET", url, params={"task_id": task_id})
+            payload = response.json()
+            if payload.get("code") != 0:
+                raise RuntimeError(f"查询异步任务失败: {payload.get('msg')} task_id={task_id}")
+            status = str((payload.get("data") or {}).get("status") or "")
+            if status == "success":
+                return
+            if status == "fail":
+                raise RuntimeError(f"云端异步任务失败: task_id={task_id}")
+            if attempt + 1 < attempts:
+                await asyncio.sleep(interval)
+        raise RuntimeError(f"云端异步任务超时: task_id={task_id}")
+
     async def scan_root(
         self, root_folder_type: str = "explorer", name: str | None = None
     ) -> DriveNode:
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class LoopLagSnapshot:
+    samples: int
+    last_ms: float
+    avg_ms: float
+    p95_ms: float
+    max_ms: float
+    slow_count: int
+
+
+class EventLoopLagMonitor:
+    """周期性 sleep 并测量实际唤醒延迟，用于观察事件循环是否被阻塞调用卡住。"""
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.5,
+        history: int = 240,
+        warn_threshold: float = 1.0,
+    ) -> None:
+        self._interval = interval
+        self._warn_threshold = warn_threshold
+        self._samples: deque[float] = deque(maxlen=max(1, history))
+        self._slow_count = 0
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self._samples.append(lag)
+        if lag >= self._warn_threshold:
+            self._slow_count += 1
+            logger.warning("事件循环阻塞: lag={:.0f} ms", lag * 1000)
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._slow_count = 0
+
+    def snapshot(self) -> LoopLagSnapshot:
+        samples = sorted(self._samples)
+        if not samples:
+            return LoopLagSnapshot(0, 0.0, 0.0, 0.0, 0.0, self._slow_count)
+        p95_index = min(len(samples) - 1, int(len(samples) * 0.95))
+        return LoopLagSnapshot(
+            samples=len(samples),
+            last_ms=self._samples[-1] * 1000,
+            avg_ms=sum(samples) / len(samples) * 1000,
+            p95_ms=samples[p95_index] * 1000,
+            max_ms=samples[-1] * 1000,
+            slow_count=self._slow_count,
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+            self.record(loop.time() - expected)
+
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+
+__all__ = ["EventLoopLagMonitor", "LoopLagSnapshot", "loop_lag_monitor"]
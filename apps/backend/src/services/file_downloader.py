@@ -53,7 +53,11 @@ class FileDownloader:
 
         safe_name = sanitize_filename(file_name)
         target_path = target_dir / safe_name
-        self._writer.write_bytes(target_path, response.content, mtime)
+        write_async = getattr(self._writer, "write_bytes_async", None)
+        if callable(write_async):
+            await write_async(target_path, response.content, mtime)
+        else:
+            self._writer.write_bytes(target_path, response.content, mtime)
         return target_path
 
     async def close(self) -> None:
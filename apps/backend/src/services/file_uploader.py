@@ -9,8 +9,8 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
 from src.db.models import SyncMapping
 from src.db.session import get_session_maker
+from src.services.async_fs import AsyncFileSystem, get_async_fs
 from src.services.feishu_client import FeishuClient
-from src.services.file_hash import calculate_file_hash
 
 
 class FileUploadError(RuntimeError):
@@ -30,8 +30,10 @@ class FileUploader:
         base_url: str = "https://open.feishu.cn",
         simple_upload_limit: int = 20 * 1024 * 1024,
         session_maker: async_sessionmaker[AsyncSession] | None = None,
+        async_fs: AsyncFileSystem | None = None,
     ) -> None:
         self._client = client or FeishuClient()
+        self._fs = async_fs or get_async_fs()
         self._base_url = base_url.rstrip("/")
         self._simple_upload_limit = simple_upload_limit
         self._session_maker = session_maker
@@ -55,13 +57,13 @@ class FileUploader:
         else:
             file_token = await self._upload_multipart(path, parent_node, parent_type)
 
-        file_hash = calculate_file_hash(path)
+        file_hash = await self._fs.hash_file(path)
         if record_db:
             await self._record_mapping(
                 file_hash=file_hash,
                 file_token=file_token,
                 local_path=str(path),
-                mtime=path.stat().st_mtime,
+                mtime=(await self._fs.stat(path)).st_mtime,
             )
 
         return UploadResult(file_token=file_token, file_hash=file_hash)
@@ -69,7 +71,7 @@ class FileUploader:
     async def _upload_all(
         self, path: Path, parent_node: str, parent_type: str
     ) -> str:
-        file_bytes = path.read_bytes()
+        file_bytes = await self._fs.read_bytes(path)
         data = {
             "file_name": path.name,
             "parent_type": parent_type,
@@ -115,7 +117,7 @@ class FileUploader:
         with path.open("rb") as handle:
             seq = 0
             while True:
-                chunk = handle.read(int(block_size))
+                chunk = await self._fs.run(handle.read, int(block_size))
                 if not chunk:
                     break
                 data = {
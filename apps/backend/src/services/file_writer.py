@@ -1,15 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import errno
+import hashlib
 import os
 import time
-from collections.abc import Callable
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
 
+from src.services.async_fs import AsyncFileSystem, get_async_fs
+from src.services.file_hash import calculate_file_hash
+from src.services.markdown_blocks import MarkdownBlockSplitter, iter_resource_refs
+
 _LOCK_WINERRORS = {32, 33}
 _LOCK_RETRY_DELAYS = (0.2, 0.5, 1.0)
 
 
+@dataclass(frozen=True)
+class MarkdownStreamResult:
+    path: Path
+    content_hash: str
+    size: int
+    mtime: float
+    resource_refs: list[tuple[str, bool]]
+    blocks: list[str]
+    written: bool = True
+
+
 class FileWriter:
     @classmethod
     def write_markdown(cls, path: Path, content: str, mtime: float) -> None:
@@ -19,16 +38,90 @@ class FileWriter:
             mtime,
         )
 
+    @classmethod
+    def open_markdown_stream(
+        cls,
+        path: Path,
+        mtime: float,
+        *,
+        baseline: tuple[str, int, float] | None = None,
+    ) -> "MarkdownStreamWriter":
+        return MarkdownStreamWriter(path, mtime, baseline=baseline)
+
     @classmethod
     def write_bytes(cls, path: Path, payload: bytes, mtime: float) -> None:
         cls._write(path, lambda: path.write_bytes(payload), mtime)
 
+    @classmethod
+    async def write_markdown_async(
+        cls,
+        path: Path,
+        content: str,
+        mtime: float,
+        *,
+        fs: AsyncFileSystem | None = None,
+    ) -> None:
+        await cls._write_async(
+            path,
+            lambda: path.write_text(content, encoding="utf-8"),
+            mtime,
+            fs=fs,
+        )
+
+    @classmethod
+    async def write_bytes_async(
+        cls,
+        path: Path,
+        payload: bytes,
+        mtime: float,
+        *,
+        fs: AsyncFileSystem | None = None,
+    ) -> None:
+        await cls._write_async(path, lambda: path.write_bytes(payload), mtime, fs=fs)
+
     @classmethod
     def _write(cls, path: Path, writer: Callable[[], object], mtime: float) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
         cls._run_with_retry(path, writer)
         cls._run_with_retry(path, lambda: os.utime(path, (mtime, mtime)))
 
+    @classmethod
+    async def _write_async(
+        cls,
+        path: Path,
+        writer: Callable[[], object],
+        mtime: float,
+        *,
+        fs: AsyncFileSystem | None = None,
+    ) -> None:
+        fs = fs or get_async_fs()
+        await fs.mkdir(path.parent)
+        await cls._run_with_retry_async(fs, path, writer)
+        await cls._run_with_retry_async(fs, path, lambda: os.utime(path, (mtime, mtime)))
+
+    @classmethod
+    async def _run_with_retry_async(
+        cls,
+        fs: AsyncFileSystem,
+        path: Path,
+        action: Callable[[], object],
+    ) -> None:
+        # 每次尝试在线程池执行，重试等待用 asyncio.sleep，文件被占用时不阻塞事件循环
+        last_error: PermissionError | None = None
+        for delay in (0.0, *_LOCK_RETRY_DELAYS):
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await fs.run(action)
+                return
+            except PermissionError as exc:
+                if not cls._is_file_locked_error(exc):
+                    raise cls._wrap_permission_error(exc, path) from exc
+                last_error = exc
+
+        if last_error is not None:
+            raise cls._wrap_permission_error(last_error, path) from last_error
+
     @classmethod
     def _run_with_retry(cls, path: Path, action: Callable[[], object]) -> None:
         last_error: PermissionError | None = None
@@ -67,3 +160,200 @@ class FileWriter:
             "没有权限写入目标文件，请检查目录权限或文件占用情况",
             str(path),
         )
+
+
+class MarkdownStreamWriter:
+    """逐行写入 Markdown 到同目录临时文件，提交时原子替换目标文件。
+
+    写入结果与 write_markdown("\\n".join(lines).strip()) 完全一致；写入过程中同步计算
+    文件哈希（与 calculate_file_hash 相同）、资源引用与块切分，调用方无需再读回文件或扫描全文。
+    若新内容与磁盘上的文件逐字节相同，提交时直接丢弃临时文件，不改动目标文件与 mtime。
+    baseline 为同步记录中的 (哈希, 大小, mtime)，与磁盘一致时可免去重新计算旧文件哈希。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mtime: float,
+        *,
+        baseline: tuple[str, int, float] | None = None,
+    ) -> None:
+        self._path = path
+        self._mtime = mtime
+        self._baseline = baseline
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 临时文件以 .tmp 结尾，同步扫描与监听都会忽略；用普通 open 创建以沿用默认权限
+        self._temp_path = path.parent / f".{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+        self._handle = self._temp_path.open("xb")
+        self._hasher = hashlib.sha256()
+        self._size = 0
+        self._splitter = MarkdownBlockSplitter()
+        self._resource_refs: list[tuple[str, bool]] = []
+        self._last_line: str | None = None
+        self._blank_lines: list[str] = []
+        self._emitted = False
+        self._closed = False
+
+    def __enter__(self) -> "MarkdownStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._closed:
+            self.abort()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write_line(line)
+
+    async def write_lines_async(
+        self,
+        lines: Iterable[str],
+        *,
+        fs: AsyncFileSystem | None = None,
+    ) -> None:
+        """与 write_lines 相同，但写临时文件与计算哈希在文件线程池中进行。"""
+        fs = fs or get_async_fs()
+        await fs.run(self.write_lines, list(lines))
+
+    def write_line(self, line: str) -> None:
+        # 首尾空白按整篇 strip() 的语义处理：末尾非空行与其后的空白行先暂存
+        if not line.strip():
+            if self._last_line is not None:
+                self._blank_lines.append(line)
+            return
+        if self._last_line is None:
+            self._last_line = line.lstrip()
+            return
+        self._emit(self._last_line)
+        for blank in self._blank_lines:
+            self._emit(blank)
+        self._blank_lines = []
+        self._last_line = line
+
+    def commit(
+        self,
+        *,
+        before_replace: Callable[[Path], None] | None = None,
+    ) -> MarkdownStreamResult:
+        content_hash = self._finish()
+        existing_mtime = self._identical_file_mtime(content_hash)
+        if existing_mtime is not None:
+            return self._discard_identical(content_hash, existing_mtime)
+        if before_replace is not None:
+            before_replace(self._path)
+        try:
+            FileWriter._run_with_retry(
+                self._path, lambda: os.replace(self._temp_path, self._path)
+            )
+        except BaseException:
+            self._temp_path.unlink(missing_ok=True)
+            raise
+        FileWriter._run_with_retry(
+            self._path, lambda: os.utime(self._path, (self._mtime, self._mtime))
+        )
+        return self._written_result(content_hash, float(self._path.stat().st_mtime))
+
+    async def commit_async(
+        self,
+        *,
+        before_replace: Callable[[Path], None] | None = None,
+        fs: AsyncFileSystem | None = None,
+    ) -> MarkdownStreamResult:
+        """与 commit 相同，但比对哈希、替换与重试等待均不占用事件循环。"""
+        fs = fs or get_async_fs()
+        content_hash = await fs.run(self._finish)
+        existing_mtime = await fs.run(self._identical_file_mtime, content_hash)
+        if existing_mtime is not None:
+            return await fs.run(self._discard_identical, content_hash, existing_mtime)
+        if before_replace is not None:
+            before_replace(self._path)
+        try:
+            await FileWriter._run_with_retry_async(
+                fs, self._path, lambda: os.replace(self._temp_path, self._path)
+            )
+        except BaseException:
+            self._temp_path.unlink(missing_ok=True)
+            raise
+        await FileWriter._run_with_retry_async(
+            fs, self._path, lambda: os.utime(self._path, (self._mtime, self._mtime))
+        )
+        stat = await fs.stat(self._path)
+        return self._written_result(content_hash, float(stat.st_mtime))
+
+    def _finish(self) -> str:
+        if self._last_line is not None:
+            self._emit(self._last_line.rstrip())
+            self._last_line = None
+        self._blank_lines = []
+        self._handle.close()
+        self._closed = True
+        return self._hasher.hexdigest()
+
+    def _discard_identical(self, content_hash: str, mtime: float) -> MarkdownStreamResult:
+        self._temp_path.unlink(missing_ok=True)
+        return MarkdownStreamResult(
+            path=self._path,
+            content_hash=content_hash,
+            size=self._size,
+            mtime=mtime,
+            resource_refs=self._resource_refs,
+            blocks=self._splitter.finish(),
+            written=False,
+        )
+
+    def _written_result(self, content_hash: str, mtime: float) -> MarkdownStreamResult:
+        return MarkdownStreamResult(
+            path=self._path,
+            content_hash=content_hash,
+            size=self._size,
+            mtime=mtime,
+            resource_refs=self._resource_refs,
+            blocks=self._splitter.finish(),
+        )
+
+    def _identical_file_mtime(self, content_hash: str) -> float | None:
+        try:
+            stat = self._path.stat()
+        except OSError:
+            return None
+        if not self._path.is_file() or stat.st_size != self._size:
+            return None
+        baseline = self._baseline
+        if (
+            baseline is not None
+            and baseline[1] == stat.st_size
+            and abs(baseline[2] - stat.st_mtime) < 1e-3
+        ):
+            existing_hash = baseline[0]
+        else:
+            try:
+                existing_hash = calculate_file_hash(self._path)
+            except OSError:
+                return None
+        if existing_hash != content_hash:
+            return None
+        return float(stat.st_mtime)
+
+    def abort(self) -> None:
+        if not self._closed:
+            self._handle.close()
+            self._closed = True
+        self._temp_path.unlink(missing_ok=True)
+
+    def _emit(self, text: str) -> None:
+        if self._emitted:
+            self._write_text("\n")
+        self._emitted = True
+        self._write_text(text)
+        for line in text.replace("\r\n", "\n").split("\n"):
+            self._splitter.feed(line)
+        self._resource_refs.extend(iter_resource_refs(text))
+
+    def _write_text(self, text: str) -> None:
+        # 与 write_text 的文本模式一致，按平台换行符落盘
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        payload = text.encode("utf-8")
+        self._hasher.update(payload)
+        self._handle.write(payload)
+        self._size += len(payload)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.services.watcher import FileChangeEvent
+
+_DEFAULT_BURST_THRESHOLD = 200
+_DEFAULT_QUIET_SECONDS = 2.0
+_DEFAULT_MAX_DIRTY_DIRS = 512
+
+
+@dataclass(frozen=True)
+class DirtyBatch:
+    directories: list[Path]
+    event_count: int
+    saw_deletes: bool
+
+
+class LocalEventCoalescer:
+    """位于 watcher 与 _handle_local_event 之间的合并层。
+
+    事件速率低于阈值时逐条转发；一秒内超过阈值（git checkout、批量解压等）即进入突发
+    模式，后续事件只记录所在目录为脏目录，不再逐条进入事件循环。突发结束并静默
+    quiet_seconds 后，由调用方取走脏目录做一次目录级重扫。脏目录数量有上限，超出时
+    退化为整个根目录，内存占用不随事件数量增长。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        forward: Callable[[FileChangeEvent], None],
+        on_burst: Callable[[], None],
+        burst_threshold: int = _DEFAULT_BURST_THRESHOLD,
+        quiet_seconds: float = _DEFAULT_QUIET_SECONDS,
+        max_dirty_dirs: int = _DEFAULT_MAX_DIRTY_DIRS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._root = root
+        self._forward = forward
+        self._on_burst = on_burst
+        self._threshold = max(0, int(burst_threshold))
+        self._quiet_seconds = quiet_seconds
+        self._max_dirty_dirs = max(1, max_dirty_dirs)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+        self._bursting = False
+        self._last_event_at = 0.0
+        self._dirty: set[str] = set()
+        self._whole_root = False
+        self._burst_events = 0
+        self._saw_deletes = False
+
+    @property
+    def in_burst(self) -> bool:
+        return self._bursting
+
+    def submit(self, event: FileChangeEvent) -> None:
+        start_burst = False
+        with self._lock:
+            now = self._clock()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if not self._bursting:
+                if not self._threshold or self._window_count <= self._threshold:
+                    forward = True
+                else:
+                    self._bursting = True
+                    start_burst = True
+                    forward = False
+            else:
+                forward = False
+            if not forward:
+                self._last_event_at = now
+                self._burst_events += 1
+                self._mark_dirty(event)
+        if forward:
+            self._forward(event)
+        elif start_burst:
+            self._on_burst()
+
+    def quiet_remaining(self) -> float:
+        with self._lock:
+            if not self._bursting:
+                return 0.0
+            return max(0.0, self._last_event_at + self._quiet_seconds - self._clock())
+
+    def take_dirty(self) -> DirtyBatch | None:
+        """突发已静默时取走脏目录并退出突发模式；仍在突发中返回 None。"""
+        with self._lock:
+            if not self._bursting:
+                return None
+            if self._clock() - self._last_event_at < self._quiet_seconds:
+                return None
+            if self._whole_root:
+                directories = [self._root]
+            else:
+                directories = [Path(item) for item in _prune_nested(self._dirty)]
+            batch = DirtyBatch(
+                directories=directories,
+                event_count=self._burst_events,
+                saw_deletes=self._saw_deletes,
+            )
+            self._bursting = False
+            self._dirty = set()
+            self._whole_root = False
+            self._burst_events = 0
+            self._saw_deletes = False
+            self._window_count = 0
+            return batch
+
+    def _mark_dirty(self, event: FileChangeEvent) -> None:
+        if event.event_type in {"deleted", "moved"}:
+            self._saw_deletes = True
+        if self._whole_root:
+            return
+        for raw in (event.src_path, event.dest_path):
+            if not raw:
+                continue
+            path = Path(raw)
+            directory = path if event.is_directory and event.event_type != "deleted" else path.parent
+            self._dirty.add(str(directory))
+        if len(self._dirty) > self._max_dirty_dirs:
+            self._whole_root = True
+            self._dirty = set()
+
+
+def _prune_nested(directories: set[str]) -> list[str]:
+    kept: list[str] = []
+    for item in sorted(directories, key=len):
+        if any(item == parent or item.startswith(parent.rstrip(os.sep) + os.sep) for parent in kept):
+            continue
+        kept.append(item)
+    return sorted(kept)
+
+
+def scan_files(
+    directories: list[Path],
+    predicate: Callable[[Path], bool] | None = None,
+) -> list[Path]:
+    """用 os.scandir 迭代遍历目录树（不递归调用），返回满足条件的文件。"""
+    files: list[Path] = []
+    stack = [str(directory) for directory in directories]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            path = Path(entry.path)
+                            if predicate is None or predicate(path):
+                                files.append(path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files
+
+
+__all__ = ["DirtyBatch", "LocalEventCoalescer", "scan_files"]
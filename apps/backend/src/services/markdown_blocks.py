@@ -2,118 +2,158 @@ from __future__ import annotations
 
 import hashlib
 import re
+from collections.abc import Iterator
 
 _TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?[-]{3,}:?\s*(\|\s*:?[-]{3,}:?\s*)*\|?\s*$")
 _LIST_RE = re.compile(r"^\s{0,3}([*+-]|\d+\.)\s+")
 _HEADING_RE = re.compile(r"^#{1,6}\s+")
 
 
+_MODE_TEXT = "text"
+_MODE_CODE = "code"
+_MODE_TABLE = "table"
+_MODE_LIST = "list"
+_MODE_QUOTE = "quote"
+
+MARKDOWN_IMAGE_REF_PATTERN = re.compile(r"!\[[^\]]*]\(([^)]+)\)")
+MARKDOWN_LINK_REF_PATTERN = re.compile(r"(?<!!)\[[^\]]*]\(([^)]+)\)")
+HTML_IMAGE_REF_PATTERN = re.compile(
+    r"""<img\b[^>]*\bsrc\s*=\s*(?P<quote>["'])(?P<src>.*?)(?P=quote)[^>]*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
 def split_markdown_blocks(markdown: str) -> list[str]:
-    lines = markdown.replace("\r\n", "\n").split("\n")
-    blocks: list[str] = []
-    buffer: list[str] = []
-    in_code = False
-    fence = ""
-    i = 0
-
-    def flush_buffer() -> None:
-        nonlocal buffer
-        if buffer:
-            blocks.append("\n".join(buffer).strip("\n"))
-            buffer = []
-
-    while i < len(lines):
-        line = lines[i]
+    splitter = MarkdownBlockSplitter()
+    for line in markdown.replace("\r\n", "\n").split("\n"):
+        splitter.feed(line)
+    return splitter.finish()
+
+
+class MarkdownBlockSplitter:
+    """逐行切分 Markdown 块，结果与 split_markdown_blocks 一致。
+
+    只需向后看一行（表头后是否紧跟分隔行），因此可以在写文件的同时增量切分。
+    """
+
+    def __init__(self) -> None:
+        self._blocks: list[str] = []
+        self._buffer: list[str] = []
+        self._group: list[str] = []
+        self._mode = _MODE_TEXT
+        self._pending_header: str | None = None
+
+    def feed(self, line: str) -> None:
+        if self._pending_header is not None:
+            header = self._pending_header
+            self._pending_header = None
+            if _is_table_separator(line):
+                self._flush_buffer()
+                self._group = [header, line]
+                self._mode = _MODE_TABLE
+                return
+            self._handle_line(header, allow_table=False)
+        self._dispatch(line)
+
+    def finish(self) -> list[str]:
+        if self._pending_header is not None:
+            header = self._pending_header
+            self._pending_header = None
+            self._handle_line(header, allow_table=False)
+        if self._mode in (_MODE_TABLE, _MODE_LIST, _MODE_QUOTE):
+            self._close_group()
+        self._flush_buffer()
+        self._mode = _MODE_TEXT
+        return self._blocks
+
+    def _dispatch(self, line: str) -> None:
+        mode = self._mode
+        if mode == _MODE_CODE:
+            self._buffer.append(line)
+            if line.strip().startswith("```"):
+                self._mode = _MODE_TEXT
+                self._flush_buffer()
+            return
+        if mode == _MODE_TABLE:
+            stripped = line.strip()
+            if (
+                stripped
+                and not stripped.startswith("```")
+                and not _is_table_separator(line)
+                and "|" in line
+            ):
+                self._group.append(line)
+                return
+            self._close_group()
+        elif mode == _MODE_LIST:
+            if not line.strip() or _is_list_line(line) or line.startswith((" ", "\t")):
+                self._group.append(line)
+                return
+            self._close_group()
+        elif mode == _MODE_QUOTE:
+            if line.lstrip().startswith(">"):
+                self._group.append(line)
+                return
+            self._close_group()
+        self._handle_line(line, allow_table=True)
+
+    def _handle_line(self, line: str, *, allow_table: bool) -> None:
         stripped = line.strip()
-
         if stripped.startswith("```"):
-            if not in_code:
-                flush_buffer()
-                in_code = True
-                fence = stripped[:3]
-                buffer.append(line)
-            else:
-                buffer.append(line)
-                in_code = False
-                fence = ""
-                flush_buffer()
-            i += 1
-            continue
-
-        if in_code:
-            buffer.append(line)
-            i += 1
-            continue
-
+            self._flush_buffer()
+            self._mode = _MODE_CODE
+            self._buffer.append(line)
+            return
         if stripped == "":
-            flush_buffer()
-            i += 1
-            continue
-
-        if _is_table_header(line) and i + 1 < len(lines) and _is_table_separator(lines[i + 1]):
-            flush_buffer()
-            table_lines = [line, lines[i + 1]]
-            i += 2
-            while i < len(lines):
-                row_line = lines[i]
-                row_strip = row_line.strip()
-                if row_strip == "":
-                    break
-                if row_strip.startswith("```"):
-                    break
-                if _is_table_separator(row_line):
-                    break
-                if "|" not in row_line:
-                    break
-                table_lines.append(row_line)
-                i += 1
-            blocks.append("\n".join(table_lines).strip("\n"))
-            continue
-
+            self._flush_buffer()
+            return
+        if allow_table and _is_table_header(line):
+            # 是否为表格取决于下一行，先暂存
+            self._pending_header = line
+            return
         if _is_list_line(line):
-            flush_buffer()
-            list_lines = [line]
-            i += 1
-            while i < len(lines):
-                next_line = lines[i]
-                next_strip = next_line.strip()
-                if next_strip == "":
-                    list_lines.append(next_line)
-                    i += 1
-                    continue
-                if _is_list_line(next_line):
-                    list_lines.append(next_line)
-                    i += 1
-                    continue
-                if next_line.startswith(" ") or next_line.startswith("\t"):
-                    list_lines.append(next_line)
-                    i += 1
-                    continue
-                break
-            blocks.append("\n".join(list_lines).strip("\n"))
-            continue
-
+            self._start_group(line, _MODE_LIST)
+            return
         if stripped.startswith(">"):
-            flush_buffer()
-            quote_lines = [line]
-            i += 1
-            while i < len(lines) and lines[i].lstrip().startswith(">"):
-                quote_lines.append(lines[i])
-                i += 1
-            blocks.append("\n".join(quote_lines).strip("\n"))
-            continue
-
+            self._start_group(line, _MODE_QUOTE)
+            return
         if _HEADING_RE.match(stripped):
-            flush_buffer()
-            blocks.append(line.strip("\n"))
-            i += 1
-            continue
+            self._flush_buffer()
+            self._blocks.append(line.strip("\n"))
+            return
+        self._buffer.append(line)
+
+    def _start_group(self, line: str, mode: str) -> None:
+        self._flush_buffer()
+        self._group = [line]
+        self._mode = mode
+
+    def _close_group(self) -> None:
+        self._blocks.append("\n".join(self._group).strip("\n"))
+        self._group = []
+        self._mode = _MODE_TEXT
+
+    def _flush_buffer(self) -> None:
+        if self._buffer:
+            self._blocks.append("\n".join(self._buffer).strip("\n"))
+            self._buffer = []
+
+
+def normalize_resource_ref(raw: str) -> str:
+    ref = raw.strip()
+    if ref.startswith("<") and ref.endswith(">"):
+        ref = ref[1:-1].strip()
+    return re.sub(r"""\s+(?:"[^"]*"|'[^']*'|\([^()]*\))\s*$""", "", ref)
 
-        buffer.append(line)
-        i += 1
 
-    flush_buffer()
-    return blocks
+def iter_resource_refs(markdown: str) -> Iterator[tuple[str, bool]]:
+    """依次产出 Markdown 图片、HTML 图片与普通链接引用，二元组第二项表示是否为图片。"""
+    for match in MARKDOWN_IMAGE_REF_PATTERN.finditer(markdown):
+        yield normalize_resource_ref(match.group(1)), True
+    for match in HTML_IMAGE_REF_PATTERN.finditer(markdown):
+        yield (match.group("src") or "").strip(), True
+    for match in MARKDOWN_LINK_REF_PATTERN.finditer(markdown):
+        yield normalize_resource_ref(match.group(1)), False
 
 
 def normalize_block(block: str) -> str:
@@ -140,4 +180,14 @@ def _is_list_line(line: str) -> bool:
     return bool(_LIST_RE.match(line))
 
 
-__all__ = ["split_markdown_blocks", "normalize_block", "hash_block"]
+__all__ = [
+    "HTML_IMAGE_REF_PATTERN",
+    "MARKDOWN_IMAGE_REF_PATTERN",
+    "MARKDOWN_LINK_REF_PATTERN",
+    "MarkdownBlockSplitter",
+    "hash_block",
+    "iter_resource_refs",
+    "normalize_block",
+    "normalize_resource_ref",
+    "split_markdown_blocks",
+]
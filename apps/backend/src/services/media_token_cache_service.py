@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db.models import MediaTokenCache
+from src.db.session import get_session_maker
+from src.services.async_fs import AsyncFileSystem, get_async_fs
+
+# 超过该时长未被成功复用的素材 token 视为失效，下次直接重新上传
+_TOKEN_MAX_AGE_SECONDS = 30 * 24 * 3600
+_HASH_MEMO_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class MediaContentKey:
+    content_hash: str
+    size: int
+
+
+class MediaTokenCacheService:
+    """按内容哈希缓存文档内已上传的图片/附件素材 token，避免同一资源在文档内重复上传。
+
+    token 只在同一文档、同一 parent_type 下复用；复用失败由调用方调用 invalidate 剔除。
+    文件哈希按 (路径, 大小, mtime) 在进程内记忆，未变化的文件不会被重复读取计算；
+    stat 与哈希在文件线程池中执行，记忆表只在事件循环线程读写。
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+        *,
+        max_age_seconds: float = _TOKEN_MAX_AGE_SECONDS,
+        async_fs: AsyncFileSystem | None = None,
+    ) -> None:
+        self._session_maker = session_maker
+        self._max_age_seconds = max_age_seconds
+        self._fs = async_fs or get_async_fs()
+        self._hash_memo: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+
+    async def content_key(self, path: Path) -> MediaContentKey:
+        memo_key = await self._fs.run(_memo_key, path)
+        size = memo_key[1]
+        content_hash = self._hash_memo.get(memo_key)
+        if content_hash is None:
+            content_hash = await self._fs.hash_file(path)
+            self._hash_memo[memo_key] = content_hash
+            if len(self._hash_memo) > _HASH_MEMO_SIZE:
+                self._hash_memo.popitem(last=False)
+        else:
+            self._hash_memo.move_to_end(memo_key)
+        return MediaContentKey(content_hash=content_hash, size=size)
+
+    async def get_token(
+        self,
+        key: MediaContentKey,
+        *,
+        document_id: str,
+        parent_type: str,
+    ) -> str | None:
+        session_maker = self._session_maker or get_session_maker()
+        cache_key = _build_cache_key(key, document_id=document_id, parent_type=parent_type)
+        try:
+            async with session_maker() as session:
+                record = await session.get(MediaTokenCache, cache_key)
+                if record is None:
+                    return None
+                if record.size != key.size or (
+                    time.time() - record.verified_at > self._max_age_seconds
+                ):
+                    await session.delete(record)
+                    await session.commit()
+                    return None
+                return record.file_token
+        except SQLAlchemyError:
+            logger.exception("素材 token 缓存查询失败，已忽略: {}", cache_key)
+            return None
+
+    async def remember(
+        self,
+        key: MediaContentKey,
+        *,
+        document_id: str,
+        parent_type: str,
+        file_token: str,
+    ) -> None:
+        """记录新上传的 token，或在复用成功后刷新其校验时间。"""
+        session_maker = self._session_maker or get_session_maker()
+        cache_key = _build_cache_key(key, document_id=document_id, parent_type=parent_type)
+        now = time.time()
+        try:
+            async with session_maker() as session:
+                record = await session.get(MediaTokenCache, cache_key)
+                if record is not None and record.file_token == file_token:
+                    record.verified_at = now
+                    record.use_count += 1
+                elif record is not None:
+                    record.file_token = file_token
+                    record.size = key.size
+                    record.created_at = now
+                    record.verified_at = now
+                    record.use_count = 1
+                else:
+                    session.add(
+                        MediaTokenCache(
+                            cache_key=cache_key,
+                            content_hash=key.content_hash,
+                            document_id=document_id,
+                            parent_type=parent_type,
+                            file_token=file_token,
+                            size=key.size,
+                            created_at=now,
+                            verified_at=now,
+                            use_count=1,
+                        )
+                    )
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception("素材 token 缓存写入失败，已跳过: {}", cache_key)
+
+    async def invalidate(
+        self,
+        key: MediaContentKey,
+        *,
+        document_id: str,
+        parent_type: str,
+    ) -> bool:
+        session_maker = self._session_maker or get_session_maker()
+        cache_key = _build_cache_key(key, document_id=document_id, parent_type=parent_type)
+        try:
+            async with session_maker() as session:
+                record = await session.get(MediaTokenCache, cache_key)
+                if record is None:
+                    return False
+                await session.delete(record)
+                await session.commit()
+                return True
+        except SQLAlchemyError:
+            logger.exception("素材 token 缓存删除失败: {}", cache_key)
+            return False
+
+
+def _memo_key(path: Path) -> tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+def _build_cache_key(key: MediaContentKey, *, document_id: str, parent_type: str) -> str:
+    return f"{document_id}:{parent_type}:{key.content_hash}"
+
+
+__all__ = ["MediaContentKey", "MediaTokenCacheService"]
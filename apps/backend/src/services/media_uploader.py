@@ -7,6 +7,7 @@ from typing import Any
 
 from loguru import logger
 
+from src.services.async_fs import AsyncFileSystem, get_async_fs
 from src.services.feishu_client import FeishuClient
 
 
@@ -20,8 +21,10 @@ class MediaUploader:
         client: FeishuClient | None = None,
         base_url: str = "https://open.feishu.cn",
         default_parent_type: str = "docx_image",
+        async_fs: AsyncFileSystem | None = None,
     ) -> None:
         self._client = client or FeishuClient()
+        self._fs = async_fs or get_async_fs()
         self._base_url = base_url.rstrip("/")
         self._default_parent_type = default_parent_type
 
@@ -34,7 +37,7 @@ class MediaUploader:
         path = Path(file_path)
         if not path.exists():
             raise MediaUploadError(f"图片不存在: {path}")
-        file_bytes = path.read_bytes()
+        file_bytes = await self._fs.read_bytes(path)
         if not file_bytes:
             raise MediaUploadError("图片大小不能为空")
 
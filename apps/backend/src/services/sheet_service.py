@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any
 from urllib.parse import quote
@@ -25,6 +28,10 @@ class SheetService:
         self._base_url = base_url.rstrip("/")
 
     async def list_sheet_ids(self, spreadsheet_token: str) -> list[str]:
+        sheets = await self.list_sheets(spreadsheet_token)
+        return [sheet.sheet_id for sheet in sheets]
+
+    async def list_sheets(self, spreadsheet_token: str) -> list[SheetMeta]:
         if not spreadsheet_token:
             return []
         url = (
@@ -37,7 +44,7 @@ class SheetService:
             raise RuntimeError(f"获取电子表格失败: {payload.get('msg')}")
         data = payload.get("data") or {}
         sheets = data.get("sheets") or []
-        collected: list[tuple[int, str]] = []
+        collected: list[tuple[int, SheetMeta]] = []
         for sheet in sheets:
             if not isinstance(sheet, dict):
                 continue
@@ -49,9 +56,20 @@ class SheetService:
                 order = int(index)
             except (TypeError, ValueError):
                 order = 0
-            collected.append((order, str(sheet_id)))
+            grid = sheet.get("grid_properties") or {}
+            collected.append(
+                (
+                    order,
+                    SheetMeta(
+                        sheet_id=str(sheet_id),
+                        title=str(sheet.get("title") or sheet_id),
+                        row_count=_as_positive_int(grid.get("row_count"), default=1),
+                        column_count=_as_positive_int(grid.get("column_count"), default=1),
+                    ),
+                )
+            )
         collected.sort(key=lambda item: item[0])
-        return [sheet_id for _, sheet_id in collected]
+        return [sheet for _, sheet in collected]
 
     async def get_sheet_meta(
         self,
@@ -90,21 +108,29 @@ class SheetService:
         *,
         row_count: int,
         column_count: int,
+        start_row: int = 1,
+        value_render_option: str | None = None,
     ) -> list[list[object]]:
+        """读取从 start_row 开始的 row_count 行；value_render_option 透传给 values 接口。"""
         if not spreadsheet_token:
             raise RuntimeError("spreadsheet_token 不能为空")
         if not sheet_id:
             raise RuntimeError("sheet_id 不能为空")
         rows = _as_positive_int(row_count, default=1)
         cols = _as_positive_int(column_count, default=1)
+        first_row = _as_positive_int(start_row, default=1)
         end_col = _column_to_name(cols)
-        range_ref = f"{sheet_id}!A1:{end_col}{rows}"
+        range_ref = f"{sheet_id}!A{first_row}:{end_col}{first_row + rows - 1}"
         encoded_range = quote(range_ref, safe="")
         url = (
             f"{self._base_url}/open-apis/sheets/v2/spreadsheets/"
             f"{spreadsheet_token}/values/{encoded_range}"
         )
-        response = await self._client.request_with_retry("GET", url)
+        params: dict[str, str] = {}
+        if value_render_option:
+            params["valueRenderOption"] = value_render_option
+            params["dateTimeRenderOption"] = "FormattedString"
+        response = await self._client.request_with_retry("GET", url, params=params)
         payload = response.json()
         if payload.get("code") != 0:
             raise RuntimeError(f"获取子表单元格失败: {payload.get('msg')}")
@@ -123,6 +149,44 @@ class SheetService:
                 result.append([row])
         return result
 
+    async def iter_value_chunks(
+        self,
+        spreadsheet_token: str,
+        sheet_id: str,
+        *,
+        row_count: int,
+        column_count: int,
+        chunk_rows: int,
+        concurrency: int = 1,
+        value_render_option: str | None = None,
+    ) -> AsyncIterator[list[list[object]]]:
+        """按行区间分块读取单元格，最多 concurrency 个分块同时在途，按行序依次产出。"""
+        rows = _as_positive_int(row_count, default=1)
+        step = _as_positive_int(chunk_rows, default=rows)
+        window = _as_positive_int(concurrency, default=1)
+        pending: deque[asyncio.Task[list[list[object]]]] = deque()
+        try:
+            for start_row in range(1, rows + 1, step):
+                pending.append(
+                    asyncio.create_task(
+                        self.get_values(
+                            spreadsheet_token,
+                            sheet_id,
+                            row_count=min(step, rows - start_row + 1),
+                            column_count=column_count,
+                            start_row=start_row,
+                            value_render_option=value_render_option,
+                        )
+                    )
+                )
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def close(self) -> None:
         await self._client.close()
 
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import csv
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Literal
+
+from loguru import logger
+
+from src.services.async_fs import AsyncFileSystem, get_async_fs
+from src.services.sheet_service import SheetService
+from src.services.transcoder_sheet_helper import TranscoderSheetHelper
+
+SheetFileFormat = Literal["csv", "markdown"]
+
+# 单次 values 请求的单元格上限，按列数换算每块行数，避免单个响应过大
+_CHUNK_CELLS = 20000
+_MAX_CHUNK_ROWS = 5000
+_CHUNK_CONCURRENCY = 4
+
+
+@dataclass(frozen=True)
+class SheetValuesExportResult:
+    path: Path
+    row_count: int
+    column_count: int
+    chunk_count: int
+
+
+class SheetValuesExportService:
+    """直接读取电子表格单元格并流式写出 CSV/Markdown，跳过导出任务的创建与轮询。
+
+    仅处理单元格数不超过 max_cells 的子表；超出时返回 None，由调用方回退导出任务。
+    文件读写都在文件线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        sheet_service: SheetService,
+        *,
+        max_cells: int,
+        chunk_cells: int = _CHUNK_CELLS,
+        concurrency: int = _CHUNK_CONCURRENCY,
+        async_fs: AsyncFileSystem | None = None,
+    ) -> None:
+        self._sheet_service = sheet_service
+        self._max_cells = max_cells
+        self._chunk_cells = max(1, chunk_cells)
+        self._concurrency = max(1, concurrency)
+        self._fs = async_fs or get_async_fs()
+
+    async def export_sheet(
+        self,
+        spreadsheet_token: str,
+        sheet_id: str,
+        target_path: Path,
+        *,
+        mtime: float,
+        file_format: SheetFileFormat = "csv",
+    ) -> SheetValuesExportResult | None:
+        meta = await self._sheet_service.get_sheet_meta(spreadsheet_token, sheet_id)
+        cell_count = meta.row_count * meta.column_count
+        if self._max_cells <= 0 or cell_count > self._max_cells:
+            logger.info(
+                "子表超出直读上限，改用导出任务: token={} sheet_id={} cells={} limit={}",
+                spreadsheet_token,
+                sheet_id,
+                cell_count,
+                self._max_cells,
+            )
+            return None
+        chunk_rows = max(1, min(_MAX_CHUNK_ROWS, self._chunk_cells // meta.column_count))
+
+        csv_path = _temp_path_for(target_path, "csv")
+        markdown_path = _temp_path_for(target_path, "md")
+        chunk_count = 0
+        try:
+            handle = await self._fs.run(_open_for_write, csv_path, encoding="utf-8-sig")
+            try:
+                sink = _RowSink(handle)
+                async for chunk in self._sheet_service.iter_value_chunks(
+                    spreadsheet_token,
+                    sheet_id,
+                    row_count=meta.row_count,
+                    column_count=meta.column_count,
+                    chunk_rows=chunk_rows,
+                    concurrency=self._concurrency,
+                    value_render_option="ToString",
+                ):
+                    chunk_count += 1
+                    await self._fs.run(sink.write_chunk, chunk)
+            finally:
+                await self._fs.run(handle.close)
+            written_rows = sink.written_rows
+            width = sink.width
+            if file_format == "markdown":
+                await self._fs.run(_render_markdown, csv_path, markdown_path, width)
+                await self._fs.run(_commit, markdown_path, target_path, mtime)
+            else:
+                await self._fs.run(_commit, csv_path, target_path, mtime)
+        finally:
+            await self._fs.run(csv_path.unlink, missing_ok=True)
+            await self._fs.run(markdown_path.unlink, missing_ok=True)
+        logger.info(
+            "子表单元格直读完成: token={} sheet_id={} rows={} cols={} chunks={}",
+            spreadsheet_token,
+            sheet_id,
+            written_rows,
+            width,
+            chunk_count,
+        )
+        return SheetValuesExportResult(
+            path=target_path,
+            row_count=written_rows,
+            column_count=width,
+            chunk_count=chunk_count,
+        )
+
+
+class _RowSink:
+    def __init__(self, handle: IO[str]) -> None:
+        self._writer = csv.writer(handle)
+        self._blank_rows = 0
+        self.written_rows = 0
+        self.width = 0
+
+    def write_chunk(self, chunk: list[list[object]]) -> None:
+        for raw_row in chunk:
+            row = _trim_row([plain_cell_text(cell) for cell in raw_row])
+            if not row:
+                # 空行先计数，后面出现非空行时再补写，末尾的空行自然被丢弃
+                self._blank_rows += 1
+                continue
+            for _ in range(self._blank_rows):
+                self._writer.writerow([])
+            self.written_rows += self._blank_rows + 1
+            self._blank_rows = 0
+            self._writer.writerow(row)
+            self.width = max(self.width, len(row))
+
+
+def plain_cell_text(value: object, depth: int = 5) -> str:
+    """取单元格纯文本；富文本片段直接拼接，不附加 Markdown 样式。"""
+    if depth < 0 or value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return "".join(plain_cell_text(item, depth - 1) for item in value)
+    if isinstance(value, dict):
+        for key in ("text", "formattedValue", "value", "name", "link"):
+            if key in value:
+                text = plain_cell_text(value.get(key), depth - 1)
+                if text:
+                    return text
+        return ""
+    return str(value)
+
+
+def _trim_row(row: list[str]) -> list[str]:
+    end = len(row)
+    while end > 0 and not row[end - 1].strip():
+        end -= 1
+    return row[:end]
+
+
+def _render_markdown(csv_path: Path, markdown_path: Path, width: int) -> None:
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as source, _open_for_write(
+        markdown_path, encoding="utf-8"
+    ) as target:
+        for index, row in enumerate(csv.reader(source)):
+            cells = [TranscoderSheetHelper.escape_markdown_cell(cell) for cell in row]
+            cells.extend([""] * (width - len(cells)))
+            target.write("| " + " | ".join(cells) + " |\n")
+            if index == 0:
+                target.write("| " + " | ".join(["---"] * width) + " |\n")
+
+
+def _temp_path_for(target_path: Path, suffix: str) -> Path:
+    return target_path.with_name(f".{target_path.name}.{suffix}.partial")
+
+
+def _open_for_write(path: Path, *, encoding: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("w", encoding=encoding, newline="")
+
+
+def _commit(temp_path: Path, target_path: Path, mtime: float) -> None:
+    os.replace(temp_path, target_path)
+    os.utime(target_path, (mtime, mtime))
+
+
+__all__ = [
+    "SheetFileFormat",
+    "SheetValuesExportResult",
+    "SheetValuesExportService",
+    "plain_cell_text",
+]
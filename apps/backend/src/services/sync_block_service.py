@@ -5,10 +5,11 @@ import uuid
 from dataclasses import dataclass
 from typing import Iterable
 
-from sqlalchemy import delete, select
+from sqlalchemy import String, delete, func, literal, select, update
 
 from src.db.models import SyncBlockState
 from src.db.session import get_session_maker
+from src.services.sync_link_service import path_prefix_clause
 
 
 @dataclass
@@ -75,5 +76,19 @@ class SyncBlockService:
                 session.add(record)
             await session.commit()
 
+    async def move_local_paths(self, old_path: str, new_path: str) -> None:
+        """本地文件/目录移动后，块级状态随之改写路径，保留局部更新能力。"""
+        async with self._session_maker() as session:
+            await session.execute(
+                update(SyncBlockState)
+                .where(path_prefix_clause(SyncBlockState.local_path, old_path))
+                .values(
+                    local_path=literal(new_path, String)
+                    + func.substr(SyncBlockState.local_path, len(old_path) + 1, type_=String)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
 
 __all__ = ["BlockStateItem", "SyncBlockService"]
@@ -38,6 +38,21 @@ class SyncCloudFolderService:
     def replace_cache(self, cache: dict[tuple[str, str], str]) -> None:
         self._cache = dict(cache)
 
+    def move_cached_folders(self, task_id: str, old_relative: str, new_relative: str) -> None:
+        """本地目录移动后改写文件夹缓存键；目标键已存在时（改名新建的文件夹）保留现值。"""
+        prefix = f"{old_relative}/"
+        moved: dict[tuple[str, str], str] = {}
+        for key in list(self._cache):
+            cached_task, relative = key
+            if cached_task != task_id:
+                continue
+            if relative == old_relative:
+                moved.setdefault((task_id, new_relative), self._cache.pop(key))
+            elif relative.startswith(prefix):
+                moved[(task_id, f"{new_relative}/{relative[len(prefix):]}")] = self._cache.pop(key)
+        for key, token in moved.items():
+            self._cache.setdefault(key, token)
+
     async def cleanup_md_mirror_copy(
         self,
         *,
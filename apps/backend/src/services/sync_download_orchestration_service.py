@@ -12,8 +12,14 @@ from src.services.drive_service import DriveNode, DriveService
 from src.services.export_task_service import ExportTaskService
 from src.services.file_downloader import FileDownloader
 from src.services.file_uploader import FileUploader
+from src.services.file_writer import MarkdownStreamResult
 from src.services.sheet_service import SheetService
-from src.services.sync_download_support_service import DownloadCandidate
+from src.services.sync_download_support_service import (
+    DownloadCandidate,
+    ExportPart,
+    ExportPartsResult,
+)
+from src.services.sync_export_part_service import SyncExportPartItem, SyncExportPartService
 from src.services.sync_link_service import SyncLinkItem, SyncLinkService
 from src.services.sync_runner_state import SyncFileEvent, SyncTaskStatus
 from src.services.sync_task_service import SyncTaskItem
@@ -34,18 +40,26 @@ BuildCloudFolderPathsFn = Callable[[SyncTaskItem, list[Any]], set[str]]
 EnqueueCloudMissingDeletesFn = Callable[..., Awaitable[None]]
 RecordEventFn = Callable[[SyncTaskStatus, SyncFileEvent, SyncTaskItem | None], None]
 ShouldSkipDownloadForLocalNewerFn = Callable[..., bool]
-ShouldSkipDownloadForUnchangedFn = Callable[..., bool]
+ShouldSkipDownloadForUnchangedFn = Callable[..., Awaitable[bool]]
 DownloadDocxFn = Callable[..., Awaitable[str]]
-GetLocalSignatureFn = Callable[[Path], tuple[str, int, float] | None]
+DownloadDocxToFileFn = Callable[..., Awaitable[MarkdownStreamResult | None]]
+GetLocalSignatureFn = Callable[[Path], Awaitable[tuple[str, int, float] | None]]
 BuildCloudRevisionFn = Callable[[str, float, str | None], str]
 CalculateLocalResourceSignatureFn = Callable[[str, Path], str | None]
+ResourceSignatureFromRefsFn = Callable[[list[tuple[str, bool]], Path], str | None]
 RebuildBlockStateFn = Callable[..., Awaitable[None]]
 ShouldSyncMdCloudMirrorFn = Callable[[SyncTaskItem], bool]
 SyncMarkdownMirrorCopyFn = Callable[..., Awaitable[None]]
-SilencePathFn = Callable[[str, Path], None]
+SilencePathFn = Callable[..., None]
 ProcessPendingDeletesFn = Callable[..., Awaitable[None]]
 WriteMarkdownFn = Callable[[Path, str, float], None]
 DownloadExportedFileFn = Callable[..., Awaitable[None]]
+ShouldSplitExportPartsFn = Callable[[SyncTaskItem, DownloadCandidate], bool]
+ListExportPartsFn = Callable[..., Awaitable[list[ExportPart]]]
+DownloadExportedPartsFn = Callable[..., Awaitable[ExportPartsResult]]
+IsExportPartSetSyncedFn = Callable[[DownloadCandidate, list[SyncExportPartItem]], Awaitable[bool]]
+
+_BULK_DOWNLOAD_SILENCE_SECONDS = 30.0
 
 
 @dataclass
@@ -59,6 +73,7 @@ class DownloadRuntimeServices:
     export_task_service: ExportTaskService
     bitable_service: BitableService
     link_service: SyncLinkService
+    export_part_service: SyncExportPartService
     owned_services: list[Any]
 
 
@@ -94,6 +109,12 @@ class SyncDownloadOrchestrationService:
         silence_path: SilencePathFn,
         process_pending_deletes: ProcessPendingDeletesFn,
         write_markdown: WriteMarkdownFn,
+        should_split_export_parts: ShouldSplitExportPartsFn,
+        list_export_parts: ListExportPartsFn,
+        download_exported_parts: DownloadExportedPartsFn,
+        is_export_part_set_synced: IsExportPartSetSyncedFn,
+        download_docx_to_file: DownloadDocxToFileFn | None = None,
+        resource_signature_from_refs: ResourceSignatureFromRefsFn | None = None,
     ) -> None:
         self._export_extension_map = export_extension_map
         self._flatten_folders = flatten_folders
@@ -113,6 +134,8 @@ class SyncDownloadOrchestrationService:
         self._should_skip_download_for_local_newer = should_skip_download_for_local_newer
         self._should_skip_download_for_unchanged = should_skip_download_for_unchanged
         self._download_docx = download_docx
+        self._download_docx_to_file = download_docx_to_file
+        self._resource_signature_from_refs = resource_signature_from_refs
         self._download_exported_file = download_exported_file
         self._get_local_signature = get_local_signature
         self._build_cloud_revision = build_cloud_revision
@@ -123,6 +146,10 @@ class SyncDownloadOrchestrationService:
         self._silence_path = silence_path
         self._process_pending_deletes = process_pending_deletes
         self._write_markdown = write_markdown
+        self._should_split_export_parts = should_split_export_parts
+        self._list_export_parts = list_export_parts
+        self._download_exported_parts = download_exported_parts
+        self._is_export_part_set_synced = is_export_part_set_synced
 
     async def run_download(
         self,
@@ -140,6 +167,10 @@ class SyncDownloadOrchestrationService:
                 task.cloud_folder_token, name=task.name or "同步根目录"
             )
             folders = list(self._flatten_folders(tree))
+            # 本地尚不存在的目录整体来自本次下载，按目录前缀静默，下载过程中逐文件续期
+            new_roots = self._missing_local_roots(task, folders)
+            for directory in new_roots:
+                self._silence_bulk_root(task, directory)
             await self._sync_cloud_folder_links(task, folders)
             files = list(self._flatten_files(tree))
             logger.info(
@@ -156,12 +187,27 @@ class SyncDownloadOrchestrationService:
                 self._build_download_candidate(task, node, relative_dir)
                 for node, relative_dir in files
             ]
+            # 按子表拆分导出的表格会逐个列出子表，不需要再补齐单个导出 sub_id
+            split_candidates = [
+                item
+                for item in candidates
+                if item.effective_type in self._export_extension_map
+                and self._should_split_export_parts(task, item)
+            ]
+            candidates = [item for item in candidates if item not in split_candidates]
             candidates = await self._hydrate_export_sub_ids(
                 candidates,
                 runtime.drive_service,
                 sheet_service=runtime.sheet_service,
                 bitable_service=runtime.bitable_service,
+                persisted_by_path=persisted_by_path,
             )
+            await self._remember_export_sub_ids(
+                candidates,
+                persisted_by_path,
+                runtime.link_service,
+            )
+            candidates.extend(split_candidates)
             candidates = [
                 item for item in candidates if not self._should_ignore_path(task, item.target_path)
             ]
@@ -224,6 +270,9 @@ class SyncDownloadOrchestrationService:
                 )
 
             for candidate in selected_candidates:
+                bulk_root = _find_root(candidate.target_path, new_roots)
+                if bulk_root is not None:
+                    self._silence_bulk_root(task, bulk_root)
                 await self._download_candidate(
                     task=task,
                     status=status,
@@ -244,6 +293,38 @@ class SyncDownloadOrchestrationService:
         finally:
             await self._close_owned_services(runtime)
 
+    async def _remember_export_sub_ids(
+        self,
+        candidates: list[DownloadCandidate],
+        persisted_by_path: dict[str, SyncLinkItem],
+        link_service: SyncLinkService,
+    ) -> None:
+        """把新解析出的导出 sub_id 回写到已有映射，云端未变更前不再重复查询。"""
+        update_export_sub_id = getattr(link_service, "update_export_sub_id", None)
+        if not callable(update_export_sub_id):
+            return
+        for candidate in candidates:
+            if candidate.effective_type not in self._export_extension_map:
+                continue
+            if not candidate.export_sub_id:
+                continue
+            persisted = persisted_by_path.get(str(candidate.target_path))
+            if persisted is None or persisted.cloud_token != candidate.effective_token:
+                continue
+            revision = self._build_cloud_revision(candidate.effective_token, candidate.mtime)
+            if (
+                persisted.export_sub_id == candidate.export_sub_id
+                and persisted.export_sub_id_revision == revision
+            ):
+                continue
+            await update_export_sub_id(
+                persisted.local_path,
+                export_sub_id=candidate.export_sub_id,
+                export_sub_id_revision=revision,
+            )
+            persisted.export_sub_id = candidate.export_sub_id
+            persisted.export_sub_id_revision = revision
+
     async def _download_candidate(
         self,
         *,
@@ -285,7 +366,7 @@ class SyncDownloadOrchestrationService:
                 target_path.stat().st_mtime,
             )
             return
-        if (not forced) and self._should_skip_download_for_unchanged(
+        if (not forced) and await self._should_skip_download_for_unchanged(
             local_path=target_path,
             cloud_mtime=mtime,
             persisted=persisted,
@@ -320,6 +401,18 @@ class SyncDownloadOrchestrationService:
                     candidate=candidate,
                     runtime=runtime,
                     link_map=link_map,
+                    persisted=persisted,
+                )
+                return
+            if effective_type in self._export_extension_map and self._should_split_export_parts(
+                task, candidate
+            ):
+                await self._download_export_parts_candidate(
+                    task=task,
+                    status=status,
+                    candidate=candidate,
+                    runtime=runtime,
+                    forced=forced,
                 )
                 return
             if effective_type in self._export_extension_map:
@@ -377,24 +470,40 @@ class SyncDownloadOrchestrationService:
         candidate: DownloadCandidate,
         runtime: DownloadRuntimeServices,
         link_map: dict[str, Path],
+        persisted: SyncLinkItem | None = None,
     ) -> None:
         node = candidate.node
         effective_token = candidate.effective_token
         target_dir = candidate.target_dir
         target_path = candidate.target_path
         mtime = candidate.mtime
-        markdown = await self._download_docx(
-            effective_token,
-            docx_service=runtime.docx_service,
-            transcoder=runtime.transcoder,
-            base_dir=target_dir,
+        streamed = await self._stream_document_to_file(
+            task=task,
+            candidate=candidate,
+            runtime=runtime,
             link_map=link_map,
+            persisted=persisted,
         )
-        self._silence_path(task.id, target_path)
-        self._write_markdown(target_path, markdown, mtime)
-        signature = self._get_local_signature(target_path)
+        if streamed is not None:
+            # 流式写入时已同步得到哈希、资源引用与块切分，无需再读回文件或扫描全文
+            markdown = None
+            signature = (streamed.content_hash, streamed.size, streamed.mtime)
+            resource_signature = self._resource_signature_from_refs(
+                streamed.resource_refs, target_dir
+            )
+        else:
+            markdown = await self._download_docx(
+                effective_token,
+                docx_service=runtime.docx_service,
+                transcoder=runtime.transcoder,
+                base_dir=target_dir,
+                link_map=link_map,
+            )
+            self._silence_path(task.id, target_path)
+            self._write_markdown(target_path, markdown, mtime)
+            signature = await self._get_local_signature(target_path)
+            resource_signature = self._calculate_local_resource_signature(markdown, target_dir)
         cloud_revision = self._build_cloud_revision(effective_token, mtime)
-        resource_signature = self._calculate_local_resource_signature(markdown, target_dir)
         await runtime.link_service.upsert_link(
             local_path=str(target_path),
             cloud_token=effective_token,
@@ -410,6 +519,26 @@ class SyncDownloadOrchestrationService:
             local_resource_signature=resource_signature,
             resource_sync_revision=cloud_revision,
         )
+        if streamed is not None and not streamed.written:
+            # 内容与本地文件逐字节一致（通常只是云端元数据变化）：只刷新同步记录，
+            # 不写盘、不改 mtime，也就不会触发监听事件与后续上传检查
+            status.completed_files += 1
+            self._record_event(
+                status,
+                SyncFileEvent(
+                    path=str(target_path),
+                    status="downloaded",
+                    message="内容未变化，仅更新同步记录",
+                ),
+                None,
+            )
+            logger.info(
+                "云端文档内容未变化，跳过写入: task_id={} path={} token={}",
+                task.id,
+                target_path,
+                effective_token,
+            )
+            return
         if task.sync_mode in {"bidirectional", "upload_only"} and ((task.update_mode or "auto") != "full"):
             await self._rebuild_block_state(
                 task=task,
@@ -419,6 +548,8 @@ class SyncDownloadOrchestrationService:
                 base_path=target_dir.as_posix(),
                 file_path=target_path,
                 user_id_type="open_id",
+                blocks=streamed.blocks if streamed is not None else None,
+                file_hash=streamed.content_hash if streamed is not None else None,
             )
         if self._should_sync_md_cloud_mirror(task):
             await self._sync_markdown_mirror_copy(
@@ -436,6 +567,38 @@ class SyncDownloadOrchestrationService:
             None,
         )
 
+    async def _stream_document_to_file(
+        self,
+        *,
+        task: SyncTaskItem,
+        candidate: DownloadCandidate,
+        runtime: DownloadRuntimeServices,
+        link_map: dict[str, Path],
+        persisted: SyncLinkItem | None,
+    ) -> MarkdownStreamResult | None:
+        if self._download_docx_to_file is None or self._resource_signature_from_refs is None:
+            return None
+        baseline = None
+        if (
+            persisted is not None
+            and persisted.cloud_token == candidate.effective_token
+            and persisted.local_hash
+            and persisted.local_size is not None
+            and persisted.local_mtime is not None
+        ):
+            baseline = (persisted.local_hash, persisted.local_size, persisted.local_mtime)
+        return await self._download_docx_to_file(
+            candidate.effective_token,
+            docx_service=runtime.docx_service,
+            transcoder=runtime.transcoder,
+            target_path=candidate.target_path,
+            mtime=candidate.mtime,
+            base_dir=candidate.target_dir,
+            link_map=link_map,
+            baseline=baseline,
+            before_replace=lambda path: self._silence_path(task.id, path),
+        )
+
     async def _download_export_candidate(
         self,
         *,
@@ -460,7 +623,8 @@ class SyncDownloadOrchestrationService:
             export_extension=export_extension,
             export_sub_id=candidate.export_sub_id,
         )
-        signature = self._get_local_signature(target_path)
+        signature = await self._get_local_signature(target_path)
+        cloud_revision = self._build_cloud_revision(effective_token, mtime)
         await runtime.link_service.upsert_link(
             local_path=str(target_path),
             cloud_token=effective_token,
@@ -471,8 +635,10 @@ class SyncDownloadOrchestrationService:
             local_hash=signature[0] if signature else None,
             local_size=signature[1] if signature else None,
             local_mtime=signature[2] if signature else None,
-            cloud_revision=self._build_cloud_revision(effective_token, mtime),
+            cloud_revision=cloud_revision,
             cloud_mtime=mtime,
+            export_sub_id=candidate.export_sub_id,
+            export_sub_id_revision=cloud_revision if candidate.export_sub_id else None,
         )
         self._silence_path(task.id, target_path)
         status.completed_files += 1
@@ -482,6 +648,103 @@ class SyncDownloadOrchestrationService:
             None,
         )
 
+    async def _download_export_parts_candidate(
+        self,
+        *,
+        task: SyncTaskItem,
+        status: SyncTaskStatus,
+        candidate: DownloadCandidate,
+        runtime: DownloadRuntimeServices,
+        forced: bool,
+    ) -> None:
+        part_service = runtime.export_part_service
+        effective_token = candidate.effective_token
+        persisted_parts = await part_service.list_by_cloud_token(task.id, effective_token)
+        if not forced and await self._is_export_part_set_synced(candidate, persisted_parts):
+            status.skipped_files += 1
+            self._record_event(
+                status,
+                SyncFileEvent(
+                    path=str(candidate.target_path),
+                    status="skipped",
+                    message="云端未更新，跳过下载",
+                ),
+                None,
+            )
+            return
+
+        parts = await self._list_export_parts(
+            candidate,
+            sheet_service=runtime.sheet_service,
+            bitable_service=runtime.bitable_service,
+        )
+        if not parts:
+            raise RuntimeError("未获取到可导出的子表")
+        persisted_by_path = {item.local_path: item for item in persisted_parts}
+        result = await self._download_exported_parts(
+            export_task_service=runtime.export_task_service,
+            file_downloader=runtime.file_downloader,
+            bitable_service=runtime.bitable_service,
+            sheet_service=runtime.sheet_service,
+            candidate=candidate,
+            parts=parts,
+            persisted_by_path=persisted_by_path,
+            force=forced,
+            before_write=lambda path: self._silence_path(task.id, path),
+        )
+        cloud_revision = self._build_cloud_revision(effective_token, candidate.mtime)
+        for part in [*result.written, *result.skipped]:
+            signature = await self._get_local_signature(part.target_path)
+            await part_service.upsert_part(
+                local_path=str(part.target_path),
+                task_id=task.id,
+                cloud_token=effective_token,
+                cloud_type=candidate.effective_type,
+                sub_id=part.sub_id,
+                sub_revision=part.sub_revision,
+                cloud_revision=cloud_revision,
+                local_hash=signature[0] if signature else None,
+                records_synced_at=part.records_synced_at,
+                updated_at=candidate.mtime,
+            )
+            self._silence_path(task.id, part.target_path)
+        for part in result.written:
+            self._record_event(
+                status,
+                SyncFileEvent(
+                    path=str(part.target_path),
+                    status="downloaded",
+                    message=f"子表导出: {part.title}",
+                ),
+                None,
+            )
+        current_paths = {str(part.target_path) for part in parts}
+        for stale in persisted_parts:
+            if stale.local_path in current_paths:
+                continue
+            await part_service.delete_by_local_path(stale.local_path)
+            logger.info(
+                "云端子表已不存在，移除导出记录: task_id={} token={} sub_id={} path={}",
+                task.id,
+                effective_token,
+                stale.sub_id,
+                stale.local_path,
+            )
+        logger.info(
+            "子表拆分导出完成: task_id={} token={} written={} skipped={} failed={}",
+            task.id,
+            effective_token,
+            len(result.written),
+            len(result.skipped),
+            len(result.failed),
+        )
+        if result.failed:
+            part, error = result.failed[0]
+            raise RuntimeError(
+                f"{len(result.failed)}/{len(parts)} 个子表导出失败 sub_id={part.sub_id}: {error}"
+            )
+        status.completed_files += 1
+
     async def _download_file_candidate(
         self,
         *,
@@ -502,7 +765,7 @@ class SyncDownloadOrchestrationService:
             target_dir=target_dir,
             mtime=mtime,
         )
-        signature = self._get_local_signature(target_path)
+        signature = await self._get_local_signature(target_path)
         await runtime.link_service.upsert_link(
             local_path=str(target_path),
             cloud_token=effective_token,
@@ -524,6 +787,33 @@ class SyncDownloadOrchestrationService:
             None,
         )
 
+    def _silence_bulk_root(self, task: SyncTaskItem, directory: Path) -> None:
+        self._silence_path(
+            task.id,
+            directory,
+            ttl_seconds=_BULK_DOWNLOAD_SILENCE_SECONDS,
+            recursive=True,
+        )
+
+    def _missing_local_roots(
+        self,
+        task: SyncTaskItem,
+        folders: list[tuple[DriveNode, Path]],
+    ) -> set[Path]:
+        """返回本地尚不存在的最上层云端目录。"""
+        root = Path(task.local_path)
+        roots: set[Path] = set()
+        for _node, relative_dir in sorted(folders, key=lambda item: len(item[1].parts)):
+            if not relative_dir.parts:
+                continue
+            local_path = root / relative_dir
+            if _find_root(local_path, roots) is not None:
+                continue
+            if self._should_ignore_path(task, local_path) or local_path.exists():
+                continue
+            roots.add(local_path)
+        return roots
+
     @staticmethod
     async def _close_owned_services(runtime: DownloadRuntimeServices) -> None:
         for service in runtime.owned_services:
@@ -532,4 +822,13 @@ class SyncDownloadOrchestrationService:
                 await close()
 
 
+def _find_root(path: Path, roots: set[Path]) -> Path | None:
+    if not roots:
+        return None
+    for parent in (path, *path.parents):
+        if parent in roots:
+            return parent
+    return None
+
+
 __all__ = ["DownloadRuntimeServices", "SyncDownloadOrchestrationService"]
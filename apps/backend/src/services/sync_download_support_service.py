@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Awaitable, Callable
 
+import httpx
 from loguru import logger
 
+from src.services.bitable_record_export_service import BitableRecordExportService
 from src.services.bitable_service import BitableService
 from src.services.docx_service import DocxService
 from src.services.drive_service import DriveNode, DriveService
 from src.services.export_task_service import ExportTaskError, ExportTaskResult, ExportTaskService
 from src.services.file_downloader import FileDownloader
+from src.services.file_writer import MarkdownStreamResult, MarkdownStreamWriter
+from src.services.path_sanitizer import sanitize_filename, sanitize_path_segment
 from src.services.sheet_service import SheetService
+from src.services.sheet_values_export_service import SheetValuesExportService
+from src.services.sync_export_part_service import SyncExportPartItem
 from src.services.sync_link_service import SyncLinkItem
 from src.services.sync_task_service import SyncTaskItem
 from src.services.transcoder import DocxTranscoder
@@ -24,7 +30,12 @@ DocxFilename = Callable[[str], str]
 ExportFilename = Callable[[str, str], str]
 GenericFilename = Callable[[str], str]
 ExtractExportSubId = Callable[[str | None, str], str | None]
-GetLocalSignature = Callable[[Path], tuple[str, int, float] | None]
+GetLocalSignature = Callable[[Path], Awaitable[tuple[str, int, float] | None]]
+BuildCloudRevision = Callable[[str, float | None], str | None]
+
+_SUB_ID_LOOKUP_CONCURRENCY = 4
+_EXPORT_PART_CONCURRENCY = 3
+_EXPORT_PART_EXTENSION = "csv"
 
 
 @dataclass(frozen=True)
@@ -39,6 +50,22 @@ class DownloadCandidate:
     export_sub_id: str | None = None
 
 
+@dataclass(frozen=True)
+class ExportPart:
+    sub_id: str
+    title: str
+    sub_revision: str | None
+    target_path: Path
+    records_synced_at: float | None = None
+
+
+@dataclass
+class ExportPartsResult:
+    written: list[ExportPart] = field(default_factory=list)
+    skipped: list[ExportPart] = field(default_factory=list)
+    failed: list[tuple[ExportPart, Exception]] = field(default_factory=list)
+
+
 class SyncDownloadSupportService:
     def __init__(
         self,
@@ -52,6 +79,7 @@ class SyncDownloadSupportService:
         generic_filename: GenericFilename,
         extract_export_sub_id: ExtractExportSubId,
         get_local_signature: GetLocalSignature,
+        build_cloud_revision: BuildCloudRevision,
     ) -> None:
         self._export_extension_map = dict(export_extension_map)
         self._parse_mtime = parse_mtime
@@ -62,8 +90,9 @@ class SyncDownloadSupportService:
         self._generic_filename = generic_filename
         self._extract_export_sub_id = extract_export_sub_id
         self._get_local_signature = get_local_signature
+        self._build_cloud_revision = build_cloud_revision
 
-    def should_skip_download_for_unchanged(
+    async def should_skip_download_for_unchanged(
         self,
         *,
         local_path: Path,
@@ -84,14 +113,14 @@ class SyncDownloadSupportService:
             return False
         if persisted.cloud_mtime is not None and persisted.cloud_mtime >= (cloud_mtime - 1.0):
             if persisted.local_hash:
-                signature = self._get_local_signature(local_path)
+                signature = await self._get_local_signature(local_path)
                 if not signature:
                     return False
                 return signature[0] == persisted.local_hash
             return True
         if persisted.updated_at >= (cloud_mtime - 1.0):
             if persisted.local_hash:
-                signature = self._get_local_signature(local_path)
+                signature = await self._get_local_signature(local_path)
                 if not signature:
                     return False
                 return signature[0] == persisted.local_hash
@@ -135,16 +164,27 @@ class SyncDownloadSupportService:
         *,
         sheet_service: SheetService | None = None,
         bitable_service: BitableService | None = None,
+        persisted_by_path: dict[str, SyncLinkItem] | None = None,
     ) -> list[DownloadCandidate]:
+        enriched: list[DownloadCandidate] = []
         pending: list[tuple[str, str]] = []
+        cached = 0
         for candidate in candidates:
-            if (
-                candidate.effective_type in self._export_extension_map
-                and not candidate.export_sub_id
-            ):
-                pending.append((candidate.effective_token, candidate.effective_type))
+            if self._needs_export_sub_id(candidate):
+                sub_id = self.cached_export_sub_id(
+                    candidate,
+                    (persisted_by_path or {}).get(str(candidate.target_path)),
+                )
+                if sub_id:
+                    candidate = replace(candidate, export_sub_id=sub_id)
+                    cached += 1
+                else:
+                    pending.append((candidate.effective_token, candidate.effective_type))
+            enriched.append(candidate)
+        if cached:
+            logger.info("复用已缓存的表格导出 sub_id: count={}", cached)
         if not pending:
-            return candidates
+            return enriched
 
         meta_map = {}
         batch_query = getattr(drive_service, "batch_query_metas", None)
@@ -154,56 +194,346 @@ class SyncDownloadSupportService:
             except Exception as exc:
                 logger.warning("补齐表格导出 sub_id 失败: {}", exc)
 
-        enriched: list[DownloadCandidate] = []
         remaining: dict[tuple[str, str], list[int]] = {}
-        for idx, candidate in enumerate(candidates):
-            if (
-                candidate.effective_type in self._export_extension_map
-                and not candidate.export_sub_id
-            ):
-                meta = meta_map.get(candidate.effective_token)
-                url = getattr(meta, "url", None) if meta else None
-                sub_id = self._extract_export_sub_id(url, candidate.effective_type)
-                if sub_id:
-                    candidate = replace(candidate, export_sub_id=sub_id)
-                else:
-                    key = (candidate.effective_token, candidate.effective_type)
-                    remaining.setdefault(key, []).append(idx)
-            enriched.append(candidate)
+        for idx, candidate in enumerate(enriched):
+            if not self._needs_export_sub_id(candidate):
+                continue
+            meta = meta_map.get(candidate.effective_token)
+            url = getattr(meta, "url", None) if meta else None
+            sub_id = self._extract_export_sub_id(url, candidate.effective_type)
+            if sub_id:
+                enriched[idx] = replace(candidate, export_sub_id=sub_id)
+            else:
+                key = (candidate.effective_token, candidate.effective_type)
+                remaining.setdefault(key, []).append(idx)
 
         if not remaining:
             return enriched
 
-        for (token, file_type), indices in remaining.items():
-            if file_type == "sheet":
-                if not sheet_service:
-                    continue
-                try:
-                    sheet_ids = await sheet_service.list_sheet_ids(token)
-                except Exception as exc:
-                    logger.warning("获取 sheet 子表失败: token={} error={}", token, exc)
-                    continue
-                if not sheet_ids:
-                    continue
-                for idx in indices:
-                    enriched[idx] = replace(enriched[idx], export_sub_id=sheet_ids[0])
-                logger.info("补齐 sheet sub_id: token={} sheet_id={}", token, sheet_ids[0])
-            elif file_type == "bitable":
-                if not bitable_service:
-                    continue
-                try:
-                    table_ids = await bitable_service.list_table_ids(token)
-                except Exception as exc:
-                    logger.warning("获取 bitable 子表失败: token={} error={}", token, exc)
-                    continue
-                if not table_ids:
-                    continue
-                for idx in indices:
-                    enriched[idx] = replace(enriched[idx], export_sub_id=table_ids[0])
-                logger.info("补齐 bitable sub_id: token={} table_id={}", token, table_ids[0])
+        semaphore = asyncio.Semaphore(_SUB_ID_LOOKUP_CONCURRENCY)
+
+        async def _lookup(token: str, file_type: str) -> str | None:
+            async with semaphore:
+                return await self._lookup_first_sub_id(
+                    token,
+                    file_type,
+                    sheet_service=sheet_service,
+                    bitable_service=bitable_service,
+                )
+
+        keys = list(remaining.keys())
+        results = await asyncio.gather(*(_lookup(token, file_type) for token, file_type in keys))
+        for key, sub_id in zip(keys, results):
+            if not sub_id:
+                continue
+            for idx in remaining[key]:
+                enriched[idx] = replace(enriched[idx], export_sub_id=sub_id)
 
         return enriched
 
+    def cached_export_sub_id(
+        self,
+        candidate: DownloadCandidate,
+        persisted: SyncLinkItem | None,
+    ) -> str | None:
+        if persisted is None or not persisted.export_sub_id:
+            return None
+        if persisted.cloud_token != candidate.effective_token:
+            return None
+        if persisted.export_sub_id_revision != self.export_sub_id_revision(candidate):
+            return None
+        return persisted.export_sub_id
+
+    def export_sub_id_revision(self, candidate: DownloadCandidate) -> str | None:
+        return self._build_cloud_revision(candidate.effective_token, candidate.mtime)
+
+    def _needs_export_sub_id(self, candidate: DownloadCandidate) -> bool:
+        return (
+            candidate.effective_type in self._export_extension_map
+            and not candidate.export_sub_id
+        )
+
+    @staticmethod
+    async def _lookup_first_sub_id(
+        token: str,
+        file_type: str,
+        *,
+        sheet_service: SheetService | None,
+        bitable_service: BitableService | None,
+    ) -> str | None:
+        if file_type == "sheet":
+            if not sheet_service:
+                return None
+            try:
+                sheet_ids = await sheet_service.list_sheet_ids(token)
+            except Exception as exc:
+                logger.warning("获取 sheet 子表失败: token={} error={}", token, exc)
+                return None
+            if not sheet_ids:
+                return None
+            logger.info("补齐 sheet sub_id: token={} sheet_id={}", token, sheet_ids[0])
+            return sheet_ids[0]
+        if file_type == "bitable":
+            if not bitable_service:
+                return None
+            try:
+                table_ids = await bitable_service.list_table_ids(token)
+            except Exception as exc:
+                logger.warning("获取 bitable 子表失败: token={} error={}", token, exc)
+                return None
+            if not table_ids:
+                return None
+            logger.info("补齐 bitable sub_id: token={} table_id={}", token, table_ids[0])
+            return table_ids[0]
+        return None
+
+    async def list_export_parts(
+        self,
+        candidate: DownloadCandidate,
+        *,
+        sheet_service: SheetService | None = None,
+        bitable_service: BitableService | None = None,
+    ) -> list[ExportPart]:
+        """列出表格的全部子表，并为每个子表分配同目录下的独立导出文件。"""
+        token = candidate.effective_token
+        entries: list[tuple[str, str, str | None]] = []
+        if candidate.effective_type == "sheet" and sheet_service:
+            document_revision = self._build_cloud_revision(token, candidate.mtime)
+            for sheet in await sheet_service.list_sheets(token):
+                entries.append((sheet.sheet_id, sheet.title, document_revision))
+        elif candidate.effective_type == "bitable" and bitable_service:
+            document_revision = self._build_cloud_revision(token, candidate.mtime)
+            for table in await bitable_service.list_tables(token):
+                revision = (
+                    f"{table.table_id}@{table.revision}"
+                    if table.revision is not None
+                    else document_revision
+                )
+                entries.append((table.table_id, table.name, revision))
+        parts: list[ExportPart] = []
+        used_names: set[str] = set()
+        for sub_id, title, revision in entries:
+            target_path = self.build_export_part_path(
+                candidate.target_path,
+                title=title,
+                sub_id=sub_id,
+                used_names=used_names,
+            )
+            parts.append(
+                ExportPart(
+                    sub_id=sub_id,
+                    title=title,
+                    sub_revision=revision,
+                    target_path=target_path,
+                )
+            )
+        return parts
+
+    @staticmethod
+    def build_export_part_path(
+        target_path: Path,
+        *,
+        title: str,
+        sub_id: str,
+        used_names: set[str],
+        extension: str = _EXPORT_PART_EXTENSION,
+    ) -> Path:
+        base = target_path.stem
+        safe_title = sanitize_path_segment(title, check_reserved=False)
+        filename = sanitize_filename(f"{base} - {safe_title}.{extension}")
+        if filename.lower() in used_names:
+            filename = sanitize_filename(f"{base} - {safe_title} ({sub_id}).{extension}")
+        used_names.add(filename.lower())
+        return target_path.parent / filename
+
+    async def is_export_part_synced(
+        self,
+        part: ExportPart,
+        persisted: SyncExportPartItem | None,
+    ) -> bool:
+        if persisted is None or persisted.sub_id != part.sub_id:
+            return False
+        if persisted.sub_revision != part.sub_revision:
+            return False
+        return await self._is_local_hash_intact(part.target_path, persisted.local_hash)
+
+    async def is_export_part_set_synced(
+        self,
+        candidate: DownloadCandidate,
+        persisted_parts: list[SyncExportPartItem],
+    ) -> bool:
+        if not persisted_parts:
+            return False
+        document_revision = self._build_cloud_revision(
+            candidate.effective_token, candidate.mtime
+        )
+        for item in persisted_parts:
+            if item.cloud_revision != document_revision:
+                return False
+            if not await self._is_local_hash_intact(Path(item.local_path), item.local_hash):
+                return False
+        return True
+
+    async def _is_local_hash_intact(self, path: Path, local_hash: str | None) -> bool:
+        if not local_hash:
+            return False
+        signature = await self._get_local_signature(path)
+        return bool(signature and signature[0] == local_hash)
+
+    async def download_exported_parts(
+        self,
+        *,
+        export_task_service: ExportTaskService,
+        file_downloader: FileDownloader,
+        candidate: DownloadCandidate,
+        parts: list[ExportPart],
+        persisted_by_path: dict[str, SyncExportPartItem],
+        poll_attempts: int,
+        poll_interval: float,
+        force: bool = False,
+        before_write: Callable[[Path], None] | None = None,
+        bitable_exporter: BitableRecordExportService | None = None,
+        sheet_exporter: SheetValuesExportService | None = None,
+    ) -> ExportPartsResult:
+        """为每个子表并发创建导出任务，子表版本未变且本地文件完好时直接跳过。
+
+        提供 bitable_exporter / sheet_exporter 时，数据表和小型子表优先直接读取记录或单元格，
+        读取失败或子表超出直读上限再回退导出任务。
+        """
+        result = ExportPartsResult()
+        semaphore = asyncio.Semaphore(_EXPORT_PART_CONCURRENCY)
+
+        async def _export(part: ExportPart) -> None:
+            persisted = persisted_by_path.get(str(part.target_path))
+            if not force and await self.is_export_part_synced(part, persisted):
+                result.skipped.append(
+                    replace(part, records_synced_at=persisted.records_synced_at)
+                    if persisted
+                    else part
+                )
+                return
+            async with semaphore:
+                if bitable_exporter is not None and candidate.effective_type == "bitable":
+                    exported_part = await self._export_bitable_records(
+                        bitable_exporter,
+                        candidate=candidate,
+                        part=part,
+                        persisted=None if force else persisted,
+                        before_write=before_write,
+                    )
+                    if exported_part is not None:
+                        result.written.append(exported_part)
+                        return
+                if sheet_exporter is not None and candidate.effective_type == "sheet":
+                    if await self._export_sheet_values(
+                        sheet_exporter,
+                        candidate=candidate,
+                        part=part,
+                        before_write=before_write,
+                    ):
+                        result.written.append(part)
+                        return
+                try:
+                    task = await export_task_service.create_export_task(
+                        file_extension=_EXPORT_PART_EXTENSION,
+                        file_token=candidate.effective_token,
+                        file_type=candidate.effective_type,
+                        sub_id=part.sub_id,
+                    )
+                    exported = await self.wait_for_export_task(
+                        export_task_service,
+                        task.ticket,
+                        file_token=candidate.effective_token,
+                        poll_attempts=poll_attempts,
+                        poll_interval=poll_interval,
+                    )
+                    if not exported.file_token:
+                        raise RuntimeError("导出任务未返回文件 token")
+                    if before_write is not None:
+                        before_write(part.target_path)
+                    await file_downloader.download_exported_file(
+                        file_token=exported.file_token,
+                        file_name=part.target_path.name,
+                        target_dir=part.target_path.parent,
+                        mtime=candidate.mtime,
+                    )
+                except (ExportTaskError, RuntimeError) as exc:
+                    logger.warning(
+                        "子表导出失败: token={} sub_id={} error={}",
+                        candidate.effective_token,
+                        part.sub_id,
+                        exc,
+                    )
+                    result.failed.append((part, exc))
+                    return
+            result.written.append(part)
+
+        await asyncio.gather(*(_export(part) for part in parts))
+        return result
+
+    async def _export_bitable_records(
+        self,
+        bitable_exporter: BitableRecordExportService,
+        *,
+        candidate: DownloadCandidate,
+        part: ExportPart,
+        persisted: SyncExportPartItem | None,
+        before_write: Callable[[Path], None] | None,
+    ) -> ExportPart | None:
+        modified_after = None
+        if (
+            persisted is not None
+            and persisted.sub_id == part.sub_id
+            and await self._is_local_hash_intact(part.target_path, persisted.local_hash)
+        ):
+            modified_after = persisted.records_synced_at
+        if before_write is not None:
+            before_write(part.target_path)
+        try:
+            exported = await bitable_exporter.export_table(
+                candidate.effective_token,
+                part.sub_id,
+                part.target_path,
+                mtime=candidate.mtime,
+                modified_after=modified_after,
+            )
+        except (RuntimeError, httpx.HTTPError) as exc:
+            logger.warning(
+                "多维表格记录接口导出失败，回退导出任务: token={} table_id={} error={}",
+                candidate.effective_token,
+                part.sub_id,
+                exc,
+            )
+            return None
+        return replace(part, records_synced_at=exported.synced_at)
+
+    async def _export_sheet_values(
+        self,
+        sheet_exporter: SheetValuesExportService,
+        *,
+        candidate: DownloadCandidate,
+        part: ExportPart,
+        before_write: Callable[[Path], None] | None,
+    ) -> bool:
+        if before_write is not None:
+            before_write(part.target_path)
+        try:
+            exported = await sheet_exporter.export_sheet(
+                candidate.effective_token,
+                part.sub_id,
+                part.target_path,
+                mtime=candidate.mtime,
+            )
+        except (RuntimeError, httpx.HTTPError) as exc:
+            logger.warning(
+                "子表单元格直读失败，回退导出任务: token={} sheet_id={} error={}",
+                candidate.effective_token,
+                part.sub_id,
+                exc,
+            )
+            return False
+        return exported is not None
+
     def select_download_candidates(
         self,
         candidates: list[DownloadCandidate],
@@ -270,7 +600,7 @@ class SyncDownloadSupportService:
         base_dir: Path | None = None,
         link_map: dict[str, Path] | None = None,
     ) -> str:
-        blocks = await docx_service.list_blocks(document_id)
+        blocks = await docx_service.list_blocks(document_id, compact=True)
         return await transcoder.to_markdown(
             document_id,
             blocks,
@@ -278,6 +608,32 @@ class SyncDownloadSupportService:
             link_map=link_map,
         )
 
+    async def download_docx_to_file(
+        self,
+        document_id: str,
+        *,
+        docx_service: DocxService,
+        transcoder: DocxTranscoder,
+        writer: MarkdownStreamWriter,
+        base_dir: Path | None = None,
+        link_map: dict[str, Path] | None = None,
+        before_replace: Callable[[Path], None] | None = None,
+    ) -> MarkdownStreamResult:
+        """边转码边写入目标文件；失败时丢弃临时文件，原文件保持不变。"""
+        with writer:
+            blocks = await docx_service.list_blocks(document_id, compact=True)
+            await transcoder.stream_markdown(
+                document_id,
+                blocks,
+                writer,
+                base_dir=base_dir,
+                link_map=link_map,
+            )
+            commit_async = getattr(writer, "commit_async", None)
+            if callable(commit_async):
+                return await commit_async(before_replace=before_replace)
+            return writer.commit(before_replace=before_replace)
+
     async def download_exported_file(
         self,
         *,
@@ -382,4 +738,9 @@ class SyncDownloadSupportService:
         raise RuntimeError(f"导出任务超时{status_hint}")
 
 
-__all__ = ["DownloadCandidate", "SyncDownloadSupportService"]
+__all__ = [
+    "DownloadCandidate",
+    "ExportPart",
+    "ExportPartsResult",
+    "SyncDownloadSupportService",
+]
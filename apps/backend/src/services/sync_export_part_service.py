@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db.models import SyncExportPart
+from src.db.session import get_session_maker
+
+
+@dataclass
+class SyncExportPartItem:
+    local_path: str
+    task_id: str
+    cloud_token: str
+    cloud_type: str
+    sub_id: str
+    sub_revision: str | None = None
+    cloud_revision: str | None = None
+    local_hash: str | None = None
+    records_synced_at: float | None = None
+    updated_at: float = 0.0
+
+
+class SyncExportPartService:
+    """记录表格/多维表格按子表拆分导出后的本地文件及其子表版本。"""
+
+    def __init__(
+        self, session_maker: async_sessionmaker[AsyncSession] | None = None
+    ) -> None:
+        self._session_maker = session_maker
+
+    async def upsert_part(
+        self,
+        *,
+        local_path: str,
+        task_id: str,
+        cloud_token: str,
+        cloud_type: str,
+        sub_id: str,
+        sub_revision: str | None,
+        cloud_revision: str | None,
+        local_hash: str | None,
+        records_synced_at: float | None = None,
+        updated_at: float | None = None,
+    ) -> SyncExportPartItem:
+        session_maker = self._session_maker or get_session_maker()
+        updated_at = updated_at if updated_at is not None else time.time()
+        try:
+            async with session_maker() as session:
+                record = await session.get(SyncExportPart, local_path)
+                if record:
+                    record.task_id = task_id
+                    record.cloud_token = cloud_token
+                    record.cloud_type = cloud_type
+                    record.sub_id = sub_id
+                    record.sub_revision = sub_revision
+                    record.cloud_revision = cloud_revision
+                    record.local_hash = local_hash
+                    record.records_synced_at = records_synced_at
+                    record.updated_at = updated_at
+                else:
+                    session.add(
+                        SyncExportPart(
+                            local_path=local_path,
+                            task_id=task_id,
+                            cloud_token=cloud_token,
+                            cloud_type=cloud_type,
+                            sub_id=sub_id,
+                            sub_revision=sub_revision,
+                            cloud_revision=cloud_revision,
+                            local_hash=local_hash,
+                            records_synced_at=records_synced_at,
+                            updated_at=updated_at,
+                        )
+                    )
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception("子表导出记录写入失败，已跳过持久化: {}", local_path)
+        return SyncExportPartItem(
+            local_path=local_path,
+            task_id=task_id,
+            cloud_token=cloud_token,
+            cloud_type=cloud_type,
+            sub_id=sub_id,
+            sub_revision=sub_revision,
+            cloud_revision=cloud_revision,
+            local_hash=local_hash,
+            records_synced_at=records_synced_at,
+            updated_at=updated_at,
+        )
+
+    async def list_by_cloud_token(
+        self, task_id: str, cloud_token: str
+    ) -> list[SyncExportPartItem]:
+        session_maker = self._session_maker or get_session_maker()
+        try:
+            async with session_maker() as session:
+                stmt = select(SyncExportPart).where(
+                    SyncExportPart.task_id == task_id,
+                    SyncExportPart.cloud_token == cloud_token,
+                )
+                result = await session.execute(stmt)
+                return [self._to_item(row) for row in result.scalars().all()]
+        except SQLAlchemyError:
+            logger.exception(
+                "子表导出记录查询失败，已忽略: task_id={} token={}",
+                task_id,
+                cloud_token,
+            )
+            return []
+
+    async def delete_by_local_path(self, local_path: str) -> bool:
+        session_maker = self._session_maker or get_session_maker()
+        try:
+            async with session_maker() as session:
+                record = await session.get(SyncExportPart, local_path)
+                if not record:
+                    return False
+                await session.delete(record)
+                await session.commit()
+                return True
+        except SQLAlchemyError:
+            logger.exception("子表导出记录删除失败: {}", local_path)
+            return False
+
+    async def delete_by_task(self, task_id: str) -> int:
+        session_maker = self._session_maker or get_session_maker()
+        try:
+            async with session_maker() as session:
+                stmt = delete(SyncExportPart).where(SyncExportPart.task_id == task_id)
+                result = await session.execute(stmt)
+                await session.commit()
+                return result.rowcount or 0  # type: ignore[union-attr]
+        except SQLAlchemyError:
+            logger.exception("子表导出记录删除失败: task_id={}", task_id)
+            return 0
+
+    @staticmethod
+    def _to_item(record: SyncExportPart) -> SyncExportPartItem:
+        return SyncExportPartItem(
+            local_path=record.local_path,
+            task_id=record.task_id,
+            cloud_token=record.cloud_token,
+            cloud_type=record.cloud_type,
+            sub_id=record.sub_id,
+            sub_revision=record.sub_revision,
+            cloud_revision=record.cloud_revision,
+            local_hash=record.local_hash,
+            records_synced_at=record.records_synced_at,
+            updated_at=record.updated_at,
+        )
+
+
+__all__ = ["SyncExportPartItem", "SyncExportPartService"]
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from loguru import logger
+
+from src.core.config import ConfigManager
+
+# 单次运行的最小计费，避免大量空跑的任务虚拟时间几乎不前进
+_MIN_JOB_COST_SECONDS = 1.0
+_DEFAULT_MAX_IN_FLIGHT = 3
+_DEFAULT_WEIGHT = 1.0
+_MIN_WEIGHT = 0.01
+
+
+class JobPriority(IntEnum):
+    """数值越小越先调度：手动 > 冲突处理 > 上传 > 定时下载。"""
+
+    manual = 0
+    conflict = 1
+    upload = 2
+    download = 3
+
+
+@dataclass(frozen=True)
+class JobQueueStats:
+    task_id: str
+    queued: int
+    running: int
+    completed: int
+    oldest_wait_seconds: float
+    last_wait_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    tag: float
+    seq: int
+    task_id: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future[float] = field(compare=False)
+
+
+@dataclass
+class _TaskCounters:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    granted: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    wait_last: float = 0.0
+
+
+class SyncJobScheduler:
+    """所有任务共享的同步作业调度器。
+
+    全局同时运行的作业数不超过 max_in_flight；排队作业先按优先级，再按任务的
+    开始时间公平队列（SFQ）标签出队：每个任务的虚拟完成时间按实际运行时长 / 权重
+    累加，长时间占用配额的大任务自然排到其他任务之后，空闲任务回来时不会积攒额度。
+    权重默认为 1；未显式传入 weights 时读取配置 sync_task_weights（按任务 ID）。
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        *,
+        weights: Mapping[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_in_flight = max_in_flight
+        self._weights = weights
+        self._clock = clock
+        self._heap: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._finish_tags: dict[str, float] = {}
+        self._counters: dict[str, _TaskCounters] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self, task_id: str, priority: JobPriority) -> AsyncIterator[None]:
+        start_tag = await self._acquire(task_id, priority)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._release(task_id, start_tag, self._clock() - started)
+
+    def stats(self) -> dict[str, JobQueueStats]:
+        now = self._clock()
+        oldest: dict[str, float] = {}
+        for waiter in self._heap:
+            if waiter.future.done():
+                continue
+            waited = now - waiter.enqueued_at
+            oldest[waiter.task_id] = max(oldest.get(waiter.task_id, 0.0), waited)
+        return {
+            task_id: JobQueueStats(
+                task_id=task_id,
+                queued=counters.queued,
+                running=counters.running,
+                completed=counters.completed,
+                oldest_wait_seconds=round(oldest.get(task_id, 0.0), 3),
+                last_wait_seconds=round(counters.wait_last, 3),
+                avg_wait_seconds=round(
+                    counters.wait_total / counters.granted if counters.granted else 0.0, 3
+                ),
+                max_wait_seconds=round(counters.wait_max, 3),
+            )
+            for task_id, counters in self._counters.items()
+        }
+
+    async def _acquire(self, task_id: str, priority: JobPriority) -> float:
+        counters = self._counters.setdefault(task_id, _TaskCounters())
+        tag = max(self._virtual_time, self._finish_tags.get(task_id, 0.0))
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=int(priority),
+            tag=tag,
+            seq=next(self._seq),
+            task_id=task_id,
+            enqueued_at=self._clock(),
+            future=loop.create_future(),
+        )
+        heapq.heappush(self._heap, waiter)
+        counters.queued += 1
+        self._dispatch()
+        try:
+            waited = await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已分配到配额但调用方在恢复执行前被取消：归还配额
+                counters.running -= 1
+                self._in_flight -= 1
+                self._dispatch()
+            else:
+                waiter.future.cancel()
+                counters.queued -= 1
+            raise
+        counters.granted += 1
+        counters.wait_last = waited
+        counters.wait_max = max(counters.wait_max, waited)
+        counters.wait_total += waited
+        if waited >= 1.0:
+            logger.debug(
+                "同步作业排队: task_id={} priority={} wait={:.1f}s",
+                task_id,
+                priority.name,
+                waited,
+            )
+        return tag
+
+    def _release(self, task_id: str, start_tag: float, duration: float) -> None:
+        counters = self._counters.setdefault(task_id, _TaskCounters())
+        counters.running = max(0, counters.running - 1)
+        counters.completed += 1
+        cost = max(duration, _MIN_JOB_COST_SECONDS) / self._weight(task_id)
+        self._finish_tags[task_id] = max(self._finish_tags.get(task_id, 0.0), start_tag + cost)
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        limit = self._limit()
+        while self._heap and self._in_flight < limit:
+            waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            counters = self._counters.setdefault(waiter.task_id, _TaskCounters())
+            counters.queued -= 1
+            counters.running += 1
+            self._in_flight += 1
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            waiter.future.set_result(self._clock() - waiter.enqueued_at)
+
+    def _weight(self, task_id: str) -> float:
+        # 与并发上限相同，每次结算时读取配置，调整权重无需重启
+        weights = self._weights
+        if weights is None:
+            weights = getattr(ConfigManager.get().config, "sync_task_weights", None) or {}
+        try:
+            return max(_MIN_WEIGHT, float(weights.get(task_id, _DEFAULT_WEIGHT)))
+        except (TypeError, ValueError):
+            return _DEFAULT_WEIGHT
+
+    def _limit(self) -> int:
+        # 未显式指定时每次读取配置，修改并发上限无需重启
+        value = self._max_in_flight
+        if value is None:
+            value = getattr(
+                ConfigManager.get().config, "sync_max_concurrent_jobs", _DEFAULT_MAX_IN_FLIGHT
+            )
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            return _DEFAULT_MAX_IN_FLIGHT
+
+
+__all__ = ["JobPriority", "JobQueueStats", "SyncJobScheduler"]
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import os
 import time
 from dataclasses import dataclass
 
 from loguru import logger
-from sqlalchemy import delete, select
+from sqlalchemy import String, delete, func, literal, or_, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
@@ -27,6 +28,8 @@ class SyncLinkItem:
     cloud_mtime: float | None = None
     local_resource_signature: str | None = None
     resource_sync_revision: str | None = None
+    export_sub_id: str | None = None
+    export_sub_id_revision: str | None = None
 
 
 class SyncLinkService:
@@ -50,6 +53,8 @@ class SyncLinkService:
         cloud_mtime: float | None = None,
         local_resource_signature: str | None = None,
         resource_sync_revision: str | None = None,
+        export_sub_id: str | None = None,
+        export_sub_id_revision: str | None = None,
     ) -> SyncLinkItem:
         session_maker = self._session_maker or get_session_maker()
         updated_at = updated_at if updated_at is not None else time.time()
@@ -77,6 +82,10 @@ class SyncLinkService:
                         record.local_resource_signature = local_resource_signature
                     if resource_sync_revision is not None:
                         record.resource_sync_revision = resource_sync_revision
+                    if export_sub_id is not None:
+                        record.export_sub_id = export_sub_id
+                    if export_sub_id_revision is not None:
+                        record.export_sub_id_revision = export_sub_id_revision
                 else:
                     session.add(
                         SyncLink(
@@ -93,6 +102,8 @@ class SyncLinkService:
                             cloud_mtime=cloud_mtime,
                             local_resource_signature=local_resource_signature,
                             resource_sync_revision=resource_sync_revision,
+                            export_sub_id=export_sub_id,
+                            export_sub_id_revision=export_sub_id_revision,
                         )
                     )
                 await session.commit()
@@ -112,8 +123,32 @@ class SyncLinkService:
             cloud_mtime=cloud_mtime,
             local_resource_signature=local_resource_signature,
             resource_sync_revision=resource_sync_revision,
+            export_sub_id=export_sub_id,
+            export_sub_id_revision=export_sub_id_revision,
         )
 
+    async def update_export_sub_id(
+        self,
+        local_path: str,
+        *,
+        export_sub_id: str,
+        export_sub_id_revision: str | None,
+    ) -> bool:
+        """仅更新导出子表 sub_id 缓存，不改动其他同步基线字段。"""
+        session_maker = self._session_maker or get_session_maker()
+        try:
+            async with session_maker() as session:
+                record = await session.get(SyncLink, local_path)
+                if not record:
+                    return False
+                record.export_sub_id = export_sub_id
+                record.export_sub_id_revision = export_sub_id_revision
+                await session.commit()
+                return True
+        except SQLAlchemyError:
+            logger.exception("导出 sub_id 缓存写入失败: {}", local_path)
+            return False
+
     async def get_by_local_path(self, local_path: str) -> SyncLinkItem | None:
         session_maker = self._session_maker or get_session_maker()
         try:
@@ -177,6 +212,60 @@ class SyncLinkService:
             logger.exception("同步映射删除失败: {}", local_path)
             return False
 
+    async def move_links(
+        self,
+        task_id: str,
+        old_path: str,
+        new_path: str,
+        *,
+        include_self: bool = True,
+        reparent: tuple[str, str] | None = None,
+        self_parent_token: str | None = None,
+    ) -> int:
+        """把 old_path 及其子路径的映射批量改写到 new_path 下，返回改写数量。
+
+        reparent=(旧父 token, 新父 token) 用于目录改名后直接子项换到新云端文件夹；
+        self_parent_token 更新被移动条目自身的云端父文件夹。目标路径上残留的映射会先清除。
+        """
+        session_maker = self._session_maker or get_session_maker()
+        old_clause = path_prefix_clause(SyncLink.local_path, old_path, include_self=include_self)
+        new_clause = path_prefix_clause(SyncLink.local_path, new_path, include_self=include_self)
+        moved_path = literal(new_path, String) + func.substr(
+            SyncLink.local_path, len(old_path) + 1, type_=String
+        )
+        now = time.time()
+        try:
+            async with session_maker() as session:
+                await session.execute(
+                    delete(SyncLink).where(SyncLink.task_id == task_id).where(new_clause)
+                )
+                if reparent is not None:
+                    await session.execute(
+                        update(SyncLink)
+                        .where(SyncLink.task_id == task_id)
+                        .where(old_clause)
+                        .where(SyncLink.cloud_parent_token == reparent[0])
+                        .values(cloud_parent_token=reparent[1])
+                    )
+                if include_self and self_parent_token is not None:
+                    await session.execute(
+                        update(SyncLink)
+                        .where(SyncLink.local_path == old_path)
+                        .values(cloud_parent_token=self_parent_token)
+                    )
+                result = await session.execute(
+                    update(SyncLink)
+                    .where(SyncLink.task_id == task_id)
+                    .where(old_clause)
+                    .values(local_path=moved_path, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                return result.rowcount or 0  # type: ignore[union-attr]
+        except SQLAlchemyError:
+            logger.exception("同步映射批量改写失败: {} -> {}", old_path, new_path)
+            raise
+
     @staticmethod
     def _to_item(record: SyncLink) -> SyncLinkItem:
         return SyncLinkItem(
@@ -193,7 +282,19 @@ class SyncLinkService:
             cloud_mtime=record.cloud_mtime,
             local_resource_signature=record.local_resource_signature,
             resource_sync_revision=record.resource_sync_revision,
+            export_sub_id=record.export_sub_id,
+            export_sub_id_revision=record.export_sub_id_revision,
         )
 
 
-__all__ = ["SyncLinkItem", "SyncLinkService"]
+def path_prefix_clause(column, path: str, *, include_self: bool = True):
+    """匹配 path 自身（可选）及其所有子路径；LIKE 通配符需转义。"""
+    prefix = path.rstrip("\\/") + os.sep
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    descendants = column.like(f"{escaped}%", escape="\\")
+    if not include_self:
+        return descendants
+    return or_(column == path, descendants)
+
+
+__all__ = ["SyncLinkItem", "SyncLinkService", "path_prefix_clause"]
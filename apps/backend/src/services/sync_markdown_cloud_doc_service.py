@@ -19,7 +19,7 @@ FindExistingDocByName = Callable[..., Awaitable[str | None]]
 WaitForImportedDoc = Callable[..., Awaitable[DriveFile | None]]
 ListFolderTokens = Callable[[DriveService, str], Awaitable[set[str]]]
 ListFilesAll = Callable[[DriveService, str], Awaitable[list[DriveFile]]]
-GetLocalSignature = Callable[[Path], tuple[str, int, float] | None]
+GetLocalSignature = Callable[[Path], Awaitable[tuple[str, int, float] | None]]
 CalculateLocalResourceSignature = Callable[[str, Path], str | None]
 BuildCloudRevision = Callable[..., str | None]
 ParseMtime = Callable[[str | int | float | None], float]
@@ -125,7 +125,7 @@ class SyncMarkdownCloudDocService:
         if not created_doc:
             return None, False
 
-        local_signature = self._get_local_signature(path)
+        local_signature = await self._get_local_signature(path)
         cloud_mtime = self.resolve_created_doc_mtime(
             created_doc,
             local_signature[2] if local_signature else None,
@@ -201,7 +201,7 @@ class SyncMarkdownCloudDocService:
             keep_token=created_doc.token,
             path=path,
         )
-        local_signature = self._get_local_signature(path)
+        local_signature = await self._get_local_signature(path)
         cloud_mtime = self.resolve_created_doc_mtime(
             created_doc,
             local_signature[2] if local_signature else old_link.local_mtime,
@@ -7,12 +7,12 @@ from typing import Awaitable, Callable
 
 from loguru import logger
 
+from src.services.async_fs import AsyncFileSystem, get_async_fs
 from src.services.docx_service import (
     DocxService,
     has_markdown_table_exceeding_create_limit,
 )
 from src.services.drive_service import DriveService
-from src.services.file_hash import calculate_file_hash
 from src.services.file_uploader import FileUploader
 from src.services.import_task_service import ImportTaskService
 from src.services.sync_link_service import SyncLinkItem, SyncLinkService
@@ -69,9 +69,11 @@ class SyncMarkdownUploadService:
         has_local_image_revision: HasLocalImageRevisionFn,
         has_markdown_table_render_revision: HasMarkdownTableRenderRevisionFn,
         record_event: RecordEventFn,
+        async_fs: AsyncFileSystem | None = None,
     ) -> None:
         self._link_service = link_service
         self._doc_locks = doc_locks
+        self._fs = async_fs or get_async_fs()
         self._upload_file = upload_file
         self._create_cloud_doc_for_markdown = create_cloud_doc_for_markdown
         self._block_markdown_upload_when_cloud_changed = (
@@ -149,10 +151,10 @@ class SyncMarkdownUploadService:
                 )
                 return
 
-        markdown = path.read_text(encoding="utf-8")
+        markdown = await self._fs.read_text(path)
         base_path = path.parent.as_posix()
-        mtime = path.stat().st_mtime
-        file_hash = calculate_file_hash(path)
+        mtime = (await self._fs.stat(path)).st_mtime
+        file_hash = await self._fs.hash_file(path)
         has_uploadable_images = self._has_uploadable_markdown_images(markdown, base_path)
         resource_signature = self._calculate_local_resource_signature(
             markdown,
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from src.services.async_fs import AsyncFileSystem, get_async_fs
+from src.services.docx_service import DocxService
+from src.services.drive_service import DriveFile, DriveService
+from src.services.sync_block_service import SyncBlockService
+from src.services.sync_cloud_folder_service import SyncCloudFolderService
+from src.services.sync_link_service import SyncLinkItem, SyncLinkService
+from src.services.sync_runner_state import SyncFileEvent, SyncTaskStatus
+from src.services.sync_task_service import SyncTaskItem
+
+ShouldIgnorePath = Callable[[SyncTaskItem, Path], bool]
+ResolveCloudParentFn = Callable[[SyncTaskItem, Path, DriveService], Awaitable[str]]
+ListLocalFilesFn = Callable[[SyncTaskItem], Awaitable[list[Path]]]
+RecordEventFn = Callable[[SyncTaskStatus, SyncFileEvent, SyncTaskItem | None], None]
+
+# 文件夹改名时借用一个不存在的子路径，让 resolve_cloud_parent 返回目标文件夹本身
+_FOLDER_PROBE_NAME = ".larksync-move-probe"
+
+
+class SyncMoveService:
+    """把本地移动/改名同步为云端 move/改名，并批量改写 SyncLink 路径。
+
+    无法在云端等价表达的情况（如非文档文件改名、缺少映射）返回 False，
+    由调用方沿用“删除墓碑 + 重新上传”的原有流程。
+    """
+
+    def __init__(
+        self,
+        *,
+        link_service: SyncLinkService,
+        block_service: SyncBlockService,
+        cloud_folder_service: SyncCloudFolderService,
+        should_ignore_path: ShouldIgnorePath,
+        resolve_cloud_parent: ResolveCloudParentFn,
+        list_local_files: ListLocalFilesFn,
+        record_event: RecordEventFn,
+        async_fs: AsyncFileSystem | None = None,
+    ) -> None:
+        self._link_service = link_service
+        self._block_service = block_service
+        self._cloud_folder_service = cloud_folder_service
+        self._should_ignore_path = should_ignore_path
+        self._resolve_cloud_parent = resolve_cloud_parent
+        self._list_local_files = list_local_files
+        self._record_event = record_event
+        self._fs = async_fs or get_async_fs()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def lock_for(self, task_id: str) -> asyncio.Lock:
+        """同一任务的移动串行处理：目录移动先于其子项的移动事件完成。"""
+        lock = self._locks.get(task_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[task_id] = lock
+        return lock
+
+    async def apply_local_move(
+        self,
+        *,
+        task: SyncTaskItem,
+        status: SyncTaskStatus,
+        src: Path,
+        dest: Path,
+        drive_service: DriveService,
+        docx_service: DocxService | None,
+    ) -> bool:
+        """调用方需持有 lock_for(task.id)。"""
+        if not self._is_movable(task, src, dest, drive_service):
+            return False
+        link = await self._link_service.get_by_local_path(str(src))
+        if link is None or link.task_id != task.id:
+            return False
+        try:
+            if link.cloud_type == "folder":
+                moved = await self._move_folder(task, link, src, dest, drive_service)
+            else:
+                moved = await self._move_file(task, link, src, dest, drive_service, docx_service)
+        except Exception as exc:
+            logger.warning(
+                "本地移动同步到云端失败，回退为删除后重新上传: task_id={} {} -> {} error={}",
+                task.id,
+                src,
+                dest,
+                exc,
+            )
+            return False
+        if not moved:
+            return False
+        logger.info("本地移动已同步到云端: task_id={} {} -> {}", task.id, src, dest)
+        self._record_event(
+            status,
+            SyncFileEvent(
+                path=str(dest),
+                status="moved",
+                message=f"云端同步移动: {src.name} -> {self._relative(task, dest)}",
+            ),
+            task,
+        )
+        return True
+
+    async def reconcile_local_moves(
+        self,
+        *,
+        task: SyncTaskItem,
+        status: SyncTaskStatus,
+        drive_service: DriveService,
+        docx_service: DocxService | None,
+    ) -> int:
+        """扫描时识别改名：本地已消失的映射与新出现的无映射文件按大小+哈希唯一配对。"""
+        if getattr(drive_service, "move_file", None) is None:
+            return 0
+        links = await self._link_service.list_by_task(task.id)
+        missing = [
+            link
+            for link in links
+            if link.cloud_type != "folder"
+            and link.local_hash
+            and link.local_size is not None
+            and not await self._fs.exists(Path(link.local_path))
+        ]
+        if not missing:
+            return 0
+        linked = {_path_key(link.local_path) for link in links}
+        sizes = {int(link.local_size or 0) for link in missing}
+        files_by_hash: dict[str, list[Path]] = {}
+        for path in await self._list_local_files(task):
+            if _path_key(path) in linked:
+                continue
+            try:
+                stat = await self._fs.stat(path)
+                if stat.st_size not in sizes:
+                    continue
+                file_hash = await self._fs.hash_file(path)
+            except OSError:
+                continue
+            files_by_hash.setdefault(file_hash, []).append(path)
+        if not files_by_hash:
+            return 0
+        missing_by_hash: dict[str, list[SyncLinkItem]] = {}
+        for link in missing:
+            missing_by_hash.setdefault(str(link.local_hash), []).append(link)
+
+        moved = 0
+        async with self.lock_for(task.id):
+            for file_hash, candidates in files_by_hash.items():
+                sources = missing_by_hash.get(file_hash) or []
+                # 内容相同的文件有多个时无法确定对应关系，交给常规流程
+                if len(candidates) != 1 or len(sources) != 1:
+                    continue
+                if await self.apply_local_move(
+                    task=task,
+                    status=status,
+                    src=Path(sources[0].local_path),
+                    dest=candidates[0],
+                    drive_service=drive_service,
+                    docx_service=docx_service,
+                ):
+                    moved += 1
+        if moved:
+            logger.info("扫描识别本地改名: task_id={} moved={}", task.id, moved)
+        return moved
+
+    def _is_movable(
+        self,
+        task: SyncTaskItem,
+        src: Path,
+        dest: Path,
+        drive_service: DriveService,
+    ) -> bool:
+        if _path_key(src) == _path_key(dest):
+            return False
+        if getattr(drive_service, "move_file", None) is None:
+            return False
+        root = Path(task.local_path)
+        for path in (src, dest):
+            try:
+                path.relative_to(root)
+            except ValueError:
+                return False
+            # 编辑器“临时文件改名覆盖”一类的事件源路径通常被忽略，按普通修改处理
+            if self._should_ignore_path(task, path):
+                return False
+        return True
+
+    async def _move_file(
+        self,
+        task: SyncTaskItem,
+        link: SyncLinkItem,
+        src: Path,
+        dest: Path,
+        drive_service: DriveService,
+        docx_service: DocxService | None,
+    ) -> bool:
+        renamed = src.name != dest.name
+        if renamed and not self._can_rename(link, src, dest, docx_service):
+            return False
+        new_parent = await self._resolve_cloud_parent(task, dest, drive_service)
+        if new_parent != link.cloud_parent_token:
+            await drive_service.move_file(link.cloud_token, link.cloud_type, new_parent)
+        if renamed and docx_service is not None:
+            await docx_service.rename_document(link.cloud_token, dest.stem)
+        await self._link_service.move_links(
+            task.id, str(src), str(dest), self_parent_token=new_parent
+        )
+        await self._block_service.move_local_paths(str(src), str(dest))
+        return True
+
+    async def _move_folder(
+        self,
+        task: SyncTaskItem,
+        link: SyncLinkItem,
+        src: Path,
+        dest: Path,
+        drive_service: DriveService,
+    ) -> bool:
+        old_token = link.cloud_token
+        if src.name == dest.name:
+            new_parent = await self._resolve_cloud_parent(task, dest, drive_service)
+            if new_parent != link.cloud_parent_token:
+                await self._move_cloud_item(drive_service, old_token, "folder", new_parent)
+            await self._link_service.move_links(
+                task.id, str(src), str(dest), self_parent_token=new_parent
+            )
+        else:
+            # 云端文件夹没有改名接口：建立新文件夹并逐项移入，子项 token 保持不变
+            target = await self._resolve_cloud_parent(
+                task, dest / _FOLDER_PROBE_NAME, drive_service
+            )
+            moved_children: list[DriveFile] = []
+            try:
+                for child in await self._cloud_folder_service.list_files_all(
+                    drive_service, old_token
+                ):
+                    await self._move_cloud_item(drive_service, child.token, child.type, target)
+                    moved_children.append(child)
+            except Exception:
+                # 中途失败时映射仍指向原文件夹：把已移入的子项移回，保持云端与映射一致
+                await self._rollback_children(drive_service, moved_children, old_token)
+                raise
+            await self._link_service.move_links(
+                task.id,
+                str(src),
+                str(dest),
+                include_self=False,
+                reparent=(old_token, target),
+            )
+            await self._link_service.delete_by_local_path(str(src))
+            if not await self._cloud_folder_service.list_files_all(drive_service, old_token):
+                await drive_service.delete_file(old_token, "folder")
+        self._cloud_folder_service.move_cached_folders(
+            task.id, self._relative(task, src), self._relative(task, dest)
+        )
+        await self._block_service.move_local_paths(str(src), str(dest))
+        return True
+
+    @staticmethod
+    async def _move_cloud_item(
+        drive_service: DriveService, token: str, file_type: str, folder_token: str
+    ) -> None:
+        move_task = await drive_service.move_file(token, file_type, folder_token)
+        if move_task:
+            await drive_service.wait_task(move_task)
+
+    async def _rollback_children(
+        self,
+        drive_service: DriveService,
+        children: list[DriveFile],
+        folder_token: str,
+    ) -> None:
+        for child in reversed(children):
+            try:
+                await self._move_cloud_item(drive_service, child.token, child.type, folder_token)
+            except Exception as exc:
+                logger.warning(
+                    "目录改名回滚失败，子项仍留在新文件夹: token={} error={}",
+                    child.token,
+                    exc,
+                )
+
+    @staticmethod
+    def _can_rename(
+        link: SyncLinkItem,
+        src: Path,
+        dest: Path,
+        docx_service: DocxService | None,
+    ) -> bool:
+        # 目前只有云文档标题可以原位修改；普通文件、表格导出件改名仍走重新上传
+        if link.cloud_type != "docx" or docx_service is None:
+            return False
+        if getattr(docx_service, "rename_document", None) is None:
+            return False
+        return src.suffix.lower() == ".md" and dest.suffix.lower() == ".md"
+
+    @staticmethod
+    def _relative(task: SyncTaskItem, path: Path) -> str:
+        try:
+            return "/".join(path.relative_to(Path(task.local_path)).parts)
+        except ValueError:
+            return path.as_posix()
+
+
+def _path_key(path: str | Path) -> str:
+    return os.path.normcase(os.path.normpath(str(path)))
+
+
+__all__ = ["SyncMoveService"]
@@ -19,7 +19,7 @@ ShouldUploadMarkdownDocFn = Callable[[SyncTaskItem], bool]
 UploadMarkdownFn = Callable[..., Awaitable[None]]
 UploadFileFn = Callable[..., Awaitable[None]]
 ResolveCloudParentFn = Callable[..., Awaitable[str]]
-GetLocalSignatureFn = Callable[[Path], tuple[str, int, float] | None]
+GetLocalSignatureFn = Callable[[Path], Awaitable[tuple[str, int, float] | None]]
 BuildCloudRevisionFn = Callable[[str, float, bool | None, bool | None], str | None]
 ListFilesAllFn = Callable[..., Awaitable[list]]
 RecordEventFn = Callable[[SyncTaskStatus, SyncFileEvent, SyncTaskItem | None], None]
@@ -139,7 +139,7 @@ class SyncPathUploadService:
         force: bool = False,
     ) -> None:
         link = await self._link_service.get_by_local_path(str(path))
-        signature = self._get_local_signature(path)
+        signature = await self._get_local_signature(path)
         if not signature:
             status.failed_files += 1
             self._record_event(
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db.models import SyncMeta, SyncPendingUpload
+from src.db.session import get_session_maker
+
+_CHECKPOINT_KEY_PREFIX = "upload_checkpoint:"
+
+
+class SyncPendingUploadService:
+    """待上传变更日志：同一路径多次变更合并为一行，后端重启后恢复未完成的上传。
+
+    record/complete 只写内存缓冲，由定时 flush 批量落库，不在 watcher 事件路径上等待磁盘。
+    检查点记录“此前的本地变更都已进入日志”的时间，热重启时只需比对之后的变化。
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+        *,
+        flush_delay_seconds: float = 0.5,
+    ) -> None:
+        self._session_maker = session_maker or get_session_maker()
+        self._flush_delay_seconds = flush_delay_seconds
+        self._upserts: dict[tuple[str, str], float] = {}
+        self._completions: dict[tuple[str, str], float] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._flush_lock: asyncio.Lock | None = None
+
+    def record(self, task_id: str, local_path: str, changed_at: float) -> None:
+        key = (task_id, local_path)
+        previous = self._upserts.get(key)
+        self._upserts[key] = changed_at if previous is None else max(previous, changed_at)
+        self._schedule_flush()
+
+    def complete(self, task_id: str, entries: dict[str, float]) -> None:
+        """上传完成后移除日志；之后又发生的变更（changed_at 更新）会被保留。"""
+        for local_path, changed_at in entries.items():
+            key = (task_id, local_path)
+            previous = self._completions.get(key)
+            self._completions[key] = changed_at if previous is None else max(previous, changed_at)
+        if entries:
+            self._schedule_flush()
+
+    async def list_pending(self, task_id: str) -> dict[str, float]:
+        await self.flush()
+        try:
+            async with self._session_maker() as session:
+                result = await session.execute(
+                    select(SyncPendingUpload.local_path, SyncPendingUpload.changed_at).where(
+                        SyncPendingUpload.task_id == task_id
+                    )
+                )
+                return {str(path): float(changed_at) for path, changed_at in result.all()}
+        except SQLAlchemyError as exc:
+            logger.warning("读取待上传日志失败: task_id={} error={}", task_id, exc)
+            return {}
+
+    async def get_checkpoint(self, task_id: str) -> float | None:
+        try:
+            async with self._session_maker() as session:
+                record = await session.get(SyncMeta, _checkpoint_key(task_id))
+        except SQLAlchemyError as exc:
+            logger.warning("读取上传检查点失败: task_id={} error={}", task_id, exc)
+            return None
+        if record is None or not record.value:
+            return None
+        try:
+            return float(record.value)
+        except ValueError:
+            return None
+
+    async def set_checkpoint(self, task_id: str, checkpoint: float) -> None:
+        # 检查点之前的日志必须先落库，否则重启后会漏掉这段时间的变更
+        await self.flush()
+        stmt = sqlite_insert(SyncMeta).values(
+            key=_checkpoint_key(task_id),
+            value=repr(float(checkpoint)),
+            updated_at=time.time(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SyncMeta.key],
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+        try:
+            async with self._session_maker() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except SQLAlchemyError as exc:
+            logger.warning("写入上传检查点失败: task_id={} error={}", task_id, exc)
+
+    async def flush(self) -> None:
+        self._cancel_scheduled_flush()
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._upserts or self._completions:
+                upserts, self._upserts = self._upserts, {}
+                completions, self._completions = self._completions, {}
+                await self._write(upserts, completions)
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+    async def _write(
+        self,
+        upserts: dict[tuple[str, str], float],
+        completions: dict[tuple[str, str], float],
+    ) -> None:
+        now = time.time()
+        try:
+            async with self._session_maker() as session:
+                if upserts:
+                    stmt = sqlite_insert(SyncPendingUpload).values(
+                        [
+                            {
+                                "task_id": task_id,
+                                "local_path": local_path,
+                                "changed_at": changed_at,
+                                "queued_at": now,
+                            }
+                            for (task_id, local_path), changed_at in upserts.items()
+                        ]
+                    )
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[SyncPendingUpload.task_id, SyncPendingUpload.local_path],
+                        set_={
+                            "changed_at": func.max(
+                                SyncPendingUpload.changed_at, stmt.excluded.changed_at
+                            ),
+                            "queued_at": stmt.excluded.queued_at,
+                        },
+                    )
+                    await session.execute(stmt)
+                for (task_id, local_path), changed_at in completions.items():
+                    await session.execute(
+                        delete(SyncPendingUpload).where(
+                            and_(
+                                SyncPendingUpload.task_id == task_id,
+                                SyncPendingUpload.local_path == local_path,
+                                SyncPendingUpload.changed_at <= changed_at,
+                            )
+                        )
+                    )
+                await session.commit()
+        except SQLAlchemyError as exc:
+            # 日志只是重启恢复的辅助信息，写入失败时内存队列仍然有效
+            logger.warning(
+                "待上传日志写入失败: upserts={} completions={} error={}",
+                len(upserts),
+                len(completions),
+                exc,
+            )
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None and not self._flush_handle.cancelled():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self._flush_delay_seconds, self._fire_scheduled_flush)
+
+    def _fire_scheduled_flush(self) -> None:
+        self._flush_handle = None
+        if self._flush_task is not None and not self._flush_task.done():
+            # 正在写入的一轮会在持锁期间取走新记录
+            return
+        # 保留任务引用，避免事件循环只持有弱引用时任务被回收
+        self._flush_task = asyncio.create_task(self._scheduled_flush())
+
+    async def _scheduled_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("待上传日志定时写入失败")
+        finally:
+            self._flush_task = None
+
+    def _cancel_scheduled_flush(self) -> None:
+        handle = self._flush_handle
+        if handle is not None and not handle.cancelled():
+            handle.cancel()
+        self._flush_handle = None
+
+
+def _checkpoint_key(task_id: str) -> str:
+    return f"{_CHECKPOINT_KEY_PREFIX}{task_id}"
+
+
+__all__ = ["SyncPendingUploadService"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import statistics
 import time
 from dataclasses import dataclass
 
@@ -319,6 +320,47 @@ class SyncRunService:
             logger.exception("运行摘要批量查询失败: task_ids={}", task_ids)
             return {}
 
+    async def estimate_durations(
+        self,
+        task_ids: list[str],
+        *,
+        trigger_source: str,
+        sample_size: int = 5,
+    ) -> dict[str, float]:
+        """按最近若干次已结束运行的耗时中位数估算各任务的运行成本（秒）。"""
+        if not task_ids:
+            return {}
+        ranked_runs = (
+            select(
+                SyncRun.task_id,
+                (SyncRun.finished_at - SyncRun.started_at).label("duration"),
+                func.row_number()
+                .over(partition_by=SyncRun.task_id, order_by=SyncRun.started_at.desc())
+                .label("row_number"),
+            )
+            .where(
+                SyncRun.task_id.in_(task_ids),
+                SyncRun.trigger_source == trigger_source,
+                SyncRun.finished_at.is_not(None),
+            )
+            .subquery()
+        )
+        stmt = select(ranked_runs.c.task_id, ranked_runs.c.duration).where(
+            ranked_runs.c.row_number <= max(1, sample_size)
+        )
+        try:
+            async with self._session_maker() as session:
+                result = await session.execute(stmt)
+                rows = result.all()
+        except SQLAlchemyError as exc:
+            logger.warning("运行耗时估算失败: task_ids={} error={}", task_ids, exc)
+            return {}
+        samples: dict[str, list[float]] = {}
+        for task_id, duration in rows:
+            if duration is not None and duration >= 0:
+                samples.setdefault(task_id, []).append(float(duration))
+        return {task_id: statistics.median(values) for task_id, values in samples.items()}
+
     @staticmethod
     def _to_item(record: SyncRun | None) -> SyncRunItem | None:
         if record is None:
@@ -1,32 +1,37 @@
 from __future__ import annotations
 
 import asyncio
-import difflib
 import hashlib
-import re
 import time
 import uuid
 from contextlib import suppress
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Literal
+from stat import S_ISREG
+from typing import Any, Callable, Iterable, Literal
 from urllib.parse import parse_qs, unquote, urlparse
 
 from loguru import logger
 
-from src.core.config import ConfigManager, DeletePolicy
+from src.core.config import ConfigManager, DeletePolicy, SyncIntervalUnit, UploadDispatchMode
+from src.services.async_fs import AsyncFileSystem, get_async_fs
+from src.services.bitable_record_export_service import BitableRecordExportService
 from src.services.bitable_service import BitableService
+from src.services.block_diff import diff_opcodes
 from src.services.docx_service import (
     DocxService,
     has_markdown_table_exceeding_create_limit,
 )
 from src.services.drive_service import DriveFile, DriveNode, DriveService
 from src.services.sheet_service import SheetService
+from src.services.sheet_values_export_service import SheetValuesExportService
 from src.services.file_downloader import FileDownloader
-from src.services.file_hash import calculate_file_hash
 from src.services.file_uploader import FileUploader
-from src.services.file_writer import FileWriter
-from src.services.markdown_blocks import hash_block, split_markdown_blocks
+from src.services.file_writer import FileWriter, MarkdownStreamResult
+from src.services.markdown_blocks import hash_block, iter_resource_refs, split_markdown_blocks
+from src.services.local_event_coalescer import DirtyBatch, LocalEventCoalescer, scan_files
+from src.services.media_token_cache_service import MediaTokenCacheService
 from src.services.path_sanitizer import sanitize_filename, sanitize_path_segment
 from src.services.import_task_service import ImportTaskService
 from src.services.export_task_service import ExportTaskError, ExportTaskResult, ExportTaskService
@@ -37,17 +42,23 @@ from src.services.sync_event_pipeline import SyncEventPipeline
 from src.services.sync_delete_sync_service import SyncDeleteSyncService
 from src.services.sync_download_support_service import (
     DownloadCandidate,
+    ExportPart,
+    ExportPartsResult,
     SyncDownloadSupportService,
 )
 from src.services.sync_download_orchestration_service import (
     DownloadRuntimeServices,
     SyncDownloadOrchestrationService,
 )
+from src.services.sync_export_part_service import SyncExportPartItem, SyncExportPartService
+from src.services.sync_job_scheduler import JobPriority, JobQueueStats, SyncJobScheduler
 from src.services.sync_link_service import SyncLinkItem, SyncLinkService
 from src.services.sync_path_upload_service import SyncPathUploadService
 from src.services.sync_cloud_folder_service import SyncCloudFolderService
 from src.services.sync_markdown_cloud_doc_service import SyncMarkdownCloudDocService
 from src.services.sync_markdown_upload_service import SyncMarkdownUploadService
+from src.services.sync_move_service import SyncMoveService
+from src.services.sync_pending_upload_service import SyncPendingUploadService
 from src.services.sync_run_event_service import SyncRunEventService
 from src.services.sync_run_service import SyncRunService
 from src.services.sync_runner_state import SYNC_LOG_LIMIT, SyncFileEvent, SyncState, SyncTaskStatus
@@ -62,12 +73,6 @@ from src.services.watcher import FileChangeEvent, WatcherService
 
 _LOCAL_IMAGE_UPLOAD_REVISION_MARKER = "#local-images-v2"
 _MARKDOWN_TABLE_RENDER_REVISION_MARKER = "#md-table-render-v10"
-_MARKDOWN_IMAGE_REF_PATTERN = re.compile(r"!\[[^\]]*]\(([^)]+)\)")
-_MARKDOWN_LINK_REF_PATTERN = re.compile(r"(?<!!)\[[^\]]*]\(([^)]+)\)")
-_HTML_IMAGE_REF_PATTERN = re.compile(
-    r"""<img\b[^>]*\bsrc\s*=\s*(?P<quote>["'])(?P<src>.*?)(?P=quote)[^>]*>""",
-    re.IGNORECASE | re.DOTALL,
-)
 _LEGACY_DOCX_PLACEHOLDER_MARKERS = (
     "sheet_token:",
     "内嵌表格（sheet_token:",
@@ -76,6 +81,9 @@ _LEGACY_DOCX_SCAN_BYTES = 262_144
 _CLOUD_MD_MIRROR_FOLDER_NAME = "_LarkSync_MD_Mirror"
 _CLOUD_MD_MIRROR_CACHE_PREFIX = "__md_mirror__"
 _LOCAL_TRASH_DIR_NAME = ".larksync_trash"
+# 检查点留出事件在途的余量；热重启时以 stat 比对为主，检查点只兜底缺少记录的映射
+_UPLOAD_CHECKPOINT_MARGIN_SECONDS = 10.0
+_UPLOAD_CHECKPOINT_INTERVAL_SECONDS = 30.0
 _LOCAL_TEMP_FILE_PREFIXES = ("~$",)
 _LOCAL_TEMP_FILE_SUFFIXES = (
     ".tmp",
@@ -148,6 +156,10 @@ class SyncTaskRunner:
         run_service: SyncRunService | None = None,
         task_service: object | None = None,
         conflict_service: ConflictService | None = None,
+        export_part_service: SyncExportPartService | None = None,
+        async_fs: AsyncFileSystem | None = None,
+        pending_upload_service: SyncPendingUploadService | None = None,
+        job_scheduler: SyncJobScheduler | None = None,
         import_poll_attempts: int = 60,
         import_poll_interval: float = 1.0,
         export_poll_attempts: int = 20,
@@ -159,6 +171,10 @@ class SyncTaskRunner:
         self._file_downloader = file_downloader
         self._file_uploader = file_uploader
         self._file_writer = file_writer or FileWriter()
+        self._fs = async_fs or get_async_fs()
+        self._pending_journal = pending_upload_service or SyncPendingUploadService()
+        self._upload_checkpoints: dict[str, float] = {}
+        self._job_scheduler = job_scheduler or SyncJobScheduler()
         self._link_service = link_service or SyncLinkService()
         self._tombstone_service = tombstone_service or SyncTombstoneService()
         self._sheet_service = sheet_service
@@ -171,6 +187,8 @@ class SyncTaskRunner:
         self._run_service = run_service or SyncRunService()
         self._task_service = task_service
         self._conflict_service = conflict_service or ConflictService()
+        self._export_part_service = export_part_service or SyncExportPartService()
+        self._media_token_cache = MediaTokenCacheService()
         self._import_poll_attempts = max(1, import_poll_attempts)
         self._import_poll_interval = max(0.0, import_poll_interval)
         self._export_poll_attempts = max(1, export_poll_attempts)
@@ -178,11 +196,14 @@ class SyncTaskRunner:
         self._statuses: dict[str, SyncTaskStatus] = {}
         self._tasks: dict[str, asyncio.Task[None]] = {}
         self._watchers: dict[str, WatcherService] = {}
+        self._coalescers: dict[str, LocalEventCoalescer] = {}
         self._loop: asyncio.AbstractEventLoop | None = None
         self._uploading_paths: set[str] = set()
         self._doc_locks: dict[str, asyncio.Lock] = {}
         self._pending_uploads: dict[str, dict[str, float]] = {}
         self._upload_quiet_window_seconds = 2.0
+        self._upload_timers: dict[str, asyncio.TimerHandle] = {}
+        self._upload_dispatches: dict[str, asyncio.Task[None]] = {}
         self._running_tasks: set[str] = set()
         self._task_meta: dict[str, SyncTaskItem] = {}
         self._pending_restarts: dict[str, SyncTaskItem] = {}
@@ -193,6 +214,16 @@ class SyncTaskRunner:
             md_mirror_folder_name=_CLOUD_MD_MIRROR_FOLDER_NAME,
             md_mirror_cache_prefix=_CLOUD_MD_MIRROR_CACHE_PREFIX,
         )
+        self._move_service = SyncMoveService(
+            link_service=self._link_service,
+            block_service=self._block_service,
+            cloud_folder_service=self._cloud_folder_service,
+            should_ignore_path=lambda *args, **kwargs: self._should_ignore_path(*args, **kwargs),
+            resolve_cloud_parent=lambda *args, **kwargs: self._resolve_cloud_parent(*args, **kwargs),
+            list_local_files=lambda *args, **kwargs: self._list_local_files(*args, **kwargs),
+            record_event=lambda *args, **kwargs: self._record_event(*args, **kwargs),
+            async_fs=self._fs,
+        )
         self._delete_sync_service = SyncDeleteSyncService(
             link_service=self._link_service,
             tombstone_service=self._tombstone_service,
@@ -224,6 +255,7 @@ class SyncTaskRunner:
             generic_filename=sanitize_filename,
             extract_export_sub_id=_extract_export_sub_id,
             get_local_signature=self._get_local_signature,
+            build_cloud_revision=self._build_cloud_revision,
         )
         self._event_pipeline = SyncEventPipeline(
             event_store=self._event_store,
@@ -261,14 +293,21 @@ class SyncTaskRunner:
             silence_path=self._silence_path,
             process_pending_deletes=lambda *args, **kwargs: self._process_pending_deletes(*args, **kwargs),
             write_markdown=self._file_writer.write_markdown,
+            should_split_export_parts=self._should_split_export_parts,
+            list_export_parts=lambda *args, **kwargs: self._download_support_service.list_export_parts(*args, **kwargs),
+            download_exported_parts=lambda *args, **kwargs: self._download_exported_parts(*args, **kwargs),
+            is_export_part_set_synced=lambda *args, **kwargs: self._download_support_service.is_export_part_set_synced(*args, **kwargs),
+            download_docx_to_file=lambda *args, **kwargs: self._download_docx_to_file(*args, **kwargs),
+            resource_signature_from_refs=self._resource_signature_from_refs,
         )
         self._upload_orchestration_service = SyncUploadOrchestrationService(
             prefill_links_from_cloud=lambda *args, **kwargs: self._prefill_links_from_cloud(*args, **kwargs),
             enqueue_missing_local_deletes=lambda *args, **kwargs: self._enqueue_missing_local_deletes(*args, **kwargs),
-            iter_local_files=lambda *args, **kwargs: self._iter_local_files(*args, **kwargs),
+            list_local_files=lambda *args, **kwargs: self._list_local_files(*args, **kwargs),
             upload_path=lambda *args, **kwargs: self._upload_path(*args, **kwargs),
             process_pending_deletes=lambda *args, **kwargs: self._process_pending_deletes(*args, **kwargs),
             record_event=lambda *args, **kwargs: self._record_event(*args, **kwargs),
+            reconcile_local_moves=lambda *args, **kwargs: self._move_service.reconcile_local_moves(*args, **kwargs),
         )
         self._path_upload_service = SyncPathUploadService(
             uploading_paths=self._uploading_paths,
@@ -307,6 +346,7 @@ class SyncTaskRunner:
             has_local_image_revision=_has_local_image_upload_revision,
             has_markdown_table_render_revision=_has_markdown_table_render_revision,
             record_event=lambda *args, **kwargs: self._record_event(*args, **kwargs),
+            async_fs=self._fs,
         )
 
     @property
@@ -323,6 +363,9 @@ class SyncTaskRunner:
     def list_statuses(self) -> dict[str, SyncTaskStatus]:
         return dict(self._statuses)
 
+    def list_queue_stats(self) -> dict[str, JobQueueStats]:
+        return self._job_scheduler.stats()
+
     def _record_event(
         self,
         status: SyncTaskStatus,
@@ -335,6 +378,7 @@ class SyncTaskRunner:
         await self._event_pipeline.flush_now()
 
     def ensure_watcher(self, task: SyncTaskItem) -> None:
+        self._task_meta[task.id] = task
         self._ensure_watcher(task)
 
     def stop_watcher(self, task_id: str) -> None:
@@ -352,9 +396,17 @@ class SyncTaskRunner:
         self._running_tasks.clear()
         self._pending_restarts.clear()
         self._pending_uploads.clear()
+        for handle in self._upload_timers.values():
+            handle.cancel()
+        self._upload_timers.clear()
+        for dispatch in self._upload_dispatches.values():
+            if not dispatch.done():
+                dispatch.cancel()
+        self._upload_dispatches.clear()
         for task_id in list(self._watchers.keys()):
             self._stop_watcher(task_id)
         await self._event_pipeline.close()
+        await self._pending_journal.close()
         self._loop = None
 
     def start_task(self, task: SyncTaskItem) -> SyncTaskStatus:
@@ -428,7 +480,72 @@ class SyncTaskRunner:
         self, task_id: str, path: Path, changed_at: float | None = None
     ) -> None:
         pending = self._pending_uploads.setdefault(task_id, {})
-        pending[str(path)] = time.time() if changed_at is None else changed_at
+        changed_at = time.time() if changed_at is None else changed_at
+        pending[str(path)] = changed_at
+        self._pending_journal.record(task_id, str(path), changed_at)
+        self._arm_upload_dispatch(
+            task_id,
+            max(0.0, changed_at + self._upload_quiet_window_seconds - time.time()),
+        )
+
+    def _upload_dispatch_enabled(self) -> bool:
+        # 按天定时上传是用户明确选择的固定时间点，不做事件驱动提前上传
+        config = ConfigManager.get().config
+        return (
+            config.upload_dispatch_mode == UploadDispatchMode.event
+            and config.upload_interval_unit != SyncIntervalUnit.days
+        )
+
+    def _arm_upload_dispatch(self, task_id: str, delay: float) -> None:
+        """每个任务一个定时器，指向最早静默到期的路径；周期上传只作为兜底。"""
+        if not self._upload_dispatch_enabled():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        handle = self._upload_timers.get(task_id)
+        if handle is not None and not handle.cancelled():
+            # 已有更早的定时器：触发时会为尚未静默的路径重新计时
+            if handle.when() <= loop.time() + delay:
+                return
+            handle.cancel()
+        self._upload_timers[task_id] = loop.call_later(
+            delay, self._fire_upload_dispatch, task_id
+        )
+
+    def _fire_upload_dispatch(self, task_id: str) -> None:
+        self._upload_timers.pop(task_id, None)
+        current = self._upload_dispatches.get(task_id)
+        if current is not None and not current.done():
+            # 上一轮派发结束时会重新计时
+            return
+        self._upload_dispatches[task_id] = asyncio.create_task(
+            self._dispatch_ready_uploads(task_id)
+        )
+
+    async def _dispatch_ready_uploads(self, task_id: str) -> None:
+        task = self._task_meta.get(task_id)
+        eligible = (
+            task is not None
+            and task.enabled
+            and task.sync_mode in {"bidirectional", "upload_only"}
+        )
+        try:
+            if eligible and task_id not in self._running_tasks:
+                await self.run_scheduled_upload(task)
+        except Exception:
+            logger.exception("事件驱动上传失败: task_id={}", task_id)
+        finally:
+            self._upload_dispatches.pop(task_id, None)
+            pending = self._pending_uploads.get(task_id)
+            # 停用或仅下载的任务不再计时：待上传记录留给任务恢复后的周期上传处理
+            if pending and eligible:
+                delay = min(pending.values()) + self._upload_quiet_window_seconds - time.time()
+                # 上传失败或被占用时路径仍处于就绪状态，至少退避一个静默窗口，避免空转
+                self._arm_upload_dispatch(
+                    task_id, max(delay, self._upload_quiet_window_seconds)
+                )
 
     async def run_conflict_upload(
         self,
@@ -472,6 +589,20 @@ class SyncTaskRunner:
         *,
         message: str,
         executor,
+    ) -> SyncTaskStatus:
+        if task.id in self._running_tasks:
+            raise RuntimeError("任务运行中，请稍后再试")
+        async with self._job_scheduler.slot(task.id, JobPriority.conflict):
+            return await self._execute_manual_resolution(
+                task, message=message, executor=executor
+            )
+
+    async def _execute_manual_resolution(
+        self,
+        task: SyncTaskItem,
+        *,
+        message: str,
+        executor,
     ) -> SyncTaskStatus:
         if task.id in self._running_tasks:
             raise RuntimeError("任务运行中，请稍后再试")
@@ -517,16 +648,31 @@ class SyncTaskRunner:
             self._running_tasks.discard(task.id)
 
     async def run_scheduled_upload(self, task: SyncTaskItem) -> None:
-        # 首次调度时，全量扫描本地目录，将没有 SyncLink 的文件加入待上传队列
+        # 首次调度时恢复待上传日志，并扫描后端停止期间的本地变化
         if task.id not in self._initial_upload_scanned:
             self._initial_upload_scanned.add(task.id)
-            await self._scan_for_unlinked_files(task)
+            await self._restore_pending_uploads(task)
+        await self._maybe_checkpoint_uploads(task)
+        if task.id in self._running_tasks or not await self._has_upload_work(task.id):
+            return
+        async with self._job_scheduler.slot(task.id, JobPriority.upload):
+            await self._run_scheduled_upload(task)
 
+    async def _has_upload_work(self, task_id: str) -> bool:
+        pending = self._pending_uploads.get(task_id)
+        if pending:
+            ready_before = time.time() - self._upload_quiet_window_seconds
+            if any(changed_at <= ready_before for changed_at in pending.values()):
+                return True
+        return await self._has_pending_tombstones(task_id)
+
+    async def _run_scheduled_upload(self, task: SyncTaskItem) -> None:
         pending = self._pending_uploads.get(task.id) or {}
         has_pending_tombstone = await self._has_pending_tombstones(task.id)
         if task.id in self._running_tasks:
             return
         ready_paths: list[Path] = []
+        taken: dict[str, float] = {}
         if pending:
             now = time.time()
             ready_keys = [
@@ -536,7 +682,7 @@ class SyncTaskRunner:
             ]
             ready_paths = [Path(path) for path in sorted(ready_keys)]
             for path in ready_keys:
-                pending.pop(path, None)
+                taken[path] = pending.pop(path)
         if not ready_paths and not has_pending_tombstone:
             return
         self._running_tasks.add(task.id)
@@ -559,6 +705,8 @@ class SyncTaskRunner:
             status.last_error = str(exc)
             status.finished_at = time.time()
         finally:
+            # 与内存队列一致：取出即视为处理完毕，失败的文件由下一次变更或全量同步重试
+            self._pending_journal.complete(task.id, taken)
             self._record_event(
                 status,
                 SyncFileEvent(
@@ -577,6 +725,12 @@ class SyncTaskRunner:
             self._running_tasks.discard(task.id)
 
     async def run_scheduled_download(self, task: SyncTaskItem) -> None:
+        if task.id in self._running_tasks:
+            return
+        async with self._job_scheduler.slot(task.id, JobPriority.download):
+            await self._run_scheduled_download(task)
+
+    async def _run_scheduled_download(self, task: SyncTaskItem) -> None:
         if task.id in self._running_tasks:
             return
         self._running_tasks.add(task.id)
@@ -655,21 +809,22 @@ class SyncTaskRunner:
         self._task_meta[task.id] = task
         status = self._statuses.setdefault(task.id, SyncTaskStatus(task_id=task.id))
         try:
-            await self._run_additive_reconciliation_if_needed(task, status)
-            if task.sync_mode == "download_only":
-                await self._run_download(task, status)
-            elif task.sync_mode == "upload_only":
-                await self._run_upload(task, status)
-            elif task.sync_mode == "bidirectional":
-                await self._run_download(task, status)
-                await self._run_upload(task, status)
-            else:
-                status.state = "failed"
-                status.last_error = f"未知同步模式: {task.sync_mode}"
+            async with self._job_scheduler.slot(task.id, JobPriority.manual):
+                await self._run_additive_reconciliation_if_needed(task, status)
+                if task.sync_mode == "download_only":
+                    await self._run_download(task, status)
+                elif task.sync_mode == "upload_only":
+                    await self._run_upload(task, status)
+                elif task.sync_mode == "bidirectional":
+                    await self._run_download(task, status)
+                    await self._run_upload(task, status)
+                else:
+                    status.state = "failed"
+                    status.last_error = f"未知同步模式: {task.sync_mode}"
+                    status.finished_at = time.time()
+                    return
+                status.state = "failed" if status.failed_files > 0 else "success"
                 status.finished_at = time.time()
-                return
-            status.state = "failed" if status.failed_files > 0 else "success"
-            status.finished_at = time.time()
         except asyncio.CancelledError:
             status.state = "cancelled"
             status.last_error = "任务已取消"
@@ -859,7 +1014,9 @@ class SyncTaskRunner:
 
     def _resolve_download_runtime_services(self) -> DownloadRuntimeServices:
         drive_service = self._drive_service or DriveService()
-        docx_service = self._docx_service or DocxService()
+        docx_service = self._docx_service or DocxService(
+            media_token_cache=self._media_token_cache
+        )
         sheet_service = self._sheet_service or SheetService()
         transcoder = self._transcoder or DocxTranscoder(sheet_service=sheet_service)
         file_downloader = self._file_downloader or FileDownloader()
@@ -893,9 +1050,19 @@ class SyncTaskRunner:
             export_task_service=export_task_service,
             bitable_service=bitable_service,
             link_service=self._link_service,
+            export_part_service=self._export_part_service,
             owned_services=owned_services,
         )
 
+    @staticmethod
+    def _should_split_export_parts(task: SyncTaskItem, candidate: DownloadCandidate) -> bool:
+        # 拆分出的 CSV 子表没有对应的云端文件，只在单向下载任务中启用，避免被当作新文件上行
+        if task.sync_mode != "download_only":
+            return False
+        if candidate.effective_type not in _EXPORT_EXTENSION_MAP:
+            return False
+        return bool(ConfigManager.get().config.export_sub_sheets_separately)
+
     @staticmethod
     def _should_skip_download_for_local_newer(
         *,
@@ -913,8 +1080,8 @@ class SyncTaskRunner:
             return False
         return local_mtime > (cloud_mtime + 1.0)
 
-    @staticmethod
-    def _should_skip_download_for_unchanged(
+    async def _should_skip_download_for_unchanged(
+        self,
         *,
         local_path: Path,
         cloud_mtime: float,
@@ -922,18 +1089,7 @@ class SyncTaskRunner:
         effective_token: str,
         effective_type: str,
     ) -> bool:
-        service = SyncDownloadSupportService(
-            export_extension_map=_EXPORT_EXTENSION_MAP,
-            parse_mtime=_parse_mtime,
-            contains_legacy_docx_placeholder=_contains_legacy_docx_placeholder,
-            resolve_target=_resolve_target,
-            docx_filename=_docx_filename,
-            export_filename=_export_filename,
-            generic_filename=sanitize_filename,
-            extract_export_sub_id=_extract_export_sub_id,
-            get_local_signature=SyncTaskRunner._get_local_signature,
-        )
-        return service.should_skip_download_for_unchanged(
+        return await self._download_support_service.should_skip_download_for_unchanged(
             local_path=local_path,
             cloud_mtime=cloud_mtime,
             persisted=persisted,
@@ -941,24 +1097,13 @@ class SyncTaskRunner:
             effective_type=effective_type,
         )
 
-    @staticmethod
     def _build_download_candidate(
+        self,
         task: SyncTaskItem,
         node: DriveNode,
         relative_dir: Path,
     ) -> DownloadCandidate:
-        service = SyncDownloadSupportService(
-            export_extension_map=_EXPORT_EXTENSION_MAP,
-            parse_mtime=_parse_mtime,
-            contains_legacy_docx_placeholder=_contains_legacy_docx_placeholder,
-            resolve_target=_resolve_target,
-            docx_filename=_docx_filename,
-            export_filename=_export_filename,
-            generic_filename=sanitize_filename,
-            extract_export_sub_id=_extract_export_sub_id,
-            get_local_signature=SyncTaskRunner._get_local_signature,
-        )
-        return service.build_download_candidate(task, node, relative_dir)
+        return self._download_support_service.build_download_candidate(task, node, relative_dir)
 
     async def _hydrate_export_sub_ids(
         self,
@@ -967,31 +1112,24 @@ class SyncTaskRunner:
         *,
         sheet_service: SheetService | None = None,
         bitable_service: BitableService | None = None,
+        persisted_by_path: dict[str, SyncLinkItem] | None = None,
     ) -> list[DownloadCandidate]:
         return await self._download_support_service.hydrate_export_sub_ids(
             candidates,
             drive_service,
             sheet_service=sheet_service,
             bitable_service=bitable_service,
+            persisted_by_path=persisted_by_path,
         )
 
-    @staticmethod
     def _select_download_candidates(
+        self,
         candidates: list[DownloadCandidate],
         persisted_by_path: dict[str, SyncLinkItem],
     ) -> tuple[list[DownloadCandidate], list[DownloadCandidate]]:
-        service = SyncDownloadSupportService(
-            export_extension_map=_EXPORT_EXTENSION_MAP,
-            parse_mtime=_parse_mtime,
-            contains_legacy_docx_placeholder=_contains_legacy_docx_placeholder,
-            resolve_target=_resolve_target,
-            docx_filename=_docx_filename,
-            export_filename=_export_filename,
-            generic_filename=sanitize_filename,
-            extract_export_sub_id=_extract_export_sub_id,
-            get_local_signature=SyncTaskRunner._get_local_signature,
+        return self._download_support_service.select_download_candidates(
+            candidates, persisted_by_path
         )
-        return service.select_download_candidates(candidates, persisted_by_path)
 
     @staticmethod
     def _choose_download_candidate(
@@ -1023,6 +1161,33 @@ class SyncTaskRunner:
             link_map=link_map,
         )
 
+    async def _download_docx_to_file(
+        self,
+        document_id: str,
+        *,
+        docx_service: DocxService,
+        transcoder: DocxTranscoder,
+        target_path: Path,
+        mtime: float,
+        base_dir: Path | None = None,
+        link_map: dict[str, Path] | None = None,
+        baseline: tuple[str, int, float] | None = None,
+        before_replace: Callable[[Path], None] | None = None,
+    ) -> MarkdownStreamResult | None:
+        open_stream = getattr(self._file_writer, "open_markdown_stream", None)
+        if open_stream is None or not hasattr(transcoder, "stream_markdown"):
+            return None
+        return await self._download_support_service.download_docx_to_file(
+            document_id,
+            docx_service=docx_service,
+            transcoder=transcoder,
+            # 创建目录与临时文件同样放到文件线程池
+            writer=await self._fs.run(open_stream, target_path, mtime, baseline=baseline),
+            base_dir=base_dir,
+            link_map=link_map,
+            before_replace=before_replace,
+        )
+
     async def _download_exported_file(
         self,
         *,
@@ -1048,6 +1213,44 @@ class SyncTaskRunner:
             poll_interval=self._export_poll_interval,
         )
 
+    async def _download_exported_parts(
+        self,
+        *,
+        export_task_service: ExportTaskService,
+        file_downloader: FileDownloader,
+        candidate: DownloadCandidate,
+        parts: list[ExportPart],
+        persisted_by_path: dict[str, SyncExportPartItem],
+        bitable_service: BitableService | None = None,
+        sheet_service: SheetService | None = None,
+        force: bool = False,
+        before_write: Callable[[Path], None] | None = None,
+    ) -> ExportPartsResult:
+        max_cells = ConfigManager.get().config.sheet_direct_export_max_cells
+        return await self._download_support_service.download_exported_parts(
+            export_task_service=export_task_service,
+            file_downloader=file_downloader,
+            bitable_exporter=(
+                BitableRecordExportService(bitable_service, async_fs=self._fs)
+                if bitable_service
+                else None
+            ),
+            sheet_exporter=(
+                SheetValuesExportService(
+                    sheet_service, max_cells=max_cells, async_fs=self._fs
+                )
+                if sheet_service and max_cells > 0
+                else None
+            ),
+            candidate=candidate,
+            parts=parts,
+            persisted_by_path=persisted_by_path,
+            poll_attempts=self._export_poll_attempts,
+            poll_interval=self._export_poll_interval,
+            force=force,
+            before_write=before_write,
+        )
+
     async def _wait_for_export_task(
         self,
         export_task_service: ExportTaskService,
@@ -1099,7 +1302,9 @@ class SyncTaskRunner:
         )
 
     def _resolve_upload_runtime_services(self) -> UploadRuntimeServices:
-        docx_service = self._docx_service or DocxService()
+        docx_service = self._docx_service or DocxService(
+            media_token_cache=self._media_token_cache
+        )
         file_uploader = self._file_uploader or FileUploader()
         drive_service = self._drive_service or DriveService()
         import_task_service = self._import_task_service or ImportTaskService()
@@ -1316,35 +1521,28 @@ class SyncTaskRunner:
 
     @staticmethod
     def _has_uploadable_markdown_images(markdown: str, base_path: str | Path | None) -> bool:
-        for match in _MARKDOWN_IMAGE_REF_PATTERN.finditer(markdown):
-            ref = _normalize_markdown_resource_ref(match.group(1))
-            if _is_uploadable_markdown_image_ref(ref, base_path):
-                return True
-        for match in _HTML_IMAGE_REF_PATTERN.finditer(markdown):
-            ref = (match.group("src") or "").strip()
-            if _is_uploadable_markdown_image_ref(ref, base_path):
-                return True
-        return False
+        return any(
+            image_only and _is_uploadable_markdown_image_ref(ref, base_path)
+            for ref, image_only in iter_resource_refs(markdown)
+        )
 
     @staticmethod
     def _calculate_local_resource_signature(
         markdown: str,
         base_path: str | Path | None,
+    ) -> str | None:
+        return SyncTaskRunner._resource_signature_from_refs(
+            iter_resource_refs(markdown), base_path
+        )
+
+    @staticmethod
+    def _resource_signature_from_refs(
+        refs: Iterable[tuple[str, bool]],
+        base_path: str | Path | None,
     ) -> str | None:
         entries: list[str] = []
-        for match in _MARKDOWN_IMAGE_REF_PATTERN.finditer(markdown):
-            ref = _normalize_markdown_resource_ref(match.group(1))
-            entry = _build_local_resource_signature_entry(ref, base_path, image_only=True)
-            if entry:
-                entries.append(entry)
-        for match in _HTML_IMAGE_REF_PATTERN.finditer(markdown):
-            ref = (match.group("src") or "").strip()
-            entry = _build_local_resource_signature_entry(ref, base_path, image_only=True)
-            if entry:
-                entries.append(entry)
-        for match in _MARKDOWN_LINK_REF_PATTERN.finditer(markdown):
-            ref = _normalize_markdown_resource_ref(match.group(1))
-            entry = _build_local_resource_signature_entry(ref, base_path, image_only=False)
+        for ref, image_only in refs:
+            entry = _build_local_resource_signature_entry(ref, base_path, image_only=image_only)
             if entry:
                 entries.append(entry)
         if not entries:
@@ -1489,13 +1687,13 @@ class SyncTaskRunner:
             return f"{token}{suffix}"
         return f"{token}@{int(cloud_mtime * 1000)}{suffix}"
 
-    @staticmethod
-    def _get_local_signature(path: Path) -> tuple[str, int, float] | None:
-        if not path.exists() or not path.is_file():
-            return None
+    async def _get_local_signature(self, path: Path) -> tuple[str, int, float] | None:
+        # stat 与哈希都放到文件线程池，避免大文件阻塞事件循环
         try:
-            stat = path.stat()
-            file_hash = calculate_file_hash(path)
+            stat = await self._fs.stat(path)
+            if not S_ISREG(stat.st_mode):
+                return None
+            file_hash = await self._fs.hash_file(path)
         except OSError:
             return None
         return file_hash, int(stat.st_size), float(stat.st_mtime)
@@ -1847,15 +2045,80 @@ class SyncTaskRunner:
             source_name=source_name,
         )
 
-    def _iter_local_files(self, task: SyncTaskItem) -> Iterable[Path]:
+    async def _list_local_files(self, task: SyncTaskItem) -> list[Path]:
+        # 目录遍历与过滤整体放到文件线程池，大目录/慢盘不阻塞事件循环
+        return await self._fs.list_files(
+            Path(task.local_path),
+            lambda path: not self._should_ignore_path(task, path),
+        )
+
+    async def _restore_pending_uploads(self, task: SyncTaskItem) -> None:
+        pending = self._pending_uploads.setdefault(task.id, {})
+        restored = await self._pending_journal.list_pending(task.id)
+        missing: dict[str, float] = {}
+        for path, changed_at in restored.items():
+            if await self._fs.exists(Path(path)):
+                pending.setdefault(path, changed_at)
+            else:
+                missing[path] = changed_at
+        self._pending_journal.complete(task.id, missing)
+        checkpoint = await self._pending_journal.get_checkpoint(task.id)
+        if checkpoint is None:
+            await self._scan_for_unlinked_files(task)
+            return
+        queued = await self._scan_for_changes_since(task, checkpoint)
+        logger.info(
+            "热重启恢复待上传队列: task_id={} restored={} changed={}",
+            task.id,
+            len(restored) - len(missing),
+            queued,
+        )
+
+    async def _maybe_checkpoint_uploads(self, task: SyncTaskItem) -> None:
+        """监听正常运行时推进检查点：此前的本地变更都已进入内存队列和日志。"""
+        watcher = self._watchers.get(task.id)
+        if watcher is None or not watcher.is_running():
+            return
+        coalescer = self._coalescers.get(task.id)
+        # 突发合并期间事件只记录脏目录，尚未进入日志
+        if coalescer is not None and coalescer.in_burst:
+            return
+        now = time.time()
+        last = self._upload_checkpoints.get(task.id)
+        if last is not None and now - last < _UPLOAD_CHECKPOINT_INTERVAL_SECONDS:
+            return
+        self._upload_checkpoints[task.id] = now
+        await self._pending_journal.set_checkpoint(
+            task.id, now - _UPLOAD_CHECKPOINT_MARGIN_SECONDS
+        )
+
+    async def _scan_for_changes_since(self, task: SyncTaskItem, checkpoint: float) -> int:
+        """热重启扫描：只比对 stat 与上次同步记录，不读取文件内容。"""
         root = Path(task.local_path)
-        if not root.exists():
-            return []
-        return [
-            path
-            for path in root.rglob("*")
-            if path.is_file() and not self._should_ignore_path(task, path)
-        ]
+        skip_md = not self._should_upload_markdown_doc(task)
+
+        def _candidate(path: Path) -> bool:
+            if self._should_ignore_path(task, path):
+                return False
+            return not (skip_md and path.suffix.lower() == ".md")
+
+        links = {item.local_path: item for item in await self._link_service.list_by_task(task.id)}
+        queued = 0
+        for path, stat in await self._fs.list_file_stats(root, _candidate):
+            link = links.get(str(path))
+            if link is None:
+                changed = True
+            elif link.local_size is None or link.local_mtime is None:
+                changed = stat.st_mtime > checkpoint
+            else:
+                changed = (
+                    int(stat.st_size) != int(link.local_size)
+                    or abs(float(stat.st_mtime) - float(link.local_mtime)) > 1e-3
+                )
+            if changed:
+                self.queue_local_change(task.id, path, changed_at=0.0)
+                queued += 1
+        return queued
 
     async def _scan_for_unlinked_files(self, task: SyncTaskItem) -> int:
         """全量扫描本地目录，将没有 SyncLink 的文件加入待上传队列。
@@ -1865,19 +2128,15 @@ class SyncTaskRunner:
         - watcher 遗漏的文件事件
         """
         root = Path(task.local_path)
-        if not root.exists():
-            return 0
-
         skip_md = not self._should_upload_markdown_doc(task)
 
-        queued = 0
-        for path in root.rglob("*"):
-            if not path.is_file():
-                continue
+        def _candidate(path: Path) -> bool:
             if self._should_ignore_path(task, path):
-                continue
-            if skip_md and path.suffix.lower() == ".md":
-                continue
+                return False
+            return not (skip_md and path.suffix.lower() == ".md")
+
+        queued = 0
+        for path in await self._fs.list_files(root, _candidate):
             link = await self._link_service.get_by_local_path(str(path))
             if not link:
                 self.queue_local_change(task.id, path, changed_at=0.0)
@@ -1978,8 +2237,13 @@ class SyncTaskRunner:
         )
 
     def _ensure_watcher(self, task: SyncTaskItem) -> None:
-        if task.id in self._watchers:
-            return
+        existing = self._watchers.get(task.id)
+        if existing is not None:
+            root_path = getattr(existing, "root_path", None)
+            if root_path is None or Path(root_path) == Path(task.local_path):
+                return
+            # 任务本地目录被修改：撤销旧订阅后按新目录重新注册
+            self._stop_watcher(task.id)
         if self._loop is None:
             try:
                 self._loop = asyncio.get_running_loop()
@@ -1994,15 +2258,38 @@ class SyncTaskRunner:
                 self._handle_local_event(task, event), loop
             )
 
-        watcher = WatcherService(Path(task.local_path), on_event=_on_event)
+        def _on_burst() -> None:
+            asyncio.run_coroutine_threadsafe(
+                self._drain_local_burst(task, coalescer), loop
+            )
+
+        def _on_resync(reason: str) -> None:
+            asyncio.run_coroutine_threadsafe(
+                self._resync_watch_root(task, reason), loop
+            )
+
+        coalescer = LocalEventCoalescer(
+            Path(task.local_path),
+            forward=_on_event,
+            on_burst=_on_burst,
+            burst_threshold=ConfigManager.get().config.local_event_burst_threshold,
+        )
+        watcher = WatcherService(
+            Path(task.local_path),
+            on_event=coalescer.submit,
+            on_resync=_on_resync,
+        )
         watcher.start()
         self._watchers[task.id] = watcher
+        self._coalescers[task.id] = coalescer
 
     def _stop_watcher(self, task_id: str) -> None:
         watcher = self._watchers.pop(task_id, None)
         if watcher:
             watcher.stop()
+        self._coalescers.pop(task_id, None)
         self._initial_upload_scanned.discard(task_id)
+        self._upload_checkpoints.pop(task_id, None)
 
     def _silence_path(
         self,
@@ -2010,10 +2297,11 @@ class SyncTaskRunner:
         path: Path,
         *,
         ttl_seconds: float | None = None,
+        recursive: bool = False,
     ) -> None:
         watcher = self._watchers.get(task_id)
         if watcher:
-            watcher.silence(path, ttl_seconds=ttl_seconds)
+            watcher.silence(path, ttl_seconds=ttl_seconds, recursive=recursive)
 
     async def _list_folder_tokens(
         self, drive_service: DriveService, folder_token: str
@@ -2069,6 +2357,120 @@ class SyncTaskRunner:
             parse_mtime=_parse_mtime,
         )
 
+    async def _drain_local_burst(
+        self, task: SyncTaskItem, coalescer: LocalEventCoalescer
+    ) -> None:
+        while True:
+            remaining = coalescer.quiet_remaining()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            batch = coalescer.take_dirty()
+            if batch is not None:
+                break
+            if not coalescer.in_burst:
+                return
+        await self._rescan_dirty_directories(task, batch)
+
+    async def _resync_watch_root(self, task: SyncTaskItem, reason: str) -> None:
+        """监听中断（线程退出、事件队列溢出）期间的变更已丢失，重扫该任务根目录补齐。"""
+        if task.id not in self._watchers:
+            return
+        logger.warning("本地监听中断，重扫任务目录: task_id={} reason={}", task.id, reason)
+        await self._rescan_dirty_directories(
+            task,
+            DirtyBatch(directories=[Path(task.local_path)], event_count=0, saw_deletes=True),
+            label=f"监听恢复重扫({reason})",
+        )
+
+    async def _rescan_dirty_directories(
+        self,
+        task: SyncTaskItem,
+        batch: DirtyBatch,
+        *,
+        label: str = "批量变更合并",
+    ) -> None:
+        """突发事件合并后，对脏目录做一次 scandir 重扫，代替逐条事件处理。"""
+        if task.sync_mode == "download_only":
+            return
+        files = await self._fs.run(
+            scan_files,
+            batch.directories,
+            lambda path: not self._should_ignore_path(task, path),
+        )
+        changed_at = time.time()
+        for path in files:
+            self.queue_local_change(task.id, path, changed_at=changed_at)
+        status = self._statuses.setdefault(task.id, SyncTaskStatus(task_id=task.id))
+        if batch.saw_deletes:
+            await self._reconcile_local_moves(task, status)
+            await self._enqueue_missing_local_deletes(task=task, status=status)
+        logger.info(
+            "本地批量变更已合并: task_id={} events={} dirs={} files={}",
+            task.id,
+            batch.event_count,
+            len(batch.directories),
+            len(files),
+        )
+        self._record_event(
+            status,
+            SyncFileEvent(
+                path=task.local_path,
+                status="queued",
+                message=(
+                    f"{label}: events={batch.event_count} "
+                    f"dirs={len(batch.directories)} files={len(files)}，等待周期上传"
+                ),
+            ),
+            task,
+        )
+
+    async def _apply_local_move(
+        self,
+        task: SyncTaskItem,
+        status: SyncTaskStatus,
+        src: Path,
+        dest: Path,
+    ) -> bool:
+        # 先取锁再做任何 await：目录移动事件先于其子项事件到达，保证按到达顺序处理
+        async with self._move_service.lock_for(task.id):
+            if await self._link_service.get_by_local_path(str(src)) is None:
+                return False
+            drive_service = self._drive_service or DriveService()
+            docx_service = self._docx_service or DocxService()
+            try:
+                return await self._move_service.apply_local_move(
+                    task=task,
+                    status=status,
+                    src=src,
+                    dest=dest,
+                    drive_service=drive_service,
+                    docx_service=docx_service,
+                )
+            finally:
+                if self._drive_service is None:
+                    await drive_service.close()
+                if self._docx_service is None:
+                    await docx_service.close()
+
+    async def _reconcile_local_moves(self, task: SyncTaskItem, status: SyncTaskStatus) -> None:
+        drive_service = self._drive_service or DriveService()
+        docx_service = self._docx_service or DocxService()
+        try:
+            await self._move_service.reconcile_local_moves(
+                task=task,
+                status=status,
+                drive_service=drive_service,
+                docx_service=docx_service,
+            )
+        except Exception as exc:
+            logger.warning("本地改名识别失败，按删除+上传处理: task_id={} error={}", task.id, exc)
+        finally:
+            if self._drive_service is None:
+                await drive_service.close()
+            if self._docx_service is None:
+                await docx_service.close()
+
     async def _handle_local_event(self, task: SyncTaskItem, event: FileChangeEvent) -> None:
         if task.sync_mode == "download_only":
             return
@@ -2076,6 +2478,9 @@ class SyncTaskRunner:
         status = self._statuses.setdefault(task.id, SyncTaskStatus(task_id=task.id))
         if self._should_ignore_path(task, path):
             return
+        if event.event_type == "moved" and event.dest_path:
+            if await self._apply_local_move(task, status, Path(event.src_path), path):
+                return
         if event.event_type == "deleted":
             marked = await self._enqueue_local_delete_tombstone(
                 task=task,
@@ -2121,7 +2526,7 @@ class SyncTaskRunner:
         blocks = split_markdown_blocks(markdown)
         if not blocks:
             return False
-        file_hash = calculate_file_hash(file_path)
+        file_hash = await self._fs.hash_file(file_path)
         block_hashes = [hash_block(block) for block in blocks]
         existing = await self._block_service.list_blocks(str(file_path), document_id)
         if not existing:
@@ -2129,7 +2534,7 @@ class SyncTaskRunner:
                 raise RuntimeError("缺少块级状态，无法局部更新")
             return False
         total_existing = sum(item.block_count for item in existing)
-        root_block, _ = await docx_service.get_root_block(document_id)
+        root_block, cloud_items = await docx_service.get_root_block(document_id)
         root_children = root_block.get("children") or []
         if total_existing != len(root_children):
             if force:
@@ -2150,10 +2555,7 @@ class SyncTaskRunner:
                 logger.info("块级更新跳过: 映射数量不一致")
                 return False
 
-        matcher = difflib.SequenceMatcher(
-            a=[item.block_hash for item in existing], b=block_hashes
-        )
-        opcodes = matcher.get_opcodes()
+        opcodes = diff_opcodes([item.block_hash for item in existing], block_hashes)
         if not opcodes:
             return False
 
@@ -2161,10 +2563,42 @@ class SyncTaskRunner:
         counts = [item.block_count for item in existing]
         new_states: list[BlockStateItem] = list(existing)
         offset_blocks = 0
+        original_offsets = [0]
+        for count in counts:
+            original_offsets.append(original_offsets[-1] + count)
+        cloud_block_map = {item.get("block_id"): item for item in cloud_items}
+        text_updates: list[dict[str, Any]] = []
+        # 尝试原位更新时已转换过的段落，回退删除重建时直接复用，不再重复调用转换接口
+        converted: dict[str, Any] = {}
 
         for tag, i1, i2, j1, j2 in opcodes:
             if tag == "equal":
                 continue
+            if tag == "replace" and (i2 - i1) == (j2 - j1):
+                requests = await self._plan_inplace_text_updates(
+                    docx_service=docx_service,
+                    document_id=document_id,
+                    cloud_ids=[
+                        root_children[original_offsets[index] : original_offsets[index + 1]]
+                        for index in range(i1, i2)
+                    ],
+                    cloud_block_map=cloud_block_map,
+                    markdown_blocks=blocks[j1:j2],
+                    base_path=base_path,
+                    converted=converted,
+                )
+                if requests is not None:
+                    # 只有文字变化：原位更新文本元素，块 ID 与块数量不变，块级状态只需刷新哈希
+                    text_updates.extend(requests)
+                    start_block = i1 + offset_blocks
+                    for offset in range(i2 - i1):
+                        new_states[start_block + offset] = replace(
+                            new_states[start_block + offset],
+                            file_hash=file_hash,
+                            block_hash=block_hashes[j1 + offset],
+                            updated_at=now,
+                        )
+                    continue
             start_block = i1 + offset_blocks
             end_block = i2 + offset_blocks
             start_index = sum(counts[:start_block])
@@ -2194,6 +2628,7 @@ class SyncTaskRunner:
                         base_path=base_path,
                         user_id_type="open_id",
                         insert_index=insert_index,
+                        current_root_children_count=sum(counts) + insert_index - start_index,
                     )
                     insert_index += count
                     insert_items.append(
@@ -2218,6 +2653,9 @@ class SyncTaskRunner:
                 insert_index = start_index
                 insert_items: list[BlockStateItem] = []
                 for block in blocks[j1:j2]:
+                    extra: dict[str, Any] = {}
+                    if block in converted:
+                        extra["convert"] = converted.pop(block)
                     count = await docx_service.insert_markdown_block(
                         document_id=document_id,
                         root_block_id=root_block["block_id"],
@@ -2225,6 +2663,8 @@ class SyncTaskRunner:
                         base_path=base_path,
                         user_id_type="open_id",
                         insert_index=insert_index,
+                        current_root_children_count=sum(counts) + insert_index - start_index,
+                        **extra,
                     )
                     insert_index += count
                     insert_items.append(
@@ -2256,36 +2696,90 @@ class SyncTaskRunner:
                     new_states[start_block:start_block] = insert_items
                 offset_blocks += (j2 - j1) - (i2 - i1)
 
+        if text_updates:
+            logger.info(
+                "块级更新原位修改文本: document_id={} blocks={}",
+                document_id,
+                len(text_updates),
+            )
+            await docx_service.batch_update_blocks(
+                document_id=document_id,
+                requests=text_updates,
+            )
         for idx, item in enumerate(new_states):
             item.block_index = idx
         await self._block_service.replace_blocks(str(file_path), document_id, new_states)
         return True
 
+    async def _plan_inplace_text_updates(
+        self,
+        *,
+        docx_service: DocxService,
+        document_id: str,
+        cloud_ids: list[list[str]],
+        cloud_block_map: dict[str, dict[str, Any]],
+        markdown_blocks: list[str],
+        base_path: str,
+        converted: dict[str, Any],
+    ) -> list[dict[str, Any]] | None:
+        plan_text_updates = getattr(docx_service, "plan_text_updates", None)
+        if not callable(plan_text_updates) or not callable(
+            getattr(docx_service, "batch_update_blocks", None)
+        ):
+            return None
+        requests: list[dict[str, Any]] = []
+        for ids, markdown_block in zip(cloud_ids, markdown_blocks):
+            current_blocks = [cloud_block_map[block_id] for block_id in ids if block_id in cloud_block_map]
+            if not ids or len(current_blocks) != len(ids):
+                return None
+            convert = await docx_service.convert_markdown_block(
+                markdown_block,
+                document_id=document_id,
+                user_id_type="open_id",
+                base_path=base_path,
+            )
+            converted[markdown_block] = convert
+            planned = await plan_text_updates(
+                document_id,
+                markdown_block,
+                current_ids=ids,
+                current_blocks=current_blocks,
+                base_path=base_path,
+                convert=convert,
+            )
+            if planned is None:
+                return None
+            requests.extend(planned)
+        return requests
+
     async def _rebuild_block_state(
         self,
         *,
         task: SyncTaskItem,
         docx_service: DocxService,
         document_id: str,
-        markdown: str,
+        markdown: str | None,
         base_path: str,
         file_path: Path,
         user_id_type: str,
+        blocks: list[str] | None = None,
+        file_hash: str | None = None,
     ) -> None:
-        blocks = split_markdown_blocks(markdown)
+        if blocks is None:
+            blocks = split_markdown_blocks(markdown or "")
         if not blocks:
             return
         now = time.time()
-        file_hash = calculate_file_hash(file_path)
+        if file_hash is None:
+            file_hash = await self._fs.hash_file(file_path)
         items: list[BlockStateItem] = []
         for idx, block in enumerate(blocks):
-            convert = await docx_service.convert_markdown_with_images(
+            convert = await docx_service.convert_markdown_block(
                 block,
                 document_id=document_id,
                 user_id_type=user_id_type,
                 base_path=base_path,
             )
-            convert = docx_service._normalize_convert(convert)
             items.append(
                 BlockStateItem(
                     file_hash=file_hash,
@@ -2503,13 +2997,6 @@ def _has_markdown_table_render_revision(revision: str | None) -> bool:
     return bool(revision and _MARKDOWN_TABLE_RENDER_REVISION_MARKER in revision)
 
 
-def _normalize_markdown_resource_ref(raw: str) -> str:
-    ref = raw.strip()
-    if ref.startswith("<") and ref.endswith(">"):
-        ref = ref[1:-1].strip()
-    return re.sub(r"""\s+(?:"[^"]*"|'[^']*'|\([^()]*\))\s*$""", "", ref)
-
-
 def _is_uploadable_markdown_image_ref(
     ref: str, base_path: str | Path | None
 ) -> bool:
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import random
+import statistics
+from dataclasses import dataclass
+
+# 没有历史运行记录时的默认成本估计
+_DEFAULT_COST_SECONDS = 60.0
+# 抖动不超过该任务所占时间片的比例，保证不会越过下一个任务的起点
+_JITTER_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class PlannedStart:
+    task_id: str
+    offset_seconds: float
+    predecessor: str | None = None
+
+
+def plan_staggered_starts(
+    costs: dict[str, float | None],
+    *,
+    window_seconds: float,
+    slot_key: str,
+) -> list[PlannedStart]:
+    """把共用同一定时点的任务分散到 window_seconds 内。
+
+    每个任务按估算成本占用一段时间片，成本大的先开始、之后留出更长的间隔；起点在
+    自己时间片的前半段内抖动。抖动由 slot_key（通常是计划日期）与任务 ID 决定，同一
+    时间点重复规划（如调度器重启）结果一致，不同日期则不再落在同一秒。
+    """
+    if not costs:
+        return []
+    known = [float(cost) for cost in costs.values() if cost is not None and cost > 0]
+    fallback = statistics.median(known) if known else _DEFAULT_COST_SECONDS
+    resolved = {
+        task_id: float(cost) if cost is not None and cost > 0 else fallback
+        for task_id, cost in costs.items()
+    }
+    order = sorted(resolved, key=lambda task_id: (-resolved[task_id], task_id))
+    window = max(0.0, float(window_seconds))
+    total = sum(resolved.values())
+    planned: list[PlannedStart] = []
+    elapsed = 0.0
+    previous: str | None = None
+    for task_id in order:
+        share = window * resolved[task_id] / total if total > 0 else 0.0
+        jitter = random.Random(f"{slot_key}:{task_id}").uniform(0.0, share * _JITTER_RATIO)
+        planned.append(
+            PlannedStart(
+                task_id=task_id,
+                offset_seconds=round(elapsed + jitter, 3),
+                predecessor=previous,
+            )
+        )
+        elapsed += share
+        previous = task_id
+    return planned
+
+
+__all__ = ["PlannedStart", "plan_staggered_starts"]
@@ -3,12 +3,15 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 from datetime import datetime, time as dt_time, timedelta
+from typing import Awaitable, Callable
 
 from loguru import logger
 
 from src.core.config import ConfigManager, SyncIntervalUnit
+from src.services.sync_run_service import SyncRunService
 from src.services.sync_runner import SyncTaskRunner
-from src.services.sync_task_service import SyncTaskService, SyncTaskItem
+from src.services.sync_schedule_planner import PlannedStart, plan_staggered_starts
+from src.services.sync_task_service import SyncTaskChange, SyncTaskService, SyncTaskItem
 
 
 @dataclass
@@ -19,6 +22,19 @@ class ScheduleSnapshot:
     download_interval_value: float
     download_interval_unit: SyncIntervalUnit
     download_daily_time: str
+    schedule_spread_minutes: int = 30
+    schedule_chain_tasks: bool = False
+
+
+@dataclass
+class _SlotPlan:
+    task_ids: frozenset[str]
+    starts: dict[str, PlannedStart]
+    costs: dict[str, float]
+
+
+# 串行模式下等待前一个任务的上限，避免前一个任务计划错位时无限等待
+_CHAIN_WAIT_MIN_SECONDS = 600.0
 
 
 class SyncScheduler:
@@ -27,10 +43,14 @@ class SyncScheduler:
         runner: SyncTaskRunner,
         task_service: SyncTaskService,
         config_manager: ConfigManager | None = None,
+        run_service: SyncRunService | None = None,
     ) -> None:
         self._runner = runner
         self._task_service = task_service
         self._config_manager = config_manager or ConfigManager.get()
+        self._run_service = run_service or SyncRunService()
+        self._slot_plans: dict[tuple[str, datetime], _SlotPlan] = {}
+        self._slot_done: dict[tuple[str, datetime, str], asyncio.Event] = {}
         self._stop_event = asyncio.Event()
         self._upload_task: asyncio.Task[None] | None = None
         self._download_task: asyncio.Task[None] | None = None
@@ -38,12 +58,19 @@ class SyncScheduler:
         self._download_workers: dict[str, asyncio.Task[None]] = {}
         self._upload_task_meta: dict[str, SyncTaskItem] = {}
         self._download_task_meta: dict[str, SyncTaskItem] = {}
-        self._task_refresh_interval_seconds = 1.0
+        # 任务变更由 SyncTaskService 通知触发刷新；定时刷新只作为兜底（如登录账号变化）
+        self._task_refresh_interval_seconds = 60.0
+        self._upload_dirty = asyncio.Event()
+        self._download_dirty = asyncio.Event()
+        self._unsubscribe_changes: Callable[[], None] | None = None
 
     async def start(self) -> None:
         if self._upload_task or self._download_task:
             return
         self._stop_event.clear()
+        subscribe = getattr(self._task_service, "subscribe_changes", None)
+        if callable(subscribe) and self._unsubscribe_changes is None:
+            self._unsubscribe_changes = subscribe(self._on_task_change)
         await self._ensure_watchers()
         self._upload_task = asyncio.create_task(self._upload_loop())
         self._download_task = asyncio.create_task(self._download_loop())
@@ -51,6 +78,9 @@ class SyncScheduler:
 
     async def stop(self) -> None:
         self._stop_event.set()
+        if self._unsubscribe_changes is not None:
+            self._unsubscribe_changes()
+            self._unsubscribe_changes = None
         for task in (
             self._upload_task,
             self._download_task,
@@ -76,6 +106,8 @@ class SyncScheduler:
         self._download_workers.clear()
         self._upload_task_meta.clear()
         self._download_task_meta.clear()
+        self._slot_plans.clear()
+        self._slot_done.clear()
         logger.info("同步调度器已停止")
 
     def _snapshot(self) -> ScheduleSnapshot:
@@ -87,6 +119,8 @@ class SyncScheduler:
             download_interval_value=_safe_interval(config.download_interval_value),
             download_interval_unit=config.download_interval_unit,
             download_daily_time=config.download_daily_time,
+            schedule_spread_minutes=max(0, int(getattr(config, "schedule_spread_minutes", 30) or 0)),
+            schedule_chain_tasks=bool(getattr(config, "schedule_chain_tasks", False)),
         )
 
     async def _ensure_watchers(self) -> None:
@@ -97,28 +131,40 @@ class SyncScheduler:
             if task.sync_mode in {"bidirectional", "upload_only"}:
                 self._runner.ensure_watcher(task)
 
+    def _on_task_change(self, change: SyncTaskChange) -> None:
+        logger.debug("任务变更，刷新调度: task_id={} kind={}", change.task_id, change.kind)
+        self._upload_dirty.set()
+        self._download_dirty.set()
+
     async def _upload_loop(self) -> None:
         while not self._stop_event.is_set():
+            # 先清标记再刷新：刷新期间到达的变更会触发下一轮
+            self._upload_dirty.clear()
             try:
                 await self._reconcile_upload_workers()
             except asyncio.CancelledError:
                 raise
             except Exception:
                 logger.exception("刷新上传调度任务失败")
-            if await self._wait_for_stop(self._task_refresh_interval_seconds):
+            if await self._wait_for_change(self._upload_dirty):
                 break
 
     async def _download_loop(self) -> None:
         while not self._stop_event.is_set():
+            self._download_dirty.clear()
             try:
                 await self._reconcile_download_workers()
             except asyncio.CancelledError:
                 raise
             except Exception:
                 logger.exception("刷新下载调度任务失败")
-            if await self._wait_for_stop(self._task_refresh_interval_seconds):
+            if await self._wait_for_change(self._download_dirty):
                 break
 
+    async def _wait_for_change(self, dirty: asyncio.Event) -> bool:
+        """等待任务变更或兜底刷新间隔；调度器停止时返回 True。"""
+        return await self._wait_for_event(dirty, self._task_refresh_interval_seconds)
+
     async def _reconcile_upload_workers(self) -> None:
         tasks = await self._task_service.list_tasks()
         eligible = {task.id: task for task in tasks if _should_upload(task)}
@@ -131,6 +177,11 @@ class SyncScheduler:
             except asyncio.CancelledError:
                 pass
             self._upload_workers.pop(task_id, None)
+        stop_watcher = getattr(self._runner, "stop_watcher", None)
+        if callable(stop_watcher):
+            # 不再需要上传的任务及时撤销共享监听中的订阅
+            for task_id in self._upload_task_meta.keys() - eligible.keys():
+                stop_watcher(task_id)
         self._upload_task_meta = eligible
         for task in eligible.values():
             self._runner.ensure_watcher(task)
@@ -193,19 +244,16 @@ class SyncScheduler:
                 interval_days=_safe_days(snapshot.upload_interval_value),
                 last_run=last_daily_run,
             )
-            wait_seconds = max(0.0, (next_run - datetime.now()).total_seconds())
-            logger.info(
-                "任务下一次本地上传计划: task_id={} time={} ({}s)",
-                task.id,
-                next_run.strftime("%Y-%m-%d %H:%M:%S"),
-                int(wait_seconds),
-            )
-            if await self._wait_for_stop(wait_seconds):
-                return
-            task = self._upload_task_meta.get(task_id)
-            if task is None or not _should_upload(task):
+
+            async def _run_upload() -> bool:
+                task = self._upload_task_meta.get(task_id)
+                if task is None or not _should_upload(task):
+                    return False
+                await self._runner.run_scheduled_upload(task)
+                return True
+
+            if not await self._run_daily_slot("upload", task_id, next_run, snapshot, _run_upload):
                 return
-            await self._runner.run_scheduled_upload(task)
             last_daily_run = next_run
 
     async def _run_download_worker(self, task_id: str) -> None:
@@ -240,20 +288,123 @@ class SyncScheduler:
                 interval_days=_safe_days(snapshot.download_interval_value),
                 last_run=last_daily_run,
             )
-            wait_seconds = max(0.0, (next_run - datetime.now()).total_seconds())
+
+            async def _run_download() -> bool:
+                task = self._download_task_meta.get(task_id)
+                if task is None or not _should_download(task):
+                    return False
+                await self._runner.run_scheduled_download(task)
+                return True
+
+            if not await self._run_daily_slot(
+                "download", task_id, next_run, snapshot, _run_download
+            ):
+                return
+            last_daily_run = next_run
+
+    async def _run_daily_slot(
+        self,
+        direction: str,
+        task_id: str,
+        slot: datetime,
+        snapshot: ScheduleSnapshot,
+        run: Callable[[], Awaitable[bool]],
+    ) -> bool:
+        """在错峰后的时间点执行一次按天计划；返回 False 表示 worker 应退出。"""
+        done = self._slot_event(direction, slot, task_id)
+        try:
+            plan = await self._plan_for_slot(direction, slot, snapshot)
+            planned = plan.starts.get(task_id)
+            start_at = slot + timedelta(seconds=planned.offset_seconds if planned else 0.0)
+            wait_seconds = max(0.0, (start_at - datetime.now()).total_seconds())
             logger.info(
-                "任务下一次云端下载计划: task_id={} time={} ({}s)",
-                task.id,
-                next_run.strftime("%Y-%m-%d %H:%M:%S"),
+                "任务下一次{}计划: task_id={} time={} ({}s)",
+                "本地上传" if direction == "upload" else "云端下载",
+                task_id,
+                start_at.strftime("%Y-%m-%d %H:%M:%S"),
                 int(wait_seconds),
             )
             if await self._wait_for_stop(wait_seconds):
-                return
-            task = self._download_task_meta.get(task_id)
-            if task is None or not _should_download(task):
-                return
-            await self._runner.run_scheduled_download(task)
-            last_daily_run = next_run
+                return False
+            if snapshot.schedule_chain_tasks and planned and planned.predecessor:
+                if await self._wait_for_predecessor(direction, slot, plan, planned.predecessor):
+                    return False
+            return await run()
+        finally:
+            # 无论执行、失败还是被取消都放行串行链上的下一个任务
+            done.set()
+
+    async def _plan_for_slot(
+        self, direction: str, slot: datetime, snapshot: ScheduleSnapshot
+    ) -> _SlotPlan:
+        meta = self._upload_task_meta if direction == "upload" else self._download_task_meta
+        task_ids = frozenset(meta)
+        key = (direction, slot)
+        plan = self._slot_plans.get(key)
+        if plan is not None and plan.task_ids == task_ids:
+            return plan
+        costs = await self._run_service.estimate_durations(
+            sorted(task_ids),
+            trigger_source=f"scheduled_{direction}",
+        )
+        starts = plan_staggered_starts(
+            {task_id: costs.get(task_id) for task_id in task_ids},
+            window_seconds=snapshot.schedule_spread_minutes * 60,
+            slot_key=slot.strftime("%Y-%m-%d %H:%M"),
+        )
+        plan = _SlotPlan(
+            task_ids=task_ids,
+            starts={item.task_id: item for item in starts},
+            costs=costs,
+        )
+        expired = slot - timedelta(days=2)
+        self._slot_plans = {
+            item_key: item for item_key, item in self._slot_plans.items() if item_key[1] > expired
+        }
+        self._slot_done = {
+            item_key: item for item_key, item in self._slot_done.items() if item_key[1] > expired
+        }
+        self._slot_plans[key] = plan
+        return plan
+
+    def _slot_event(self, direction: str, slot: datetime, task_id: str) -> asyncio.Event:
+        key = (direction, slot, task_id)
+        event = self._slot_done.get(key)
+        if event is None:
+            event = asyncio.Event()
+            self._slot_done[key] = event
+        return event
+
+    async def _wait_for_predecessor(
+        self, direction: str, slot: datetime, plan: _SlotPlan, predecessor: str
+    ) -> bool:
+        """等待同一时间点的前一个任务结束；调度器停止时返回 True。"""
+        done = self._slot_event(direction, slot, predecessor)
+        limit = max(_CHAIN_WAIT_MIN_SECONDS, 3 * plan.costs.get(predecessor, 0.0))
+        if await self._wait_for_event(done, limit):
+            return True
+        if not done.is_set():
+            logger.warning(
+                "等待前序任务超时，继续执行: predecessor={} limit={}s", predecessor, int(limit)
+            )
+        return False
+
+    async def _wait_for_event(self, event: asyncio.Event, timeout: float) -> bool:
+        """等待 event 或超时；调度器停止时返回 True。"""
+        waiters = [
+            asyncio.ensure_future(self._stop_event.wait()),
+            asyncio.ensure_future(event.wait()),
+        ]
+        try:
+            await asyncio.wait(
+                waiters,
+                timeout=max(0.0, timeout),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return self._stop_event.is_set()
 
     async def _wait_for_stop(self, timeout: float) -> bool:
         try:
@@ -5,6 +5,9 @@ import uuid
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Literal
+
+from loguru import logger
 
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
@@ -53,16 +56,60 @@ class SyncTaskValidationError(ValueError):
     pass
 
 
+@dataclass(frozen=True)
+class SyncTaskChange:
+    kind: Literal["created", "updated", "deleted"]
+    task_id: str
+
+
+SyncTaskChangeListener = Callable[[SyncTaskChange], None]
+
+
+class SyncTaskChangeNotifier:
+    """进程内任务变更通知：所有 SyncTaskService 实例共用，写库提交后同步回调监听者。"""
+
+    def __init__(self) -> None:
+        self._listeners: list[SyncTaskChangeListener] = []
+
+    def subscribe(self, listener: SyncTaskChangeListener) -> Callable[[], None]:
+        self._listeners.append(listener)
+
+        def _unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _unsubscribe
+
+    def publish(self, change: SyncTaskChange) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception:
+                logger.exception("任务变更通知回调失败: task_id={}", change.task_id)
+
+
+_task_change_notifier = SyncTaskChangeNotifier()
+
+
+def get_task_change_notifier() -> SyncTaskChangeNotifier:
+    return _task_change_notifier
+
+
 class SyncTaskService:
     def __init__(
         self,
         session_maker: async_sessionmaker[AsyncSession] | None = None,
         owner_device_id: str | None = None,
         owner_open_id: str | None | object = _OWNER_OPEN_ID_UNSET,
+        notifier: SyncTaskChangeNotifier | None = None,
     ) -> None:
         self._session_maker = session_maker or get_session_maker()
         self._owner_device_id = owner_device_id or current_device_id()
         self._owner_open_id = owner_open_id
+        self._notifier = notifier or get_task_change_notifier()
+
+    def subscribe_changes(self, listener: SyncTaskChangeListener) -> Callable[[], None]:
+        return self._notifier.subscribe(listener)
 
     async def create_task(
         self,
@@ -132,6 +179,7 @@ class SyncTaskService:
             )
             session.add(record)
             await session.commit()
+        self._notifier.publish(SyncTaskChange("created", record.id))
         return self._to_item(record)
 
     async def list_tasks(self) -> list[SyncTaskItem]:
@@ -268,6 +316,7 @@ class SyncTaskService:
                 record.owner_open_id = open_id
             record.updated_at = time.time()
             await session.commit()
+            self._notifier.publish(SyncTaskChange("updated", record.id))
             return self._to_item(record)
 
     async def delete_task(self, task_id: str) -> bool:
@@ -280,6 +329,7 @@ class SyncTaskService:
                 return False
             await session.delete(record)
             await session.commit()
+            self._notifier.publish(SyncTaskChange("deleted", task_id))
             return True
 
     async def mark_task_run(
@@ -296,6 +346,8 @@ class SyncTaskService:
             record.last_run_at = now
             record.updated_at = now
             await session.commit()
+            # 调度器缓存的任务快照依赖 last_run_at 判断是否需要补齐
+            self._notifier.publish(SyncTaskChange("updated", task_id))
             return True
 
     def _effective_owner_open_id(self) -> str | None:
@@ -640,4 +692,11 @@ class SyncTaskService:
         )
 
 
-__all__ = ["SyncTaskItem", "SyncTaskService", "SyncTaskValidationError"]
+__all__ = [
+    "SyncTaskChange",
+    "SyncTaskChangeNotifier",
+    "SyncTaskItem",
+    "SyncTaskService",
+    "SyncTaskValidationError",
+    "get_task_change_notifier",
+]
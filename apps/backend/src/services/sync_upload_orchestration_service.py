@@ -15,10 +15,11 @@ from src.services.sync_task_service import SyncTaskItem
 
 PrefillLinksFn = Callable[[SyncTaskItem, DriveService], Awaitable[None]]
 EnqueueMissingLocalDeletesFn = Callable[..., Awaitable[None]]
-IterLocalFilesFn = Callable[[SyncTaskItem], Iterable[Path]]
+ListLocalFilesFn = Callable[[SyncTaskItem], Awaitable[list[Path]]]
 UploadPathFn = Callable[..., Awaitable[None]]
 ProcessPendingDeletesFn = Callable[..., Awaitable[None]]
 RecordEventFn = Callable[[SyncTaskStatus, SyncFileEvent, SyncTaskItem | None], None]
+ReconcileLocalMovesFn = Callable[..., Awaitable[int]]
 
 
 @dataclass
@@ -36,17 +37,19 @@ class SyncUploadOrchestrationService:
         *,
         prefill_links_from_cloud: PrefillLinksFn,
         enqueue_missing_local_deletes: EnqueueMissingLocalDeletesFn,
-        iter_local_files: IterLocalFilesFn,
+        list_local_files: ListLocalFilesFn,
         upload_path: UploadPathFn,
         process_pending_deletes: ProcessPendingDeletesFn,
         record_event: RecordEventFn,
+        reconcile_local_moves: ReconcileLocalMovesFn | None = None,
     ) -> None:
         self._prefill_links_from_cloud = prefill_links_from_cloud
         self._enqueue_missing_local_deletes = enqueue_missing_local_deletes
-        self._iter_local_files = iter_local_files
+        self._list_local_files = list_local_files
         self._upload_path = upload_path
         self._process_pending_deletes = process_pending_deletes
         self._record_event = record_event
+        self._reconcile_local_moves = reconcile_local_moves
 
     async def run_upload(
         self,
@@ -60,8 +63,10 @@ class SyncUploadOrchestrationService:
             if task.sync_mode == "upload_only":
                 await self._prefill_links_from_cloud(task, runtime.drive_service)
             if allow_deletes:
+                # 先把可识别的改名转为云端移动，剩余的缺失文件才进入删除流程
+                await self._reconcile_moves(task, status, runtime)
                 await self._enqueue_missing_local_deletes(task=task, status=status)
-            files = list(self._iter_local_files(task))
+            files = await self._list_local_files(task)
             logger.info("上传阶段: task_id={} files={}", task.id, len(files))
             status.total_files += len(files)
             for path in files:
@@ -95,6 +100,7 @@ class SyncUploadOrchestrationService:
             if task.sync_mode == "upload_only":
                 await self._prefill_links_from_cloud(task, runtime.drive_service)
             if allow_deletes:
+                await self._reconcile_moves(task, status, runtime)
                 await self._enqueue_missing_local_deletes(task=task, status=status)
             path_list = list(paths)
             status.total_files += len(path_list)
@@ -115,6 +121,24 @@ class SyncUploadOrchestrationService:
         finally:
             await self._close_owned_services(runtime)
 
+    async def _reconcile_moves(
+        self,
+        task: SyncTaskItem,
+        status: SyncTaskStatus,
+        runtime: UploadRuntimeServices,
+    ) -> None:
+        if self._reconcile_local_moves is None:
+            return
+        try:
+            await self._reconcile_local_moves(
+                task=task,
+                status=status,
+                drive_service=runtime.drive_service,
+                docx_service=runtime.docx_service,
+            )
+        except Exception as exc:
+            logger.warning("本地改名识别失败，按删除+上传处理: task_id={} error={}", task.id, exc)
+
     async def _upload_with_guard(
         self,
         *,
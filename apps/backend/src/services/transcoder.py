@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import os
 import time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from loguru import logger
 
 from src.core.paths import data_dir
+from src.services.async_fs import AsyncFileSystem, get_async_fs
 from src.services.docx_parser import (
     BLOCK_TYPE_ADD_ONS,
     BLOCK_TYPE_BULLET,
@@ -35,10 +39,16 @@ from src.services.docx_parser import (
 )
 from src.services.feishu_client import FeishuClient
 from src.services.file_downloader import FileDownloader
+from src.services.file_writer import MarkdownStreamWriter
 from src.services.path_sanitizer import sanitize_filename
 from src.services.sheet_service import SheetService
 from src.services.transcoder_sheet_helper import TranscoderSheetHelper
 
+# 渲染是按块层级递归的；超过该深度的子树整体折叠为一行纯文本，避免触及递归上限
+_MAX_RENDER_DEPTH = 100
+# 流式写出时累计到该行数再交给 writer，减少切换到文件线程池的次数
+_STREAM_FLUSH_LINES = 256
+
 
 def _default_assets_root() -> Path:
     return data_dir() / "assets"
@@ -46,31 +56,51 @@ def _default_assets_root() -> Path:
 
 class MediaDownloader:
     def __init__(
-        self, client: FeishuClient | None = None, base_url: str = "https://open.feishu.cn"
+        self,
+        client: FeishuClient | None = None,
+        base_url: str = "https://open.feishu.cn",
+        *,
+        async_fs: AsyncFileSystem | None = None,
     ) -> None:
         self._client = client or FeishuClient()
         self._base_url = base_url.rstrip("/")
+        self._fs = async_fs or get_async_fs()
 
     async def download(self, file_token: str, output_path: Path) -> None:
         url = f"{self._base_url}/open-apis/drive/v1/medias/{file_token}/download"
         response = await self._client.request("GET", url)
         response.raise_for_status()
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_bytes(response.content)
+        await self._fs.mkdir(output_path.parent)
+        await self._fs.run(output_path.write_bytes, response.content)
 
     async def close(self) -> None:
         await self._client.close()
+@dataclass
+class _RenderContext:
+    ordered_ids: list[str]
+    images: list[tuple[str, Path]]
+    attachments: list[tuple[str, str, Path]]
+    render_kwargs: dict[str, Any]
+
+
 class _LineBuffer:
     def __init__(self, blank_line: str = "") -> None:
         self.lines: list[str] = []
         self._blank_line = blank_line
+        self._last_line: str | None = None
 
     def add_block(self, block_lines: list[str]) -> None:
         if not block_lines:
             return
-        if self.lines and self.lines[-1] != self._blank_line:
+        if self._last_line is not None and self._last_line != self._blank_line:
             self.lines.append(self._blank_line)
         self.lines.extend(block_lines)
+        self._last_line = block_lines[-1]
+
+    def drain(self) -> list[str]:
+        """取出已缓存的行；块间空行按已写出的最后一行继续判断。"""
+        lines, self.lines = self.lines, []
+        return lines
 
 
 class DocxTranscoder:
@@ -98,6 +128,55 @@ class DocxTranscoder:
         base_dir: Path | None = None,
         link_map: dict[str, Path] | None = None,
     ) -> str:
+        lines = await self._render_lines(
+            document_id, blocks, base_dir=base_dir, link_map=link_map
+        )
+        return "\n".join(lines).strip()
+
+    async def stream_markdown(
+        self,
+        document_id: str,
+        blocks: list[dict],
+        writer: MarkdownStreamWriter,
+        *,
+        base_dir: Path | None = None,
+        link_map: dict[str, Path] | None = None,
+    ) -> None:
+        """与 to_markdown 输出相同，但按顶层块逐段交给 writer，内存占用不随文档长度增长。"""
+        context = await self._prepare_render(
+            document_id, blocks, base_dir=base_dir, link_map=link_map
+        )
+        buffer = _LineBuffer()
+        for group_lines in self._iter_block_groups(context.ordered_ids, **context.render_kwargs):
+            buffer.add_block(group_lines)
+            if len(buffer.lines) >= _STREAM_FLUSH_LINES:
+                await writer.write_lines_async(buffer.drain())
+        await writer.write_lines_async(buffer.drain())
+        await self._download_resources(context.images, context.attachments)
+
+    async def _render_lines(
+        self,
+        document_id: str,
+        blocks: list[dict],
+        *,
+        base_dir: Path | None,
+        link_map: dict[str, Path] | None,
+    ) -> list[str]:
+        context = await self._prepare_render(
+            document_id, blocks, base_dir=base_dir, link_map=link_map
+        )
+        lines = self._render_block_ids(context.ordered_ids, **context.render_kwargs)
+        await self._download_resources(context.images, context.attachments)
+        return lines
+
+    async def _prepare_render(
+        self,
+        document_id: str,
+        blocks: list[dict],
+        *,
+        base_dir: Path | None,
+        link_map: dict[str, Path] | None,
+    ) -> _RenderContext:
         resolved_base = Path(base_dir) if base_dir is not None else None
         resolved_link_map = link_map or {}
         link_rewriter = self._build_link_rewriter(resolved_base, resolved_link_map)
@@ -107,19 +186,28 @@ class DocxTranscoder:
         sheet_tables = await self._sheet_helper.prepare_sheet_tables(blocks)
         images: list[tuple[str, Path]] = []
         attachments: list[tuple[str, str, Path]] = []
-        lines = self._render_block_ids(
-            ordered_ids,
-            parser,
-            document_id,
-            images,
-            attachments,
-            base_dir=resolved_base,
-            link_map=resolved_link_map,
-            base_indent="",
-            quote_prefix="",
-            sheet_tables=sheet_tables,
+        return _RenderContext(
+            ordered_ids=ordered_ids,
+            images=images,
+            attachments=attachments,
+            render_kwargs={
+                "parser": parser,
+                "document_id": document_id,
+                "images": images,
+                "attachments": attachments,
+                "base_dir": resolved_base,
+                "link_map": resolved_link_map,
+                "base_indent": "",
+                "quote_prefix": "",
+                "sheet_tables": sheet_tables,
+            },
         )
 
+    async def _download_resources(
+        self,
+        images: list[tuple[str, Path]],
+        attachments: list[tuple[str, str, Path]],
+    ) -> None:
         for token, path in images:
             try:
                 await self._downloader.download(token, path)
@@ -149,8 +237,6 @@ class DocxTranscoder:
                 except Exception:
                     continue
 
-        return "\n".join(lines).strip()
-
     def _render_block_ids(
         self,
         block_ids: list[str],
@@ -167,6 +253,36 @@ class DocxTranscoder:
     ) -> list[str]:
         blank_line = quote_prefix.rstrip() if quote_prefix else ""
         buffer = _LineBuffer(blank_line=blank_line)
+        for lines in self._iter_block_groups(
+            block_ids,
+            parser,
+            document_id,
+            images,
+            attachments,
+            base_dir=base_dir,
+            link_map=link_map,
+            base_indent=base_indent,
+            quote_prefix=quote_prefix,
+            sheet_tables=sheet_tables,
+        ):
+            buffer.add_block(lines)
+        return buffer.lines
+
+    def _iter_block_groups(
+        self,
+        block_ids: list[str],
+        parser: DocxParser,
+        document_id: str,
+        images: list[tuple[str, Path]],
+        attachments: list[tuple[str, str, Path]],
+        *,
+        base_dir: Path | None,
+        link_map: dict[str, Path],
+        base_indent: str,
+        quote_prefix: str,
+        sheet_tables: dict[str, list[str]],
+    ) -> Iterator[list[str]]:
+        """按顺序渲染块，每次产出一个顶层块（或一组连续列表项）的行。"""
         index = 0
         while index < len(block_ids):
             block_id = block_ids[index]
@@ -174,6 +290,13 @@ class DocxTranscoder:
             if not block:
                 index += 1
                 continue
+            if parser.depth(block_id) > _MAX_RENDER_DEPTH:
+                text = parser.collect_text(block_id, max_depth=None)
+                if text:
+                    prefix = f"{quote_prefix}{base_indent}"
+                    yield [self._line_with_prefix(prefix, text, keep_blank=bool(quote_prefix))]
+                index += 1
+                continue
             block_type = block.get("block_type")
             if block_type in LIST_BLOCK_TYPES:
                 group_ids = [block_id]
@@ -199,7 +322,7 @@ class DocxTranscoder:
                     quote_prefix=quote_prefix,
                     sheet_tables=sheet_tables,
                 )
-                buffer.add_block(lines)
+                yield lines
                 continue
 
             lines = self._render_block(
@@ -214,11 +337,9 @@ class DocxTranscoder:
                 quote_prefix=quote_prefix,
                 sheet_tables=sheet_tables,
             )
-            buffer.add_block(lines)
+            yield lines
             index += 1
 
-        return buffer.lines
-
     def _render_list_group(
         self,
         block_ids: list[str],
@@ -613,7 +734,7 @@ class DocxTranscoder:
         cell = parser.get_block(cell_id)
         if not cell:
             return ""
-        children = cell.get("children") or []
+        children = parser.children_ids(cell_id)
         if children:
             lines = self._render_block_ids(
                 children,
@@ -685,7 +806,7 @@ class DocxTranscoder:
     @staticmethod
     def _extract_file_info(block: dict) -> tuple[str | None, str | None]:
         file_info = block.get("file")
-        if isinstance(file_info, dict):
+        if isinstance(file_info, Mapping):
             token = file_info.get("token") or file_info.get("file_token")
             name = (
                 file_info.get("name")
@@ -702,7 +823,7 @@ class DocxTranscoder:
             return token, name
 
         for value in block.values():
-            if not isinstance(value, dict):
+            if not isinstance(value, Mapping):
                 continue
             token = value.get("token") or value.get("file_token")
             name = value.get("name") or value.get("title") or value.get("file_name")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Mapping
 from urllib.parse import unquote
 
 from loguru import logger
@@ -168,7 +169,7 @@ class TranscoderSheetHelper:
         if isinstance(value, list):
             parts = [TranscoderSheetHelper.sheet_cell_text(item, depth - 1) for item in value]
             return "".join(part for part in parts if part)
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             text = value.get("text")
             if isinstance(text, str):
                 styled = TranscoderSheetHelper.sheet_apply_inline_style(
@@ -222,7 +223,7 @@ class TranscoderSheetHelper:
         if isinstance(value, str):
             cleaned = value.strip()
             return unquote(cleaned) if cleaned else None
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             for key in ("url", "href", "link"):
                 nested = value.get(key)
                 extracted = TranscoderSheetHelper.sheet_extract_link(nested, depth - 1)
@@ -232,7 +233,7 @@ class TranscoderSheetHelper:
 
     @staticmethod
     def sheet_apply_inline_style(text: str, style: object) -> str:
-        if not isinstance(style, dict):
+        if not isinstance(style, Mapping):
             return text
         rendered = text
         if style.get("inline_code") or style.get("inlineCode"):
@@ -250,7 +251,7 @@ class TranscoderSheetHelper:
     @staticmethod
     def render_add_ons_block(block: dict) -> list[str]:
         add_ons = block.get("add_ons")
-        if not isinstance(add_ons, dict):
+        if not isinstance(add_ons, Mapping):
             return []
         data = TranscoderSheetHelper.extract_add_ons_data(add_ons)
         if not data:
@@ -274,12 +275,12 @@ class TranscoderSheetHelper:
                 parsed = json.loads(raw)
             except json.JSONDecodeError:
                 return raw
-        if isinstance(parsed, dict):
+        if isinstance(parsed, Mapping):
             data = parsed.get("data")
             if isinstance(data, str):
                 return data
             try:
-                return json.dumps(parsed, ensure_ascii=False)
+                return json.dumps(parsed, ensure_ascii=False, default=dict)
             except TypeError:
                 return ""
         return ""
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import errno
+import math
+import os
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable
 
+from loguru import logger
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+from src.services.watcher_overflow import create_observer
+
 
 @dataclass
 class FileChangeEvent:
@@ -18,39 +25,219 @@ class FileChangeEvent:
     is_directory: bool = False
 
 
+_WHEEL_TICK_SECONDS = 1.0
+_DEFAULT_MAX_ENTRIES = 100_000
+_DEFAULT_MAX_PREFIXES = 4_096
+_DEFAULT_HEALTH_INTERVAL_SECONDS = 5.0
+# inotify watch 数 / 实例数达到上限时 schedule 抛出的错误码
+_WATCH_LIMIT_ERRNOS = {errno.ENOSPC, errno.EMFILE}
+
+
+@dataclass(frozen=True)
+class ExpiryMetrics:
+    size: int
+    capacity: int
+    inserted: int
+    expired: int
+    evicted: int
+
+
+@dataclass(frozen=True)
+class WatcherHealth:
+    observer_alive: bool
+    watched_roots: int
+    observer_restarts: int
+    emitter_restarts: int
+    overflows: int
+    watch_limit_errors: int
+    resyncs: int
+    last_issue: str | None
+    last_issue_at: float | None
+
+
+class _ExpiryWheel:
+    """按到期 tick 分桶的哈希时间轮，替代只在查询时惰性清理的字典。
+
+    写入与查询均摊 O(1)：时间推进时整桶回收已到期条目，条目数超过上限时从最早
+    到期的桶开始逐条淘汰，内存占用与监听过的路径总数无关。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        tick: float = _WHEEL_TICK_SECONDS,
+    ) -> None:
+        self._name = name
+        self._max_entries = max(1, int(max_entries))
+        self._tick = tick
+        self._expires: dict[str, float] = {}
+        self._buckets: dict[int, dict[str, None]] = {}
+        self._cursor: int | None = None
+        self._lock = threading.Lock()
+        self._inserted = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def get(self, key: str, now: float) -> float | None:
+        with self._lock:
+            self._advance(now)
+            return self._expires.get(key)
+
+    def set(self, key: str, expires_at: float, now: float) -> None:
+        with self._lock:
+            self._advance(now)
+            previous = self._expires.get(key)
+            self._expires[key] = expires_at
+            if previous is None:
+                self._inserted += 1
+            slot = self._slot(expires_at)
+            if previous is None or self._slot(previous) != slot:
+                self._buckets.setdefault(slot, {})[key] = None
+            while len(self._expires) > self._max_entries:
+                self._evict_earliest()
+
+    def metrics(self) -> ExpiryMetrics:
+        with self._lock:
+            return ExpiryMetrics(
+                size=len(self._expires),
+                capacity=self._max_entries,
+                inserted=self._inserted,
+                expired=self._expired,
+                evicted=self._evicted,
+            )
+
+    def _slot(self, expires_at: float) -> int:
+        slot = math.ceil(expires_at / self._tick)
+        # 已经推进过的桶不会再被回收，过去的到期时间放进下一个桶
+        if self._cursor is not None and slot <= self._cursor:
+            return self._cursor + 1
+        return slot
+
+    def _advance(self, now: float) -> None:
+        current = math.floor(now / self._tick)
+        if self._cursor is not None and current <= self._cursor:
+            return
+        if self._cursor is None or current - self._cursor > len(self._buckets):
+            due = sorted(slot for slot in self._buckets if slot <= current)
+        else:
+            due = [slot for slot in range(self._cursor + 1, current + 1) if slot in self._buckets]
+        self._cursor = current
+        for slot in due:
+            for key in self._buckets.pop(slot):
+                expires_at = self._expires.get(key)
+                # 条目被续期到更晚的桶时，这里只是过期的旧引用
+                if expires_at is not None and expires_at <= now:
+                    del self._expires[key]
+                    self._expired += 1
+
+    def _evict_earliest(self) -> None:
+        slot = min(self._buckets)
+        bucket = self._buckets[slot]
+        key = next(iter(bucket))
+        del bucket[key]
+        if not bucket:
+            del self._buckets[slot]
+        expires_at = self._expires.get(key)
+        if expires_at is None or self._slot(expires_at) > slot:
+            return
+        del self._expires[key]
+        if not self._evicted:
+            logger.warning("{} 条目达到上限 {}，开始淘汰最早到期的条目", self._name, self._max_entries)
+        self._evicted += 1
+
+
 class DebounceFilter:
-    def __init__(self, window_seconds: float = 2.0) -> None:
+    def __init__(
+        self,
+        window_seconds: float = 2.0,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+    ) -> None:
         self._window = window_seconds
-        self._last_seen: dict[str, float] = {}
+        self._wheel = _ExpiryWheel("DebounceFilter", max_entries=max_entries)
 
     def should_emit(self, path: str, now: float | None = None) -> bool:
         now = now if now is not None else time.time()
-        last = self._last_seen.get(path)
-        self._last_seen[path] = now
-        if last is None:
-            return True
-        return (now - last) >= self._window
+        quiet_until = self._wheel.get(path, now)
+        if self._window > 0:
+            self._wheel.set(path, now + self._window, now)
+        return quiet_until is None or now >= quiet_until
+
+    def metrics(self) -> ExpiryMetrics:
+        return self._wheel.metrics()
 
 
 class IgnoreRegistry:
-    def __init__(self, ttl_seconds: float = 5.0) -> None:
+    """回写静默登记：精确路径，以及批量下载时的整个目录前缀。"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 5.0,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_prefixes: int = _DEFAULT_MAX_PREFIXES,
+    ) -> None:
         self._ttl = ttl_seconds
-        self._entries: dict[str, float] = {}
+        self._entries = _ExpiryWheel("IgnoreRegistry", max_entries=max_entries)
+        self._prefixes = _ExpiryWheel("IgnoreRegistry(prefix)", max_entries=max_prefixes)
 
-    def add(self, path: str, ttl_seconds: float | None = None, now: float | None = None) -> None:
+    def add(
+        self,
+        path: str,
+        ttl_seconds: float | None = None,
+        now: float | None = None,
+        *,
+        recursive: bool = False,
+    ) -> None:
         now = now if now is not None else time.time()
         ttl = ttl_seconds if ttl_seconds is not None else self._ttl
-        self._entries[path] = now + ttl
+        expires_at = now + ttl
+        if recursive:
+            self._prefixes.set(_strip_separator(path), expires_at, now)
+            return
+        # 已被目录前缀覆盖的路径不再单独登记，批量下载只占一个条目
+        covered = self._prefix_expiry(path, now)
+        if covered is not None and covered >= expires_at:
+            return
+        self._entries.set(path, expires_at, now)
 
     def is_ignored(self, path: str, now: float | None = None) -> bool:
         now = now if now is not None else time.time()
-        expires_at = self._entries.get(path)
-        if expires_at is None:
-            return False
-        if expires_at < now:
-            self._entries.pop(path, None)
-            return False
-        return True
+        expires_at = self._entries.get(path, now)
+        if expires_at is not None and expires_at >= now:
+            return True
+        covered = self._prefix_expiry(path, now)
+        return covered is not None and covered >= now
+
+    def metrics(self) -> ExpiryMetrics:
+        return self._entries.metrics()
+
+    def prefix_metrics(self) -> ExpiryMetrics:
+        return self._prefixes.metrics()
+
+    def _prefix_expiry(self, path: str, now: float) -> float | None:
+        """沿父目录逐级查找（O(深度)），返回覆盖该路径的最晚到期时间。"""
+        if not len(self._prefixes):
+            return None
+        latest: float | None = None
+        current = _strip_separator(path)
+        while current:
+            expires_at = self._prefixes.get(current, now)
+            if expires_at is not None and (latest is None or expires_at > latest):
+                latest = expires_at
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+        return latest
+
+
+def _strip_separator(path: str) -> str:
+    stripped = path.rstrip("\\/")
+    return stripped or path
 
 
 class FileEventHandler(FileSystemEventHandler):
@@ -91,42 +278,426 @@ class FileEventHandler(FileSystemEventHandler):
         self._on_event(payload)
 
 
+def _normalize_root(path: str | Path) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def _is_within(path: str, root: str) -> bool:
+    if path == root:
+        return True
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return path.startswith(prefix)
+
+
+class _Subscription:
+    __slots__ = ("root", "handler", "on_resync")
+
+    def __init__(
+        self,
+        root: str,
+        handler: FileEventHandler,
+        on_resync: Callable[[str], None] | None = None,
+    ) -> None:
+        self.root = root
+        self.handler = handler
+        self.on_resync = on_resync
+
+
+@dataclass(frozen=True)
+class _RoutedEvent:
+    event_type: str
+    src_path: str
+    dest_path: str | None
+    is_directory: bool
+
+
+class _RoutingHandler(FileSystemEventHandler):
+    def __init__(self, owner: "SharedObserver") -> None:
+        super().__init__()
+        self._owner = owner
+
+    def on_any_event(self, event) -> None:
+        self._owner.dispatch(event)
+
+
+class SharedObserver:
+    """所有同步任务共用的 watchdog Observer。
+
+    每个任务根目录注册一个订阅；只为互不包含的根目录调度 watch，事件按最长前缀
+    路由到对应任务各自的去抖/忽略处理器。订阅可随任务集合动态增删。
+
+    后台巡检线程定期检查 Observer 与各 emitter 线程是否存活：线程退出（如 inotify
+    读取异常、监听根目录被删除）期间的事件已经丢失，重建 watch 后通过 on_resync
+    通知受影响的订阅对自己的根目录做一次重扫。
+    """
+
+    def __init__(
+        self,
+        observer_factory: Callable[[], Observer] | None = None,
+        *,
+        health_interval: float | None = _DEFAULT_HEALTH_INTERVAL_SECONDS,
+    ) -> None:
+        self._observer_factory = observer_factory
+        self._observer: Observer | None = None
+        self._handler = _RoutingHandler(self)
+        self._lock = threading.RLock()
+        self._subscriptions: dict[int, _Subscription] = {}
+        # 按根目录长度降序排列的快照，事件线程只读，避免持锁路由
+        self._routes: tuple[_Subscription, ...] = ()
+        self._watches: dict[str, object] = {}
+        self._health_interval = health_interval
+        self._health_stop: threading.Event | None = None
+        self._observer_restarts = 0
+        self._emitter_restarts = 0
+        self._overflows = 0
+        self._watch_limit_errors = 0
+        self._resyncs = 0
+        self._last_issue: str | None = None
+        self._last_issue_at: float | None = None
+
+    def subscribe(
+        self,
+        root_path: Path,
+        handler: FileEventHandler,
+        on_resync: Callable[[str], None] | None = None,
+    ) -> int:
+        root = _normalize_root(root_path)
+        with self._lock:
+            key = id(handler)
+            self._subscriptions[key] = _Subscription(root, handler, on_resync)
+            try:
+                self._sync_watches()
+            except Exception:
+                self._subscriptions.pop(key, None)
+                self._sync_watches()
+                raise
+            return key
+
+    def unsubscribe(self, key: int) -> None:
+        with self._lock:
+            if self._subscriptions.pop(key, None) is None:
+                return
+            self._sync_watches()
+
+    def is_subscribed(self, key: int) -> bool:
+        with self._lock:
+            return key in self._subscriptions and self.is_alive()
+
+    def is_alive(self) -> bool:
+        observer = self._observer
+        return observer is not None and observer.is_alive()
+
+    def watched_roots(self) -> list[str]:
+        with self._lock:
+            return sorted(self._watches)
+
+    def health(self) -> WatcherHealth:
+        with self._lock:
+            return WatcherHealth(
+                observer_alive=self.is_alive(),
+                watched_roots=len(self._watches),
+                observer_restarts=self._observer_restarts,
+                emitter_restarts=self._emitter_restarts,
+                overflows=self._overflows,
+                watch_limit_errors=self._watch_limit_errors,
+                resyncs=self._resyncs,
+                last_issue=self._last_issue,
+                last_issue_at=self._last_issue_at,
+            )
+
+    def check_health(self) -> int:
+        """重建已退出的 Observer/emitter，返回需要重扫的订阅数。"""
+        with self._lock:
+            if not self._subscriptions:
+                return 0
+            observer = self._observer
+            if observer is None or not observer.is_alive():
+                reason = "observer_died"
+                self._observer_restarts += 1
+                lost_roots = None
+                if observer is not None:
+                    self._stop_observer()
+            else:
+                reason = "emitter_died"
+                lost_roots = self._dead_watch_roots(observer)
+                lost_roots.extend(
+                    root for root in self._desired_roots() if root not in self._watches
+                )
+                if not lost_roots:
+                    return 0
+                self._emitter_restarts += 1
+                for root in lost_roots:
+                    watch = self._watches.pop(root, None)
+                    if watch is None:
+                        continue
+                    try:
+                        observer.unschedule(watch)
+                    except Exception:
+                        logger.debug("撤销失效目录监听失败: {}", root)
+            self._note_issue(reason)
+            logger.warning("本地监听线程已退出，重建监听: reason={}", reason)
+            try:
+                self._sync_watches()
+            except OSError as exc:
+                # 重建失败时保留订阅，下一轮巡检继续重试
+                logger.warning("重建本地监听失败: error={}", exc)
+            affected = self._subscriptions_within(lost_roots)
+        self._notify_resync(affected, reason)
+        return len(affected)
+
+    def report_overflow(self, path: str | Path | None = None) -> int:
+        """事件队列溢出时调用：该路径所在 watch（未指定则全部）下的订阅需要重扫。"""
+        with self._lock:
+            self._overflows += 1
+            self._note_issue("overflow")
+            lost_roots = None
+            if path is not None:
+                target = _normalize_root(path)
+                lost_roots = [root for root in self._watches if _is_within(target, root)]
+            affected = self._subscriptions_within(lost_roots)
+        logger.warning("本地事件队列溢出，安排重扫: path={} roots={}", path, len(affected))
+        self._notify_resync(affected, "overflow")
+        return len(affected)
+
+    def dispatch(self, event) -> None:
+        src_path = str(getattr(event, "src_path", "") or "")
+        dest_path = str(getattr(event, "dest_path", "") or "")
+        src_route = self._route(_normalize_root(src_path)) if src_path else None
+        if not dest_path:
+            self._deliver(src_route, event)
+            return
+        dest_route = self._route(_normalize_root(dest_path))
+        if src_route is dest_route or not src_path:
+            self._deliver(dest_route, event)
+            return
+        # 跨任务根目录的移动：与各自独立监听时一致，源任务视为删除、目标任务视为新建
+        is_directory = bool(getattr(event, "is_directory", False))
+        if src_route is not None:
+            self._deliver(src_route, _RoutedEvent("deleted", src_path, None, is_directory))
+        if dest_route is not None:
+            self._deliver(dest_route, _RoutedEvent("created", dest_path, None, is_directory))
+
+    @staticmethod
+    def _deliver(route: _Subscription | None, event) -> None:
+        if route is None:
+            return
+        try:
+            route.handler.on_any_event(event)
+        except Exception:
+            logger.exception("本地文件事件分发失败: root={}", route.root)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._subscriptions.clear()
+            self._routes = ()
+            self._watches.clear()
+            self._stop_health_monitor()
+            self._stop_observer()
+
+    def _route(self, path: str) -> _Subscription | None:
+        for route in self._routes:
+            if _is_within(path, route.root):
+                return route
+        return None
+
+    def _desired_roots(self) -> list[str]:
+        roots = sorted({item.root for item in self._subscriptions.values()}, key=len)
+        desired: list[str] = []
+        for root in roots:
+            if not any(_is_within(root, parent) for parent in desired):
+                desired.append(root)
+        return desired
+
+    def _sync_watches(self) -> None:
+        self._routes = tuple(
+            sorted(self._subscriptions.values(), key=lambda item: len(item.root), reverse=True)
+        )
+        desired = self._desired_roots()
+        if not desired:
+            self._stop_health_monitor()
+            self._stop_observer()
+            return
+        observer = self._ensure_observer()
+        self._start_health_monitor()
+        # 先调度新的覆盖根目录，再撤销被覆盖的旧 watch，避免切换期间漏事件
+        for root in desired:
+            if root not in self._watches:
+                try:
+                    self._watches[root] = observer.schedule(self._handler, root, recursive=True)
+                except OSError as exc:
+                    if exc.errno in _WATCH_LIMIT_ERRNOS:
+                        self._watch_limit_errors += 1
+                        self._note_issue("watch_limit")
+                        logger.warning(
+                            "目录监听数量达到系统上限，请调大 fs.inotify.max_user_watches: root={}",
+                            root,
+                        )
+                    raise
+        for root in list(self._watches):
+            if root not in desired:
+                watch = self._watches.pop(root)
+                try:
+                    observer.unschedule(watch)
+                except Exception:
+                    logger.debug("撤销目录监听失败: {}", root)
+
+    def _dead_watch_roots(self, observer: Observer) -> list[str]:
+        emitters = getattr(observer, "emitters", None)
+        if emitters is None:
+            return []
+        alive = [emitter.watch for emitter in emitters if emitter.is_alive()]
+        return [root for root, watch in self._watches.items() if watch not in alive]
+
+    def _subscriptions_within(self, roots: list[str] | None) -> list[_Subscription]:
+        if roots is None:
+            return list(self._subscriptions.values())
+        return [
+            item
+            for item in self._subscriptions.values()
+            if any(_is_within(item.root, root) for root in roots)
+        ]
+
+    def _notify_resync(self, affected: list[_Subscription], reason: str) -> None:
+        for item in affected:
+            if item.on_resync is None:
+                continue
+            with self._lock:
+                self._resyncs += 1
+            try:
+                item.on_resync(reason)
+            except Exception:
+                logger.exception("本地监听重扫回调失败: root={}", item.root)
+
+    def _note_issue(self, reason: str) -> None:
+        self._last_issue = reason
+        self._last_issue_at = time.time()
+
+    def _start_health_monitor(self) -> None:
+        if self._health_interval is None or self._health_stop is not None:
+            return
+        stop_event = threading.Event()
+        self._health_stop = stop_event
+        threading.Thread(
+            target=self._health_loop,
+            args=(stop_event,),
+            name="larksync-watch-health",
+            daemon=True,
+        ).start()
+
+    def _stop_health_monitor(self) -> None:
+        stop_event, self._health_stop = self._health_stop, None
+        if stop_event is not None:
+            stop_event.set()
+
+    def _health_loop(self, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self._health_interval):
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("本地监听巡检失败")
+
+    def _ensure_observer(self) -> Observer:
+        if self._observer is None or not self._observer.is_alive():
+            if self._observer_factory is None:
+                # 默认使用能上报内核事件队列溢出的平台 Observer
+                self._observer = create_observer(self.report_overflow)
+            else:
+                self._observer = self._observer_factory()
+            self._watches.clear()
+            self._observer.start()
+        return self._observer
+
+    def _stop_observer(self) -> None:
+        observer, self._observer = self._observer, None
+        self._watches.clear()
+        if observer is None:
+            return
+        observer.stop()
+        if observer is not threading.current_thread():
+            observer.join(timeout=5)
+
+
+_shared_observer: SharedObserver | None = None
+_shared_observer_lock = threading.Lock()
+
+
+def get_shared_observer() -> SharedObserver:
+    global _shared_observer
+    with _shared_observer_lock:
+        if _shared_observer is None:
+            _shared_observer = SharedObserver()
+        return _shared_observer
+
+
 class WatcherService:
+    """单个根目录的监听订阅；底层共用一个 SharedObserver 线程。"""
+
     def __init__(
         self,
         root_path: Path,
         on_event: Callable[[FileChangeEvent], None],
         debounce_seconds: float = 2.0,
         ignore_seconds: float = 5.0,
+        observer: SharedObserver | None = None,
+        on_resync: Callable[[str], None] | None = None,
     ) -> None:
         self._root_path = root_path
+        self._on_resync = on_resync
         self._debounce = DebounceFilter(window_seconds=debounce_seconds)
         self._ignore = IgnoreRegistry(ttl_seconds=ignore_seconds)
         self._handler = FileEventHandler(on_event, self._debounce, self._ignore)
-        self._observer = Observer()
+        self._observer = observer
+        self._subscription: int | None = None
 
     @property
     def root_path(self) -> Path:
         return self._root_path
 
     def start(self) -> None:
-        self._observer.schedule(self._handler, str(self._root_path), recursive=True)
-        self._observer.start()
+        if self._subscription is not None:
+            return
+        if self._observer is None:
+            self._observer = get_shared_observer()
+        self._subscription = self._observer.subscribe(
+            self._root_path, self._handler, on_resync=self._on_resync
+        )
 
     def stop(self) -> None:
-        self._observer.stop()
-        self._observer.join(timeout=5)
+        if self._subscription is None or self._observer is None:
+            return
+        self._observer.unsubscribe(self._subscription)
+        self._subscription = None
 
-    def silence(self, path: Path, ttl_seconds: float | None = None) -> None:
-        self._ignore.add(str(path), ttl_seconds=ttl_seconds)
+    def silence(
+        self,
+        path: Path,
+        ttl_seconds: float | None = None,
+        *,
+        recursive: bool = False,
+    ) -> None:
+        """recursive=True 时静默整个目录前缀，用于批量下载。"""
+        self._ignore.add(str(path), ttl_seconds=ttl_seconds, recursive=recursive)
+
+    def metrics(self) -> dict[str, ExpiryMetrics]:
+        return {
+            "debounce": self._debounce.metrics(),
+            "ignore": self._ignore.metrics(),
+            "ignore_prefix": self._ignore.prefix_metrics(),
+        }
 
     def is_running(self) -> bool:
-        return self._observer.is_alive()
+        if self._subscription is None or self._observer is None:
+            return False
+        return self._observer.is_subscribed(self._subscription)
 
 
 __all__ = [
     "DebounceFilter",
+    "ExpiryMetrics",
     "FileChangeEvent",
     "IgnoreRegistry",
+    "SharedObserver",
+    "WatcherHealth",
     "WatcherService",
+    "get_shared_observer",
 ]
@@ -41,10 +41,16 @@ class WatcherManager:
             return {"running": False, "path": None}
         return {"running": self._watcher.is_running(), "path": str(self._watcher.root_path)}
 
-    def silence(self, path: Path, ttl_seconds: float | None = None) -> None:
+    def silence(
+        self,
+        path: Path,
+        ttl_seconds: float | None = None,
+        *,
+        recursive: bool = False,
+    ) -> None:
         if not self._watcher:
             return
-        self._watcher.silence(path, ttl_seconds=ttl_seconds)
+        self._watcher.silence(path, ttl_seconds=ttl_seconds, recursive=recursive)
 
 
 __all__ = ["WatcherManager"]
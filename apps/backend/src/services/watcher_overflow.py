@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+from typing import Any, Callable
+
+from loguru import logger
+from watchdog.observers import Observer
+from watchdog.observers.api import DEFAULT_OBSERVER_TIMEOUT, BaseObserver
+from watchdog.utils import platform
+
+OverflowCallback = Callable[[str], None]
+
+# 溢出检测依赖 watchdog 的内部实现（已在 watchdog 4.x-6.x 验证）；导入或特征检查
+# 不通过时退回 watchdog 默认 Observer，丢失的事件仍由巡检重扫兜底
+_InotifyObserver: type | None = None
+_WindowsApiObserver: type | None = None
+
+if platform.is_linux():
+    try:
+        from watchdog.observers.inotify import InotifyEmitter, InotifyObserver
+        from watchdog.observers.inotify_buffer import InotifyBuffer
+        from watchdog.observers.inotify_c import (
+            DEFAULT_EVENT_BUFFER_SIZE,
+            Inotify,
+            InotifyConstants,
+        )
+        from watchdog.utils import BaseThread
+        from watchdog.utils.delayed_queue import DelayedQueue
+    except Exception:  # 不支持的 libc 等情况下 watchdog 本身也会退回轮询
+        pass
+    else:
+        _InotifyObserver = InotifyObserver
+elif platform.is_windows():
+    try:
+        from watchdog.observers.read_directory_changes import (
+            WindowsApiEmitter,
+            WindowsApiObserver,
+        )
+        from watchdog.observers.winapi import (
+            WinAPINativeEvent,
+            _parse_event_buffer,
+            read_directory_changes,
+        )
+    except Exception:
+        pass
+    else:
+        _WindowsApiObserver = WindowsApiObserver
+
+# 当前线程正在读取的 Inotify 实例，供事件缓冲解析钩子定位溢出来源
+_reading = threading.local()
+
+
+def create_observer(on_overflow: OverflowCallback) -> BaseObserver:
+    """创建能上报内核事件队列溢出的 Observer。
+
+    inotify 溢出表现为 wd == -1 的 IN_Q_OVERFLOW 事件，ReadDirectoryChangesW 溢出
+    表现为读取返回 0 字节；watchdog 都会静默丢弃。其他平台或 watchdog 内部实现
+    不符合预期时退回 watchdog 默认实现。
+    """
+    if _InotifyObserver is not None and Observer is _InotifyObserver:
+        if _inotify_hooks_supported():
+            return _OverflowInotifyObserver(on_overflow)
+    elif _WindowsApiObserver is not None and Observer is _WindowsApiObserver:
+        if _windows_hooks_supported():
+            return _OverflowWindowsApiObserver(on_overflow)
+    else:
+        return Observer()
+    logger.warning("当前 watchdog 版本不支持事件队列溢出检测，仅依赖监听巡检兜底")
+    return Observer()
+
+
+def _code_names(fn: Any) -> tuple[str, ...]:
+    code = getattr(fn, "__code__", None)
+    return tuple(code.co_names) if code is not None else ()
+
+
+def _accepts_keywords(fn: Any, *names: str) -> bool:
+    try:
+        parameters = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return all(name in parameters for name in names)
+
+
+def _inotify_hooks_supported() -> bool:
+    """钩子依赖的内部结构：read_events 经类属性解析缓冲、InotifyBuffer 的队列与 Inotify 属性。"""
+    return (
+        isinstance(Inotify.__dict__.get("_parse_event_buffer"), staticmethod)
+        and "_parse_event_buffer" in _code_names(Inotify.read_events)
+        and _accepts_keywords(Inotify.__init__, "recursive", "event_mask")
+        and _accepts_keywords(Inotify.read_events, "event_buffer_size")
+        and {"_queue", "_inotify", "start"} <= set(_code_names(InotifyBuffer.__init__))
+        and isinstance(getattr(InotifyBuffer, "delay", None), (int, float))
+        and callable(getattr(InotifyEmitter, "on_thread_start", None))
+    )
+
+
+def _windows_hooks_supported() -> bool:
+    return (
+        "_read_events" in _code_names(WindowsApiEmitter.queue_events)
+        and _accepts_keywords(read_directory_changes, "recursive")
+    )
+
+
+def _report_later(on_overflow: OverflowCallback, path: str) -> None:
+    # 在独立线程上报：emitter 关闭时会 join 读取线程，读取线程不能反过来等待订阅锁
+    threading.Thread(
+        target=_safe_report,
+        args=(on_overflow, path),
+        name="larksync-watch-overflow",
+        daemon=True,
+    ).start()
+
+
+def _safe_report(on_overflow: OverflowCallback, path: str) -> None:
+    try:
+        on_overflow(path)
+    except Exception:
+        logger.exception("上报本地事件队列溢出失败: path={}", path)
+
+
+if _InotifyObserver is not None:
+
+    def _install_parse_hook() -> None:
+        """只在首次创建溢出检测 Observer 时安装；包装对其他 Inotify 实例透明。"""
+        original = Inotify.__dict__["_parse_event_buffer"].__func__
+        if getattr(original, "_larksync_overflow_hook", False):
+            return
+
+        def _parse_event_buffer(event_buffer: bytes) -> Any:
+            inotify = getattr(_reading, "inotify", None)
+            for item in original(event_buffer):
+                wd, mask = item[0], item[1]
+                if inotify is not None and wd == -1 and mask & InotifyConstants.IN_Q_OVERFLOW:
+                    inotify.overflowed = True
+                yield item
+
+        _parse_event_buffer._larksync_overflow_hook = True  # type: ignore[attr-defined]
+        # read_events 通过 Inotify._parse_event_buffer 解析，子类覆盖无效，只能包装类属性
+        Inotify._parse_event_buffer = staticmethod(_parse_event_buffer)
+
+    class _OverflowInotify(Inotify):
+        def __init__(
+            self,
+            path: bytes,
+            *,
+            on_overflow: Callable[[], None],
+            recursive: bool = False,
+            event_mask: int | None = None,
+        ) -> None:
+            super().__init__(path, recursive=recursive, event_mask=event_mask)
+            self._on_overflow = on_overflow
+            self.overflowed = False
+
+        def read_events(self, *, event_buffer_size: int = DEFAULT_EVENT_BUFFER_SIZE) -> list:
+            _reading.inotify = self
+            self.overflowed = False
+            try:
+                events = super().read_events(event_buffer_size=event_buffer_size)
+            finally:
+                _reading.inotify = None
+            if self.overflowed:
+                # 同一次读取中的多条溢出事件只上报一次
+                self._on_overflow()
+            return events
+
+    class _OverflowInotifyBuffer(InotifyBuffer):
+        def __init__(
+            self,
+            path: bytes,
+            *,
+            on_overflow: Callable[[], None],
+            recursive: bool = False,
+            event_mask: int | None = None,
+        ) -> None:
+            # InotifyBuffer.__init__ 会直接创建并启动原版 Inotify，这里按相同步骤替换
+            # 底层实例；结构由 _inotify_hooks_supported 预先校验
+            BaseThread.__init__(self)
+            self._queue = DelayedQueue(self.delay)
+            self._inotify = _OverflowInotify(
+                path, on_overflow=on_overflow, recursive=recursive, event_mask=event_mask
+            )
+            self.start()
+
+    class _OverflowInotifyEmitter(InotifyEmitter):
+        def __init__(self, *args: Any, on_overflow: OverflowCallback, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self._on_overflow = on_overflow
+
+        def on_thread_start(self) -> None:
+            mask_from_filter = getattr(self, "get_event_mask_from_filter", None)
+            self._inotify = _OverflowInotifyBuffer(
+                os.fsencode(self.watch.path),
+                on_overflow=lambda: _report_later(self._on_overflow, self.watch.path),
+                recursive=self.watch.is_recursive,
+                event_mask=mask_from_filter() if callable(mask_from_filter) else None,
+            )
+
+    class _OverflowInotifyObserver(BaseObserver):
+        def __init__(self, on_overflow: OverflowCallback) -> None:
+            _install_parse_hook()
+            super().__init__(
+                functools.partial(_OverflowInotifyEmitter, on_overflow=on_overflow),  # type: ignore[arg-type]
+                timeout=DEFAULT_OBSERVER_TIMEOUT,
+            )
+
+
+if _WindowsApiObserver is not None:
+
+    class _OverflowWindowsApiEmitter(WindowsApiEmitter):
+        def __init__(self, *args: Any, on_overflow: OverflowCallback, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self._on_overflow = on_overflow
+
+        def _read_events(self) -> list:
+            if not self._whandle:
+                return []
+            buffer, nbytes = read_directory_changes(
+                self._whandle, self.watch.path, recursive=self.watch.is_recursive
+            )
+            # 停止监听时读取被取消同样返回 0 字节，只在仍运行时视为溢出
+            if nbytes == 0 and self.should_keep_running():
+                _report_later(self._on_overflow, self.watch.path)
+            return [
+                WinAPINativeEvent(action, src_path)
+                for action, src_path in _parse_event_buffer(buffer, nbytes)
+            ]
+
+    class _OverflowWindowsApiObserver(BaseObserver):
+        def __init__(self, on_overflow: OverflowCallback) -> None:
+            super().__init__(
+                functools.partial(_OverflowWindowsApiEmitter, on_overflow=on_overflow),  # type: ignore[arg-type]
+                timeout=DEFAULT_OBSERVER_TIMEOUT,
+            )
+
+
+__all__ = ["OverflowCallback", "create_observer"]
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import src.services.file_writer as file_writer_module
+from src.services.async_fs import AsyncFileSystem
+from src.services.event_loop_monitor import EventLoopLagMonitor
+from src.services.file_hash import calculate_file_hash
+from src.services.file_writer import FileWriter
+
+
+@pytest.mark.asyncio
+async def test_async_fs_runs_blocking_calls_in_worker_threads(tmp_path: Path) -> None:
+    fs = AsyncFileSystem(max_workers=2)
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    target = tmp_path / "a" / "b" / "note.md"
+    target.write_text("内容", encoding="utf-8")
+    (tmp_path / "a" / "skip.tmp").write_text("x", encoding="utf-8")
+    seen_threads: set[str] = set()
+
+    def _keep(path: Path) -> bool:
+        seen_threads.add(threading.current_thread().name)
+        return path.suffix != ".tmp"
+
+    try:
+        files = await fs.list_files(tmp_path, _keep)
+        file_hash = await fs.hash_file(target)
+        text = await fs.read_text(target)
+    finally:
+        fs.shutdown()
+
+    assert files == [target]
+    assert file_hash == calculate_file_hash(target)
+    assert text == "内容"
+    assert seen_threads and all(name.startswith("larksync-fs") for name in seen_threads)
+    assert await AsyncFileSystem().list_files(tmp_path / "missing") == []
+
+
+@pytest.mark.asyncio
+async def test_write_bytes_async_retries_locked_file_with_async_sleep(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    target = tmp_path / "nested" / "file.bin"
+    delays: list[float] = []
+    attempts = 0
+    original_write_bytes = Path.write_bytes
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    def blocking_sleep(_: float) -> None:
+        raise AssertionError("异步写入不应调用 time.sleep")
+
+    def flaky_write_bytes(self: Path, payload: bytes) -> int:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            error = PermissionError("locked")
+            error.winerror = 32
+            raise error
+        return original_write_bytes(self, payload)
+
+    monkeypatch.setattr(file_writer_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(file_writer_module.time, "sleep", blocking_sleep)
+    monkeypatch.setattr(Path, "write_bytes", flaky_write_bytes)
+
+    await FileWriter.write_bytes_async(target, b"payload", 1700000000.0)
+
+    assert target.read_bytes() == b"payload"
+    assert target.stat().st_mtime == pytest.approx(1700000000.0)
+    assert delays == [0.2, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_drops_when_blocking_work_is_offloaded() -> None:
+    monitor = EventLoopLagMonitor(interval=0.01, warn_threshold=10.0)
+    fs = AsyncFileSystem(max_workers=1)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        monitor.reset()
+        time.sleep(0.3)
+        await asyncio.sleep(0.05)
+        blocking = monitor.snapshot()
+
+        monitor.reset()
+        await fs.run(time.sleep, 0.3)
+        await asyncio.sleep(0.05)
+        offloaded = monitor.snapshot()
+    finally:
+        await monitor.stop()
+        fs.shutdown()
+
+    assert blocking.max_ms >= 200
+    assert offloaded.samples >= 10
+    assert offloaded.max_ms < 150
@@ -0,0 +1,155 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from src.services.bitable_record_export_service import (
+    BitableRecordExportService,
+    format_cell,
+)
+from src.services.bitable_service import (
+    FIELD_TYPE_MODIFIED_TIME,
+    BitableField,
+    BitableRecord,
+    BitableRecordPage,
+)
+
+
+class FakeBitableService:
+    def __init__(self, records: list[BitableRecord], *, with_modified_field: bool = True) -> None:
+        self.records = records
+        self.changed: list[BitableRecord] = []
+        self.fields = [
+            BitableField(field_id="fld-name", name="名称", type=1),
+            BitableField(field_id="fld-qty", name="数量", type=2),
+        ]
+        if with_modified_field:
+            self.fields.append(
+                BitableField(field_id="fld-mtime", name="更新时间", type=FIELD_TYPE_MODIFIED_TIME)
+            )
+        self.page_calls: list[dict] = []
+
+    async def list_fields(self, app_token: str, table_id: str):
+        return list(self.fields)
+
+    async def iter_record_pages(self, app_token: str, table_id: str, **kwargs):
+        self.page_calls.append(kwargs)
+        source = self.changed if kwargs.get("modified_after") is not None else self.records
+        for start in range(0, len(source), 2):
+            yield BitableRecordPage(records=source[start : start + 2], total=len(source))
+
+    async def list_record_ids(self, app_token: str, table_id: str):
+        return {record.record_id for record in self.records}
+
+
+def _record(record_id: str, name: str, qty: int) -> BitableRecord:
+    return BitableRecord(
+        record_id=record_id,
+        fields={"名称": [{"type": "text", "text": name}], "数量": qty, "更新时间": 1},
+    )
+
+
+def _read_csv(path: Path) -> list[list[str]]:
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        return list(csv.reader(handle))
+
+
+@pytest.mark.asyncio
+async def test_export_table_streams_all_pages_to_csv(tmp_path: Path) -> None:
+    service = FakeBitableService([_record(f"rec-{idx}", f"条目{idx}", idx) for idx in range(5)])
+    exporter = BitableRecordExportService(service)  # type: ignore[arg-type]
+    target = tmp_path / "库存 - 明细.csv"
+
+    result = await exporter.export_table("app-1", "tbl-1", target, mtime=1700000000.0)
+
+    assert result.mode == "full"
+    assert result.record_count == 5
+    rows = _read_csv(target)
+    assert rows[0] == ["record_id", "名称", "数量", "更新时间"]
+    assert rows[1] == ["rec-0", "条目0", "0", "1"]
+    assert len(rows) == 6
+    assert target.stat().st_mtime == 1700000000.0
+    assert not any(path.name.endswith(".partial") for path in tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_export_table_merges_changed_records_incrementally(tmp_path: Path) -> None:
+    service = FakeBitableService([_record("rec-1", "苹果", 1), _record("rec-2", "香蕉", 2)])
+    exporter = BitableRecordExportService(service)  # type: ignore[arg-type]
+    target = tmp_path / "库存.csv"
+    first = await exporter.export_table("app-1", "tbl-1", target, mtime=1.0)
+
+    service.records = [_record("rec-1", "苹果", 1), _record("rec-2", "香蕉", 20), _record("rec-3", "梨", 3)]
+    service.changed = [_record("rec-2", "香蕉", 20), _record("rec-3", "梨", 3)]
+    result = await exporter.export_table(
+        "app-1", "tbl-1", target, mtime=2.0, modified_after=first.synced_at
+    )
+
+    assert result.mode == "incremental"
+    assert result.changed_count == 2
+    assert [row[:3] for row in _read_csv(target)[1:]] == [
+        ["rec-1", "苹果", "1"],
+        ["rec-2", "香蕉", "20"],
+        ["rec-3", "梨", "3"],
+    ]
+    assert service.page_calls[-1]["modified_field"] == "更新时间"
+
+
+@pytest.mark.asyncio
+async def test_export_table_falls_back_to_full_when_records_were_deleted(tmp_path: Path) -> None:
+    service = FakeBitableService([_record("rec-1", "苹果", 1), _record("rec-2", "香蕉", 2)])
+    exporter = BitableRecordExportService(service)  # type: ignore[arg-type]
+    target = tmp_path / "库存.jsonl"
+    await exporter.export_table("app-1", "tbl-1", target, mtime=1.0, file_format="jsonl")
+
+    service.records = [_record("rec-2", "香蕉", 2)]
+    result = await exporter.export_table(
+        "app-1", "tbl-1", target, mtime=2.0, modified_after=100.0, file_format="jsonl"
+    )
+
+    assert result.mode == "full"
+    lines = target.read_text(encoding="utf-8-sig").splitlines()
+    assert json.loads(lines[0]) == {"columns": ["名称", "数量", "更新时间"]}
+    assert [json.loads(line)["record_id"] for line in lines[1:]] == ["rec-2"]
+
+
+@pytest.mark.asyncio
+async def test_export_table_detects_delete_and_add_in_same_window(tmp_path: Path) -> None:
+    service = FakeBitableService([_record("rec-1", "苹果", 1), _record("rec-2", "香蕉", 2)])
+    exporter = BitableRecordExportService(service)  # type: ignore[arg-type]
+    target = tmp_path / "库存.csv"
+    first = await exporter.export_table("app-1", "tbl-1", target, mtime=1.0)
+
+    # 删除一条、新增一条，新增记录的修改时间又落在过滤窗口之外（如时钟偏差）：
+    # 合并后行数与云端一致，只有记录集合不同
+    service.records = [_record("rec-2", "香蕉", 2), _record("rec-3", "梨", 3)]
+    service.changed = []
+    result = await exporter.export_table(
+        "app-1", "tbl-1", target, mtime=2.0, modified_after=first.synced_at
+    )
+
+    assert result.mode == "full"
+    assert [row[0] for row in _read_csv(target)[1:]] == ["rec-2", "rec-3"]
+
+
+@pytest.mark.asyncio
+async def test_export_table_without_modified_field_always_exports_full(tmp_path: Path) -> None:
+    service = FakeBitableService([_record("rec-1", "苹果", 1)], with_modified_field=False)
+    exporter = BitableRecordExportService(service)  # type: ignore[arg-type]
+    target = tmp_path / "库存.csv"
+    await exporter.export_table("app-1", "tbl-1", target, mtime=1.0)
+
+    result = await exporter.export_table("app-1", "tbl-1", target, mtime=2.0, modified_after=100.0)
+
+    assert result.mode == "full"
+    assert all(call.get("modified_after") is None for call in service.page_calls)
+
+
+def test_format_cell_flattens_bitable_values() -> None:
+    assert format_cell([{"type": "text", "text": "你好"}, {"type": "text", "text": "世界"}]) == "你好世界"
+    assert format_cell(["选项A", "选项B"]) == "选项A, 选项B"
+    assert format_cell([{"id": "ou_1", "name": "张三"}]) == "张三"
+    assert format_cell({"link": "https://example.com", "text": "官网"}) == "官网"
+    assert format_cell(True) == "true"
+    assert format_cell(None) == ""
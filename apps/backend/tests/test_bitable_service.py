@@ -0,0 +1,102 @@
+import httpx
+import pytest
+
+from src.services.bitable_service import BitableService
+
+
+class FakeClient:
+    def __init__(self, responses: list[httpx.Response]) -> None:
+        self._responses = responses
+        self.requests: list[tuple[str, str, dict]] = []
+
+    async def request_with_retry(self, method: str, url: str, **kwargs):
+        self.requests.append((method, url, kwargs))
+        if not self._responses:
+            raise RuntimeError("no response prepared")
+        return self._responses.pop(0)
+
+    async def close(self) -> None:
+        return None
+
+
+def _build_response(payload: dict) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json=payload,
+        request=httpx.Request("POST", "https://open.feishu.cn"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_iter_record_pages_follows_page_token_and_filters_by_modified_time() -> None:
+    client = FakeClient(
+        [
+            _build_response(
+                {
+                    "code": 0,
+                    "data": {
+                        "items": [{"record_id": "rec-1", "fields": {"名称": "苹果"}}],
+                        "has_more": True,
+                        "page_token": "next",
+                        "total": 2,
+                    },
+                }
+            ),
+            _build_response(
+                {
+                    "code": 0,
+                    "data": {
+                        "items": [{"record_id": "rec-2", "fields": {"名称": "香蕉"}}],
+                        "has_more": False,
+                        "total": 2,
+                    },
+                }
+            ),
+        ]
+    )
+    service = BitableService(client=client)
+
+    pages = [
+        page
+        async for page in service.iter_record_pages(
+            "app-1",
+            "tbl-1",
+            modified_field="更新时间",
+            modified_after=1700000000.5,
+        )
+    ]
+
+    assert [record.record_id for page in pages for record in page.records] == ["rec-1", "rec-2"]
+    assert pages[0].total == 2
+    method, url, kwargs = client.requests[0]
+    assert method == "POST"
+    assert url.endswith("/open-apis/bitable/v1/apps/app-1/tables/tbl-1/records/search")
+    condition = kwargs["json"]["filter"]["conditions"][0]
+    assert condition["field_name"] == "更新时间"
+    assert condition["value"] == ["ExactDate", "1700000000500"]
+    assert client.requests[1][2]["params"]["page_token"] == "next"
+
+
+@pytest.mark.asyncio
+async def test_list_fields_parses_field_types() -> None:
+    client = FakeClient(
+        [
+            _build_response(
+                {
+                    "code": 0,
+                    "data": {
+                        "items": [
+                            {"field_id": "fld-1", "field_name": "名称", "type": 1},
+                            {"field_id": "fld-2", "field_name": "更新时间", "type": 1002},
+                        ],
+                        "has_more": False,
+                    },
+                }
+            )
+        ]
+    )
+    service = BitableService(client=client)
+
+    fields = await service.list_fields("app-1", "tbl-1")
+
+    assert [(field.name, field.type) for field in fields] == [("名称", 1), ("更新时间", 1002)]
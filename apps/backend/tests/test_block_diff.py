@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from src.services.block_diff import diff_opcodes
+
+
+class _CountingSignature:
+    """统计比较与哈希次数，用操作数而不是耗时衡量算法复杂度。"""
+
+    operations = 0
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        _CountingSignature.operations += 1
+        return isinstance(other, _CountingSignature) and self.value == other.value
+
+    def __hash__(self) -> int:
+        _CountingSignature.operations += 1
+        return hash(self.value)
+
+
+def _apply(a: list[str], b: list[str], opcodes) -> list[str]:
+    result: list[str] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            result.extend(a[i1:i2])
+        else:
+            result.extend(b[j1:j2])
+    return result
+
+
+def _assert_contiguous(a: list[str], b: list[str], opcodes) -> None:
+    i = j = 0
+    for _, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+
+
+def _equal_count(opcodes) -> int:
+    return sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal")
+
+
+def test_diff_opcodes_matches_difflib_format_for_simple_edit() -> None:
+    a = ["h1", "p1", "p2", "p3", "p4"]
+    b = ["h1", "p1", "p2-edited", "p3", "new", "p4"]
+
+    opcodes = diff_opcodes(a, b)
+
+    assert opcodes == [
+        ("equal", 0, 2, 0, 2),
+        ("replace", 2, 3, 2, 3),
+        ("equal", 3, 4, 3, 4),
+        ("insert", 4, 4, 4, 5),
+        ("equal", 4, 5, 5, 6),
+    ]
+
+
+def test_diff_opcodes_anchors_on_repeated_signatures() -> None:
+    a = ["t", "empty", "x", "empty", "y", "empty", "z"]
+    b = ["t", "empty", "x", "empty", "y2", "empty", "z"]
+
+    opcodes = diff_opcodes(a, b)
+
+    assert [op for op in opcodes if op[0] != "equal"] == [("replace", 4, 5, 4, 5)]
+
+
+def test_diff_opcodes_handles_sequences_of_duplicates() -> None:
+    a = ["a", "a", "b", "a", "b"]
+    b = ["a", "b", "a", "a", "b", "b"]
+
+    opcodes = diff_opcodes(a, b)
+
+    _assert_contiguous(a, b, opcodes)
+    assert _apply(a, b, opcodes) == b
+    assert _equal_count(opcodes) == 4
+
+
+def test_diff_opcodes_random_sequences_are_valid() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        a = [rng.choice("abcdef") for _ in range(rng.randint(0, 30))]
+        b = list(a)
+        for _ in range(rng.randint(0, 6)):
+            op = rng.random()
+            if op < 0.4 and b:
+                del b[rng.randrange(len(b))]
+            elif op < 0.8:
+                b.insert(rng.randint(0, len(b)), rng.choice("abcdefg"))
+            elif b:
+                b[rng.randrange(len(b))] = rng.choice("abcdefg")
+        opcodes = diff_opcodes(a, b)
+        _assert_contiguous(a, b, opcodes)
+        assert _apply(a, b, opcodes) == b
+
+
+def test_diff_opcodes_gives_up_as_replace_when_cost_exceeds_limit() -> None:
+    a = ["x"] * 20
+    b = ["y"] * 20
+
+    assert diff_opcodes(a, b, max_cost=4) == [("replace", 0, 20, 0, 20)]
+
+
+@pytest.mark.parametrize("size", [5000, 20000])
+def test_diff_opcodes_scales_on_large_documents(size: int) -> None:
+    rng = random.Random(size)
+    # 模拟长文档：大部分签名唯一，夹杂大量重复的空段落/分隔线
+    a = [f"p{idx}" if idx % 7 else "empty" for idx in range(size)]
+    b = list(a)
+    for _ in range(50):
+        position = rng.randrange(len(b))
+        if rng.random() < 0.5:
+            b[position] = f"edited-{position}"
+        else:
+            b.insert(position, f"inserted-{position}")
+
+    _CountingSignature.operations = 0
+    opcodes = diff_opcodes(
+        [_CountingSignature(item) for item in a], [_CountingSignature(item) for item in b]
+    )
+
+    _assert_contiguous(a, b, opcodes)
+    assert _apply(a, b, opcodes) == b
+    assert _equal_count(opcodes) >= size - 60
+    # 接近线性时每个元素约 10 次比较/哈希；退化为平方级时会高出几个数量级
+    assert _CountingSignature.operations < 20 * size
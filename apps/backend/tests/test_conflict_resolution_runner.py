@@ -37,8 +37,8 @@ class UploadDocxService:
     async def get_root_block(self, document_id: str, user_id_type: str = "open_id"):
         return {"block_id": document_id, "children": list(self.root_children)}, []
 
-    def _normalize_convert(self, convert: ConvertResult) -> ConvertResult:
-        return convert
+    async def convert_markdown_block(self, markdown: str, **kwargs) -> ConvertResult:
+        return await self.convert_markdown_with_images(markdown, **kwargs)
 
 
 class UploadFileUploader:
@@ -143,7 +143,9 @@ class DownloadDriveService:
 
 
 class DownloadDocxService:
-    async def list_blocks(self, document_id: str, user_id_type: str = "open_id"):
+    async def list_blocks(
+        self, document_id: str, user_id_type: str = "open_id", *, compact: bool = False
+    ):
         return []
 
     async def close(self) -> None:
@@ -158,6 +158,12 @@ async def test_init_db_upgrades_legacy_schema_with_versioned_migrations(tmp_path
     await dispose_engines()
 
     assert {"update_mode", "ignored_subpaths", "last_run_at"}.issubset(sync_task_columns)
-    assert {"local_hash", "cloud_revision", "resource_sync_revision"}.issubset(sync_link_columns)
+    assert {
+        "local_hash",
+        "cloud_revision",
+        "resource_sync_revision",
+        "export_sub_id",
+        "export_sub_id_revision",
+    }.issubset(sync_link_columns)
     assert "idx_sync_runs_task_started_updated" in sync_run_indexes
     assert version == str(CURRENT_SCHEMA_VERSION)
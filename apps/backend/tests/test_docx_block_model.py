@@ -0,0 +1,194 @@
+import gc
+import json
+import tracemalloc
+from collections.abc import Mapping
+from pathlib import Path
+
+import pytest
+
+from src.services.docx_block_model import CompactBlock, compact_block
+from src.services.transcoder import DocxTranscoder
+
+
+def _text(content: str, **style: object) -> dict:
+    return {
+        "text_run": {
+            "content": content,
+            "text_element_style": {
+                "bold": False,
+                "inline_code": False,
+                "italic": False,
+                "strikethrough": False,
+                "underline": False,
+                **style,
+            },
+        }
+    }
+
+
+def _sample_blocks() -> list[dict]:
+    return [
+        {
+            "block_id": "root",
+            "block_type": 1,
+            "children": ["h1", "p1", "bul1", "code1", "quote1", "tbl", "addons"],
+            "page": {"elements": [_text("标题")], "style": {"align": 1}},
+        },
+        {
+            "block_id": "h1",
+            "block_type": 3,
+            "parent_id": "root",
+            "comment_ids": ["c1"],
+            "heading1": {"elements": [_text("概览")], "style": {"align": 1, "folded": False}},
+        },
+        {
+            "block_id": "p1",
+            "block_type": 2,
+            "parent_id": "root",
+            "text": {
+                "elements": [
+                    _text("加粗", bold=True),
+                    _text(" 与 "),
+                    _text("代码", inline_code=True),
+                    _text("链接", link={"url": "https%3A%2F%2Fexample.com"}),
+                    {"equation": {"content": "E=mc^2", "text_element_style": {"bold": False}}},
+                ],
+                "style": {"align": 1, "folded": False},
+            },
+        },
+        {
+            "block_id": "bul1",
+            "block_type": 12,
+            "parent_id": "root",
+            "children": ["bul1_child"],
+            "bullet": {"elements": [_text("列表一")], "style": {}},
+        },
+        {
+            "block_id": "bul1_child",
+            "block_type": 12,
+            "parent_id": "bul1",
+            "bullet": {"elements": [_text("子项", italic=True)], "style": {}},
+        },
+        {
+            "block_id": "code1",
+            "block_type": 14,
+            "parent_id": "root",
+            "code": {"elements": [_text("print('hi')")], "style": {"language": 49, "wrap": False}},
+        },
+        {
+            "block_id": "quote1",
+            "block_type": 34,
+            "parent_id": "root",
+            "children": ["quote_text"],
+            "quote_container": {},
+        },
+        {
+            "block_id": "quote_text",
+            "block_type": 2,
+            "parent_id": "quote1",
+            "text": {"elements": [_text("引用内容")], "style": {}},
+        },
+        {
+            "block_id": "tbl",
+            "block_type": 31,
+            "parent_id": "root",
+            "children": ["cell1", "cell2"],
+            "table": {
+                "cells": ["cell1", "cell2"],
+                "property": {"row_size": 1, "column_size": 2, "header_row": False},
+            },
+        },
+        {"block_id": "cell1", "block_type": 32, "parent_id": "tbl", "children": ["t1"], "table_cell": {}},
+        {"block_id": "cell2", "block_type": 32, "parent_id": "tbl", "children": ["t2"], "table_cell": {}},
+        {
+            "block_id": "t1",
+            "block_type": 2,
+            "parent_id": "cell1",
+            "text": {"elements": [_text("A", strikethrough=True)]},
+        },
+        {
+            "block_id": "t2",
+            "block_type": 2,
+            "parent_id": "cell2",
+            "text": {"elements": [_text("B", underline=True)]},
+        },
+        {
+            "block_id": "addons",
+            "block_type": 40,
+            "parent_id": "root",
+            "add_ons": {"record": {"view": "chart", "data": None}},
+        },
+    ]
+
+
+def test_compact_block_behaves_like_mapping() -> None:
+    raw = _sample_blocks()[2]
+
+    block = compact_block(raw)
+
+    assert isinstance(block, CompactBlock)
+    assert isinstance(block, Mapping)
+    assert block["block_id"] == "p1"
+    assert block.get("parent_id") == "root"
+    assert block.get("children") is None
+    assert block.get("missing", "x") == "x"
+    first = block["text"]["elements"][0]["text_run"]
+    assert first["text_element_style"] == {"bold": True}
+    assert "comment_ids" not in compact_block(_sample_blocks()[1])
+    with pytest.raises(KeyError):
+        block["text"]["missing"]
+
+
+@pytest.mark.asyncio
+async def test_compact_blocks_transcode_to_same_markdown(tmp_path: Path) -> None:
+    transcoder = DocxTranscoder(assets_root=tmp_path)
+
+    expected = await transcoder.to_markdown("doc-compact", _sample_blocks())
+    actual = await transcoder.to_markdown(
+        "doc-compact", [compact_block(block) for block in _sample_blocks()]
+    )
+
+    assert actual == expected
+    assert "概览" in actual
+    assert "列表一" in actual
+
+
+def _page_payload(start: int, size: int) -> str:
+    items = [
+        {
+            "block_id": f"doxcn{index:020d}",
+            "parent_id": "doxcnroot",
+            "block_type": 2,
+            "children": [],
+            "comment_ids": [],
+            "text": {
+                "elements": [_text(f"段落 {index}", bold=index % 5 == 0)],
+                "style": {"align": 1, "folded": False},
+            },
+        }
+        for index in range(start, start + size)
+    ]
+    return json.dumps({"items": items})
+
+
+def _retained_bytes(pages: list[str], *, compact: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    blocks: list = []
+    for page in pages:
+        items = json.loads(page)["items"]
+        # 与 list_blocks(compact=True) 一致：每页解析后立即转换，原始字典随即释放
+        blocks.extend(compact_block(item) for item in items) if compact else blocks.extend(items)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(blocks) == 20000
+    return current
+
+
+def test_compact_blocks_retain_much_less_memory_than_raw_dicts() -> None:
+    pages = [_page_payload(start, 500) for start in range(0, 20000, 500)]
+
+    raw_bytes = _retained_bytes(pages, compact=False)
+    compact_bytes = _retained_bytes(pages, compact=True)
+
+    assert compact_bytes < raw_bytes * 0.7
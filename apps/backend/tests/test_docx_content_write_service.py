@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 import src.services.docx_content_write_service as content_write_module
@@ -224,3 +226,105 @@ async def test_create_from_convert_rolls_back_inserted_root_children_on_failure(
         "end_index": 4,
     }
     assert current_blocks[0]["children"] == ["c1", "c2"]
+
+
+def _make_pipeline_service(
+    *,
+    current_blocks: list[dict],
+    operation_log: list[tuple[str, dict]],
+    fail_on_segment: int | None = None,
+) -> DocxContentWriteService:
+    converted: list[str] = []
+
+    async def _list_blocks(*args, **kwargs):
+        return current_blocks
+
+    async def _convert_markdown_with_images(markdown, **kwargs):
+        index = len(converted)
+        converted.append(markdown)
+        operation_log.append(("convert", {"markdown": markdown}))
+        block_id = f"s{index}"
+        return ConvertResult(
+            first_level_block_ids=[block_id],
+            blocks=[{"block_id": block_id, "block_type": 2, "text": {"elements": []}}],
+        )
+
+    async def _apply_partial_update(*args, **kwargs):
+        raise AssertionError("full 模式不应尝试局部更新")
+
+    async def _create_children_recursive(*args, **kwargs):
+        await asyncio.sleep(0)
+        operation_log.append(("create", kwargs))
+        if fail_on_segment is not None and kwargs["child_ids"] == [f"s{fail_on_segment}"]:
+            kwargs["error_flag"]["error"] = True
+
+    async def _delete_children(*args, **kwargs):
+        operation_log.append(("delete", kwargs))
+
+    return DocxContentWriteService(
+        list_blocks=_list_blocks,
+        find_root_block=lambda items: items[0] if items else None,
+        convert_markdown_with_images=_convert_markdown_with_images,
+        normalize_convert=lambda convert: convert,
+        apply_partial_update=_apply_partial_update,
+        create_children_recursive=_create_children_recursive,
+        delete_children=_delete_children,
+        summarize_block_types=_summarize_block_types,
+        extract_children_ids=_extract_children_ids,
+        service_error_cls=RuntimeError,
+    )
+
+
+@pytest.mark.asyncio
+async def test_replace_document_content_pipelines_segments_in_full_mode(monkeypatch) -> None:
+    monkeypatch.setattr(content_write_module, "PIPELINE_SEGMENT_CHARS", 20)
+    operations: list[tuple[str, dict]] = []
+    service = _make_pipeline_service(
+        current_blocks=[{"block_id": "root", "block_type": 1, "children": ["c1", "c2"]}],
+        operation_log=operations,
+    )
+    markdown = "# 第一节\n\n第一段内容较长一些\n\n# 第二节\n\n第二段内容较长一些"
+
+    await service.replace_document_content(
+        document_id="doc-pipe",
+        markdown=markdown,
+        update_mode="full",
+    )
+
+    kinds = [name for name, _ in operations]
+    # 下一段的转换在本段写入之前就已发起
+    assert kinds[:3] == ["convert", "convert", "create"]
+    assert kinds.count("convert") == kinds.count("create") >= 2
+    assert kinds[-1] == "delete"
+    converted = "\n\n".join(item["markdown"] for name, item in operations if name == "convert")
+    assert converted == markdown
+    creates = [item for name, item in operations if name == "create"]
+    assert all(item["insert_index"] == -1 for item in creates)
+    assert operations[-1][1]["start_index"] == 0
+    assert operations[-1][1]["end_index"] == 2
+
+
+@pytest.mark.asyncio
+async def test_replace_document_content_pipeline_removes_partial_content_on_failure(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(content_write_module, "PIPELINE_SEGMENT_CHARS", 10)
+    operations: list[tuple[str, dict]] = []
+    service = _make_pipeline_service(
+        current_blocks=[{"block_id": "root", "block_type": 1, "children": ["c1"]}],
+        operation_log=operations,
+        fail_on_segment=1,
+    )
+
+    with pytest.raises(RuntimeError):
+        await service.replace_document_content(
+            document_id="doc-pipe-fail",
+            markdown="第一段内容\n\n第二段内容\n\n第三段内容",
+            update_mode="full",
+        )
+
+    deletes = [item for name, item in operations if name == "delete"]
+    assert {"start_index": 1, "end_index": 2} == {
+        key: deletes[-1][key] for key in ("start_index", "end_index")
+    }
+    assert all(item["start_index"] != 0 for item in deletes)
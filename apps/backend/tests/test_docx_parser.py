@@ -0,0 +1,150 @@
+from pathlib import Path
+
+import pytest
+
+from src.services.docx_parser import DocxParser
+from src.services.transcoder import DocxTranscoder
+
+_BLOCK_COUNT = 50_000
+
+
+def _text_block(block_id: str, parent_id: str, content: str, *, block_type: int = 2, children=None) -> dict:
+    field = {2: "text", 12: "bullet"}[block_type]
+    block = {
+        "block_id": block_id,
+        "block_type": block_type,
+        "parent_id": parent_id,
+        field: {"elements": [{"text_run": {"content": content}}], "style": {}},
+    }
+    if children:
+        block["children"] = children
+    return block
+
+
+def _wide_document(count: int) -> list[dict]:
+    ids = [f"p{index}" for index in range(count)]
+    blocks = [{"block_id": "root", "block_type": 1, "children": ids}]
+    blocks.extend(_text_block(block_id, "root", f"段落 {block_id}") for block_id in ids)
+    return blocks
+
+
+def _deep_document(count: int) -> list[dict]:
+    blocks = [{"block_id": "root", "block_type": 1, "children": ["b0"]}]
+    for index in range(count):
+        children = [f"b{index + 1}"] if index + 1 < count else None
+        parent = "root" if index == 0 else f"b{index - 1}"
+        blocks.append(
+            _text_block(f"b{index}", parent, f"层级{index}", block_type=12, children=children)
+        )
+    return blocks
+
+
+def test_parser_indexes_depth_parent_and_order() -> None:
+    blocks = [
+        {"block_id": "root", "block_type": 1, "children": ["a", "b"]},
+        _text_block("a", "root", "甲", children=["a1"]),
+        _text_block("a1", "a", "甲一"),
+        _text_block("b", "root", "乙"),
+    ]
+
+    parser = DocxParser(blocks)
+
+    assert parser.document_order() == ["root", "a", "a1", "b"]
+    assert [parser.depth(block_id) for block_id in ("root", "a", "a1", "b")] == [0, 1, 2, 1]
+    assert parser.parent_id("a1") == "a"
+    assert list(parser.iter_subtree("root", max_depth=1)) == ["root", "a", "b"]
+    assert parser.collect_text("root") == "甲 甲一 乙"
+    assert parser.collect_text("root", max_depth=1) == "甲 乙"
+
+
+def test_parser_drops_cyclic_children_references() -> None:
+    blocks = [
+        {"block_id": "root", "block_type": 1, "children": ["a"]},
+        _text_block("a", "root", "甲", children=["b"]),
+        _text_block("b", "a", "乙", children=["a", "root"]),
+    ]
+
+    parser = DocxParser(blocks)
+
+    assert parser.children_ids("b") == []
+    assert parser.collect_text("root", max_depth=None) == "甲 乙"
+
+
+def test_parser_memoizes_text_of_each_block(monkeypatch: pytest.MonkeyPatch) -> None:
+    blocks = _wide_document(50)
+    parser = DocxParser(blocks)
+    calls = 0
+    original = parser._format_element
+
+    def counting(element: dict) -> str:
+        nonlocal calls
+        calls += 1
+        return original(element)
+
+    monkeypatch.setattr(parser, "_format_element", counting)
+
+    first = parser.collect_text("root", max_depth=None)
+    for block in blocks:
+        parser.text_from_block(block)
+    second = parser.collect_text("root", max_depth=None)
+
+    assert first == second
+    assert calls == 50
+
+
+def _count_format_calls(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    # 用格式化次数代替耗时断言：每个块只应格式化一次，重复遍历子树会让次数成倍增长
+    calls = [0]
+    original = DocxParser._format_element
+
+    def counting(self: DocxParser, element: dict) -> str:
+        calls[0] += 1
+        return original(self, element)
+
+    monkeypatch.setattr(DocxParser, "_format_element", counting)
+    return calls
+
+
+def test_parser_indexes_wide_50k_block_document_linearly(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    blocks = _wide_document(_BLOCK_COUNT)
+    calls = _count_format_calls(monkeypatch)
+
+    parser = DocxParser(blocks)
+    text = parser.collect_text("root", max_depth=None)
+
+    assert len(parser.resolve_order()) == _BLOCK_COUNT
+    assert text.endswith(f"段落 p{_BLOCK_COUNT - 1}")
+    assert calls[0] == _BLOCK_COUNT
+
+
+def test_parser_handles_50k_deep_nesting_without_recursion(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    blocks = _deep_document(_BLOCK_COUNT)
+    calls = _count_format_calls(monkeypatch)
+
+    parser = DocxParser(blocks)
+    text = parser.collect_text("b0", max_depth=None)
+
+    assert parser.depth(f"b{_BLOCK_COUNT - 1}") == _BLOCK_COUNT
+    assert text.startswith("层级0 层级1")
+    assert text.endswith(f"层级{_BLOCK_COUNT - 1}")
+    assert calls[0] == _BLOCK_COUNT
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("builder", [_wide_document, _deep_document])
+async def test_transcoder_renders_50k_block_documents(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, builder
+) -> None:
+    blocks = builder(_BLOCK_COUNT)
+    transcoder = DocxTranscoder(assets_root=tmp_path)
+    calls = _count_format_calls(monkeypatch)
+
+    markdown = await transcoder.to_markdown("doc-large", blocks)
+
+    assert markdown.startswith(("段落 p0", "- 层级0"))
+    assert str(_BLOCK_COUNT - 1) in markdown.splitlines()[-1]
+    assert calls[0] == _BLOCK_COUNT
@@ -239,16 +239,11 @@ async def test_replace_document_content_creates_nested_children() -> None:
             "code": 0,
             "data": {
                 "children": [{"block_id": "np1"}],
+                "block_id_relations": [
+                    {"temporary_block_id": "p1", "block_id": "np1"},
+                    {"temporary_block_id": "c1", "block_id": "nc1"},
+                ],
                 "document_revision_id": 3,
-                "client_token": "t3",
-            },
-        },
-        {
-            "code": 0,
-            "data": {
-                "children": [{"block_id": "nc1"}],
-                "document_revision_id": 4,
-                "client_token": "t4",
             },
         },
     ]
@@ -257,14 +252,46 @@ async def test_replace_document_content_creates_nested_children() -> None:
 
     await service.replace_document_content("doc456", "- item", update_mode="full")
 
-    assert len(client.requests) == 4
-    assert client.requests[2][1].endswith(
-        "/open-apis/docx/v1/documents/doc456/blocks/root/children"
+    assert len(client.requests) == 3
+    method, url, kwargs = client.requests[2]
+    assert method == "POST"
+    assert url.endswith("/open-apis/docx/v1/documents/doc456/blocks/root/descendant")
+    payload = kwargs["json"]
+    assert payload["children_id"] == ["p1"]
+    assert [block["block_id"] for block in payload["descendants"]] == ["p1", "c1"]
+    assert payload["descendants"][0]["children"] == ["c1"]
+    assert "children" not in payload["descendants"][1]
+
+
+@pytest.mark.asyncio
+async def test_create_children_recursive_batches_subtrees_within_block_limit() -> None:
+    client = FakeClient(
+        [
+            {"code": 0, "data": {"children": [{"block_id": "n1"}, {"block_id": "n2"}]}},
+            {"code": 0, "data": {"children": [{"block_id": "n3"}]}},
+        ]
     )
-    assert client.requests[3][1].endswith(
-        "/open-apis/docx/v1/documents/doc456/blocks/np1/children"
+    service = DocxService(client=client)
+    service._block_create_service._descendant_max_blocks = 4
+    block_map = {
+        block_id: {"block_id": block_id, "block_type": 12, "bullet": {"elements": []}}
+        for block_id in ("p1", "c1", "p2", "c2", "p3", "c3")
+    }
+    children_map = {"p1": ["c1"], "p2": ["c2"], "p3": ["c3"]}
+
+    await service._block_create_service.create_children_recursive(
+        document_id="doc-batch",
+        parent_block_id="root",
+        child_ids=["p1", "p2", "p3"],
+        block_map=block_map,
+        children_map=children_map,
+        user_id_type="open_id",
     )
 
+    assert [req[1].rsplit("/", 1)[-1] for req in client.requests] == ["descendant", "descendant"]
+    assert client.requests[0][2]["json"]["children_id"] == ["p1", "p2"]
+    assert client.requests[1][2]["json"]["children_id"] == ["p3"]
+
 
 @pytest.mark.asyncio
 async def test_insert_markdown_block_creates_children_at_index() -> None:
@@ -928,6 +955,105 @@ def test_build_create_chunks_isolates_complex_blocks(tmp_path) -> None:
     assert chunks == [["a"], ["b"], ["c"], ["d"], ["e"]]
 
 
+def test_build_create_chunks_groups_consecutive_asset_blocks(tmp_path) -> None:
+    chunks = _build_create_chunks(
+        child_ids=["a", "img1", "img2", "file1", "b", "img3"],
+        children_map={},
+        image_paths={
+            "img1": tmp_path / "1.png",
+            "img2": tmp_path / "2.png",
+            "img3": tmp_path / "3.png",
+        },
+        file_paths={"file1": tmp_path / "a.pdf"},
+        batch_size=50,
+    )
+
+    assert chunks == [["a"], ["img1", "img2", "file1"], ["b"], ["img3"]]
+
+
+@pytest.mark.asyncio
+async def test_upload_created_images_reuses_cached_token_and_dedupes_paths(tmp_path) -> None:
+    from src.services.docx_block_create_service import DocxBlockCreateService
+    from src.services.media_token_cache_service import MediaContentKey
+
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(b"logo")
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"shot")
+
+    class FakeCache:
+        def __init__(self) -> None:
+            self.tokens: dict[str, str] = {"hash-logo": "stale-token"}
+            self.invalidated: list[str] = []
+
+        async def content_key(self, path):
+            return MediaContentKey(content_hash=f"hash-{path.stem}", size=4)
+
+        async def get_token(self, key, *, document_id, parent_type):
+            return self.tokens.get(key.content_hash)
+
+        async def remember(self, key, *, document_id, parent_type, file_token):
+            self.tokens[key.content_hash] = file_token
+
+        async def invalidate(self, key, *, document_id, parent_type):
+            self.invalidated.append(key.content_hash)
+            self.tokens.pop(key.content_hash, None)
+            return True
+
+    class RecordingUploader:
+        def __init__(self) -> None:
+            self.calls: list[tuple[str, str]] = []
+
+        async def upload_image(self, file_path, parent_node: str, parent_type: str | None = None):
+            self.calls.append((file_path.name, parent_node))
+            return f"token-{file_path.stem}"
+
+    replaced: list[tuple[str, str]] = []
+
+    async def replace_image_block(*, document_id, block_id, token, image_path, user_id_type):
+        if token == "stale-token":
+            raise RuntimeError("invalid media token")
+        replaced.append((block_id, token))
+
+    async def _unused(**kwargs):
+        return None
+
+    cache = FakeCache()
+    uploader = RecordingUploader()
+    service = DocxBlockCreateService(
+        request_json=_unused,
+        sanitize_block=lambda block: block,
+        replace_image_block=replace_image_block,
+        replace_file_block=_unused,
+        populate_table_cells=_unused,
+        fallback_table_block_without_code=_unused,
+        summarize_block_types=lambda blocks: {},
+        truncate_payload=lambda block, limit=0: "",
+        media_uploader=uploader,
+        file_uploader=None,
+        base_url="https://open.feishu.cn",
+        image_parent_type="docx_image",
+        file_parent_type="docx_file",
+        service_error_cls=RuntimeError,
+        media_token_cache=cache,
+    )
+
+    await service._upload_created_images(
+        created=[{"block_id": "n1"}, {"block_id": "n2"}, {"block_id": "n3"}],
+        image_uploads=[(0, logo), (1, shot), (2, logo)],
+        document_id="doc-1",
+        user_id_type="open_id",
+    )
+
+    assert cache.invalidated == ["hash-logo"]
+    assert sorted(uploader.calls) == [("logo.png", "n1"), ("shot.png", "n2")]
+    assert sorted(replaced) == [
+        ("n1", "token-logo"),
+        ("n2", "token-shot"),
+        ("n3", "token-logo"),
+    ]
+
+
 def test_build_create_chunks_batches_simple_blocks() -> None:
     chunks = _build_create_chunks(
         child_ids=["a", "b", "c", "d"],
@@ -1112,6 +1238,231 @@ async def test_partial_update_table_children_flattens_nested_cells() -> None:
     assert service.children_map.get("t1") == ["cell1", "cell2", "cell3"]
 
 
+class _RecordingPartialService(DocxService):
+    def __init__(self) -> None:
+        super().__init__(client=FakeClient([]))
+        self.calls: list[tuple[str, dict]] = []
+
+    async def delete_children(self, *args, **kwargs) -> None:
+        self.calls.append(("delete", kwargs))
+
+    async def _create_children_recursive(self, *args, **kwargs) -> None:
+        self.calls.append(("create", kwargs))
+
+    async def batch_update_blocks(self, *args, **kwargs) -> None:
+        self.calls.append(("update", kwargs))
+
+
+def _text_block(block_id: str, content: str, block_type: int = 2, **extra) -> dict:
+    field = {2: "text", 12: "bullet"}[block_type]
+    block = {
+        "block_id": block_id,
+        "block_type": block_type,
+        field: {"elements": [{"text_run": {"content": content}}]},
+    }
+    block.update(extra)
+    return block
+
+
+def _table_blocks(prefix: str, values: list[str]) -> list[dict]:
+    cells = [f"{prefix}-cell{idx}" for idx in range(len(values))]
+    blocks: list[dict] = [
+        {
+            "block_id": f"{prefix}-table",
+            "block_type": 31,
+            "children": cells,
+            "table": {"property": {"row_size": 2, "column_size": 2}},
+        }
+    ]
+    for idx, value in enumerate(values):
+        blocks.append(
+            {
+                "block_id": cells[idx],
+                "block_type": 32,
+                "children": [f"{prefix}-p{idx}"],
+                "table_cell": {},
+            }
+        )
+        blocks.append(_text_block(f"{prefix}-p{idx}", value))
+    return blocks
+
+
+@pytest.mark.asyncio
+async def test_partial_update_edits_single_table_cell_in_place() -> None:
+    service = _RecordingPartialService()
+    current_blocks = [
+        {"block_id": "root", "block_type": 1, "children": ["h", "cur-table", "tail"]},
+        _text_block("h", "标题"),
+        *_table_blocks("cur", ["A", "B", "1", "2"]),
+        _text_block("tail", "结尾"),
+    ]
+    convert = ConvertResult(
+        first_level_block_ids=["nh", "new-table", "ntail"],
+        blocks=[
+            _text_block("nh", "标题"),
+            *_table_blocks("new", ["A", "B", "1", "3"]),
+            _text_block("ntail", "结尾"),
+        ],
+    )
+
+    applied = await service._apply_partial_update(
+        document_id="doc-cell",
+        root_block_id="root",
+        current_children=["h", "cur-table", "tail"],
+        current_blocks=current_blocks,
+        convert=convert,
+        user_id_type="open_id",
+        force=False,
+    )
+
+    assert applied is True
+    assert [kind for kind, _ in service.calls] == ["update"]
+    requests = service.calls[0][1]["requests"]
+    assert requests == [
+        {
+            "block_id": "cur-p3",
+            "update_text_elements": {"elements": [{"text_run": {"content": "3"}}]},
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_partial_update_inserts_nested_list_item_under_existing_parent() -> None:
+    service = _RecordingPartialService()
+    current_blocks = [
+        {"block_id": "root", "block_type": 1, "children": ["b1", "b2"]},
+        _text_block("b1", "父项", 12, children=["c1"]),
+        _text_block("c1", "子项一", 12, parent_id="b1"),
+        _text_block("b2", "其他", 12),
+    ]
+    convert = ConvertResult(
+        first_level_block_ids=["n1", "n2"],
+        blocks=[
+            _text_block("n1", "父项", 12, children=["nc1", "nc2"]),
+            _text_block("nc1", "子项一", 12),
+            _text_block("nc2", "子项二", 12),
+            _text_block("n2", "其他", 12),
+        ],
+    )
+
+    applied = await service._apply_partial_update(
+        document_id="doc-list",
+        root_block_id="root",
+        current_children=["b1", "b2"],
+        current_blocks=current_blocks,
+        convert=convert,
+        user_id_type="open_id",
+        force=False,
+    )
+
+    assert applied is True
+    assert [kind for kind, _ in service.calls] == ["create"]
+    create_kwargs = service.calls[0][1]
+    assert create_kwargs["parent_block_id"] == "b1"
+    assert create_kwargs["child_ids"] == ["nc2"]
+    assert create_kwargs["insert_index"] == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_update_aligns_repeated_signatures_around_unique_anchors() -> None:
+    service = _RecordingPartialService()
+    current_ids = ["a", "e1", "b", "e2", "c"]
+    current_blocks = [
+        {"block_id": "root", "block_type": 1, "children": current_ids},
+        _text_block("a", "第一段"),
+        _text_block("e1", "---"),
+        _text_block("b", "第二段"),
+        _text_block("e2", "---"),
+        _text_block("c", "第三段"),
+    ]
+    convert = ConvertResult(
+        first_level_block_ids=["na", "ne1", "nb", "ne2", "nc"],
+        blocks=[
+            _text_block("na", "第一段"),
+            _text_block("ne1", "---"),
+            _text_block("nb", "第二段（修订）"),
+            _text_block("ne2", "---"),
+            _text_block("nc", "第三段"),
+        ],
+    )
+
+    applied = await service._apply_partial_update(
+        document_id="doc-dup",
+        root_block_id="root",
+        current_children=current_ids,
+        current_blocks=current_blocks,
+        convert=convert,
+        user_id_type="open_id",
+        force=False,
+    )
+
+    assert applied is True
+    assert [kind for kind, _ in service.calls] == ["update"]
+    assert service.calls[0][1]["requests"][0]["block_id"] == "b"
+
+
+@pytest.mark.asyncio
+async def test_plan_text_updates_only_accepts_same_type_text_changes() -> None:
+    def convert_response(block_type: int, content: str) -> dict:
+        field = {2: "text", 3: "heading1"}[block_type]
+        return {
+            "code": 0,
+            "data": {
+                "first_level_block_ids": ["n1"],
+                "blocks": [
+                    {
+                        "block_id": "n1",
+                        "block_type": block_type,
+                        field: {"elements": [{"text_run": {"content": content}}]},
+                    }
+                ],
+            },
+        }
+
+    client = FakeClient([convert_response(2, "修正后的段落"), convert_response(3, "修正后的段落")])
+    service = DocxService(client=client)
+    current_blocks = [_text_block("b1", "修正前的段落")]
+
+    requests = await service.plan_text_updates(
+        "doc-plan", "修正后的段落", current_ids=["b1"], current_blocks=current_blocks, base_path=None
+    )
+    rejected = await service.plan_text_updates(
+        "doc-plan", "# 修正后的段落", current_ids=["b1"], current_blocks=current_blocks, base_path=None
+    )
+
+    assert requests == [
+        {
+            "block_id": "b1",
+            "update_text_elements": {
+                "elements": [{"text_run": {"content": "修正后的段落"}}]
+            },
+        }
+    ]
+    assert rejected is None
+
+
+@pytest.mark.asyncio
+async def test_plan_text_updates_rejects_cloud_block_with_nested_children() -> None:
+    convert = ConvertResult(
+        first_level_block_ids=["n1"],
+        blocks=[_text_block("n1", "item edited", block_type=12)],
+    )
+    service = DocxService(client=FakeClient([]))
+    # 运行器只传一级块：c1 的子块 c2 不在 current_blocks 里，也不能当成无子块原位更新
+    current_blocks = [_text_block("c1", "item", block_type=12, children=["c2"])]
+
+    requests = await service.plan_text_updates(
+        "doc-plan",
+        "- item edited",
+        current_ids=["c1"],
+        current_blocks=current_blocks,
+        base_path=None,
+        convert=convert,
+    )
+
+    assert requests is None
+
+
 def test_sanitize_block_strips_table_cells() -> None:
     block = {
         "block_id": "tbl1",
@@ -1685,6 +2036,7 @@ async def test_replace_document_content_populates_table_cells_without_creating_c
                 ],
             },
         },
+        {"code": 1770001, "msg": "invalid param"},
         {
             "code": 0,
             "data": {
@@ -1710,6 +2062,11 @@ async def test_replace_document_content_populates_table_cells_without_creating_c
     await service.replace_document_content("doc-table", "| A | B |", update_mode="full")
 
     urls = [req[1] for req in client.requests]
+    descendant_call = client.requests[2]
+    assert descendant_call[1].endswith("/blocks/root/descendant")
+    descendant_table = descendant_call[2]["json"]["descendants"][0]
+    assert descendant_table["table"]["property"]["row_size"] == 1
+    assert descendant_table["children"] == ["c1", "c2"]
     create_call = next(req for req in client.requests if req[1].endswith("/blocks/root/children"))
     table_payload = create_call[2]["json"]["children"][0]["table"]
     assert table_payload["property"]["row_size"] == 1
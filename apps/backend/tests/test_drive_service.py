@@ -216,3 +216,33 @@ async def test_delete_file_raises_with_detail() -> None:
     assert "field validation failed" in str(exc.value)
     assert "bad-token" in str(exc.value)
     assert "docx" in str(exc.value)
+
+
+@pytest.mark.asyncio
+async def test_move_file_and_wait_task(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeClient(
+        [
+            {"code": 0, "data": {"task_id": "task-1"}},
+            {"code": 0, "data": {"status": "process"}},
+            {"code": 0, "data": {"status": "success"}},
+            {"code": 0, "data": {}},
+        ]
+    )
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr("src.services.drive_service.asyncio.sleep", fake_sleep)
+    service = DriveService(client=client)
+
+    task_id = await service.move_file("fld-1", "folder", "fld-2")
+    await service.wait_task(task_id or "", interval=0.5)
+    assert await service.move_file("doc-1", "docx", "fld-2") is None
+
+    method, url, kwargs = client.requests[0]
+    assert method == "POST"
+    assert url.endswith("/open-apis/drive/v1/files/fld-1/move")
+    assert kwargs["json"] == {"type": "folder", "folder_token": "fld-2"}
+    assert client.requests[1][2]["params"] == {"task_id": "task-1"}
+    assert sleeps == [0.5]
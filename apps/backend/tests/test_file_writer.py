@@ -4,7 +4,9 @@ from pathlib import Path
 import pytest
 
 import src.services.file_writer as file_writer_module
+from src.services.file_hash import calculate_file_hash
 from src.services.file_writer import FileWriter
+from src.services.markdown_blocks import iter_resource_refs, split_markdown_blocks
 
 
 def test_write_markdown_sets_mtime(tmp_path: Path) -> None:
@@ -18,6 +20,84 @@ def test_write_markdown_sets_mtime(tmp_path: Path) -> None:
     assert abs(target.stat().st_mtime - mtime) < 1.0
 
 
+def test_markdown_stream_matches_joined_write_and_precomputes_metadata(tmp_path: Path) -> None:
+    lines = [
+        "",
+        "   ",
+        "  # 标题",
+        "",
+        "正文 ![](assets/a.png) 与 [附件](attachments/b.pdf)",
+        "",
+        "| a | b |",
+        "| --- | --- |",
+        "| 1 | 2 |",
+        "",
+        "- 列表\n  - 子项",
+        "```",
+        "code  ",
+        "```  ",
+        "",
+        "  ",
+    ]
+    expected = "\n".join(lines).strip()
+    reference = tmp_path / "reference.md"
+    FileWriter.write_markdown(reference, expected, 1700000000.0)
+    target = tmp_path / "nested" / "doc.md"
+
+    writer = FileWriter.open_markdown_stream(target, 1700000000.0)
+    writer.write_lines(lines)
+    result = writer.commit()
+
+    assert target.read_bytes() == reference.read_bytes()
+    assert result.content_hash == calculate_file_hash(target)
+    assert result.size == target.stat().st_size
+    assert abs(result.mtime - 1700000000.0) < 1.0
+    assert result.blocks == split_markdown_blocks(expected)
+    assert sorted(result.resource_refs) == sorted(iter_resource_refs(expected))
+    assert not list(target.parent.glob("*.tmp"))
+
+
+def test_markdown_stream_abort_keeps_existing_file(tmp_path: Path) -> None:
+    target = tmp_path / "doc.md"
+    target.write_text("旧内容", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with FileWriter.open_markdown_stream(target, 1700000000.0) as writer:
+            writer.write_lines(["新内容"])
+            raise RuntimeError("transcode failed")
+
+    assert target.read_text(encoding="utf-8") == "旧内容"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_markdown_stream_leaves_identical_file_untouched(tmp_path: Path) -> None:
+    target = tmp_path / "doc.md"
+    FileWriter.write_markdown(target, "# 标题\n\n正文", 1700000000.0)
+    replaced: list[Path] = []
+
+    writer = FileWriter.open_markdown_stream(target, 1700000900.0)
+    writer.write_lines(["# 标题", "", "正文"])
+    result = writer.commit(before_replace=replaced.append)
+
+    assert result.written is False
+    assert replaced == []
+    assert abs(target.stat().st_mtime - 1700000000.0) < 1.0
+    assert result.content_hash == calculate_file_hash(target)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    writer = FileWriter.open_markdown_stream(
+        target,
+        1700000900.0,
+        baseline=("stale-hash", target.stat().st_size, target.stat().st_mtime),
+    )
+    writer.write_lines(["# 标题", "", "正文"])
+    result = writer.commit(before_replace=replaced.append)
+
+    assert result.written is True
+    assert replaced == [target]
+    assert abs(target.stat().st_mtime - 1700000900.0) < 1.0
+
+
 def test_write_bytes_retries_when_file_is_temporarily_locked(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -0,0 +1,107 @@
+from pathlib import Path
+
+from src.services.local_event_coalescer import LocalEventCoalescer, scan_files
+from src.services.watcher import FileChangeEvent
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _event(path: Path, event_type: str = "modified", is_directory: bool = False) -> FileChangeEvent:
+    return FileChangeEvent(
+        event_type=event_type,
+        src_path=str(path),
+        dest_path=None,
+        timestamp=0.0,
+        is_directory=is_directory,
+    )
+
+
+def _coalescer(root: Path, clock: FakeClock, **kwargs):
+    forwarded: list[FileChangeEvent] = []
+    bursts: list[int] = []
+    coalescer = LocalEventCoalescer(
+        root,
+        forward=forwarded.append,
+        on_burst=lambda: bursts.append(1),
+        clock=clock,
+        **kwargs,
+    )
+    return coalescer, forwarded, bursts
+
+
+def test_coalescer_forwards_events_below_threshold(tmp_path: Path) -> None:
+    clock = FakeClock()
+    coalescer, forwarded, bursts = _coalescer(tmp_path, clock, burst_threshold=5)
+
+    for index in range(5):
+        coalescer.submit(_event(tmp_path / f"{index}.md"))
+    clock.now += 1.5
+    for index in range(5):
+        coalescer.submit(_event(tmp_path / f"later-{index}.md"))
+
+    assert len(forwarded) == 10
+    assert bursts == []
+    assert not coalescer.in_burst
+
+
+def test_coalescer_collapses_burst_into_dirty_directories(tmp_path: Path) -> None:
+    clock = FakeClock()
+    coalescer, forwarded, bursts = _coalescer(
+        tmp_path, clock, burst_threshold=3, quiet_seconds=2.0
+    )
+
+    for index in range(10_000):
+        folder = tmp_path / "src" / f"pkg{index % 20}"
+        coalescer.submit(_event(folder / f"file{index}.py", event_type="created"))
+    coalescer.submit(_event(tmp_path / "src", event_type="modified", is_directory=True))
+    coalescer.submit(_event(tmp_path / "old.md", event_type="deleted"))
+
+    assert len(forwarded) == 3
+    assert bursts == [1]
+    assert coalescer.take_dirty() is None
+    assert coalescer.quiet_remaining() == 2.0
+
+    clock.now += 2.0
+    batch = coalescer.take_dirty()
+
+    assert batch is not None
+    # 删除事件把根目录标脏，嵌套的 src/pkgN 目录随之合并
+    assert batch.directories == [tmp_path]
+    assert batch.event_count == 10_000 - 3 + 2
+    assert batch.saw_deletes is True
+    assert not coalescer.in_burst
+
+
+def test_coalescer_falls_back_to_root_when_dirty_set_overflows(tmp_path: Path) -> None:
+    clock = FakeClock()
+    coalescer, _, _ = _coalescer(tmp_path, clock, burst_threshold=1, max_dirty_dirs=8)
+
+    for index in range(100):
+        coalescer.submit(_event(tmp_path / f"dir{index}" / "a.txt"))
+    clock.now += 5
+    batch = coalescer.take_dirty()
+
+    assert batch is not None
+    assert batch.directories == [tmp_path]
+    assert batch.saw_deletes is False
+
+
+def test_scan_files_walks_directories_iteratively(tmp_path: Path) -> None:
+    deep = tmp_path
+    for index in range(50):
+        deep = deep / f"d{index}"
+    deep.mkdir(parents=True)
+    (deep / "leaf.md").write_text("x", encoding="utf-8")
+    (tmp_path / "top.md").write_text("x", encoding="utf-8")
+    (tmp_path / "skip.tmp").write_text("x", encoding="utf-8")
+
+    files = scan_files([tmp_path], lambda path: path.suffix == ".md")
+
+    assert sorted(files) == sorted([deep / "leaf.md", tmp_path / "top.md"])
+    assert scan_files([tmp_path / "missing"]) == []
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from src.db.session import get_session_maker, init_db
+from src.services.media_token_cache_service import MediaContentKey, MediaTokenCacheService
+
+
+@pytest.mark.asyncio
+async def test_media_token_cache_scopes_tokens_by_document(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = MediaTokenCacheService(session_maker=get_session_maker(db_url))
+    image_path = tmp_path / "logo.png"
+    image_path.write_bytes(b"logo")
+    key = await service.content_key(image_path)
+
+    assert await service.get_token(key, document_id="doc-1", parent_type="docx_image") is None
+    await service.remember(key, document_id="doc-1", parent_type="docx_image", file_token="tok-1")
+
+    assert await service.get_token(key, document_id="doc-1", parent_type="docx_image") == "tok-1"
+    assert await service.get_token(key, document_id="doc-2", parent_type="docx_image") is None
+    assert await service.get_token(key, document_id="doc-1", parent_type="docx_file") is None
+
+    resized = MediaContentKey(content_hash=key.content_hash, size=key.size + 1)
+    assert await service.get_token(resized, document_id="doc-1", parent_type="docx_image") is None
+
+    await service.remember(key, document_id="doc-1", parent_type="docx_image", file_token="tok-2")
+    assert await service.invalidate(key, document_id="doc-1", parent_type="docx_image") is True
+    assert await service.get_token(key, document_id="doc-1", parent_type="docx_image") is None
+
+
+@pytest.mark.asyncio
+async def test_media_token_cache_expires_unverified_tokens(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = MediaTokenCacheService(session_maker=get_session_maker(db_url), max_age_seconds=0)
+    key = MediaContentKey(content_hash="abc", size=3)
+    await service.remember(key, document_id="doc-1", parent_type="docx_image", file_token="tok")
+    time.sleep(0.01)
+
+    assert await service.get_token(key, document_id="doc-1", parent_type="docx_image") is None
+
+
+@pytest.mark.asyncio
+async def test_media_token_cache_memoizes_file_hash(tmp_path, monkeypatch) -> None:
+    import src.services.async_fs as async_fs_module
+
+    calls: list[str] = []
+    original = async_fs_module.calculate_file_hash
+
+    def _counting_hash(path):
+        calls.append(str(path))
+        return original(path)
+
+    monkeypatch.setattr(async_fs_module, "calculate_file_hash", _counting_hash)
+    service = MediaTokenCacheService()
+    image_path = tmp_path / "logo.png"
+    image_path.write_bytes(b"logo")
+
+    first = await service.content_key(image_path)
+    second = await service.content_key(image_path)
+    # 并发计算同一批文件时记忆表不会出现竞争
+    keys = await asyncio.gather(*(service.content_key(image_path) for _ in range(8)))
+
+    assert first == second
+    assert all(key == first for key in keys)
+    assert len(calls) == 1
@@ -52,6 +52,35 @@ async def test_list_sheet_ids_returns_sorted_result() -> None:
     assert url.endswith("/open-apis/sheets/v3/spreadsheets/spreadsheet-token/sheets/query")
 
 
+@pytest.mark.asyncio
+async def test_list_sheets_returns_titles_in_tab_order() -> None:
+    response = _build_response(
+        {
+            "code": 0,
+            "data": {
+                "sheets": [
+                    {
+                        "sheet_id": "sheet-b",
+                        "title": "明细",
+                        "index": 1,
+                        "grid_properties": {"row_count": 20, "column_count": 4},
+                    },
+                    {"sheet_id": "sheet-a", "title": "汇总", "index": 0},
+                ]
+            },
+        }
+    )
+    service = SheetService(client=FakeClient([response]))
+
+    result = await service.list_sheets("spreadsheet-token")
+
+    assert [(item.sheet_id, item.title) for item in result] == [
+        ("sheet-a", "汇总"),
+        ("sheet-b", "明细"),
+    ]
+    assert (result[1].row_count, result[1].column_count) == (20, 4)
+
+
 @pytest.mark.asyncio
 async def test_get_sheet_meta_parses_grid_properties() -> None:
     response = _build_response(
@@ -107,3 +136,35 @@ async def test_get_values_builds_a1_range_and_returns_rows() -> None:
     method, url, _ = client.requests[0]
     assert method == "GET"
     assert "/values/sheet-1%21A1%3AAB3" in url
+
+
+@pytest.mark.asyncio
+async def test_iter_value_chunks_reads_row_ranges_in_order() -> None:
+    responses = [
+        _build_response(
+            {"code": 0, "data": {"valueRange": {"values": [[f"r{row}"] for row in rows]}}}
+        )
+        for rows in ((1, 2), (3, 4), (5,))
+    ]
+    client = FakeClient(responses)
+    service = SheetService(client=client)
+
+    chunks = [
+        chunk
+        async for chunk in service.iter_value_chunks(
+            "spreadsheet-token",
+            "sheet-1",
+            row_count=5,
+            column_count=2,
+            chunk_rows=2,
+            concurrency=2,
+            value_render_option="ToString",
+        )
+    ]
+
+    assert chunks == [[["r1"], ["r2"]], [["r3"], ["r4"]], [["r5"]]]
+    urls = [url for _, url, _ in client.requests]
+    assert "/values/sheet-1%21A1%3AB2" in urls[0]
+    assert "/values/sheet-1%21A3%3AB4" in urls[1]
+    assert "/values/sheet-1%21A5%3AB5" in urls[2]
+    assert client.requests[0][2]["params"]["valueRenderOption"] == "ToString"
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from src.services.sheet_service import SheetMeta
+from src.services.sheet_values_export_service import (
+    SheetValuesExportService,
+    plain_cell_text,
+)
+
+
+class FakeSheetService:
+    def __init__(self, meta: SheetMeta, chunks: list[list[list[object]]]) -> None:
+        self.meta = meta
+        self.chunks = chunks
+        self.chunk_kwargs: list[dict] = []
+
+    async def get_sheet_meta(self, spreadsheet_token: str, sheet_id: str) -> SheetMeta:
+        return self.meta
+
+    async def iter_value_chunks(self, spreadsheet_token: str, sheet_id: str, **kwargs):
+        self.chunk_kwargs.append(kwargs)
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_export_sheet_streams_chunks_and_drops_trailing_blank_rows(tmp_path: Path) -> None:
+    service = FakeSheetService(
+        SheetMeta(sheet_id="sheet-1", title="汇总", row_count=6, column_count=3),
+        [
+            [["项目", "金额", None], [None, None, None]],
+            [["水电", 120.5, ""], [None, None, None], [None, None, None]],
+        ],
+    )
+    exporter = SheetValuesExportService(service, max_cells=100, chunk_cells=6)  # type: ignore[arg-type]
+    target = tmp_path / "预算 - 汇总.csv"
+
+    result = await exporter.export_sheet("token", "sheet-1", target, mtime=1700000000.0)
+
+    assert result is not None
+    assert (result.row_count, result.column_count, result.chunk_count) == (3, 2, 2)
+    assert target.read_text(encoding="utf-8-sig").splitlines() == ["项目,金额", "", "水电,120.5"]
+    assert service.chunk_kwargs[0]["chunk_rows"] == 2
+    assert target.stat().st_mtime == 1700000000.0
+
+
+@pytest.mark.asyncio
+async def test_export_sheet_renders_markdown_table(tmp_path: Path) -> None:
+    service = FakeSheetService(
+        SheetMeta(sheet_id="sheet-1", title="汇总", row_count=2, column_count=2),
+        [[["名称", "说明"], ["a|b", None]]],
+    )
+    exporter = SheetValuesExportService(service, max_cells=100)  # type: ignore[arg-type]
+    target = tmp_path / "汇总.md"
+
+    await exporter.export_sheet("token", "sheet-1", target, mtime=1.0, file_format="markdown")
+
+    assert target.read_text(encoding="utf-8").splitlines() == [
+        "| 名称 | 说明 |",
+        "| --- | --- |",
+        "| a\\|b |  |",
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["汇总.md"]
+
+
+@pytest.mark.asyncio
+async def test_export_sheet_skips_sheets_over_cell_limit(tmp_path: Path) -> None:
+    service = FakeSheetService(
+        SheetMeta(sheet_id="sheet-1", title="明细", row_count=1000, column_count=26),
+        [],
+    )
+    exporter = SheetValuesExportService(service, max_cells=10000)  # type: ignore[arg-type]
+
+    result = await exporter.export_sheet("token", "sheet-1", tmp_path / "明细.csv", mtime=1.0)
+
+    assert result is None
+    assert service.chunk_kwargs == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_plain_cell_text_joins_rich_text_segments() -> None:
+    assert plain_cell_text([{"type": "text", "text": "飞书"}, {"type": "url", "text": "文档"}]) == "飞书文档"
+    assert plain_cell_text({"type": "mention", "text": "@张三"}) == "@张三"
+    assert plain_cell_text(True) == "TRUE"
+    assert plain_cell_text(None) == ""
@@ -0,0 +1,46 @@
+import pytest
+
+from src.db.session import get_session_maker, init_db
+from src.services.sync_export_part_service import SyncExportPartService
+
+
+@pytest.mark.asyncio
+async def test_sync_export_part_service_roundtrip(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = SyncExportPartService(session_maker=get_session_maker(db_url))
+
+    for sub_id, title in (("tab-a", "汇总"), ("tab-b", "明细")):
+        await service.upsert_part(
+            local_path=f"/tmp/预算表 - {title}.csv",
+            task_id="task-1",
+            cloud_token="sheet-1",
+            cloud_type="sheet",
+            sub_id=sub_id,
+            sub_revision="sheet-1@1000",
+            cloud_revision="sheet-1@1000",
+            local_hash=f"hash-{sub_id}",
+            updated_at=10.0,
+        )
+    await service.upsert_part(
+        local_path="/tmp/预算表 - 汇总.csv",
+        task_id="task-1",
+        cloud_token="sheet-1",
+        cloud_type="sheet",
+        sub_id="tab-a",
+        sub_revision="sheet-1@2000",
+        cloud_revision="sheet-1@2000",
+        local_hash="hash-a2",
+    )
+
+    items = await service.list_by_cloud_token("task-1", "sheet-1")
+    by_sub_id = {item.sub_id: item for item in items}
+    assert set(by_sub_id) == {"tab-a", "tab-b"}
+    assert by_sub_id["tab-a"].sub_revision == "sheet-1@2000"
+    assert by_sub_id["tab-a"].local_hash == "hash-a2"
+    assert await service.list_by_cloud_token("task-2", "sheet-1") == []
+
+    assert await service.delete_by_local_path("/tmp/预算表 - 明细.csv") is True
+    assert await service.delete_by_local_path("/tmp/预算表 - 明细.csv") is False
+    assert await service.delete_by_task("task-1") == 1
+    assert await service.list_by_cloud_token("task-1", "sheet-1") == []
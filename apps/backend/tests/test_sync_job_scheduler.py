@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from src.services.sync_job_scheduler import JobPriority, SyncJobScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _hold(
+    scheduler: SyncJobScheduler,
+    task_id: str,
+    priority: JobPriority,
+    order: list,
+    gate: asyncio.Event,
+) -> None:
+    async with scheduler.slot(task_id, priority):
+        order.append((task_id, priority.name))
+        await gate.wait()
+
+
+@pytest.mark.asyncio
+async def test_job_scheduler_respects_budget_and_priority_classes() -> None:
+    clock = FakeClock()
+    scheduler = SyncJobScheduler(max_in_flight=1, clock=clock)
+    order: list = []
+    gate = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "a", JobPriority.download, order, gate))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(_hold(scheduler, "b", JobPriority.download, order, gate)),
+        asyncio.create_task(_hold(scheduler, "c", JobPriority.upload, order, gate)),
+        asyncio.create_task(_hold(scheduler, "d", JobPriority.conflict, order, gate)),
+        asyncio.create_task(_hold(scheduler, "e", JobPriority.manual, order, gate)),
+    ]
+    await asyncio.sleep(0)
+    clock.now = 4.0
+
+    stats = scheduler.stats()
+    assert scheduler.in_flight == 1
+    assert stats["a"].running == 1
+    assert stats["e"].queued == 1 and stats["e"].oldest_wait_seconds == 4.0
+
+    gate.set()
+    await asyncio.gather(blocker, *waiters)
+
+    assert order == [
+        ("a", "download"),
+        ("e", "manual"),
+        ("d", "conflict"),
+        ("c", "upload"),
+        ("b", "download"),
+    ]
+    stats = scheduler.stats()
+    assert stats["e"].last_wait_seconds == 4.0
+    assert all(item.queued == 0 and item.running == 0 for item in stats.values())
+
+
+@pytest.mark.asyncio
+async def test_job_scheduler_interleaves_heavy_task_with_others() -> None:
+    clock = FakeClock()
+    scheduler = SyncJobScheduler(max_in_flight=1, clock=clock)
+    order: list[str] = []
+
+    async def job(task_id: str, duration: float) -> None:
+        async with scheduler.slot(task_id, JobPriority.download):
+            order.append(task_id)
+            clock.now += duration
+            await asyncio.sleep(0)
+
+    # 大任务每次运行 30s，小任务 1s：大任务跑完一次后让出，不会连续霸占配额
+    await job("big", 30.0)
+    gate = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "other", JobPriority.download, [], gate))
+    await asyncio.sleep(0)
+    jobs = [asyncio.create_task(job("big", 30.0))]
+    jobs += [asyncio.create_task(job(f"small-{index}", 1.0)) for index in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+
+    assert order == ["big", "small-0", "small-1", "small-2", "big"]
+
+
+@pytest.mark.asyncio
+async def test_job_scheduler_charges_run_time_by_task_weight() -> None:
+    clock = FakeClock()
+    scheduler = SyncJobScheduler(max_in_flight=1, weights={"a": 3.0}, clock=clock)
+    order: list[str] = []
+
+    async def job(task_id: str, duration: float) -> None:
+        async with scheduler.slot(task_id, JobPriority.download):
+            order.append(task_id)
+            clock.now += duration
+            await asyncio.sleep(0)
+
+    # 两个任务各跑 3s；a 权重为 3，只记 1s 虚拟时长，下一轮排在先入队的 b 之前
+    await job("a", 3.0)
+    await job("b", 3.0)
+    gate = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "other", JobPriority.download, [], gate))
+    await asyncio.sleep(0)
+    jobs = [asyncio.create_task(job("b", 1.0))]
+    await asyncio.sleep(0)
+    jobs.append(asyncio.create_task(job("a", 1.0)))
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+
+    assert order == ["a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_job_scheduler_cancelled_waiter_does_not_leak_budget() -> None:
+    scheduler = SyncJobScheduler(max_in_flight=1)
+    gate = asyncio.Event()
+    order: list = []
+    blocker = asyncio.create_task(_hold(scheduler, "a", JobPriority.upload, order, gate))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_hold(scheduler, "b", JobPriority.upload, order, gate))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["b"].queued == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    gate.set()
+    await blocker
+
+    assert scheduler.in_flight == 0
+    assert scheduler.stats()["b"].queued == 0
+    async with scheduler.slot("c", JobPriority.download):
+        assert scheduler.in_flight == 1
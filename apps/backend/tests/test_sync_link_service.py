@@ -78,3 +78,86 @@ async def test_sync_link_service_persists_fingerprints(tmp_path) -> None:
     deleted = await service.delete_by_local_path("/tmp/a.md")
     assert deleted is True
     assert await service.get_by_local_path("/tmp/a.md") is None
+
+
+@pytest.mark.asyncio
+async def test_sync_link_service_updates_export_sub_id_only(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = SyncLinkService(session_maker=get_session_maker(db_url))
+
+    await service.upsert_link(
+        local_path="/tmp/budget.xlsx",
+        cloud_token="sheet-1",
+        cloud_type="sheet",
+        task_id="task-1",
+        updated_at=123.0,
+        local_hash="hash-1",
+        cloud_revision="sheet-1@123000",
+    )
+
+    updated = await service.update_export_sub_id(
+        "/tmp/budget.xlsx",
+        export_sub_id="sheet-abc",
+        export_sub_id_revision="sheet-1@123000",
+    )
+    assert updated is True
+    assert await service.update_export_sub_id(
+        "/tmp/missing.xlsx",
+        export_sub_id="sheet-abc",
+        export_sub_id_revision=None,
+    ) is False
+
+    item = await service.get_by_local_path("/tmp/budget.xlsx")
+    assert item is not None
+    assert item.export_sub_id == "sheet-abc"
+    assert item.export_sub_id_revision == "sheet-1@123000"
+    assert item.local_hash == "hash-1"
+    assert item.updated_at == 123.0
+
+
+@pytest.mark.asyncio
+async def test_sync_link_service_moves_links_under_prefix(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = SyncLinkService(session_maker=get_session_maker(db_url))
+    root = tmp_path / "root"
+    old_dir = root / "a_b"
+    new_dir = root / "docs" / "renamed"
+    for path, token, kind, parent in (
+        (old_dir, "fld-1", "folder", "root-token"),
+        (old_dir / "note.md", "doc-1", "docx", "fld-1"),
+        (old_dir / "sub" / "data.bin", "file-1", "file", "fld-2"),
+        (root / "aXb" / "other.md", "doc-2", "docx", "fld-3"),
+    ):
+        await service.upsert_link(
+            local_path=str(path),
+            cloud_token=token,
+            cloud_type=kind,
+            task_id="task-1",
+            updated_at=1.0,
+            cloud_parent_token=parent,
+            local_hash=f"hash-{token}",
+        )
+
+    moved = await service.move_links(
+        "task-1",
+        str(old_dir),
+        str(new_dir),
+        include_self=False,
+        reparent=("fld-1", "fld-new"),
+    )
+
+    assert moved == 2
+    note = await service.get_by_local_path(str(new_dir / "note.md"))
+    assert note is not None
+    assert note.cloud_token == "doc-1"
+    assert note.cloud_parent_token == "fld-new"
+    assert note.local_hash == "hash-doc-1"
+    nested = await service.get_by_local_path(str(new_dir / "sub" / "data.bin"))
+    assert nested is not None
+    assert nested.cloud_parent_token == "fld-2"
+    assert await service.get_by_local_path(str(old_dir / "note.md")) is None
+    # 目录自身未包含在内；“_” 不能当作 LIKE 通配符匹配到 aXb
+    assert await service.get_by_local_path(str(old_dir)) is not None
+    assert await service.get_by_local_path(str(root / "aXb" / "other.md")) is not None
@@ -0,0 +1,268 @@
+from pathlib import Path
+
+import pytest
+
+from src.db.session import get_session_maker, init_db
+from src.services.async_fs import AsyncFileSystem
+from src.services.drive_service import DriveFile, DriveFileList
+from src.services.file_hash import calculate_file_hash
+from src.services.sync_cloud_folder_service import SyncCloudFolderService
+from src.services.sync_link_service import SyncLinkService
+from src.services.sync_move_service import SyncMoveService
+from src.services.sync_runner_state import SyncTaskStatus
+from src.services.sync_task_service import SyncTaskItem
+
+
+class FakeDrive:
+    def __init__(self, folders: dict[str, list[DriveFile]] | None = None) -> None:
+        self.folders = folders or {}
+        self.moves: list[tuple[str, str, str]] = []
+        self.deleted: list[tuple[str, str]] = []
+        self.waited: list[str] = []
+
+    async def move_file(self, file_token: str, file_type: str, folder_token: str) -> str | None:
+        self.moves.append((file_token, file_type, folder_token))
+        for files in self.folders.values():
+            for item in list(files):
+                if item.token == file_token:
+                    files.remove(item)
+        self.folders.setdefault(folder_token, [])
+        return "move-task" if file_type == "folder" else None
+
+    async def wait_task(self, task_id: str) -> None:
+        self.waited.append(task_id)
+
+    async def list_files(self, folder_token: str, page_token: str | None = None) -> DriveFileList:
+        return DriveFileList(files=list(self.folders.get(folder_token, [])))
+
+    async def delete_file(self, file_token: str, file_type: str) -> None:
+        self.deleted.append((file_token, file_type))
+
+
+class FakeDocx:
+    def __init__(self) -> None:
+        self.renamed: list[tuple[str, str]] = []
+
+    async def rename_document(self, document_id: str, title: str) -> None:
+        self.renamed.append((document_id, title))
+
+
+class FakeBlockService:
+    def __init__(self) -> None:
+        self.moved: list[tuple[str, str]] = []
+
+    async def move_local_paths(self, old_path: str, new_path: str) -> None:
+        self.moved.append((old_path, new_path))
+
+
+def _task(root: Path) -> SyncTaskItem:
+    return SyncTaskItem(
+        id="task-1",
+        name="任务",
+        local_path=str(root),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+
+
+async def _build(tmp_path: Path, folder_tokens: dict[str, str]):
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    link_service = SyncLinkService(session_maker=get_session_maker(db_url))
+    block_service = FakeBlockService()
+    root = tmp_path / "root"
+    root.mkdir()
+    events = []
+
+    async def resolve_cloud_parent(task, path, drive_service) -> str:
+        relative = "/".join(path.parent.relative_to(root).parts)
+        return folder_tokens.setdefault(relative, f"fld-{relative}")
+
+    async def list_local_files(task) -> list[Path]:
+        return sorted(path for path in root.rglob("*") if path.is_file())
+
+    service = SyncMoveService(
+        link_service=link_service,
+        block_service=block_service,
+        cloud_folder_service=SyncCloudFolderService(
+            link_service=link_service,
+            should_ignore_path=lambda task, path: False,
+            md_mirror_folder_name="_LarkSync_MD_Mirror",
+            md_mirror_cache_prefix="__md_mirror__",
+        ),
+        should_ignore_path=lambda task, path: path.suffix == ".tmp",
+        resolve_cloud_parent=resolve_cloud_parent,
+        list_local_files=list_local_files,
+        record_event=lambda status, event, task: events.append(event),
+        async_fs=AsyncFileSystem(max_workers=1),
+    )
+    return service, link_service, block_service, root, events
+
+
+async def _link(link_service, path: Path, token: str, kind: str, parent: str, **kwargs) -> None:
+    await link_service.upsert_link(
+        local_path=str(path),
+        cloud_token=token,
+        cloud_type=kind,
+        task_id="task-1",
+        updated_at=1.0,
+        cloud_parent_token=parent,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_move_file_across_folders_and_rename_docx(tmp_path: Path) -> None:
+    service, links, blocks, root, events = await _build(
+        tmp_path, {"": "root-token", "archive": "fld-archive"}
+    )
+    task = _task(root)
+    status = SyncTaskStatus(task_id=task.id)
+    drive = FakeDrive()
+    docx = FakeDocx()
+    await _link(links, root / "note.md", "doc-1", "docx", "root-token")
+    await _link(links, root / "data.bin", "file-1", "file", "root-token")
+
+    async with service.lock_for(task.id):
+        moved = await service.apply_local_move(
+            task=task, status=status, src=root / "note.md",
+            dest=root / "archive" / "周报.md", drive_service=drive, docx_service=docx,
+        )
+        renamed_binary = await service.apply_local_move(
+            task=task, status=status, src=root / "data.bin",
+            dest=root / "data-v2.bin", drive_service=drive, docx_service=docx,
+        )
+        temp_rename = await service.apply_local_move(
+            task=task, status=status, src=root / "data.bin",
+            dest=root / "data.bin.tmp", drive_service=drive, docx_service=docx,
+        )
+
+    assert moved is True
+    assert drive.moves == [("doc-1", "docx", "fld-archive")]
+    assert docx.renamed == [("doc-1", "周报")]
+    item = await links.get_by_local_path(str(root / "archive" / "周报.md"))
+    assert item is not None and item.cloud_parent_token == "fld-archive"
+    assert await links.get_by_local_path(str(root / "note.md")) is None
+    assert blocks.moved == [(str(root / "note.md"), str(root / "archive" / "周报.md"))]
+    assert [event.status for event in events] == ["moved"]
+    # 普通文件改名没有云端等价操作，交回删除+上传流程
+    assert renamed_binary is False
+    assert temp_rename is False
+    assert await links.get_by_local_path(str(root / "data.bin")) is not None
+
+
+@pytest.mark.asyncio
+async def test_directory_rename_moves_cloud_children_into_new_folder(tmp_path: Path) -> None:
+    service, links, _blocks, root, _events = await _build(
+        tmp_path, {"": "root-token", "new": "fld-new"}
+    )
+    task = _task(root)
+    drive = FakeDrive(
+        {
+            "fld-old": [
+                DriveFile(token="doc-1", name="a", type="docx"),
+                DriveFile(token="fld-sub", name="sub", type="folder"),
+            ]
+        }
+    )
+    await _link(links, root / "old", "fld-old", "folder", "root-token")
+    await _link(links, root / "old" / "a.md", "doc-1", "docx", "fld-old")
+    await _link(links, root / "old" / "sub" / "b.md", "doc-2", "docx", "fld-sub")
+
+    async with service.lock_for(task.id):
+        moved = await service.apply_local_move(
+            task=task, status=SyncTaskStatus(task_id=task.id), src=root / "old",
+            dest=root / "new", drive_service=drive, docx_service=FakeDocx(),
+        )
+
+    assert moved is True
+    assert drive.moves == [
+        ("doc-1", "docx", "fld-new"),
+        ("fld-sub", "folder", "fld-new"),
+    ]
+    assert drive.waited == ["move-task"]
+    assert drive.deleted == [("fld-old", "folder")]
+    assert await links.get_by_local_path(str(root / "old")) is None
+    child = await links.get_by_local_path(str(root / "new" / "a.md"))
+    assert child is not None and child.cloud_parent_token == "fld-new"
+    nested = await links.get_by_local_path(str(root / "new" / "sub" / "b.md"))
+    assert nested is not None and nested.cloud_parent_token == "fld-sub"
+
+
+@pytest.mark.asyncio
+async def test_directory_rename_rolls_back_moved_children_on_failure(tmp_path: Path) -> None:
+    service, links, _blocks, root, _events = await _build(
+        tmp_path, {"": "root-token", "new": "fld-new"}
+    )
+    task = _task(root)
+
+    class FailingDrive(FakeDrive):
+        async def move_file(self, file_token: str, file_type: str, folder_token: str) -> str | None:
+            if file_token == "fld-sub":
+                raise RuntimeError("move failed")
+            return await super().move_file(file_token, file_type, folder_token)
+
+    drive = FailingDrive(
+        {
+            "fld-old": [
+                DriveFile(token="doc-1", name="a", type="docx"),
+                DriveFile(token="fld-sub", name="sub", type="folder"),
+            ]
+        }
+    )
+    await _link(links, root / "old", "fld-old", "folder", "root-token")
+    await _link(links, root / "old" / "a.md", "doc-1", "docx", "fld-old")
+
+    async with service.lock_for(task.id):
+        moved = await service.apply_local_move(
+            task=task, status=SyncTaskStatus(task_id=task.id), src=root / "old",
+            dest=root / "new", drive_service=drive, docx_service=FakeDocx(),
+        )
+
+    assert moved is False
+    # 第二个子项移动失败：已移入新文件夹的 doc-1 被移回，映射仍指向原文件夹
+    assert drive.moves == [("doc-1", "docx", "fld-new"), ("doc-1", "docx", "fld-old")]
+    assert drive.deleted == []
+    child = await links.get_by_local_path(str(root / "old" / "a.md"))
+    assert child is not None and child.cloud_parent_token == "fld-old"
+    assert await links.get_by_local_path(str(root / "old")) is not None
+
+
+@pytest.mark.asyncio
+async def test_reconcile_local_moves_pairs_unique_hash(tmp_path: Path) -> None:
+    service, links, _blocks, root, events = await _build(
+        tmp_path, {"": "root-token", "moved": "fld-moved"}
+    )
+    task = _task(root)
+    (root / "moved").mkdir()
+    target = root / "moved" / "note.md"
+    target.write_text("# 标题\n", encoding="utf-8")
+    (root / "copy-1.md").write_text("same", encoding="utf-8")
+    (root / "copy-2.md").write_text("same", encoding="utf-8")
+    await _link(
+        links, root / "note.md", "doc-1", "docx", "root-token",
+        local_hash=calculate_file_hash(target), local_size=target.stat().st_size,
+    )
+    await _link(
+        links, root / "gone.md", "doc-2", "docx", "root-token",
+        local_hash=calculate_file_hash(root / "copy-1.md"), local_size=4,
+    )
+    drive = FakeDrive()
+
+    moved = await service.reconcile_local_moves(
+        task=task, status=SyncTaskStatus(task_id=task.id),
+        drive_service=drive, docx_service=FakeDocx(),
+    )
+
+    assert moved == 1
+    assert drive.moves == [("doc-1", "docx", "fld-moved")]
+    assert await links.get_by_local_path(str(target)) is not None
+    # 内容相同的两个候选无法唯一配对，保留原映射交给删除流程
+    assert await links.get_by_local_path(str(root / "gone.md")) is not None
+    assert [event.path for event in events] == [str(target)]
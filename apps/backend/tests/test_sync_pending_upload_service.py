@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from src.db.session import get_session_maker, init_db
+from src.services.sync_pending_upload_service import SyncPendingUploadService
+
+
+@pytest.mark.asyncio
+async def test_pending_upload_journal_coalesces_and_survives_restart(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    journal = SyncPendingUploadService(session_maker=get_session_maker(db_url))
+
+    journal.record("task-1", "/root/a.md", 10.0)
+    journal.record("task-1", "/root/a.md", 12.0)
+    journal.record("task-1", "/root/a.md", 0.0)
+    journal.record("task-1", "/root/b.md", 11.0)
+    journal.record("task-2", "/other/c.md", 5.0)
+    await journal.flush()
+    # 上传期间 a.md 再次变更：完成标记只移除旧的那次
+    journal.record("task-1", "/root/a.md", 20.0)
+    journal.complete("task-1", {"/root/a.md": 12.0, "/root/b.md": 11.0})
+    await journal.set_checkpoint("task-1", 100.5)
+    await journal.close()
+
+    restarted = SyncPendingUploadService(session_maker=get_session_maker(db_url))
+    assert await restarted.list_pending("task-1") == {"/root/a.md": 20.0}
+    assert await restarted.list_pending("task-2") == {"/other/c.md": 5.0}
+    assert await restarted.get_checkpoint("task-1") == 100.5
+    assert await restarted.get_checkpoint("task-2") is None
+
+
+@pytest.mark.asyncio
+async def test_pending_upload_journal_flushes_on_timer(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    journal = SyncPendingUploadService(
+        session_maker=get_session_maker(db_url), flush_delay_seconds=0.01
+    )
+
+    journal.record("task-1", "/root/a.md", 10.0)
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if journal._flush_handle is None and journal._flush_task is None:
+            break
+
+    # 未显式 flush：定时触发的写入任务已完成并释放引用
+    assert journal._flush_task is None
+    reader = SyncPendingUploadService(session_maker=get_session_maker(db_url))
+    assert await reader.list_pending("task-1") == {"/root/a.md": 10.0}
@@ -122,3 +122,48 @@ async def test_sync_run_service_lists_latest_by_tasks(tmp_path) -> None:
     latest = await service.list_latest_by_tasks(["task-1", "task-2"])
     assert latest["task-1"].run_id == "run-new"
     assert latest["task-2"].run_id == "run-other"
+
+
+@pytest.mark.asyncio
+async def test_sync_run_service_estimates_durations_from_recent_runs(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    service = SyncRunService(session_maker=get_session_maker(db_url))
+    runs = [
+        ("run-1", "task-1", "scheduled_download", 0.0, 10.0),
+        ("run-2", "task-1", "scheduled_download", 100.0, 130.0),
+        ("run-3", "task-1", "scheduled_download", 200.0, 220.0),
+        ("run-4", "task-1", "manual", 300.0, 900.0),
+        ("run-5", "task-2", "scheduled_download", 50.0, 55.0),
+    ]
+    for run_id, task_id, trigger_source, started_at, finished_at in runs:
+        await service.finish_run(
+            run_id=run_id,
+            task_id=task_id,
+            trigger_source=trigger_source,
+            state="success",
+            started_at=started_at,
+            finished_at=finished_at,
+            last_event_at=finished_at,
+            total_files=0,
+            completed_files=0,
+            failed_files=0,
+            skipped_files=0,
+            uploaded_files=0,
+            downloaded_files=0,
+            deleted_files=0,
+            conflict_files=0,
+            delete_pending_files=0,
+            delete_failed_files=0,
+            last_error=None,
+        )
+    await service.start_run(
+        run_id="run-running", task_id="task-2", trigger_source="scheduled_download", started_at=400.0
+    )
+
+    estimates = await service.estimate_durations(
+        ["task-1", "task-2", "task-3"], trigger_source="scheduled_download", sample_size=2
+    )
+
+    # 只取最近两次定时下载：30s 与 20s 的中位数；手动运行和未结束的运行不计入
+    assert estimates == {"task-1": 25.0, "task-2": 5.0}
@@ -6,14 +6,19 @@ from pathlib import Path
 import pytest
 
 from src.core.config import ConfigManager
+from src.db.session import get_session_maker, init_db
 from src.services.drive_service import DriveFile, DriveFileList, DriveNode
+from src.services.file_hash import calculate_file_hash
 from src.services.file_writer import FileWriter
 from src.services.export_task_service import (
     ExportTaskCreateResult,
     ExportTaskError,
     ExportTaskResult,
 )
+from src.services.sheet_service import SheetMeta
+from src.services.sync_export_part_service import SyncExportPartItem
 from src.services.sync_link_service import SyncLinkItem
+from src.services.sync_pending_upload_service import SyncPendingUploadService
 from src.services.sync_runner import (
     SyncTaskRunner,
     SyncTaskStatus,
@@ -22,6 +27,7 @@ from src.services.sync_runner import (
 )
 from src.services.sync_event_store import SyncEventStore
 from src.services.sync_task_service import SyncTaskItem
+from src.services.local_event_coalescer import DirtyBatch
 from src.services.watcher import FileChangeEvent
 
 
@@ -39,7 +45,9 @@ class FakeDriveService:
 
 
 class FakeDocxService:
-    async def list_blocks(self, document_id: str, user_id_type: str = "open_id"):
+    async def list_blocks(
+        self, document_id: str, user_id_type: str = "open_id", *, compact: bool = False
+    ):
         return []
 
     async def close(self) -> None:
@@ -208,6 +216,26 @@ class FakeSheetService:
         return None
 
 
+class FakeExportPartService:
+    def __init__(self) -> None:
+        self.items: dict[str, SyncExportPartItem] = {}
+
+    async def upsert_part(self, **kwargs):
+        item = SyncExportPartItem(**kwargs)
+        self.items[item.local_path] = item
+        return item
+
+    async def list_by_cloud_token(self, task_id: str, cloud_token: str):
+        return [
+            item
+            for item in self.items.values()
+            if item.task_id == task_id and item.cloud_token == cloud_token
+        ]
+
+    async def delete_by_local_path(self, local_path: str):
+        return self.items.pop(local_path, None) is not None
+
+
 class FakeLinkService:
     def __init__(self, persisted: list[SyncLinkItem] | None = None) -> None:
         self.calls: list[tuple[str, str, str, str, str | None]] = []
@@ -266,9 +294,18 @@ class FakeLinkService:
 class FakeWatcher:
     def __init__(self) -> None:
         self.silenced: list[tuple[str, float | None]] = []
+        self.silenced_prefixes: list[str] = []
 
-    def silence(self, path: Path, ttl_seconds: float | None = None) -> None:
+    def silence(
+        self,
+        path: Path,
+        ttl_seconds: float | None = None,
+        *,
+        recursive: bool = False,
+    ) -> None:
         self.silenced.append((str(path), ttl_seconds))
+        if recursive:
+            self.silenced_prefixes.append(str(path))
 
 
 class ResourceTranscoder(FakeTranscoder):
@@ -686,6 +723,133 @@ async def test_run_download_persists_resource_sync_baseline_for_markdown_assets(
     assert persisted.resource_sync_revision == persisted.cloud_revision
 
 
+class StreamingResourceTranscoder(ResourceTranscoder):
+    async def stream_markdown(
+        self,
+        document_id: str,
+        blocks: list[dict],
+        writer,
+        *,
+        base_dir=None,
+        link_map=None,
+    ) -> None:
+        markdown = await self.to_markdown(
+            document_id, blocks, base_dir=base_dir, link_map=link_map
+        )
+        writer.write_lines(["", *markdown.split("\n"), "", ""])
+
+
+@pytest.mark.asyncio
+async def test_run_download_streams_docx_and_reuses_computed_signatures(
+    tmp_path: Path,
+) -> None:
+    tree = DriveNode(
+        token="root",
+        name="根目录",
+        type="folder",
+        children=[
+            DriveNode(
+                token="doc-1",
+                name="设计文档",
+                type="docx",
+                modified_time="1700000000000",
+            )
+        ],
+    )
+    link_service = FakeLinkService()
+    runner = SyncTaskRunner(
+        drive_service=FakeDriveService(tree),
+        docx_service=FakeDocxService(),
+        transcoder=StreamingResourceTranscoder(),
+        file_downloader=FakeFileDownloader(),
+        file_writer=FileWriter(),
+        link_service=link_service,
+    )
+    task = SyncTaskItem(
+        id="task-docx-stream",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="download_only",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    status = runner.get_status(task.id)
+
+    await runner._run_download(task, status, allow_deletes=False)
+
+    target = tmp_path / "设计文档.md"
+    content = target.read_text(encoding="utf-8")
+    assert content == "# doc\n\n![](assets/logo.png)\n\n[brief](attachments/brief.pdf)"
+    assert not list(tmp_path.glob("*.tmp"))
+    persisted = link_service.items[-1]
+    assert persisted.local_hash == calculate_file_hash(target)
+    assert persisted.local_size == target.stat().st_size
+    assert persisted.local_resource_signature == runner._calculate_local_resource_signature(
+        content, tmp_path
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_download_skips_rewrite_when_streamed_content_is_identical(
+    tmp_path: Path,
+) -> None:
+    doc = DriveNode(
+        token="doc-1",
+        name="设计文档",
+        type="docx",
+        modified_time="1700000000",
+    )
+    tree = DriveNode(token="root", name="根目录", type="folder", children=[doc])
+    link_service = FakeLinkService()
+    watcher = FakeWatcher()
+    runner = SyncTaskRunner(
+        drive_service=FakeDriveService(tree),
+        docx_service=FakeDocxService(),
+        transcoder=StreamingResourceTranscoder(),
+        file_downloader=FakeFileDownloader(),
+        file_writer=FileWriter(),
+        link_service=link_service,
+    )
+    task = SyncTaskItem(
+        id="task-docx-identical",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="download_only",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    runner._watchers[task.id] = watcher  # type: ignore[assignment]
+    target = tmp_path / "设计文档.md"
+
+    await runner._run_download(task, runner.get_status(task.id), allow_deletes=False)
+    first_mtime = target.stat().st_mtime
+    watcher.silenced.clear()
+
+    # 云端只有元数据变化：修改时间前进，但转码结果不变
+    doc.modified_time = "1700000600"
+    status = SyncTaskStatus(task_id=task.id)
+    await runner._run_download(task, status, allow_deletes=False)
+
+    assert status.completed_files == 1
+    assert target.stat().st_mtime == first_mtime
+    assert str(target) not in {item[0] for item in watcher.silenced}
+    assert not list(tmp_path.glob("*.tmp"))
+    persisted = link_service.items[-1]
+    assert persisted.cloud_mtime == 1700000600.0
+    assert persisted.local_mtime == first_mtime
+    assert persisted.local_hash == calculate_file_hash(target)
+
+
 @pytest.mark.asyncio
 async def test_run_download_silences_binary_targets_before_local_write(tmp_path: Path) -> None:
     tree = DriveNode(
@@ -742,6 +906,72 @@ async def test_run_download_silences_binary_targets_before_local_write(tmp_path:
     assert str(tmp_path / "表格.xlsx") in silenced
 
 
+@pytest.mark.asyncio
+async def test_run_download_silences_new_directory_prefix(tmp_path: Path) -> None:
+    tree = DriveNode(
+        token="root",
+        name="根目录",
+        type="folder",
+        children=[
+            DriveNode(
+                token="fld-new",
+                name="新目录",
+                type="folder",
+                children=[
+                    DriveNode(
+                        token="fld-deep",
+                        name="子目录",
+                        type="folder",
+                        children=[
+                            DriveNode(
+                                token="file-1",
+                                name="spec.pdf",
+                                type="file",
+                                modified_time="1700000000",
+                            ),
+                        ],
+                    ),
+                ],
+            ),
+            DriveNode(
+                token="file-2",
+                name="top.pdf",
+                type="file",
+                modified_time="1700000000",
+            ),
+        ],
+    )
+    watcher = FakeWatcher()
+    runner = SyncTaskRunner(
+        drive_service=FakeDriveService(tree),
+        docx_service=FakeDocxService(),
+        transcoder=FakeTranscoder(),
+        file_downloader=FakeFileDownloader(),
+        file_writer=FileWriter(),
+        link_service=FakeLinkService(),
+        export_task_service=FakeExportTaskService(),
+    )
+    task = SyncTaskItem(
+        id="task-prefix-silence",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    runner._watchers[task.id] = watcher  # type: ignore[assignment]
+
+    await runner._run_download(task, runner.get_status(task.id))
+
+    # 只静默本地不存在的最上层目录；根目录下已有目录中的文件仍逐个静默
+    assert set(watcher.silenced_prefixes) == {str(tmp_path / "新目录")}
+
+
 @pytest.mark.asyncio
 async def test_runner_download_skips_internal_md_mirror_folder(tmp_path: Path) -> None:
     tree = DriveNode(
@@ -1392,6 +1622,283 @@ async def test_runner_fills_sheet_sub_id_when_missing(tmp_path: Path) -> None:
     assert sheet_service.calls == ["sheet-1"]
 
 
+@pytest.mark.asyncio
+async def test_runner_reuses_persisted_sheet_sub_id_until_cloud_changes(tmp_path: Path) -> None:
+    tree = DriveNode(
+        token="root",
+        name="根目录",
+        type="folder",
+        children=[
+            DriveNode(
+                token="sheet-1",
+                name="预算表",
+                type="sheet",
+                modified_time="1700000500",
+            )
+        ],
+    )
+
+    class DriveWithMeta(FakeDriveService):
+        def __init__(self, tree: DriveNode) -> None:
+            super().__init__(tree)
+            self.meta_calls: list[list[tuple[str, str]]] = []
+
+        async def batch_query_metas(self, docs, *, with_url=True):  # type: ignore[override]
+            self.meta_calls.append(list(docs))
+            return {}
+
+    local_path = tmp_path / "预算表.xlsx"
+    persisted = SyncLinkItem(
+        local_path=str(local_path),
+        cloud_token="sheet-1",
+        cloud_type="sheet",
+        task_id="task-sheet-cache",
+        updated_at=1700000000.0,
+        cloud_mtime=1700000000.0,
+        export_sub_id="sheet-cached",
+        export_sub_id_revision="sheet-1@1700000500000",
+    )
+    drive_service = DriveWithMeta(tree)
+    export_service = FakeExportTaskService()
+    sheet_service = FakeSheetService(["sheet-new"])
+    link_service = FakeLinkService([persisted])
+    runner = SyncTaskRunner(
+        drive_service=drive_service,
+        docx_service=FakeDocxService(),
+        transcoder=FakeTranscoder(),
+        file_downloader=FakeFileDownloader(),
+        file_writer=FileWriter(),
+        link_service=link_service,
+        export_task_service=export_service,
+        sheet_service=sheet_service,
+    )
+    task = SyncTaskItem(
+        id="task-sheet-cache",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="download_only",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+        last_run_at=time.time(),
+    )
+
+    await runner.run_task(task)
+
+    assert drive_service.meta_calls == []
+    assert sheet_service.calls == []
+    assert runner.get_status(task.id).failed_files == 0
+
+    stale = SyncLinkItem(
+        local_path=str(local_path),
+        cloud_token="sheet-1",
+        cloud_type="sheet",
+        task_id="task-sheet-cache",
+        updated_at=1700000000.0,
+        export_sub_id="sheet-cached",
+        export_sub_id_revision="sheet-1@1700000000000",
+    )
+    candidates = await runner._hydrate_export_sub_ids(
+        [runner._build_download_candidate(task, tree.children[0], Path())],
+        drive_service,
+        sheet_service=sheet_service,
+        persisted_by_path={str(local_path): stale},
+    )
+
+    assert candidates[0].export_sub_id == "sheet-new"
+    assert sheet_service.calls == ["sheet-1"]
+
+
+@pytest.mark.asyncio
+async def test_runner_exports_each_sub_sheet_separately_when_enabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        '{"export_sub_sheets_separately": true, "sheet_direct_export_max_cells": 0}',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LARKSYNC_CONFIG", str(config_path))
+    ConfigManager.reset()
+
+    class SheetServiceWithTabs(FakeSheetService):
+        async def list_sheets(self, spreadsheet_token: str):
+            self.calls.append(spreadsheet_token)
+            return [
+                SheetMeta(sheet_id="tab-a", title="汇总", row_count=10, column_count=3),
+                SheetMeta(sheet_id="tab-b", title="明细/2024", row_count=50, column_count=6),
+            ]
+
+    tree = DriveNode(
+        token="root",
+        name="根目录",
+        type="folder",
+        children=[
+            DriveNode(
+                token="sheet-1",
+                name="预算表",
+                type="sheet",
+                modified_time="1700000500",
+            )
+        ],
+    )
+    export_service = FakeExportTaskService()
+    sheet_service = SheetServiceWithTabs()
+    downloader = FakeFileDownloader()
+    part_service = FakeExportPartService()
+    link_service = FakeLinkService()
+    task = SyncTaskItem(
+        id="task-sheet-parts",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="download_only",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+
+    try:
+        runner = SyncTaskRunner(
+            drive_service=FakeDriveService(tree),
+            docx_service=FakeDocxService(),
+            transcoder=FakeTranscoder(),
+            file_downloader=downloader,
+            file_writer=FileWriter(),
+            link_service=link_service,
+            export_task_service=export_service,
+            sheet_service=sheet_service,
+            export_part_service=part_service,
+        )
+        await runner.run_task(task)
+
+        status = runner.get_status(task.id)
+        assert status.failed_files == 0
+        assert sorted(call[3] for call in export_service.create_calls) == ["tab-a", "tab-b"]
+        assert {call[0] for call in export_service.create_calls} == {"csv"}
+        assert sorted(name for _, name in downloader.export_calls) == [
+            "预算表 - 明细_2024.csv",
+            "预算表 - 汇总.csv",
+        ]
+        assert (tmp_path / "预算表 - 汇总.csv").exists()
+        assert not (tmp_path / "预算表.xlsx").exists()
+        assert sorted(item.sub_id for item in part_service.items.values()) == [
+            "tab-a",
+            "tab-b",
+        ]
+        assert link_service.items == []
+
+        runner = SyncTaskRunner(
+            drive_service=FakeDriveService(tree),
+            docx_service=FakeDocxService(),
+            transcoder=FakeTranscoder(),
+            file_downloader=downloader,
+            file_writer=FileWriter(),
+            link_service=link_service,
+            export_task_service=export_service,
+            sheet_service=sheet_service,
+            export_part_service=part_service,
+        )
+        await runner.run_task(task)
+
+        assert len(export_service.create_calls) == 2
+        assert sheet_service.calls == ["sheet-1"]
+    finally:
+        ConfigManager.reset()
+
+
+@pytest.mark.asyncio
+async def test_runner_reads_small_sub_sheets_directly_without_export_task(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        '{"export_sub_sheets_separately": true, "sheet_direct_export_max_cells": 100}',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LARKSYNC_CONFIG", str(config_path))
+    ConfigManager.reset()
+
+    metas = {
+        "tab-small": SheetMeta(sheet_id="tab-small", title="汇总", row_count=3, column_count=2),
+        "tab-large": SheetMeta(sheet_id="tab-large", title="明细", row_count=500, column_count=20),
+    }
+
+    class SheetServiceWithValues(FakeSheetService):
+        def __init__(self) -> None:
+            super().__init__()
+            self.value_calls: list[tuple[str, int, int]] = []
+
+        async def list_sheets(self, spreadsheet_token: str):
+            return list(metas.values())
+
+        async def get_sheet_meta(self, spreadsheet_token: str, sheet_id: str):
+            return metas[sheet_id]
+
+        async def iter_value_chunks(self, spreadsheet_token: str, sheet_id: str, **kwargs):
+            self.value_calls.append((sheet_id, kwargs["row_count"], kwargs["column_count"]))
+            yield [["项目", "金额"], ["房租", 3000]]
+            yield [[None, None]]
+
+    tree = DriveNode(
+        token="root",
+        name="根目录",
+        type="folder",
+        children=[
+            DriveNode(token="sheet-1", name="预算表", type="sheet", modified_time="1700000500")
+        ],
+    )
+    export_service = FakeExportTaskService()
+    sheet_service = SheetServiceWithValues()
+    downloader = FakeFileDownloader()
+    task = SyncTaskItem(
+        id="task-sheet-direct",
+        name="测试任务",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="download_only",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+
+    try:
+        runner = SyncTaskRunner(
+            drive_service=FakeDriveService(tree),
+            docx_service=FakeDocxService(),
+            transcoder=FakeTranscoder(),
+            file_downloader=downloader,
+            file_writer=FileWriter(),
+            link_service=FakeLinkService(),
+            export_task_service=export_service,
+            sheet_service=sheet_service,
+            export_part_service=FakeExportPartService(),
+        )
+        await runner.run_task(task)
+
+        assert runner.get_status(task.id).failed_files == 0
+        assert sheet_service.value_calls == [("tab-small", 3, 2)]
+        assert [call[3] for call in export_service.create_calls] == ["tab-large"]
+        direct_path = tmp_path / "预算表 - 汇总.csv"
+        assert direct_path.read_text(encoding="utf-8-sig").splitlines() == [
+            "项目,金额",
+            "房租,3000",
+        ]
+        assert downloader.export_calls == [("export-file", "预算表 - 明细.csv")]
+    finally:
+        ConfigManager.reset()
+
+
 @pytest.mark.asyncio
 async def test_bidirectional_skips_download_when_local_file_is_newer(tmp_path: Path) -> None:
     tree = DriveNode(
@@ -2951,12 +3458,14 @@ async def test_process_pending_deletes_handles_cloud_already_deleted_as_success(
     assert tombstone_service.pending == []
 
 
-def test_should_skip_download_for_unchanged_respects_local_hash(tmp_path: Path) -> None:
+@pytest.mark.asyncio
+async def test_should_skip_download_for_unchanged_respects_local_hash(tmp_path: Path) -> None:
     local_path = tmp_path / "report.pdf"
     local_path.write_text("v1", encoding="utf-8")
     from src.services.file_hash import calculate_file_hash as _calc
 
     same_hash = _calc(local_path)
+    runner = SyncTaskRunner()
     persisted_same = SyncLinkItem(
         local_path=str(local_path),
         cloud_token="file-1",
@@ -2967,7 +3476,7 @@ def test_should_skip_download_for_unchanged_respects_local_hash(tmp_path: Path)
         cloud_mtime=100.0,
     )
     assert (
-        SyncTaskRunner._should_skip_download_for_unchanged(
+        await runner._should_skip_download_for_unchanged(
             local_path=local_path,
             cloud_mtime=100.0,
             persisted=persisted_same,
@@ -2987,7 +3496,7 @@ def test_should_skip_download_for_unchanged_respects_local_hash(tmp_path: Path)
         cloud_mtime=100.0,
     )
     assert (
-        SyncTaskRunner._should_skip_download_for_unchanged(
+        await runner._should_skip_download_for_unchanged(
             local_path=local_path,
             cloud_mtime=100.0,
             persisted=persisted_diff,
@@ -2996,3 +3505,268 @@ def test_should_skip_download_for_unchanged_respects_local_hash(tmp_path: Path)
         )
         is False
     )
+
+
+@pytest.mark.asyncio
+async def test_rescan_dirty_directories_queues_files_with_single_event(tmp_path: Path) -> None:
+    store = SyncEventStore(tmp_path / "sync-events.jsonl")
+    root = tmp_path / "root"
+    runner = SyncTaskRunner(link_service=FakeLinkService(), event_store=store)
+    task = SyncTaskItem(
+        id="task-burst",
+        name="批量变更测试",
+        local_path=root.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    for index in range(30):
+        target = root / "unzipped" / f"part{index % 3}" / f"file{index}.md"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("x", encoding="utf-8")
+    (root / "unzipped" / "~$lock.docx").write_text("x", encoding="utf-8")
+
+    await runner._rescan_dirty_directories(
+        task,
+        DirtyBatch(directories=[root / "unzipped"], event_count=5000, saw_deletes=False),
+    )
+
+    assert len(runner._pending_uploads[task.id]) == 30
+    records = list(store.iter_records())
+    assert len(records) == 1
+    assert records[0].status == "queued"
+    assert "files=30" in (records[0].message or "")
+
+
+@pytest.mark.asyncio
+async def test_resync_watch_root_rescans_whole_task_after_watch_loss(tmp_path: Path) -> None:
+    store = SyncEventStore(tmp_path / "sync-events.jsonl")
+    root = tmp_path / "root"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "a.md").write_text("x", encoding="utf-8")
+    (root / "b.md").write_text("x", encoding="utf-8")
+    runner = SyncTaskRunner(link_service=FakeLinkService(), event_store=store)
+    task = SyncTaskItem(
+        id="task-resync",
+        name="监听恢复测试",
+        local_path=root.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    delete_checks: list[str] = []
+
+    async def fake_reconcile(task, status) -> None:
+        return None
+
+    async def fake_enqueue_deletes(*, task, status) -> None:
+        delete_checks.append(task.id)
+
+    runner._reconcile_local_moves = fake_reconcile
+    runner._enqueue_missing_local_deletes = fake_enqueue_deletes
+
+    # 未注册监听（任务已停止）时不重扫
+    await runner._resync_watch_root(task, "overflow")
+    assert task.id not in runner._pending_uploads
+
+    runner._watchers[task.id] = FakeWatcher()
+    await runner._resync_watch_root(task, "emitter_died")
+
+    assert len(runner._pending_uploads[task.id]) == 2
+    assert delete_checks == [task.id]
+    records = list(store.iter_records())
+    assert "监听恢复重扫(emitter_died)" in (records[-1].message or "")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, expected_runs", [("event", 1), ("interval", 0)])
+async def test_queue_local_change_dispatches_upload_after_quiet_window(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str,
+    expected_runs: int,
+) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        f'{{"upload_dispatch_mode": "{mode}", "upload_interval_unit": "hours"}}',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LARKSYNC_CONFIG", str(config_path))
+    ConfigManager.reset()
+    runner = SyncTaskRunner(link_service=FakeLinkService())
+    runner._upload_quiet_window_seconds = 0.2
+    task = SyncTaskItem(
+        id="task-dispatch",
+        name="事件上传",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    runner._task_meta[task.id] = task
+    runs: list[list[str]] = []
+
+    async def fake_scheduled_upload(item: SyncTaskItem) -> None:
+        pending = runner._pending_uploads.get(item.id) or {}
+        now = time.time()
+        ready = [
+            path
+            for path, changed_at in pending.items()
+            if now - changed_at >= runner._upload_quiet_window_seconds
+        ]
+        for path in ready:
+            pending.pop(path)
+        if ready:
+            runs.append(sorted(ready))
+
+    runner.run_scheduled_upload = fake_scheduled_upload  # type: ignore[method-assign]
+    try:
+        runner.queue_local_change(task.id, tmp_path / "a.md")
+        await asyncio.sleep(0.1)
+        # 静默期内再次修改会推迟该路径的上传
+        runner.queue_local_change(task.id, tmp_path / "a.md")
+        runner.queue_local_change(task.id, tmp_path / "b.md")
+        await asyncio.sleep(0.15)
+        assert runs == []
+        await asyncio.sleep(0.35)
+    finally:
+        await runner.close()
+        ConfigManager.reset()
+
+    assert len(runs) == expected_runs
+    if expected_runs:
+        assert runs[0] == [str(tmp_path / "a.md"), str(tmp_path / "b.md")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sync_mode, enabled, max_dispatches",
+    [("download_only", True, 1), ("bidirectional", False, 1), ("bidirectional", True, 3)],
+)
+async def test_ready_upload_dispatch_does_not_spin(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    sync_mode: str,
+    enabled: bool,
+    max_dispatches: int,
+) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        '{"upload_dispatch_mode": "event", "upload_interval_unit": "hours"}',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LARKSYNC_CONFIG", str(config_path))
+    ConfigManager.reset()
+    runner = SyncTaskRunner(link_service=FakeLinkService())
+    runner._upload_quiet_window_seconds = 0.2
+    task = SyncTaskItem(
+        id="task-spin",
+        name="事件上传",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode=sync_mode,
+        update_mode="auto",
+        enabled=enabled,
+        created_at=0,
+        updated_at=0,
+    )
+    runner._task_meta[task.id] = task
+    dispatches: list[float] = []
+    original = runner._dispatch_ready_uploads
+
+    async def counting_dispatch(task_id: str) -> None:
+        dispatches.append(time.time())
+        await original(task_id)
+
+    async def failing_upload(item: SyncTaskItem) -> None:
+        # 上传失败时路径仍处于就绪状态
+        raise RuntimeError("upload failed")
+
+    runner._dispatch_ready_uploads = counting_dispatch  # type: ignore[method-assign]
+    runner.run_scheduled_upload = failing_upload  # type: ignore[method-assign]
+    try:
+        runner.queue_local_change(task.id, tmp_path / "a.md", changed_at=time.time() - 1)
+        await asyncio.sleep(0.5)
+    finally:
+        await runner.close()
+        ConfigManager.reset()
+
+    # 停用或仅下载的任务只触发一次；上传失败按静默窗口退避，不会空转
+    assert 1 <= len(dispatches) <= max_dispatches
+
+
+@pytest.mark.asyncio
+async def test_restore_pending_uploads_warm_restart_only_queues_changes(tmp_path: Path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'journal.db').as_posix()}"
+    await init_db(db_url)
+    journal = SyncPendingUploadService(session_maker=get_session_maker(db_url))
+    root = tmp_path / "root"
+    root.mkdir()
+    unchanged = root / "unchanged.md"
+    edited = root / "edited.md"
+    created = root / "created.md"
+    journaled = root / "journaled.md"
+    for path in (unchanged, edited, created, journaled):
+        path.write_text("# v1", encoding="utf-8")
+    links = []
+    for path in (unchanged, edited, journaled):
+        stat = path.stat()
+        links.append(
+            SyncLinkItem(
+                local_path=str(path),
+                cloud_token=f"doc-{path.stem}",
+                cloud_type="docx",
+                task_id="task-warm",
+                updated_at=0.0,
+                local_size=stat.st_size,
+                local_mtime=stat.st_mtime,
+            )
+        )
+    edited.write_text("# v2 本地停机期间修改", encoding="utf-8")
+    journal.record("task-warm", str(journaled), 50.0)
+    journal.record("task-warm", str(root / "removed.md"), 40.0)
+    await journal.set_checkpoint("task-warm", time.time() - 60)
+
+    runner = SyncTaskRunner(
+        link_service=FakeLinkService(links),
+        pending_upload_service=journal,
+    )
+    task = SyncTaskItem(
+        id="task-warm",
+        name="热重启",
+        local_path=root.as_posix(),
+        cloud_folder_token="root-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    runner._should_upload_markdown_doc = lambda task_arg: True  # type: ignore[method-assign]
+
+    await runner._restore_pending_uploads(task)
+    await journal.flush()
+
+    pending = runner._pending_uploads[task.id]
+    assert set(pending) == {str(edited), str(created), str(journaled)}
+    assert pending[str(journaled)] == 50.0
+    assert str(root / "removed.md") not in await journal.list_pending(task.id)
@@ -3,6 +3,7 @@ from pathlib import Path
 import pytest
 
 from src.services.file_hash import calculate_file_hash
+from src.services.markdown_blocks import hash_block
 from src.services.sync_block_service import BlockStateItem
 from src.services.sync_runner import SyncTaskRunner, SyncTaskStatus
 from src.services.sync_task_service import SyncTaskItem
@@ -171,3 +172,165 @@ async def test_apply_block_update_bootstraps_on_mapping_mismatch(tmp_path: Path)
         for call in runner._block_service.replaced_calls
         for item in call
     )
+
+
+class InplaceDocxService(FakeDocxService):
+    def __init__(self) -> None:
+        super().__init__(total_children=3)
+        self.planned: list[tuple[str, list[str]]] = []
+        self.updates: list[list[dict]] = []
+        self.converted: list[str] = []
+        self.rejected: set[str] = set()
+        self.insert_converts: list = []
+
+    async def insert_markdown_block(self, *args, **kwargs) -> int:
+        self.insert_converts.append(kwargs.get("convert"))
+        return await super().insert_markdown_block(*args, **kwargs)
+
+    async def get_root_block(self, document_id: str):
+        items = [
+            {"block_id": f"b{idx}", "block_type": 2, "text": {"elements": []}}
+            for idx in range(3)
+        ]
+        return {"block_id": "root", "children": ["b0", "b1", "b2"]}, items
+
+    async def convert_markdown_block(self, markdown: str, **kwargs):
+        self.converted.append(markdown)
+        return {"markdown": markdown}
+
+    async def plan_text_updates(self, document_id: str, markdown: str, **kwargs):
+        self.planned.append((markdown, kwargs["current_ids"]))
+        if markdown in self.rejected:
+            return None
+        return [
+            {
+                "block_id": block_id,
+                "update_text_elements": {"elements": [{"text_run": {"content": markdown}}]},
+            }
+            for block_id in kwargs["current_ids"]
+        ]
+
+    async def batch_update_blocks(self, document_id: str, requests: list[dict], **kwargs):
+        self.updates.append(requests)
+
+
+@pytest.mark.asyncio
+async def test_apply_block_update_edits_changed_paragraphs_in_place(tmp_path: Path) -> None:
+    markdown = "# Title\n\npara fixed\n\ntail fixed"
+    file_path = tmp_path / "note.md"
+    file_path.write_text(markdown, encoding="utf-8")
+    file_hash = calculate_file_hash(file_path)
+    task = SyncTaskItem(
+        id="task-3",
+        name="测试",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="upload_only",
+        update_mode="partial",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    existing = [
+        BlockStateItem(
+            file_hash="old",
+            local_path=str(file_path),
+            cloud_token="doc",
+            block_index=idx,
+            block_hash=block_hash,
+            block_count=1,
+            updated_at=0,
+            created_at=0,
+        )
+        for idx, block_hash in enumerate(
+            [hash_block("# Title"), hash_block("para"), hash_block("tail")]
+        )
+    ]
+    runner = SyncTaskRunner()
+    runner._block_service = FakeBlockService(existing)
+    docx = InplaceDocxService()
+
+    applied = await runner._apply_block_update(
+        task=task,
+        docx_service=docx,
+        document_id="doc",
+        markdown=markdown,
+        base_path=tmp_path.as_posix(),
+        file_path=file_path,
+        status=SyncTaskStatus(task_id=task.id),
+        force=True,
+    )
+
+    assert applied is True
+    assert docx.deleted == []
+    assert docx.inserted == []
+    assert docx.planned == [("para fixed", ["b1"]), ("tail fixed", ["b2"])]
+    assert len(docx.updates) == 1
+    assert [item["block_id"] for item in docx.updates[0]] == ["b1", "b2"]
+    states = runner._block_service.replaced
+    assert [item.block_hash for item in states] == [
+        hash_block("# Title"),
+        hash_block("para fixed"),
+        hash_block("tail fixed"),
+    ]
+    assert [item.block_count for item in states] == [1, 1, 1]
+    assert states[1].file_hash == file_hash
+
+
+@pytest.mark.asyncio
+async def test_apply_block_update_reuses_conversion_when_falling_back(tmp_path: Path) -> None:
+    markdown = "# Title\n\npara fixed\n\n- tail fixed"
+    file_path = tmp_path / "note.md"
+    file_path.write_text(markdown, encoding="utf-8")
+    task = SyncTaskItem(
+        id="task-4",
+        name="测试",
+        local_path=tmp_path.as_posix(),
+        cloud_folder_token="root",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="upload_only",
+        update_mode="partial",
+        enabled=True,
+        created_at=0,
+        updated_at=0,
+    )
+    existing = [
+        BlockStateItem(
+            file_hash="old",
+            local_path=str(file_path),
+            cloud_token="doc",
+            block_index=idx,
+            block_hash=block_hash,
+            block_count=1,
+            updated_at=0,
+            created_at=0,
+        )
+        for idx, block_hash in enumerate(
+            [hash_block("# Title"), hash_block("para"), hash_block("tail")]
+        )
+    ]
+    runner = SyncTaskRunner()
+    runner._block_service = FakeBlockService(existing)
+    docx = InplaceDocxService()
+    docx.rejected = {"- tail fixed"}
+
+    applied = await runner._apply_block_update(
+        task=task,
+        docx_service=docx,
+        document_id="doc",
+        markdown=markdown,
+        base_path=tmp_path.as_posix(),
+        file_path=file_path,
+        status=SyncTaskStatus(task_id=task.id),
+        force=True,
+    )
+
+    assert applied is True
+    assert docx.updates == []
+    assert docx.deleted == [(3, 5)]
+    # 原位更新被拒后删除重建，两段都复用首次转换结果，不再重复转换
+    assert docx.converted == ["para fixed", "- tail fixed"]
+    assert docx.insert_converts == [{"markdown": "para fixed"}, {"markdown": "- tail fixed"}]
@@ -31,8 +31,8 @@ class FakeDocxService:
     async def get_root_block(self, document_id: str, user_id_type: str = "open_id"):
         return {"block_id": document_id, "children": list(self.root_children)}, []
 
-    def _normalize_convert(self, convert: ConvertResult) -> ConvertResult:
-        return convert
+    async def convert_markdown_block(self, markdown: str, **kwargs) -> ConvertResult:
+        return await self.convert_markdown_with_images(markdown, **kwargs)
 
     async def insert_markdown_block(
         self,
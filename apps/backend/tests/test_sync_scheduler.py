@@ -5,8 +5,9 @@ from types import SimpleNamespace
 import pytest
 
 from src.core.config import SyncIntervalUnit
-from src.services.sync_scheduler import SyncScheduler, _next_daily_run
-from src.services.sync_task_service import SyncTaskItem
+from src.services.sync_schedule_planner import plan_staggered_starts
+from src.services.sync_scheduler import ScheduleSnapshot, SyncScheduler, _next_daily_run
+from src.services.sync_task_service import SyncTaskChange, SyncTaskChangeNotifier, SyncTaskItem
 
 
 class FakeTaskService:
@@ -107,3 +108,180 @@ async def test_upload_scheduler_runs_tasks_independently() -> None:
 
     assert "task-slow" in runner.upload_calls
     assert "task-fast" in runner.upload_calls
+
+
+class WatcherTrackingRunner(FakeRunner):
+    def __init__(self) -> None:
+        super().__init__()
+        self.stopped: list[str] = []
+
+    def stop_watcher(self, task_id: str) -> None:
+        self.stopped.append(task_id)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_upload_workers_releases_watchers_of_removed_tasks() -> None:
+    runner = WatcherTrackingRunner()
+    task = SyncTaskItem(
+        id="task-a",
+        name="任务A",
+        local_path="F:/a",
+        cloud_folder_token="a-token",
+        cloud_folder_name=None,
+        base_path=None,
+        sync_mode="bidirectional",
+        update_mode="auto",
+        enabled=True,
+        created_at=1.0,
+        updated_at=1.0,
+    )
+    task_service = FakeTaskService([task])
+    scheduler = SyncScheduler(runner=runner, task_service=task_service)
+
+    await scheduler._reconcile_upload_workers()
+    assert runner.watchers == ["task-a"]
+
+    task_service.tasks = []
+    await scheduler._reconcile_upload_workers()
+
+    assert runner.stopped == ["task-a"]
+    assert scheduler._upload_workers == {}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reconciles_on_task_change_notification() -> None:
+    runner = WatcherTrackingRunner()
+    notifier = SyncTaskChangeNotifier()
+
+    class NotifyingTaskService(FakeTaskService):
+        def __init__(self) -> None:
+            super().__init__([])
+            self.list_calls = 0
+
+        async def list_tasks(self) -> list[SyncTaskItem]:
+            self.list_calls += 1
+            return await super().list_tasks()
+
+        def subscribe_changes(self, listener):
+            return notifier.subscribe(listener)
+
+    task_service = NotifyingTaskService()
+    config_manager = SimpleNamespace(
+        config=SimpleNamespace(
+            upload_interval_value=3600.0,
+            upload_interval_unit=SyncIntervalUnit.seconds,
+            upload_daily_time="01:00",
+            download_interval_value=1.0,
+            download_interval_unit=SyncIntervalUnit.days,
+            download_daily_time="01:00",
+        )
+    )
+    scheduler = SyncScheduler(
+        runner=runner,
+        task_service=task_service,
+        config_manager=config_manager,
+    )
+    await scheduler.start()
+    try:
+        await asyncio.sleep(0.05)
+        idle_calls = task_service.list_calls
+        await asyncio.sleep(0.1)
+        # 没有变更时不再轮询任务列表
+        assert task_service.list_calls == idle_calls
+
+        task_service.tasks = [
+            SyncTaskItem(
+                id="task-new",
+                name="新任务",
+                local_path="F:/new",
+                cloud_folder_token="new-token",
+                cloud_folder_name=None,
+                base_path=None,
+                sync_mode="upload_only",
+                update_mode="auto",
+                enabled=True,
+                created_at=1.0,
+                updated_at=1.0,
+            )
+        ]
+        notifier.publish(SyncTaskChange("created", "task-new"))
+        for _ in range(20):
+            if "task-new" in runner.upload_calls:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await scheduler.stop()
+
+    assert "task-new" in runner.upload_calls
+    assert notifier._listeners == []
+
+
+def test_plan_staggered_starts_spreads_tasks_by_cost() -> None:
+    costs = {"big": 300.0, "small": 100.0, "new": None}
+    plan = plan_staggered_starts(costs, window_seconds=1000.0, slot_key="2026-02-06 01:00")
+
+    assert [item.task_id for item in plan] == ["big", "new", "small"]
+    assert [item.predecessor for item in plan] == [None, "big", "new"]
+    # 新任务按已知成本中位数（200s）估算，窗口按 300:200:100 分成 500/333/167 秒，
+    # 起点落在各自时间片的前半段
+    assert 0.0 <= plan[0].offset_seconds < 250.0
+    assert 500.0 <= plan[1].offset_seconds < 500.0 + 333.4 / 2
+    assert 833.3 <= plan[2].offset_seconds < 833.4 + 166.7 / 2
+    assert plan == plan_staggered_starts(costs, window_seconds=1000.0, slot_key="2026-02-06 01:00")
+    assert plan != plan_staggered_starts(costs, window_seconds=1000.0, slot_key="2026-02-07 01:00")
+
+
+class FakeRunService:
+    def __init__(self, durations: dict[str, float]) -> None:
+        self.durations = durations
+
+    async def estimate_durations(self, task_ids, *, trigger_source: str) -> dict[str, float]:
+        assert trigger_source == "scheduled_download"
+        return {task_id: self.durations[task_id] for task_id in task_ids if task_id in self.durations}
+
+
+@pytest.mark.asyncio
+async def test_chained_daily_slot_waits_for_predecessor() -> None:
+    scheduler = SyncScheduler(
+        runner=FakeRunner(),
+        task_service=FakeTaskService([]),
+        config_manager=SimpleNamespace(config=SimpleNamespace()),
+        run_service=FakeRunService({"first": 50.0, "second": 10.0}),
+    )
+    scheduler._download_task_meta = {"first": object(), "second": object()}
+    snapshot = ScheduleSnapshot(
+        upload_interval_value=1.0,
+        upload_interval_unit=SyncIntervalUnit.days,
+        upload_daily_time="01:00",
+        download_interval_value=1.0,
+        download_interval_unit=SyncIntervalUnit.days,
+        download_daily_time="01:00",
+        schedule_spread_minutes=0,
+        schedule_chain_tasks=True,
+    )
+    slot = datetime(2020, 1, 1, 1, 0)
+    order: list[str] = []
+    release_first = asyncio.Event()
+
+    async def run_first() -> bool:
+        order.append("first-start")
+        await release_first.wait()
+        order.append("first-end")
+        return True
+
+    async def run_second() -> bool:
+        order.append("second")
+        return True
+
+    second = asyncio.create_task(
+        scheduler._run_daily_slot("download", "second", slot, snapshot, run_second)
+    )
+    first = asyncio.create_task(
+        scheduler._run_daily_slot("download", "first", slot, snapshot, run_first)
+    )
+    await asyncio.sleep(0.05)
+    assert order == ["first-start"]
+
+    release_first.set()
+    assert await asyncio.wait_for(asyncio.gather(first, second), timeout=1.0) == [True, True]
+    assert order == ["first-start", "first-end", "second"]
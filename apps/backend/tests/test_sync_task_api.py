@@ -1,7 +1,10 @@
 import pytest
+from fastapi.testclient import TestClient
 
 import src.api.sync_tasks as sync_tasks_api
+from src.main import app
 from src.services.sync_event_store import SyncEventRecord
+from src.services.sync_job_scheduler import JobQueueStats
 from src.api.sync_tasks import SyncTaskUpdateRequest, _task_update_requires_restart
 from src.services.sync_run_event_service import SyncRunEventBackfillState
 from src.services.sync_run_service import SyncRunItem
@@ -490,3 +493,37 @@ async def test_read_sync_logs_does_not_fallback_when_backfill_completed_and_db_e
 
     assert response.total == 0
     assert response.items == []
+
+
+def test_list_task_queue_reports_scheduler_stats(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FakeRunner:
+        def list_queue_stats(self):
+            return {
+                "task-1": JobQueueStats(
+                    task_id="task-1",
+                    queued=2,
+                    running=1,
+                    completed=5,
+                    oldest_wait_seconds=3.5,
+                    last_wait_seconds=1.25,
+                    avg_wait_seconds=0.8,
+                    max_wait_seconds=4.0,
+                )
+            }
+
+    monkeypatch.setattr(sync_tasks_api, "runner", FakeRunner())
+    client = TestClient(app)
+    response = client.get("/sync/tasks/queue")
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "task_id": "task-1",
+            "queued": 2,
+            "running": 1,
+            "completed": 5,
+            "oldest_wait_seconds": 3.5,
+            "last_wait_seconds": 1.25,
+            "avg_wait_seconds": 0.8,
+            "max_wait_seconds": 4.0,
+        }
+    ]
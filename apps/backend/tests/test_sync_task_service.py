@@ -3,7 +3,11 @@ import pytest
 from src.core.config import ConfigManager
 from src.db.models import SyncTask
 from src.db.session import get_session_maker, init_db
-from src.services.sync_task_service import SyncTaskService, SyncTaskValidationError
+from src.services.sync_task_service import (
+    SyncTaskChangeNotifier,
+    SyncTaskService,
+    SyncTaskValidationError,
+)
 
 
 @pytest.mark.asyncio
@@ -55,6 +59,46 @@ async def test_mark_task_run_updates_last_run_at(tmp_path) -> None:
     assert listed[0].last_run_at == 12345.0
 
 
+@pytest.mark.asyncio
+async def test_task_changes_are_published_to_subscribers(tmp_path) -> None:
+    db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
+    await init_db(db_url)
+    notifier = SyncTaskChangeNotifier()
+    service = SyncTaskService(session_maker=get_session_maker(db_url), notifier=notifier)
+    changes = []
+    unsubscribe = service.subscribe_changes(lambda change: changes.append(change))
+
+    item = await service.create_task(
+        name="任务A",
+        local_path="C:/docs",
+        cloud_folder_token="fld123",
+        base_path="C:/docs",
+        sync_mode="bidirectional",
+        enabled=True,
+    )
+    await service.list_tasks()
+    await service.update_task(item.id, enabled=False)
+    await service.mark_task_run(item.id, run_at=1.0)
+    await service.update_task("missing", enabled=True)
+    await service.delete_task(item.id)
+    unsubscribe()
+    await service.create_task(
+        name="任务B",
+        local_path="C:/other",
+        cloud_folder_token="fld456",
+        base_path="C:/other",
+        sync_mode="bidirectional",
+        enabled=True,
+    )
+
+    assert [(change.kind, change.task_id) for change in changes] == [
+        ("created", item.id),
+        ("updated", item.id),
+        ("updated", item.id),
+        ("deleted", item.id),
+    ]
+
+
 @pytest.mark.asyncio
 async def test_create_task_rejects_duplicate_local_path(tmp_path) -> None:
     db_url = f"sqlite+aiosqlite:///{(tmp_path / 'test.db').as_posix()}"
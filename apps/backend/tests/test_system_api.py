@@ -2,6 +2,8 @@ from fastapi.testclient import TestClient
 
 from src.api import system
 from src.main import app
+from src.services.event_loop_monitor import EventLoopLagMonitor
+from src.services.watcher import WatcherHealth
 
 
 def test_select_folder_success(monkeypatch) -> None:
@@ -31,3 +33,56 @@ def test_shutdown_schedules_background(monkeypatch) -> None:
     assert response.status_code == 200
     assert response.json()["status"] == "shutting_down"
     assert called.get("app") is app
+
+
+def test_loop_lag_reports_monitor_snapshot(monkeypatch) -> None:
+    monitor = EventLoopLagMonitor(warn_threshold=1.0)
+    for lag in (0.01, 0.02, 1.5):
+        monitor.record(lag)
+    monkeypatch.setattr(app.state, "loop_lag_monitor", monitor, raising=False)
+    client = TestClient(app)
+    response = client.get("/system/loop-lag")
+    assert response.status_code == 200
+    assert response.json() == {
+        "samples": 3,
+        "last_ms": 1500.0,
+        "avg_ms": 510.0,
+        "p95_ms": 1500.0,
+        "max_ms": 1500.0,
+        "slow_count": 1,
+    }
+
+
+def test_watcher_health_reports_observer_counters(monkeypatch) -> None:
+    class FakeObserver:
+        def health(self) -> WatcherHealth:
+            return WatcherHealth(
+                observer_alive=True,
+                watched_roots=2,
+                observer_restarts=1,
+                emitter_restarts=0,
+                overflows=3,
+                watch_limit_errors=0,
+                resyncs=3,
+                last_issue="overflow",
+                last_issue_at=1700000000.0,
+            )
+
+    monkeypatch.setattr(app.state, "shared_observer", FakeObserver(), raising=False)
+    monkeypatch.setattr(system, "_read_inotify_limit", lambda name: 8192)
+    client = TestClient(app)
+    response = client.get("/system/watcher-health")
+    assert response.status_code == 200
+    assert response.json() == {
+        "observer_alive": True,
+        "watched_roots": 2,
+        "observer_restarts": 1,
+        "emitter_restarts": 0,
+        "overflows": 3,
+        "watch_limit_errors": 0,
+        "resyncs": 3,
+        "last_issue": "overflow",
+        "last_issue_at": 1700000000.0,
+        "max_user_watches": 8192,
+        "max_user_instances": 8192,
+    }
@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pytest
 
+from src.services.file_writer import FileWriter
 from src.services.sheet_service import SheetMeta
 from src.services.transcoder import DocxTranscoder
 
@@ -1227,3 +1228,74 @@ async def test_transcoder_internal_full_coverage_document(tmp_path: Path) -> Non
     assert "[附件.docx](attachments/附件.docx)" in markdown
     assert "![](assets/doc-full/img-full.png)" in markdown
     assert "视图容器文本" in markdown
+
+
+@pytest.mark.asyncio
+async def test_transcoder_stream_markdown_writes_same_content(tmp_path: Path) -> None:
+    blocks = [
+        {"block_id": "root", "block_type": 1, "children": ["h1", "q1"]},
+        {
+            "block_id": "h1",
+            "block_type": 3,
+            "parent_id": "root",
+            "heading1": {"elements": [{"text_run": {"content": "标题"}}]},
+        },
+        {
+            "block_id": "q1",
+            "block_type": 15,
+            "parent_id": "root",
+            "quote": {"elements": [{"text_run": {"content": "引用\n第二行"}}]},
+        },
+    ]
+    transcoder = DocxTranscoder(assets_root=tmp_path, downloader=StubDownloader())
+    target = tmp_path / "doc.md"
+
+    expected = await transcoder.to_markdown("doc-stream", blocks)
+    writer = FileWriter.open_markdown_stream(target, 1700000000.0)
+    await transcoder.stream_markdown("doc-stream", blocks, writer)
+    result = writer.commit()
+
+    assert target.read_text(encoding="utf-8") == expected
+    assert result.blocks
+
+
+class RecordingStreamWriter:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def write_lines_async(self, lines) -> None:
+        self.batches.append(list(lines))
+
+
+@pytest.mark.asyncio
+async def test_transcoder_stream_markdown_writes_top_level_blocks_in_batches(
+    tmp_path: Path,
+) -> None:
+    children = []
+    blocks: list[dict] = [{"block_id": "root", "block_type": 1, "children": children}]
+    for index in range(600):
+        # 段落与两项无序列表交替，验证分批写出时列表分组与块间空行不变
+        for suffix, block_type, key in (
+            ("p", 2, "text"),
+            ("a", 12, "bullet"),
+            ("b", 12, "bullet"),
+        ):
+            block_id = f"{suffix}{index}"
+            children.append(block_id)
+            blocks.append(
+                {
+                    "block_id": block_id,
+                    "block_type": block_type,
+                    "parent_id": "root",
+                    key: {"elements": [{"text_run": {"content": f"{suffix}-{index}"}}]},
+                }
+            )
+    transcoder = DocxTranscoder(assets_root=tmp_path, downloader=StubDownloader())
+
+    expected = await transcoder.to_markdown("doc-batches", blocks)
+    writer = RecordingStreamWriter()
+    await transcoder.stream_markdown("doc-batches", blocks, writer)
+
+    assert "\n".join(line for batch in writer.batches for line in batch).strip() == expected
+    assert len(writer.batches) > 1
+    assert max(len(batch) for batch in writer.batches) < 300
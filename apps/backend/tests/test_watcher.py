@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from src.services.watcher import DebounceFilter, FileEventHandler, IgnoreRegistry
+import errno
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services.watcher import (
+    DebounceFilter,
+    FileEventHandler,
+    IgnoreRegistry,
+    SharedObserver,
+    WatcherService,
+)
 
 
 class DummyEvent:
@@ -54,3 +67,208 @@ def test_directory_deleted_event_is_emitted_with_directory_flag() -> None:
     assert events[0].event_type == "deleted"
     assert events[0].src_path == "C:\\tmp\\folder"
     assert events[0].is_directory is True
+
+
+class FakeObserver:
+    instances = 0
+
+    def __init__(self) -> None:
+        FakeObserver.instances += 1
+        self.scheduled: dict[str, object] = {}
+        self.alive = False
+
+    def schedule(self, handler, path: str, recursive: bool = False) -> object:
+        watch = object()
+        self.scheduled[path] = watch
+        return watch
+
+    def unschedule(self, watch: object) -> None:
+        self.scheduled = {path: item for path, item in self.scheduled.items() if item is not watch}
+
+    def start(self) -> None:
+        self.alive = True
+
+    def stop(self) -> None:
+        self.alive = False
+
+    def join(self, timeout: float | None = None) -> None:
+        return None
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+def _collecting_watcher(root: Path, observer: SharedObserver, sink: list) -> WatcherService:
+    watcher = WatcherService(
+        root,
+        on_event=lambda event: sink.append(event),
+        debounce_seconds=0.0,
+        observer=observer,
+    )
+    watcher.start()
+    return watcher
+
+
+def test_shared_observer_routes_events_by_longest_root(tmp_path: Path) -> None:
+    FakeObserver.instances = 0
+    observer = SharedObserver(observer_factory=FakeObserver)
+    outer_events: list = []
+    inner_events: list = []
+    other_events: list = []
+    outer = _collecting_watcher(tmp_path / "outer", observer, outer_events)
+    _collecting_watcher(tmp_path / "outer" / "inner", observer, inner_events)
+    _collecting_watcher(tmp_path / "other", observer, other_events)
+
+    # 嵌套根目录只调度外层 watch，且全程只有一个 Observer
+    assert observer.watched_roots() == sorted(
+        [os.path.normcase(str(tmp_path / "outer")), os.path.normcase(str(tmp_path / "other"))]
+    )
+    assert FakeObserver.instances == 1
+
+    observer.dispatch(DummyEvent(str(tmp_path / "outer" / "inner" / "a.md"), event_type="modified"))
+    observer.dispatch(DummyEvent(str(tmp_path / "outer" / "b.md"), event_type="modified"))
+    observer.dispatch(
+        DummyEvent(str(tmp_path / "outer" / "c.md"), dest_path=str(tmp_path / "other" / "c.md"))
+    )
+
+    assert [event.src_path for event in inner_events] == [str(tmp_path / "outer" / "inner" / "a.md")]
+    assert [(event.event_type, event.src_path) for event in outer_events] == [
+        ("modified", str(tmp_path / "outer" / "b.md")),
+        ("deleted", str(tmp_path / "outer" / "c.md")),
+    ]
+    assert [(event.event_type, event.src_path) for event in other_events] == [
+        ("created", str(tmp_path / "other" / "c.md")),
+    ]
+
+    outer.stop()
+
+    assert observer.watched_roots() == sorted(
+        [
+            os.path.normcase(str(tmp_path / "outer" / "inner")),
+            os.path.normcase(str(tmp_path / "other")),
+        ]
+    )
+    assert not outer.is_running()
+
+
+def test_shared_observer_stops_thread_when_last_root_is_removed(tmp_path: Path) -> None:
+    observer = SharedObserver(observer_factory=FakeObserver)
+    watcher = _collecting_watcher(tmp_path, observer, [])
+    assert watcher.is_running()
+
+    watcher.stop()
+
+    assert not observer.is_alive()
+    assert observer.watched_roots() == []
+
+
+def test_shared_observer_delivers_real_filesystem_events(tmp_path: Path) -> None:
+    observer = SharedObserver()
+    first_root = tmp_path / "first"
+    second_root = tmp_path / "second"
+    first_root.mkdir()
+    second_root.mkdir()
+    first_events: list = []
+    second_events: list = []
+    first = _collecting_watcher(first_root, observer, first_events)
+    second = _collecting_watcher(second_root, observer, second_events)
+    try:
+        (second_root / "note.md").write_text("hello", encoding="utf-8")
+        deadline = time.time() + 5
+        while not second_events and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        first.stop()
+        second.stop()
+
+    assert any(event.src_path.endswith("note.md") for event in second_events)
+    assert first_events == []
+    assert not observer.is_alive()
+
+
+class FakeEmitter:
+    def __init__(self, watch: object) -> None:
+        self.watch = watch
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+class FakeEmitterObserver(FakeObserver):
+    def __init__(self) -> None:
+        super().__init__()
+        self.emitter_by_path: dict[str, FakeEmitter] = {}
+
+    @property
+    def emitters(self) -> set[FakeEmitter]:
+        return set(self.emitter_by_path.values())
+
+    def schedule(self, handler, path: str, recursive: bool = False) -> object:
+        watch = super().schedule(handler, path, recursive)
+        self.emitter_by_path[path] = FakeEmitter(watch)
+        return watch
+
+    def unschedule(self, watch: object) -> None:
+        super().unschedule(watch)
+        self.emitter_by_path = {
+            path: emitter for path, emitter in self.emitter_by_path.items() if emitter.watch is not watch
+        }
+
+
+def _resync_watcher(root: Path, observer: SharedObserver, sink: list) -> WatcherService:
+    watcher = WatcherService(
+        root,
+        on_event=lambda event: None,
+        observer=observer,
+        on_resync=lambda reason: sink.append((root.name, reason)),
+    )
+    watcher.start()
+    return watcher
+
+
+def test_shared_observer_rebuilds_dead_emitter_and_resyncs_affected_roots(tmp_path: Path) -> None:
+    observer = SharedObserver(observer_factory=FakeEmitterObserver, health_interval=None)
+    resyncs: list = []
+    _resync_watcher(tmp_path / "a", observer, resyncs)
+    _resync_watcher(tmp_path / "b", observer, resyncs)
+    inner = observer._observer
+    root_a = os.path.normcase(str(tmp_path / "a"))
+    inner.emitter_by_path[root_a].alive = False
+
+    assert observer.check_health() == 1
+    assert resyncs == [("a", "emitter_died")]
+    assert inner.emitter_by_path[root_a].alive
+    assert observer.check_health() == 0
+
+    # Observer 线程退出：换新 Observer 并重扫全部订阅
+    inner.alive = False
+    assert observer.check_health() == 2
+    assert observer._observer is not inner and observer.is_alive()
+    assert len(observer.watched_roots()) == 2
+
+    assert observer.report_overflow(tmp_path / "b" / "x.md") == 1
+    health = observer.health()
+    assert sorted(resyncs[1:]) == [
+        ("a", "observer_died"),
+        ("b", "observer_died"),
+        ("b", "overflow"),
+    ]
+    assert (health.emitter_restarts, health.observer_restarts, health.overflows) == (1, 1, 1)
+    assert health.resyncs == 4 and health.last_issue == "overflow"
+
+
+def test_shared_observer_counts_watch_limit_errors(tmp_path: Path) -> None:
+    class LimitedObserver(FakeObserver):
+        def schedule(self, handler, path: str, recursive: bool = False) -> object:
+            raise OSError(errno.ENOSPC, "inotify watch limit reached")
+
+    observer = SharedObserver(observer_factory=LimitedObserver, health_interval=None)
+    watcher = WatcherService(tmp_path, on_event=lambda event: None, observer=observer)
+
+    with pytest.raises(OSError):
+        watcher.start()
+
+    health = observer.health()
+    assert health.watch_limit_errors == 1
+    assert health.last_issue == "watch_limit"
@@ -1,3 +1,5 @@
+import os
+
 from src.services.watcher import DebounceFilter, IgnoreRegistry
 
 
@@ -13,3 +15,37 @@ def test_ignore_registry() -> None:
     ignore.add("file.txt", now=0.0)
     assert ignore.is_ignored("file.txt", now=1.0)
     assert not ignore.is_ignored("file.txt", now=3.0)
+
+
+def test_debounce_filter_reclaims_expired_entries_and_caps_size() -> None:
+    debounce = DebounceFilter(window_seconds=2.0, max_entries=3)
+    for index in range(5):
+        assert debounce.should_emit(f"file-{index}.txt", now=0.0)
+    metrics = debounce.metrics()
+    assert metrics.size == 3
+    assert metrics.evicted == 2
+    # 被淘汰的条目只会让事件提前放行，不会被误吞
+    assert debounce.should_emit("file-0.txt", now=0.5)
+    assert not debounce.should_emit("file-4.txt", now=0.5)
+
+    assert debounce.should_emit("other.txt", now=10.0)
+    metrics = debounce.metrics()
+    assert metrics.size == 1
+    assert metrics.expired == 3
+
+
+def test_ignore_registry_silences_directory_prefix() -> None:
+    ignore = IgnoreRegistry(ttl_seconds=2.0)
+    ignore.add(os.path.join("root", "bulk"), ttl_seconds=30.0, now=0.0, recursive=True)
+    nested = os.path.join("root", "bulk", "a", "b.md")
+    assert ignore.is_ignored(nested, now=1.0)
+    assert ignore.is_ignored(os.path.join("root", "bulk"), now=1.0)
+    assert not ignore.is_ignored(os.path.join("root", "bulk2", "c.md"), now=1.0)
+
+    # 已被前缀覆盖的路径不再单独占用条目
+    ignore.add(nested, now=1.0)
+    assert ignore.metrics().size == 0
+    assert ignore.prefix_metrics().size == 1
+
+    assert not ignore.is_ignored(nested, now=31.0)
+    assert ignore.prefix_metrics().size == 0
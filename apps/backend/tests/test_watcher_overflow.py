@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services import watcher_overflow
+from src.services.watcher import SharedObserver, WatcherService
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or watcher_overflow._InotifyObserver is None,
+    reason="需要 inotify",
+)
+
+
+def _max_queued_events() -> int:
+    try:
+        return int(Path("/proc/sys/fs/inotify/max_queued_events").read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def test_inotify_reports_kernel_queue_overflow(tmp_path: Path) -> None:
+    limit = _max_queued_events()
+    if not 0 < limit <= 65536:
+        pytest.skip("inotify 队列上限不适合在测试中触发溢出")
+    watcher_overflow._install_parse_hook()
+    overflows: list[int] = []
+    inotify = watcher_overflow._OverflowInotify(
+        os.fsencode(str(tmp_path)), on_overflow=lambda: overflows.append(1)
+    )
+    try:
+        # 不读取事件时持续创建文件，让内核队列溢出
+        for index in range(limit // 2 + 16):
+            (tmp_path / f"f{index}").touch()
+        for _ in range(1000):
+            if overflows or not inotify.read_events():
+                break
+    finally:
+        inotify.close()
+
+    assert overflows == [1]
+
+
+def test_create_observer_falls_back_when_watchdog_internals_differ(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(watcher_overflow, "_inotify_hooks_supported", lambda: False)
+
+    observer = watcher_overflow.create_observer(lambda path: None)
+
+    assert type(observer) is watcher_overflow._InotifyObserver
+
+
+def test_inotify_hooks_match_installed_watchdog() -> None:
+    assert watcher_overflow._inotify_hooks_supported()
+
+
+def test_shared_observer_resyncs_root_on_emitter_overflow(tmp_path: Path) -> None:
+    observer = SharedObserver(health_interval=None)
+    resyncs: list[str] = []
+    watcher = WatcherService(
+        tmp_path, on_event=lambda event: None, observer=observer, on_resync=resyncs.append
+    )
+    watcher.start()
+    try:
+        emitter = next(iter(observer._observer.emitters))
+        # 模拟读取线程在事件缓冲里遇到 IN_Q_OVERFLOW
+        emitter._inotify._inotify._on_overflow()
+        deadline = time.time() + 5
+        while not resyncs and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+
+    assert resyncs == ["overflow"]
+    assert observer.health().overflows == 1
@@ -13,13 +13,19 @@ type ConfigData = {
   auth_redirect_uri?: string;
   sync_mode?: string;
   ignore_hidden_cache_paths?: boolean;
+  local_event_burst_threshold?: number;
   token_store?: string;
   upload_interval_value?: number;
   upload_interval_unit?: string;
   upload_daily_time?: string;
+  upload_dispatch_mode?: "event" | "interval";
+  sync_max_concurrent_jobs?: number;
+  sync_task_weights?: Record<string, number>;
   download_interval_value?: number;
   download_interval_unit?: string;
   download_daily_time?: string;
+  schedule_spread_minutes?: number;
+  schedule_chain_tasks?: boolean;
   sync_log_retention_days?: number;
   sync_log_warn_size_mb?: number;
   system_log_retention_days?: number;
@@ -28,6 +34,8 @@ type ConfigData = {
   last_update_check?: number;
   allow_dev_to_stable?: boolean;
   upload_md_to_cloud?: boolean;
+  export_sub_sheets_separately?: boolean;
+  sheet_direct_export_max_cells?: number;
   device_display_name?: string;
   delete_policy?: "off" | "safe" | "strict";
   delete_grace_minutes?: number;
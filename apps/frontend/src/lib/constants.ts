@@ -48,6 +48,7 @@ export const statusLabelMap: Record<string, string> = {
   success: "完成",
   cancelled: "取消",
   mirrored: "镜像",
+  moved: "移动",
   queued: "等待上传",
   conflict: "冲突",
   linked: "关联文档",
@@ -28,6 +28,7 @@ describe("event filters", () => {
       "uploaded",
       "downloaded",
       "deleted",
+      "moved",
       "mirrored",
       "delete_pending",
       "conflict",
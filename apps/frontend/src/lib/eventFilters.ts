@@ -10,7 +10,7 @@ export type EventFilter =
 export const PROBLEM_STATUS_VALUES = ["failed", "delete_failed", "conflict", "cancelled"] as const;
 export const WARNING_STATUS_VALUES = ["skipped", "delete_pending", "cancelled", "queued"] as const;
 export const DANGER_STATUS_VALUES = ["failed", "delete_failed", "conflict"] as const;
-export const CHANGE_STATUS_VALUES = ["uploaded", "downloaded", "deleted", "mirrored", "delete_pending", "conflict"] as const;
+export const CHANGE_STATUS_VALUES = ["uploaded", "downloaded", "deleted", "moved", "mirrored", "delete_pending", "conflict"] as const;
 export const DELETE_STATUS_VALUES = ["deleted", "delete_pending", "delete_failed"] as const;
 
 export const PROBLEM_STATUSES = new Set<string>(PROBLEM_STATUS_VALUES);
@@ -44,7 +44,7 @@ const CONFLICT_STATUSES = new Set(["conflict"]);
 const ATTENTION_STATUSES = new Set([...FAILURE_STATUSES, ...CONFLICT_STATUSES]);
 const DELETE_PENDING_STATUSES = new Set(["delete_pending"]);
 const QUEUED_SYNC_STATUSES = new Set(["queued", "creating", "created", "reimporting"]);
-const SUCCESS_STATUSES = new Set(["success", "uploaded", "downloaded", "mirrored", "deleted", "linked", "bootstrapped"]);
+const SUCCESS_STATUSES = new Set(["success", "uploaded", "downloaded", "mirrored", "moved", "deleted", "linked", "bootstrapped"]);
 
 function getStatusActivityTime(status?: SyncTaskStatus | null): number | null {
   return status?.finished_at ?? status?.started_at ?? null;